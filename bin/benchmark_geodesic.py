@@ -0,0 +1,61 @@
+"""Compares geodesic measures with the planar measures they replace.
+
+Builds random polygons in longitude and latitude, then times planar shoelace
+areas of each Part, batch planar areas over the ragged arrays, and batch
+geodesic areas and perimeters. Run from the bin directory.
+"""
+
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.abspath('..'))
+from cfgeom import GeometryContainer
+from cfgeom.part import _compute_area
+from cfgeom.ragged import RaggedArrays
+
+
+def random_polygons(count, nodes, seed=0):
+    """Returns a container of star-shaped polygons scattered over the globe."""
+    rng = np.random.default_rng(seed)
+    center_x = rng.uniform(-180, 180, count)
+    center_y = rng.uniform(-60, 60, count)
+    angle = np.sort(rng.uniform(0, 2 * np.pi, (count, nodes)), axis=1)
+    radius = rng.uniform(0.05, 0.5, (count, nodes))
+    x = center_x[:, None] + radius * np.cos(angle)
+    y = center_y[:, None] + radius * np.sin(angle)
+    x = np.column_stack((x, x[:, 0])).ravel()
+    y = np.column_stack((y, y[:, 0])).ravel()
+    ragged = RaggedArrays('polygon', x, y,
+                          node_count=np.full(count, nodes + 1))
+    return GeometryContainer.from_ragged(ragged)
+
+
+def timed(label, func):
+    start = time.time()
+    result = func()
+    print('{0:<32}{1:>10.3f} s'.format(label, time.time() - start))
+    return result
+
+
+def main(count=100000, nodes=50):
+    container = random_polygons(count, nodes)
+    ragged = container.to_ragged()
+    print('{0} polygons with {1} nodes each'.format(count, nodes + 1))
+    geoms = container.geoms
+    timed('planar area, per Part', lambda: [
+        _compute_area(p.x, p.y) for g in geoms for p in g.parts])
+    planar = timed('planar area, ragged arrays',
+                   lambda: ragged.part_areas())
+    area = timed('geodesic area, WGS84', container.geodesic_area)
+    timed('geodesic perimeter, WGS84', container.geodesic_length)
+    # Square degrees shrink with latitude, so the ratio varies
+    ratio = area / planar
+    print('square meters per square degree: {0:.4g} to {1:.4g}'.format(
+        ratio.min(), ratio.max()))
+
+
+if __name__ == '__main__':
+    main()
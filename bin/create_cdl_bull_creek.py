@@ -7,7 +7,7 @@ import subprocess
 import sys
 
 import fiona
-from netCDF4 import Dataset, stringtochar
+from netCDF4 import Dataset
 import numpy as np
 from shapely.geometry import shape
 
@@ -81,28 +81,12 @@ def get_cf_geometry_collection(path_src, string_id, comids):
 
 def write_collection(coll, nc_names, coll_properties, cra, nc):
     nc_names.instance_dim = INSTANCE_DIM
-    coll.to_netcdf(nc, nc_names=nc_names, use_vlen=(not cra))
     string_id = nc_names.x_var[:(nc_names.x_var.find('_') + 1)]
+    data = OrderedDict()
     for pk, pv in coll_properties.items():
-        vname = '{}{}'.format(string_id, pk)
-        try:
-            dtype = pv.dtype
-        except AttributeError:
-            dtype = type(pv[0])
-        if dtype in (str, unicode):
-            dtype = 'S1'
-        if dtype == 'S1':
-            pv = ['' if v is None else v for v in pv]
-            max_char = len(max(pv, key=len))
-            dim_name = vname + '_strlen'
-            nc.createDimension(dim_name, max_char)
-            var = nc.createVariable(
-                vname, dtype, dimensions=(INSTANCE_DIM, dim_name))
-            for i in range(len(var)):
-                var[i] = stringtochar(np.array(pv[i], 'S' + str(max_char)))
-        else:
-            var = nc.createVariable(vname, dtype, dimensions=(INSTANCE_DIM,))
-            var[:] = pv
+        # String columns become character arrays in one call per column
+        data['{}{}'.format(string_id, pk)] = np.array(pv)
+    coll.to_netcdf(nc, nc_names=nc_names, use_vlen=(not cra), data=data)
 
 
 def copy_nc(src_file, dest_file):
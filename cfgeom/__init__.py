@@ -1,9 +1,17 @@
+from . adjacency import Adjacency
 from . container import GeometryContainer
 from . geometry import Geometry
+from . network import FlowNetwork
 from . part import Part
+from . ragged import RaggedArrays
+from . topology import Topology
+from . weights import OverlapWeights
 from . convert.json_io.json_reader import json_to_container as read_json
-from . convert.netcdf.nc_reader import read_netcdf
+from . convert.netcdf.nc_reader import (
+    iter_netcdf_chunks, read_netcdf, read_netcdf_bytes, read_netcdf_shapely)
+from . convert.netcdf.nc_updater import update_netcdf
 from . convert.shapely_io.shapely_reader import shapely_to_container as read_shapely
+from . convert.shapely_io.shapely_reader import write_shapely_netcdf
 from . _version import __version__
 
 __cf_version__ = '1.8'
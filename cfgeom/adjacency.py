@@ -0,0 +1,245 @@
+"""Finds neighboring polygons from the ring segments they share.
+
+Every ring segment of every geometry is normalized so its lesser end node
+comes first, and segments are grouped by their end node coordinates in one
+sort over the contiguous ragged arrays. Geometries sharing a segment are
+neighbors. Neighbors must therefore share nodes along their common boundary,
+as in topologically consistent layers such as catchments; boundaries that
+merely overlap, or touch at a single node, do not make neighbors.
+
+The neighbors are held in compressed sparse row (CSR) form, with the length of
+boundary shared with each neighbor.
+"""
+
+from netCDF4 import Dataset
+import numpy as np
+
+from . ragged import _offsets, _range_index
+from . topology import _sort_rows
+from . convert.netcdf.nc_constants import Attrs
+from . convert.netcdf.nc_names import NcNames
+from . convert.netcdf.nc_writer import _make_dim, _make_var, _set_attr
+
+
+class Adjacency(object):
+    """Contains the neighbors of each polygon geometry.
+
+    Attributes:
+        indptr (numpy.ndarray(int)): Offsets of each geometry's neighbors, one
+            longer than the count of geometries.
+        indices (numpy.ndarray(int)): Index of each neighbor.
+        lengths (numpy.ndarray(float)): Length of boundary shared with each
+            neighbor.
+
+    """
+
+    def __init__(self, indptr, indices, lengths):
+        """Inits Adjacency with CSR arrays.
+
+        Args:
+            indptr (array-like(int)): Offsets of each geometry's neighbors.
+            indices (array-like(int)): Index of each neighbor.
+            lengths (array-like(float)): Length of each shared boundary.
+
+        Raises:
+            ValueError: If the arrays are inconsistent.
+
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int_)
+        self.indices = np.asarray(indices, dtype=np.int_)
+        self.lengths = np.asarray(lengths, dtype=np.float64)
+        if (len(self.indices) != len(self.lengths) or
+                self.indptr[-1] != len(self.indices)):
+            raise ValueError('CSR arrays are inconsistent')
+
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+
+    def counts(self):
+        """Returns the count of neighbors of each geometry.
+
+        Returns:
+            numpy.ndarray(int): Count of entries in each row.
+
+        """
+        return np.diff(self.indptr)
+
+
+    def neighbors(self, geom):
+        """Returns the neighbors of a geometry.
+
+        Args:
+            geom (int): Index of the geometry.
+
+        Returns:
+            numpy.ndarray(int): Indices of the neighbors, in ascending order.
+
+        """
+        return self.indices[self.indptr[geom]:self.indptr[geom + 1]]
+
+
+    def to_scipy(self):
+        """Converts the adjacency to a scipy sparse matrix.
+
+        Requires scipy, installed with the scipy extra, e.g.,
+        pip install cfgeom[scipy].
+
+        Returns:
+            scipy.sparse.csr_matrix: Symmetric matrix of shared boundary
+            lengths.
+
+        """
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.lengths, self.indices, self.indptr),
+                          shape=(len(self), len(self)))
+
+
+    def to_netcdf(self, path_or_object, nc_names=None):
+        """Writes the adjacency to a netCDF file.
+
+        Neighbors are stored as a contiguous ragged array along the instance
+        dimension, so they can sit next to the geometry container they were
+        computed from.
+
+        Args:
+            path_or_object (str or netCDF4.Dataset): Target netCDF file
+                or object.  If the file exists, it is overwritten. Pass a
+                netCDF4.Dataset object to append to an existing file.
+            nc_names (nc_names.NcNames, optional): Object specifying names for
+                dimensions and variables to use in the netCDF file.
+
+        """
+        if nc_names is None:
+            nc_names = NcNames()
+        should_close = False
+        if isinstance(path_or_object, Dataset):
+            ds = path_or_object
+        else:
+            ds = Dataset(path_or_object, mode='w')
+            should_close = True
+
+        try:
+            _make_dim(ds, nc_names.instance_dim, len(self))
+            _make_dim(ds, nc_names.neighbor_dim, len(self.indices))
+            v_count = _make_var(ds, nc_names.neighbor_count_var, np.int_,
+                                (nc_names.instance_dim,))
+            _set_attr(v_count, Attrs.LONG_NAME,
+                      Attrs.NEIGHBOR_COUNT_LONG_NAME)
+            v_count[:] = self.counts()
+            v_index = _make_var(ds, nc_names.neighbor_index_var, np.int_,
+                                (nc_names.neighbor_dim,))
+            _set_attr(v_index, Attrs.LONG_NAME,
+                      Attrs.NEIGHBOR_INDEX_LONG_NAME)
+            v_index[:] = self.indices
+            v_length = _make_var(ds, nc_names.neighbor_length_var,
+                                 np.float64, (nc_names.neighbor_dim,))
+            _set_attr(v_length, Attrs.LONG_NAME,
+                      Attrs.NEIGHBOR_LENGTH_LONG_NAME)
+            v_length[:] = self.lengths
+        finally:
+            if should_close:
+                ds.close()
+
+
+    @classmethod
+    def from_netcdf(cls, path_or_object, nc_names=None):
+        """Reads an adjacency written by to_netcdf.
+
+        Args:
+            path_or_object (str or netCDF4.Dataset): Input netCDF file or
+                object.
+            nc_names (nc_names.NcNames, optional): Object specifying names for
+                dimensions and variables used in the netCDF file.
+
+        Returns:
+            Adjacency: The adjacency.
+
+        """
+        if nc_names is None:
+            nc_names = NcNames()
+        should_close = False
+        if isinstance(path_or_object, Dataset):
+            ds = path_or_object
+        else:
+            ds = Dataset(path_or_object)
+            should_close = True
+
+        try:
+            counts = ds.variables[nc_names.neighbor_count_var][:]
+            return cls(_offsets(counts),
+                       ds.variables[nc_names.neighbor_index_var][:],
+                       ds.variables[nc_names.neighbor_length_var][:])
+        finally:
+            if should_close:
+                ds.close()
+
+
+def polygon_adjacency(ragged):
+    """Finds the neighbors of each polygon geometry.
+
+    Args:
+        ragged (RaggedArrays): Polygon geometries.
+
+    Returns:
+        Adjacency: Neighbors of each geometry.
+
+    Raises:
+        ValueError: If geometry type is not polygon.
+
+    """
+    if ragged.geom_type != 'polygon':
+        raise ValueError('Adjacency requires polygon geometries')
+    count = len(ragged)
+    following = ragged.next_node_index()
+    # Compare bits, treating -0.0 as 0.0
+    x = (np.asarray(ragged.x, dtype=np.float64) + 0.0).view(np.int64)
+    y = (np.asarray(ragged.y, dtype=np.float64) + 0.0).view(np.int64)
+    segment = np.flatnonzero((x != x[following]) | (y != y[following]))
+    end = following[segment]
+    ax, ay, bx, by = x[segment], y[segment], x[end], y[end]
+    swap = (ax > bx) | ((ax == bx) & (ay > by))
+    columns = [np.where(swap, bx, ax), np.where(swap, by, ay),
+               np.where(swap, ax, bx), np.where(swap, ay, by)]
+    if not len(segment):
+        return Adjacency(np.zeros(count + 1, dtype=np.int_),
+                         np.zeros(0, dtype=np.int_), np.zeros(0))
+    order, is_new = _sort_rows(columns)
+    segment_geom = ragged.node_geom_index()[segment]
+    segment_length = np.hypot(ragged.x[end] - ragged.x[segment],
+                              ragged.y[end] - ragged.y[segment])
+
+    # Most shared segments are shared by two geometries, which are paired
+    # directly. Segments shared more widely are paired with each later
+    # segment of their group.
+    starts = np.flatnonzero(is_new)
+    sizes = np.diff(np.r_[starts, len(order)])
+    pairs = starts[sizes == 2]
+    first = order[pairs]
+    second = order[pairs + 1]
+    wide = sizes > 2
+    if np.any(wide):
+        starts = starts[wide]
+        sizes = sizes[wide]
+        member_sizes = np.repeat(sizes, sizes)
+        members = np.repeat(_range_index(starts, sizes), member_sizes)
+        partners = _range_index(np.repeat(starts, sizes), member_sizes)
+        later = partners > members
+        first = np.concatenate((first, order[members[later]]))
+        second = np.concatenate((second, order[partners[later]]))
+    a = segment_geom[first]
+    b = segment_geom[second]
+    keep = a != b
+    low = np.minimum(a[keep], b[keep])
+    high = np.maximum(a[keep], b[keep])
+    # A segment shared by a pair of geometries counts once for the pair
+    pair, inverse = np.unique(low * count + high, return_inverse=True)
+    lengths = np.bincount(inverse, weights=segment_length[first[keep]])
+    low = pair // count
+    high = pair % count
+    rows = np.concatenate((low, high))
+    cols = np.concatenate((high, low))
+    order = np.argsort(rows * count + cols)
+    return Adjacency(_offsets(np.bincount(rows, minlength=count)),
+                     cols[order], np.concatenate((lengths, lengths))[order])
@@ -0,0 +1,385 @@
+"""Clips geometries held in contiguous ragged array buffers to a box.
+
+Geometries are first sorted by their bounding boxes. Those entirely outside
+the box are dropped and those entirely inside it are copied as is, without
+any clipping arithmetic. If no geometry crosses the box edges and the ones
+kept are stored next to each other, the result refers to slices of the
+original buffers rather than copies.
+
+The remaining geometries are clipped in batch over flat arrays. Line segments
+are clipped with Liang-Barsky, and a part is split wherever it leaves the box.
+Polygon rings are clipped with Sutherland-Hodgman, one box edge at a time, so
+a concave ring leaving the box more than once stays a single ring whose
+pieces are joined along the box edges.
+"""
+
+import numpy as np
+
+from . ragged import RaggedArrays, _offsets, _range_index, _trim_z
+
+
+def _clip_half_plane(x, y, counts, ax, ay, bx, by, z=None):
+    """Clips rings to the left side of a line, one line per ring.
+
+    Args:
+        x (numpy.ndarray(float)): X coordinates of all ring nodes.
+        y (numpy.ndarray(float)): Y coordinates of all ring nodes.
+        counts (numpy.ndarray(int)): Count of nodes in each ring. Rings must
+            not be empty.
+        ax, ay (numpy.ndarray(float)): Start of the clipping line of each
+            ring.
+        bx, by (numpy.ndarray(float)): End of the clipping line of each ring.
+        z (numpy.ndarray(float), optional): Z coordinates of all ring nodes,
+            interpolated where edges cross the line.
+
+    Returns:
+        Tuple with x, y, and z coordinates of the clipped rings, where z is
+        None if not provided, and the count of nodes in each clipped ring,
+        which may be zero.
+
+    """
+    offsets = _offsets(counts)
+    previous = np.arange(len(x)) - 1
+    # The first node of each ring follows the last node
+    previous[offsets[:-1]] = offsets[1:] - 1
+    ax = np.repeat(ax, counts)
+    ay = np.repeat(ay, counts)
+    side = ((np.repeat(bx, counts) - ax) * (y - ay) -
+            (np.repeat(by, counts) - ay) * (x - ax))
+    inside = side >= 0
+    crossing = inside != inside[previous]
+    emit = inside.astype(np.int_) + crossing
+    out_offsets = np.cumsum(emit) - emit
+    coords = [x, y] if z is None else [x, y, z]
+    out = [np.empty(emit.sum()) for _ in coords]
+
+    # An edge crossing the line emits its intersection before its end node
+    cross = np.flatnonzero(crossing)
+    prior = previous[cross]
+    t = side[prior] / (side[prior] - side[cross])
+    kept = np.flatnonzero(inside)
+    for values, out_values in zip(coords, out):
+        out_values[out_offsets[cross]] = (
+            values[prior] + t * (values[cross] - values[prior]))
+        out_values[out_offsets[kept] + crossing[kept]] = values[kept]
+    new_counts = np.add.reduceat(emit, offsets[:-1]) if len(x) else emit
+    return out[0], out[1], out[2] if z is not None else None, new_counts
+
+
+def _half_plane(value, is_x, keep_greater):
+    """Describes axis-aligned half-planes as lines with the inside on the left.
+
+    Args:
+        value (numpy.ndarray(float)): Coordinate of each boundary line.
+        is_x (numpy.ndarray(bool) or bool): True for lines at constant x,
+            False for lines at constant y.
+        keep_greater (numpy.ndarray(bool) or bool): True to keep coordinates
+            greater than the line, False to keep lesser coordinates.
+
+    Returns:
+        Tuple of arrays with the x and y coordinates of the start and end of
+        each line.
+
+    """
+    value = np.asarray(value, dtype=np.float64)
+    zero = np.zeros(len(value))
+    step = np.where(keep_greater, 1.0, -1.0)
+    return (np.where(is_x, value, zero), np.where(is_x, zero, value),
+            np.where(is_x, value, step), np.where(is_x, -step, value))
+
+
+def _ring_areas(x, y, counts):
+    """Computes the absolute area of rings with the shoelace method.
+
+    Args:
+        x (numpy.ndarray(float)): X coordinates of all ring nodes.
+        y (numpy.ndarray(float)): Y coordinates of all ring nodes.
+        counts (numpy.ndarray(int)): Count of nodes in each ring. Rings must
+            not be empty.
+
+    Returns:
+        numpy.ndarray(float): Area of each ring.
+
+    """
+    offsets = _offsets(counts)
+    following = np.arange(1, len(x) + 1)
+    following[offsets[1:] - 1] = offsets[:-1]
+    cross = x * y[following] - x[following] * y
+    return np.abs(np.add.reduceat(cross, offsets[:-1])) / 2.0
+
+
+def _clip_lines(ragged, box):
+    """Clips line parts to a box with Liang-Barsky, one segment at a time.
+
+    Consecutive visible segments are joined into one part unless the line
+    leaves the box between them. Parts with a single node are kept if the
+    node is inside the box.
+
+    Args:
+        ragged (RaggedArrays): Line geometries to clip.
+        box (tuple(float)): The xmin, ymin, xmax, and ymax of the box.
+
+    Returns:
+        Tuple with the x, y, and z coordinates of the clipped parts, where z
+        is None if the buffers have no z values, the count of nodes in each
+        clipped part, and the index of the geometry each part belongs to.
+
+    """
+    xmin, ymin, xmax, ymax = box
+    part_offsets = ragged.part_offsets()
+    single = ragged.part_node_count == 1
+    # Segments start at every node except the last of each part, while a part
+    # with a single node becomes a segment from the node to itself
+    last = np.zeros(len(ragged.x), dtype=bool)
+    last[part_offsets[1:] - 1] = True
+    last[part_offsets[:-1][single]] = False
+    start = np.flatnonzero(~last)
+    is_single = single[ragged.node_part_index()[start]]
+    end = np.where(is_single, start, start + 1)
+    x0 = ragged.x[start]
+    y0 = ragged.y[start]
+    dx = ragged.x[end] - x0
+    dy = ragged.y[end] - y0
+
+    t0 = np.zeros(len(start))
+    t1 = np.ones(len(start))
+    rejected = np.zeros(len(start), dtype=bool)
+    for p, q in [(-dx, x0 - xmin), (dx, xmax - x0),
+                 (-dy, y0 - ymin), (dy, ymax - y0)]:
+        with np.errstate(divide='ignore', invalid='ignore'):
+            r = q / p
+        entering = p < 0
+        leaving = p > 0
+        t0 = np.where(entering, np.maximum(t0, r), t0)
+        t1 = np.where(leaving, np.minimum(t1, r), t1)
+        rejected |= (p == 0) & (q < 0)
+    # Segments touching the box at a single point are not kept
+    visible = ~rejected & ((t0 < t1) | (is_single & (t0 <= t1)))
+    segment = np.flatnonzero(visible)
+    start = start[segment]
+    end = end[segment]
+    t0 = t0[segment]
+    t1 = t1[segment]
+    is_single = is_single[segment]
+
+    # A run of joined segments breaks where the line enters the box, or
+    # where the preceding segment of the part is missing or was cut short
+    new_run = np.ones(len(segment), dtype=bool)
+    if len(segment):
+        new_run[1:] = ((segment[1:] != segment[:-1] + 1) |
+                       (start[1:] != end[:-1]) | (t1[:-1] < 1))
+    new_run |= (t0 > 0) | is_single
+    emit_start = new_run
+    emit_end = ~is_single
+    emit = emit_start.astype(np.int_) + emit_end
+    out_offsets = np.cumsum(emit) - emit
+    coords = [ragged.x, ragged.y]
+    if ragged.z is not None:
+        coords.append(ragged.z)
+    out = []
+    for values in coords:
+        out_values = np.empty(emit.sum())
+        v0 = values[start]
+        delta = values[end] - v0
+        # Unclipped ends keep their exact values
+        out_values[out_offsets[emit_start]] = np.where(
+            t0 > 0, v0 + t0 * delta, v0)[emit_start]
+        out_values[(out_offsets + emit_start)[emit_end]] = np.where(
+            t1 < 1, v0 + t1 * delta, values[end])[emit_end]
+        out.append(out_values)
+
+    run = np.cumsum(new_run) - 1
+    counts = np.bincount(run, weights=emit,
+                         minlength=new_run.sum()).astype(np.int_)
+    geom = ragged.node_geom_index()[start[new_run]]
+    return (out[0], out[1], out[2] if ragged.z is not None else None, counts,
+            geom)
+
+
+def _clip_polygons(ragged, box):
+    """Clips polygon rings to a box with Sutherland-Hodgman.
+
+    Repeated nodes are removed from the clipped rings, rings left without
+    area are dropped, and closed rings stay closed.
+
+    Args:
+        ragged (RaggedArrays): Polygon geometries to clip.
+        box (tuple(float)): The xmin, ymin, xmax, and ymax of the box.
+
+    Returns:
+        Tuple with the x, y, and z coordinates of the clipped rings, where z
+        is None if the buffers have no z values, the count of nodes in each
+        clipped ring, the index of the geometry each ring belongs to, and
+        whether each ring is a hole.
+
+    """
+    xmin, ymin, xmax, ymax = box
+    part = np.arange(len(ragged.part_node_count))
+    counts = ragged.part_node_count
+    x = ragged.x
+    y = ragged.y
+    z = ragged.z
+    for value, is_x, keep_greater in [(xmin, True, True),
+                                      (xmax, True, False),
+                                      (ymin, False, True),
+                                      (ymax, False, False)]:
+        line = _half_plane(np.full(len(part), value), is_x, keep_greater)
+        x, y, z, counts = _clip_half_plane(x, y, counts, *line, z=z)
+        part = part[counts > 0]
+        counts = counts[counts > 0]
+
+    # Drop nodes repeating the node before them, wrapping around the ring
+    offsets = _offsets(counts)
+    previous = np.arange(len(x)) - 1
+    previous[offsets[:-1]] = offsets[1:] - 1
+    keep = (x != x[previous]) | (y != y[previous])
+    as_int = keep.astype(np.int_)
+    counts = np.add.reduceat(as_int, offsets[:-1]) if len(x) else counts
+    x = x[keep]
+    y = y[keep]
+    z = None if z is None else z[keep]
+    nonempty = counts > 0
+    areas = np.zeros(len(counts))
+    areas[nonempty] = _ring_areas(x, y, counts[nonempty])
+    kept = (counts >= 3) & (areas > 0)
+    ring_kept = np.repeat(kept, counts)
+    part = part[kept]
+    counts = counts[kept]
+    x = x[ring_kept]
+    y = y[ring_kept]
+    z = None if z is None else z[ring_kept]
+
+    # Close rings that were closed before clipping
+    closed = ragged.is_closed()[part]
+    offsets = _offsets(counts)
+    nodes = np.arange(len(x))
+    extra = offsets[:-1][closed]
+    insert_at = offsets[1:][closed]
+    nodes = np.insert(nodes, insert_at, extra)
+    counts = counts + closed
+    z = None if z is None else z[nodes]
+    return (x[nodes], y[nodes], z, counts, ragged.part_geom_index()[part],
+            ragged.is_hole[part])
+
+
+def clip_by_box(ragged, xmin, ymin, xmax, ymax, return_index=False):
+    """Clips geometries to a box.
+
+    Points outside the box are dropped. Lines are split where they leave the
+    box. Polygon rings are cut along the box edges. Geometries left without
+    nodes are dropped. Coordinates on the box edges are inside the box.
+
+    Args:
+        ragged (RaggedArrays): Geometries to clip.
+        xmin (float): Minimum x coordinate of the box.
+        ymin (float): Minimum y coordinate of the box.
+        xmax (float): Maximum x coordinate of the box.
+        ymax (float): Maximum y coordinate of the box.
+        return_index (bool, optional): True to also return the index of the
+            original geometry of each clipped geometry.
+
+    Returns:
+        RaggedArrays: Clipped geometries, in their original order, which may
+        hold no geometries. If return_index is True, a tuple with the clipped
+        geometries and the index of each in the original buffers.
+
+    Raises:
+        ValueError: If the minimum of the box exceeds its maximum.
+
+    """
+    if xmin > xmax or ymin > ymax:
+        raise ValueError('Box minimum cannot exceed its maximum')
+    box = (xmin, ymin, xmax, ymax)
+    bounds = ragged.bounds()
+    inside = ((bounds[:, 0] >= xmin) & (bounds[:, 1] >= ymin) &
+              (bounds[:, 2] <= xmax) & (bounds[:, 3] <= ymax))
+    outside = ((bounds[:, 0] > xmax) | (bounds[:, 1] > ymax) |
+               (bounds[:, 2] < xmin) | (bounds[:, 3] < ymin))
+    crossing = np.flatnonzero(~inside & ~outside)
+    inside = np.flatnonzero(inside)
+
+    if not len(crossing):
+        result = _take_inside(ragged, inside)
+        return (result, inside) if return_index else result
+
+    sub = ragged.take(crossing)
+    if ragged.geom_type == 'point':
+        x, y, z = sub.x, sub.y, sub.z
+        keep = (x >= xmin) & (x <= xmax) & (y >= ymin) & (y <= ymax)
+        x, y = x[keep], y[keep]
+        z = None if z is None else z[keep]
+        counts = np.ones(len(x), dtype=np.int_)
+        geom = sub.node_geom_index()[keep]
+        is_hole = np.zeros(len(x), dtype=bool)
+    elif ragged.geom_type == 'line':
+        x, y, z, counts, geom = _clip_lines(sub, box)
+        is_hole = np.zeros(len(counts), dtype=bool)
+    else:
+        x, y, z, counts, geom, is_hole = _clip_polygons(sub, box)
+    geom = crossing[geom]
+
+    # Merge the clipped parts with the parts of geometries inside the box
+    part_offsets = ragged.geom_part_offsets()
+    inside_parts = _range_index(part_offsets[inside],
+                                ragged.geom_part_count()[inside])
+    part_geom = np.concatenate((ragged.part_geom_index()[inside_parts], geom))
+    part_counts = np.concatenate((ragged.part_node_count[inside_parts],
+                                  counts))
+    order = np.argsort(part_geom, kind='stable')
+    out_counts = part_counts[order]
+    destination = np.empty(len(order), dtype=np.int_)
+    destination[order] = _offsets(out_counts)[:-1]
+    n_inside = len(inside_parts)
+    inside_nodes = _range_index(destination[:n_inside],
+                                part_counts[:n_inside])
+    source_nodes = _range_index(ragged.part_offsets()[inside_parts],
+                                part_counts[:n_inside])
+    clipped_nodes = _range_index(destination[n_inside:], counts)
+    out = []
+    sources = [(ragged.x, x), (ragged.y, y)]
+    if ragged.z is not None:
+        sources.append((ragged.z, z))
+    for original, clipped in sources:
+        values = np.empty(out_counts.sum())
+        values[inside_nodes] = original[source_nodes]
+        values[clipped_nodes] = clipped
+        out.append(values)
+
+    out_geom = part_geom[order]
+    index, first = np.unique(out_geom, return_index=True)
+    node_count = (np.add.reduceat(out_counts, first) if len(first)
+                  else np.zeros(0, dtype=np.int_))
+    is_hole = np.concatenate((ragged.is_hole[inside_parts], is_hole))[order]
+    z = _trim_z(out[2]) if ragged.z is not None else None
+    result = RaggedArrays(ragged.geom_type, out[0], out[1], z, node_count,
+                          out_counts, is_hole)
+    return (result, index) if return_index else result
+
+
+def _take_inside(ragged, inside):
+    """Selects geometries inside the box, sharing buffers if possible.
+
+    Args:
+        ragged (RaggedArrays): Geometries to select from.
+        inside (numpy.ndarray(int)): Sorted indices of geometries to select.
+
+    Returns:
+        RaggedArrays: The selected geometries. If they are stored next to
+        each other, the buffers are slices of the original buffers, copied
+        only if either is later transformed or oriented in place.
+
+    """
+    if len(inside) and inside[-1] - inside[0] + 1 != len(inside):
+        return ragged.take(inside)
+    start, stop = (inside[0], inside[-1] + 1) if len(inside) else (0, 0)
+    node_offsets = ragged.node_offsets()
+    part_offsets = ragged.geom_part_offsets()
+    nodes = slice(node_offsets[start], node_offsets[stop])
+    parts = slice(part_offsets[start], part_offsets[stop])
+    z = None if ragged.z is None else _trim_z(ragged.z[nodes])
+    result = RaggedArrays(ragged.geom_type, ragged.x[nodes], ragged.y[nodes],
+                          z, ragged.node_count[start:stop],
+                          ragged.part_node_count[parts], ragged.is_hole[parts])
+    # Both buffers copy their coordinates before changing them in place
+    ragged._shares_coords = result._shares_coords = True
+    return result
@@ -0,0 +1,200 @@
+"""Hashes and compares geometries held in contiguous ragged array buffers.
+
+Each node is hashed from the bits of its coordinates and its position in its
+geometry, and each part from its node count, ring type, and position. Node and
+part hashes are summed per geometry with wrapping 64-bit arithmetic, so every
+geometry hash costs a few passes over the flat buffers rather than a loop
+over Part objects. Hashes only depend on geometry content: equal geometries
+hash equal whichever containers or files they come from.
+
+Coordinates are compared bit for bit, except that -0.0 equals 0.0, all NaN
+values are equal, and a missing z value equals a NaN z value.
+"""
+
+import hashlib
+
+import numpy as np
+
+from . ragged import _range_index
+
+
+_type_seeds = {'point': 1, 'line': 2, 'polygon': 3}
+"""dict: Value mixed into the hash of each geometry, by geometry type."""
+
+
+def _mix(vals):
+    """Scrambles 64-bit values with the SplitMix64 finalizer.
+
+    Args:
+        vals (numpy.ndarray(uint64)): Values to scramble.
+
+    Returns:
+        numpy.ndarray(uint64): Scrambled values, in a new array.
+
+    """
+    vals = vals ^ (vals >> np.uint64(30))
+    vals *= np.uint64(0xbf58476d1ce4e5b9)
+    vals ^= vals >> np.uint64(27)
+    vals *= np.uint64(0x94d049bb133111eb)
+    vals ^= vals >> np.uint64(31)
+    return vals
+
+
+def _coord_bits(vals):
+    """Returns the bits of coordinate values in canonical form.
+
+    Args:
+        vals (numpy.ndarray(float)): Coordinate values.
+
+    Returns:
+        numpy.ndarray(uint64): Bits of each value as float64, with -0.0
+        stored as 0.0 and NaN values stored as one NaN.
+
+    """
+    vals = np.asarray(vals, dtype=np.float64) + 0.0
+    vals[np.isnan(vals)] = np.nan
+    return vals.view(np.uint64)
+
+
+def _sum_groups(vals, offsets):
+    """Sums values of consecutive groups, wrapping at 64 bits.
+
+    Args:
+        vals (numpy.ndarray(uint64)): Values of all groups.
+        offsets (numpy.ndarray(int)): Offsets of each group, one longer than
+            the group count. Groups may not be empty.
+
+    Returns:
+        numpy.ndarray(uint64): Sum of each group.
+
+    """
+    if not len(vals):
+        return np.zeros(len(offsets) - 1, dtype=np.uint64)
+    return np.add.reduceat(vals, offsets[:-1])
+
+
+def geometry_hashes(ragged):
+    """Computes a content hash of every geometry.
+
+    Args:
+        ragged (RaggedArrays): Geometries to hash.
+
+    Returns:
+        numpy.ndarray(uint64): Hash of each geometry.
+
+    """
+    node_offsets = ragged.node_offsets()
+    node_position = np.arange(len(ragged.x)) - np.repeat(
+        node_offsets[:-1], ragged.node_count)
+    hashes = _mix(_coord_bits(ragged.x))
+    hashes = _mix(hashes ^ _coord_bits(ragged.y))
+    if ragged.z is not None:
+        hashes = _mix(hashes ^ _coord_bits(ragged.z))
+    else:
+        hashes = _mix(hashes ^ _coord_bits(np.array([np.nan]))[0])
+    hashes = _mix(hashes ^ node_position.astype(np.uint64))
+    node_sums = _sum_groups(hashes, node_offsets)
+
+    geom_part_offsets = ragged.geom_part_offsets()
+    part_position = np.arange(len(ragged.part_node_count)) - np.repeat(
+        geom_part_offsets[:-1], ragged.geom_part_count())
+    hashes = _mix(ragged.part_node_count.astype(np.uint64) ^
+                  (ragged.is_hole.astype(np.uint64) << np.uint64(63)))
+    hashes = _mix(hashes ^ part_position.astype(np.uint64))
+    part_sums = _sum_groups(hashes, geom_part_offsets)
+
+    seed = np.uint64(_type_seeds[ragged.geom_type])
+    return _mix(node_sums ^ _mix(part_sums ^ seed))
+
+
+def fingerprint(ragged):
+    """Computes a content hash of all geometries, in order.
+
+    Args:
+        ragged (RaggedArrays): Geometries to hash.
+
+    Returns:
+        str: Hexadecimal digest, equal for containers holding equal
+        geometries in the same order.
+
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(ragged.geom_type.encode('ascii'))
+    digest.update(geometry_hashes(ragged).astype('<u8').tobytes())
+    return digest.hexdigest()
+
+
+def diff(ragged, other):
+    """Finds the instances added, removed, or modified between two versions.
+
+    Instances are matched by index, as along the instance dimension of a
+    netCDF file.
+
+    Args:
+        ragged (RaggedArrays): Geometries of the old version.
+        other (RaggedArrays): Geometries of the new version.
+
+    Returns:
+        Tuple of numpy.ndarray(int) holding the indices of instances only in
+        the new version, of instances only in the old version, and of
+        instances in both versions whose geometries differ.
+
+    """
+    common = min(len(ragged), len(other))
+    old_hashes = geometry_hashes(ragged)
+    new_hashes = geometry_hashes(other)
+    modified = np.flatnonzero(old_hashes[:common] != new_hashes[:common])
+    added = np.arange(common, len(other))
+    removed = np.arange(common, len(ragged))
+    return added, removed, modified
+
+
+def unique_geometries(ragged):
+    """Finds the distinct geometries, matching duplicates by hash.
+
+    Duplicates found by hash are confirmed by comparing their nodes and
+    parts, so a hash collision never merges different geometries.
+
+    Args:
+        ragged (RaggedArrays): Geometries to deduplicate.
+
+    Returns:
+        Tuple of numpy.ndarray(int) holding the index of the first instance
+        of each distinct geometry, in order of first appearance, and the
+        position of each geometry among the distinct geometries.
+
+    """
+    _, first, inverse = np.unique(geometry_hashes(ragged), return_index=True,
+                                  return_inverse=True)
+    inverse = inverse.ravel()
+    representative = first[inverse]
+    duplicate = np.flatnonzero(representative != np.arange(len(ragged)))
+    source = representative[duplicate]
+
+    # Confirm duplicates, in case distinct geometries share a hash
+    differ = ((ragged.node_count[duplicate] != ragged.node_count[source]) |
+              (ragged.geom_part_count()[duplicate] !=
+               ragged.geom_part_count()[source]))
+    check = np.flatnonzero(~differ)
+    counts = ragged.node_count[duplicate[check]]
+    offsets = ragged.node_offsets()
+    nodes = _range_index(offsets[duplicate[check]], counts)
+    source_nodes = _range_index(offsets[source[check]], counts)
+    coords = [ragged.x, ragged.y] + ([] if ragged.z is None else [ragged.z])
+    equal = np.ones(len(nodes), dtype=bool)
+    for vals in coords:
+        equal &= ((vals[nodes] == vals[source_nodes]) |
+                  (np.isnan(vals[nodes]) & np.isnan(vals[source_nodes])))
+    differ[check[np.repeat(np.arange(len(check)), counts)[~equal]]] = True
+    counts = ragged.geom_part_count()[duplicate[check]]
+    offsets = ragged.geom_part_offsets()
+    parts = _range_index(offsets[duplicate[check]], counts)
+    source_parts = _range_index(offsets[source[check]], counts)
+    equal = ((ragged.part_node_count[parts] ==
+              ragged.part_node_count[source_parts]) &
+             (ragged.is_hole[parts] == ragged.is_hole[source_parts]))
+    differ[check[np.repeat(np.arange(len(check)), counts)[~equal]]] = True
+    representative[duplicate[differ]] = duplicate[differ]
+
+    first, inverse = np.unique(representative, return_inverse=True)
+    return first, inverse.ravel()
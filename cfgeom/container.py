@@ -1,10 +1,26 @@
 """Represents a geometry container, a collection of like geometries."""
 
 from . util import is_iterable, as_iterable
-from . geometry import Geometry
+from . geodesic import geodesic_area, geodesic_length
+from . geometry import Geometry, _wkt_types
+from . adjacency import polygon_adjacency
+from . clip import clip_by_box as _clip_by_box
+from . compare import (
+    diff as _diff, fingerprint as _fingerprint, geometry_hashes,
+    unique_geometries)
+from . network import FlowNetwork
+from . ragged import RaggedArrays
+from . simplify import simplify as _simplify
+from . spatial import locate_points as _locate_points, spatial_order
+from . topology import Topology
+from . validate import repair as _repair, validate as _validate
+from . weights import overlap_weights as _overlap_weights
 from . convert.json_io.json_writer import container_to_json
-from . convert.netcdf.nc_writer import write_netcdf
+from . convert.mvt.mvt_writer import container_to_mvt
+from . convert.netcdf.nc_writer import (
+    write_netcdf, write_netcdf_bytes, write_netcdf_pyramid)
 from . convert.shapely_io.shapely_writer import geom_to_shapely as to_shp
+from . convert.shapely_io.shapely_writer import ragged_to_shapely
 
 
 class GeometryContainer(object):
@@ -12,7 +28,9 @@ class GeometryContainer(object):
 
     Attributes:
         geom_type (str): Geometry type, either point, line, or polygon.
-        geoms (array-like(Geometry)): List of geometry objects.
+        geoms (array-like(Geometry)): List of geometry objects. For containers
+            built from ragged array buffers, geometry objects are created on
+            first access.
 
     """
 
@@ -42,25 +60,93 @@ class GeometryContainer(object):
             raise ValueError(m)
         self.geom_type = geometries[0].geom_type
         self.geoms = geometries
-        self._has_hole = False if self.geom_type != 'polygon' else None
-        self._is_multipart = None
-        self._has_z = None
-        self._wkt_type = None
 
 
     def __eq__(self, other):
         if type(other) is type(self):
             try:
-                attributes_to_check = [k for k in self.__dict__ if k[0] != '_']
-                for k in attributes_to_check:
-                    if self.__dict__[k] != other.__dict__[k]:
-                        return False
-                return True
+                if self.geom_type != other.geom_type:
+                    return False
+                if self._ragged is not None and other._ragged is not None:
+                    return self._ragged.equals(other._ragged)
+                return self.geoms == other.geoms
             except:
                 return False
         return False        
 
 
+    def __len__(self):
+        if self._ragged is not None:
+            return len(self._ragged)
+        return len(self._geoms)
+
+
+    @property
+    def geoms(self):
+        if self._geoms is None:
+            self._geoms = self._ragged.to_geoms()
+        return self._geoms
+
+
+    @geoms.setter
+    def geoms(self, geometries):
+        self._geoms = geometries
+        self._ragged = None
+        self._reset_cache()
+
+
+    def _reset_cache(self):
+        """Clears values computed from the geometries."""
+        self._has_hole = False if self.geom_type != 'polygon' else None
+        self._is_multipart = None
+        self._has_z = None
+        self._wkt_type = None
+
+
+    @classmethod
+    def from_ragged(cls, ragged):
+        """Builds a GeometryContainer from contiguous ragged array buffers.
+
+        Geometry and Part objects are not created until the geoms attribute is
+        accessed.
+
+        Args:
+            ragged (RaggedArrays): Buffers holding the geometry nodes.
+
+        Returns:
+            GeometryContainer: Container backed by the buffers.
+
+        Raises:
+            ValueError: If the buffers hold no geometries.
+
+        """
+        if not len(ragged):
+            raise ValueError('Geometry must be provided')
+        container = cls.__new__(cls)
+        container.geom_type = ragged.geom_type
+        container._geoms = None
+        container._ragged = ragged
+        container._reset_cache()
+        return container
+
+
+    def to_ragged(self):
+        """Returns contiguous ragged array buffers for the geometries.
+
+        The buffers are built once and cached, and container methods keep
+        them and the Geometry objects in step. After editing Geometry or Part
+        objects in place, reassign the geoms attribute so the buffers are
+        rebuilt.
+
+        Returns:
+            RaggedArrays: Buffers holding the geometry nodes.
+
+        """
+        if self._ragged is None:
+            self._ragged = RaggedArrays.from_geoms(self.geom_type, self._geoms)
+        return self._ragged
+
+
     def __ne__(self, other):
         return not self.__eq__(other)
 
@@ -75,7 +161,9 @@ class GeometryContainer(object):
             bool: True if holes are found, False otherwise.
 
         """
-        if self._has_hole is None:
+        if self._has_hole is None and self._ragged is not None:
+            self._has_hole = self._ragged.has_hole()
+        elif self._has_hole is None:
             self._has_hole = False
             for geom in self.geoms:
                 if geom.has_hole():
@@ -91,7 +179,9 @@ class GeometryContainer(object):
             bool: True if multipart geometries were found, False otherwise.
 
         """
-        if self._is_multipart is None:
+        if self._is_multipart is None and self._ragged is not None:
+            self._is_multipart = self._ragged.is_multipart()
+        elif self._is_multipart is None:
             self._is_multipart = False
             for geom in self.geoms:
                 if geom.is_multipart():
@@ -107,7 +197,9 @@ class GeometryContainer(object):
             bool: True if z values were found, False otherwise.
 
         """
-        if self._has_z is None:
+        if self._has_z is None and self._ragged is not None:
+            self._has_z = self._ragged.has_z()
+        elif self._has_z is None:
             self._has_z = False
             for geom in self.geoms:
                 if geom.has_z():
@@ -129,8 +221,258 @@ class GeometryContainer(object):
             NotImplementedError: If geometry type is not polygon.
 
         """
-        for geom in self.geoms:
-            geom.orient(holes_clockwise)
+        if self._ragged is None:
+            for geom in self._geoms:
+                geom.orient(holes_clockwise)
+        else:
+            # Geometry objects are rebuilt from the buffers when next accessed
+            self._ragged.orient(holes_clockwise)
+            self._geoms = None
+
+
+    def transform(self, func_or_matrix, inplace=True, chunk_size=None):
+        """Transforms the coordinates of all nodes at once.
+
+        The transformation runs on the contiguous ragged array buffers.
+        Geometry and Part objects are rebuilt from the buffers when next
+        accessed. A transformation that reflects coordinates reverses the
+        orientation of rings; call orient afterwards if it matters.
+
+        Args:
+            func_or_matrix (callable or array-like(float)): Either a function
+                taking x and y arrays, plus a z array if the geometries have z
+                values, and returning transformed x and y arrays, plus an
+                optional z array; or an affine matrix. A matrix of shape
+                (2, 3) or (3, 3) transforms x and y. A matrix of shape (3, 4)
+                or (4, 4) transforms x, y, and z.
+            inplace (bool, optional): True to transform this container, False
+                to return a transformed copy.
+            chunk_size (int, optional): Count of nodes transformed at once,
+                which bounds the memory used by temporary arrays.
+
+        Returns:
+            GeometryContainer: The transformed copy if inplace is False, None
+            otherwise.
+
+        Raises:
+            ValueError: If the matrix is not a supported affine matrix, or if
+                it transforms z values the geometries do not have.
+
+        """
+        if not inplace:
+            ragged = self.to_ragged().transform(func_or_matrix,
+                                                chunk_size=chunk_size)
+            return GeometryContainer.from_ragged(ragged)
+        self.to_ragged().transform(func_or_matrix, inplace=True,
+                                   chunk_size=chunk_size)
+        self._geoms = None
+        self._reset_cache()
+
+
+    def astype(self, coord_dtype):
+        """Returns a copy of the container with coordinates of another type.
+
+        Args:
+            coord_dtype (numpy.dtype): Coordinate data type of the contiguous
+                ragged array buffers, either float32 or float64. Float32
+                halves the memory used by coordinates.
+
+        Returns:
+            GeometryContainer: Container backed by the converted buffers.
+
+        Raises:
+            ValueError: If coord_dtype is not float32 or float64.
+
+        """
+        return GeometryContainer.from_ragged(
+            self.to_ragged().astype(coord_dtype))
+
+
+    def sort_spatial(self, curve='hilbert'):
+        """Reorders geometries along a space-filling curve, in-place.
+
+        Geometries are located by the mean of their nodes, so geometries near
+        each other end up near each other in the container and in netCDF
+        files written from it.
+
+        Args:
+            curve (str, optional): Space-filling curve, either hilbert or
+                morton.
+
+        Returns:
+            numpy.ndarray(int): The permutation applied, i.e., the original
+            index of each geometry in its new position. Use it to reorder data
+            variables associated with the geometries, e.g., data[permutation].
+
+        """
+        permutation = spatial_order(self.to_ragged(), curve)
+        self._ragged = self._ragged.take(permutation)
+        if self._geoms is not None:
+            self._geoms = [self._geoms[i] for i in permutation]
+        return permutation
+
+
+    def adjacency(self):
+        """Finds the neighbors of each polygon geometry.
+
+        Geometries are neighbors if they share a ring segment, i.e., two
+        consecutive nodes. Persist the result with its to_netcdf method to
+        reuse it across runs.
+
+        Returns:
+            Adjacency: Neighbors of each geometry, with the length of each
+            shared boundary.
+
+        Raises:
+            ValueError: If the container does not hold polygons.
+
+        """
+        return polygon_adjacency(self.to_ragged())
+
+
+    def clip_by_box(self, xmin, ymin, xmax, ymax, return_index=False):
+        """Clips geometries to a box.
+
+        Clipping runs over the contiguous ragged array buffers in batch.
+        Geometries entirely inside the box are kept without clipping, and
+        those left without nodes are dropped.
+
+        Args:
+            xmin (float): Minimum x coordinate of the box.
+            ymin (float): Minimum y coordinate of the box.
+            xmax (float): Maximum x coordinate of the box.
+            ymax (float): Maximum y coordinate of the box.
+            return_index (bool, optional): True to also return the index of
+                the original geometry of each clipped geometry, e.g., to
+                select matching values of data variables.
+
+        Returns:
+            GeometryContainer or None: New container with clipped geometries,
+            or None if no geometry intersects the box. If return_index is
+            True, a tuple with the container and the index of each geometry
+            in this container.
+
+        Raises:
+            ValueError: If the minimum of the box exceeds its maximum.
+
+        """
+        ragged, index = _clip_by_box(self.to_ragged(), xmin, ymin, xmax, ymax,
+                                     return_index=True)
+        container = GeometryContainer.from_ragged(ragged) if len(ragged) \
+            else None
+        return (container, index) if return_index else container
+
+
+    def flow_network(self, tolerance=None):
+        """Connects line geometries into a directed flow network.
+
+        Each geometry is a reach flowing from its first node to its last
+        node, and flows into every reach starting where it ends.
+
+        Args:
+            tolerance (float, optional): Size of the grid end point
+                coordinates are rounded to before matching. Leave as None to
+                match identical coordinates only.
+
+        Returns:
+            FlowNetwork: Connections between the geometries, for tracing
+            upstream and downstream.
+
+        Raises:
+            ValueError: If the container does not hold lines.
+
+        """
+        return FlowNetwork.from_ragged(self.to_ragged(), tolerance)
+
+
+    def geodesic_area(self, ellipsoid='WGS84'):
+        """Computes the area of polygons with longitude and latitude nodes.
+
+        Areas are computed in batch over the contiguous ragged array buffers,
+        on the sphere with the surface area of the ellipsoid. Holes are
+        subtracted.
+
+        Args:
+            ellipsoid (str or tuple(float), optional): Name of a supported
+                ellipsoid, i.e., WGS84, GRS80, or sphere, or the semi-major
+                axis in meters and the flattening.
+
+        Returns:
+            numpy.ndarray(float): Area of each geometry in square meters.
+
+        Raises:
+            ValueError: If the container does not hold polygons.
+
+        """
+        return geodesic_area(self.to_ragged(), ellipsoid)
+
+
+    def geodesic_length(self, ellipsoid='WGS84'):
+        """Computes the length of geometries with longitude and latitude nodes.
+
+        Lengths follow geodesics on the ellipsoid and are computed in batch
+        over the contiguous ragged array buffers.
+
+        Args:
+            ellipsoid (str or tuple(float), optional): Name of a supported
+                ellipsoid, i.e., WGS84, GRS80, or sphere, or the semi-major
+                axis in meters and the flattening.
+
+        Returns:
+            numpy.ndarray(float): Length of each line geometry, or perimeter
+            of each polygon geometry, in meters.
+
+        Raises:
+            ValueError: If the container holds points.
+
+        """
+        return geodesic_length(self.to_ragged(), ellipsoid)
+
+
+    def locate_points(self, x, y):
+        """Finds the polygon geometry containing each point.
+
+        Points are tested in batch against the contiguous ragged array
+        buffers, after a bounding box prefilter. Holes are honored.
+
+        Args:
+            x (array-like(float)): X coordinates of the points.
+            y (array-like(float)): Y coordinates of the points.
+
+        Returns:
+            numpy.ndarray(int): Index of the first geometry containing each
+            point, or -1 for points outside all geometries.
+
+        Raises:
+            ValueError: If the container does not hold polygons.
+
+        """
+        return _locate_points(self.to_ragged(), x, y)
+
+
+    def overlap_weights(self, x_bounds, y_bounds):
+        """Computes areas of overlap between polygons and grid cells.
+
+        Use the result to aggregate gridded values to each geometry, and
+        persist it with its to_netcdf method to reuse it across runs.
+
+        Args:
+            x_bounds (array-like(float)): For a regular grid, either the cell
+                edges along x, or an array of shape (nx, 2) with the bounds of
+                each column. For a curvilinear grid, an array of shape
+                (ny, nx, 4) with the x coordinate of the corners of each cell.
+            y_bounds (array-like(float)): Grid bounds along y, in the same form
+                as x_bounds.
+
+        Returns:
+            OverlapWeights: Areas of overlap, with one row per geometry and
+            one column per grid cell.
+
+        Raises:
+            ValueError: If the container does not hold polygons.
+
+        """
+        return _overlap_weights(self.to_ragged(), x_bounds, y_bounds)
 
 
     def wkt_type(self):
@@ -144,7 +486,11 @@ class GeometryContainer(object):
             str: The matching WKT type.
 
         """
-        if self._wkt_type is None:
+        if self._wkt_type is None and self._ragged is not None:
+            self._wkt_type = _wkt_types[self.geom_type]
+            if self.is_multipart():
+                self._wkt_type = 'Multi' + self._wkt_type
+        elif self._wkt_type is None:
             types = list(set([g.wkt_type() for g in self.geoms]))
             self._wkt_type = types[0]
             for t in types:
@@ -154,6 +500,159 @@ class GeometryContainer(object):
         return self._wkt_type
 
 
+    def simplify(self, tolerance, method='douglas-peucker'):
+        """Simplifies all geometries in the container.
+
+        Simplification runs over the contiguous ragged array buffers in batch.
+        Polygon rings keep at least three distinct nodes, and line parts keep
+        their end nodes.
+
+        Args:
+            tolerance (float): For the douglas-peucker method, the maximum
+                distance between a removed node and the simplified part. For
+                the visvalingam method, the minimum area of the triangle formed
+                by a retained node and its neighbors.
+            method (str, optional): Either douglas-peucker or visvalingam.
+
+        Returns:
+            GeometryContainer: New container with simplified geometries.
+
+        """
+        return GeometryContainer.from_ragged(
+            _simplify(self.to_ragged(), tolerance, method))
+
+
+    def geometry_hashes(self):
+        """Computes a content hash of every geometry.
+
+        Hashes are computed over the contiguous ragged array buffers in
+        batch, and equal geometries hash equal across containers.
+
+        Returns:
+            numpy.ndarray(uint64): Hash of each geometry.
+
+        """
+        return geometry_hashes(self.to_ragged())
+
+
+    def fingerprint(self):
+        """Computes a content hash of the container.
+
+        Returns:
+            str: Hexadecimal digest, equal for containers holding equal
+            geometries in the same order.
+
+        """
+        return _fingerprint(self.to_ragged())
+
+
+    def diff(self, other):
+        """Finds the instances changed in another version of the container.
+
+        Instances are matched by index and compared by geometry hash, which
+        is much faster than comparing geometries with ==.
+
+        Args:
+            other (GeometryContainer): New version of the container.
+
+        Returns:
+            Tuple of numpy.ndarray(int) holding the indices of instances
+            added in other, of instances removed from this container, and of
+            instances in both whose geometries differ.
+
+        """
+        return _diff(self.to_ragged(), other.to_ragged())
+
+
+    def deduplicate(self):
+        """Finds the distinct geometries of the container.
+
+        Geometries are matched by content hash, and matches are confirmed
+        node by node.
+
+        Returns:
+            Tuple with a new container holding each distinct geometry once, in
+            order of first appearance, and numpy.ndarray(int) giving the
+            position of each geometry of this container in the new one.
+
+        """
+        ragged = self.to_ragged()
+        first, index = unique_geometries(ragged)
+        return GeometryContainer.from_ragged(ragged.take(first)), index
+
+
+    def validate(self):
+        """Checks every geometry for structural errors.
+
+        Checks run over the contiguous ragged array buffers in batch. They
+        find NaN coordinates, repeated nodes, parts with too few distinct
+        nodes, unclosed polygon rings, and polygons starting with a hole, but
+        not self-intersections.
+
+        Returns:
+            numpy.ndarray(int): Error flags of each geometry, combined from
+            cfgeom.validate.Errors values, or zero if the geometry is valid.
+
+        """
+        return _validate(self.to_ragged())
+
+
+    def repair(self, return_index=False):
+        """Repairs the structural errors found by validate.
+
+        NaN and repeated nodes are dropped, polygon rings are closed, and
+        holes are moved after the first exterior ring of their geometry.
+        Parts left with too few distinct nodes, and geometries left without
+        parts, are dropped.
+
+        Args:
+            return_index (bool, optional): True to also return the index of
+                the original geometry of each repaired geometry, e.g., to
+                select matching values of data variables.
+
+        Returns:
+            GeometryContainer or None: New container with repaired geometries,
+            or None if no geometry could be repaired. If return_index is
+            True, a tuple with the container and the index of each geometry
+            in this container.
+
+        """
+        ragged, index = _repair(self.to_ragged(), return_index=True)
+        container = GeometryContainer.from_ragged(ragged) if len(ragged) \
+            else None
+        return (container, index) if return_index else container
+
+
+    @classmethod
+    def from_topology(cls, topology):
+        """Creates a geometry container from shared arcs.
+
+        Args:
+            topology (Topology): Topology holding line or polygon geometries.
+
+        Returns:
+            GeometryContainer: Container backed by the rebuilt buffers.
+
+        """
+        return cls.from_ragged(topology.to_ragged())
+
+
+    def to_topology(self):
+        """Stores runs of nodes shared between parts once, as arcs.
+
+        Neighboring polygons store each shared boundary once, so the arc node
+        arrays may be much smaller than the node arrays of the container.
+
+        Returns:
+            Topology: Topology holding the geometries as arcs.
+
+        Raises:
+            ValueError: If geometry type is not line or polygon.
+
+        """
+        return Topology.from_ragged(self.to_ragged())
+
+
     def to_json(self):
         """Serializes the geometry container to JSON.
 
@@ -164,7 +663,34 @@ class GeometryContainer(object):
         return container_to_json(self)
 
 
-    def to_netcdf(self, netcdf_path_or_object, nc_names=None, use_vlen=False):
+    def to_mvt(self, z, x, y, data=None, **kwargs):
+        """Encodes the geometries as a Mapbox Vector Tile.
+
+        To encode many tiles, or all tiles of a zoom level, create a
+        convert.mvt.mvt_writer.TileEncoder once and reuse it.
+
+        Args:
+            z (int): Zoom level.
+            x (int): Tile column, counted from the west.
+            y (int): Tile row, counted from the north.
+            data (dict, optional): Arrays of attribute values, keyed by name,
+                with one value per geometry.
+            **kwargs: Other options of TileEncoder, e.g., extent, buffer,
+                tolerance, and whether coordinates are geographic.
+
+        Returns:
+            bytes: The tile as an MVT protocol buffer, which is empty if no
+            geometry overlaps the tile.
+
+        """
+        return container_to_mvt(self, z, x, y, data, **kwargs)
+
+
+    def to_netcdf(self, netcdf_path_or_object, nc_names=None, use_vlen=False,
+                  zlib=False, coord_encoding=None, coord_quantum=None,
+                  sort_spatial=None, use_topology=False, data=None,
+                  unlimited=False, deduplicate=False, coord_dtype=None,
+                  count_dtype=None):
         """Exports the geometry container to a CF-compliant netCDF file.
 
         Args:
@@ -177,10 +703,99 @@ class GeometryContainer(object):
             use_vlen (bool, optional): True if variable length (VLEN) arrays
                 from the netCDF enhanced model should be used for variables
                 such as node coordinate arrays, False otherwise.
+            zlib (bool, optional): True if variables should be compressed with
+                zlib, False otherwise. Ignored for VLEN variables.
+            coord_encoding (str, optional): Encoding applied to node
+                coordinates within each part, either 'delta' or 'xor'. Leave as
+                None to write plain CF coordinates.
+            coord_quantum (float, optional): Rounding quantum required for
+                delta encoding.
+            sort_spatial (str, optional): If provided, geometries are written
+                in order along this space-filling curve, either hilbert or
+                morton. The container itself is not reordered.
+            use_topology (bool, optional): True if runs of nodes shared
+                between line or polygon parts should be stored once, as arcs.
+            data (dict or numpy.ndarray, optional): Data variables with one
+                value per geometry, as a dictionary of arrays keyed by
+                variable name or as a structured array. They are written
+                along the instance dimension and linked to the geometry
+                container.
+            unlimited (bool, optional): True if the node and part dimensions
+                should be unlimited, so cfgeom.update_netcdf can grow them.
+            deduplicate (bool, optional): True if identical geometries should
+                be stored once, with a geometry index variable giving the
+                stored geometry of each instance.
+            coord_dtype (numpy.dtype, optional): Data type of node coordinate
+                variables, either float32 or float64. Defaults to the type of
+                the coordinate buffers.
+            count_dtype (numpy.dtype or str, optional): Integer data type of
+                count and index variables, or 'auto' for the smallest type
+                holding the values of each variable.
+
+        Returns:
+            numpy.ndarray(int) or None: If sort_spatial is provided, the
+            permutation applied to the geometries, as in sort_spatial().
+
+        """
+        return write_netcdf(self, netcdf_path_or_object, nc_names=nc_names,
+                            use_vlen=use_vlen, zlib=zlib,
+                            coord_encoding=coord_encoding,
+                            coord_quantum=coord_quantum,
+                            sort_spatial=sort_spatial,
+                            use_topology=use_topology, data=data,
+                            unlimited=unlimited, deduplicate=deduplicate,
+                            coord_dtype=coord_dtype, count_dtype=count_dtype)
+
+
+    def to_netcdf_bytes(self, file_format='NETCDF4', **kwargs):
+        """Exports the geometry container to an in-memory netCDF file.
+
+        Use this to return netCDF from a service without a temporary file.
+
+        Args:
+            file_format (str, optional): NetCDF file format, e.g., NETCDF4 or
+                NETCDF3_64BIT_DATA. VLEN arrays require NETCDF4.
+            **kwargs: Options accepted by to_netcdf, e.g., nc_names, zlib, or
+                data.
+
+        Returns:
+            memoryview: Contents of the netCDF file. Read it back with
+            cfgeom.read_netcdf_bytes.
+
+        """
+        return write_netcdf_bytes(self, file_format=file_format, **kwargs)
+
+
+    def to_netcdf_pyramid(self, netcdf_path_or_object, tolerances,
+                          nc_names=None, use_vlen=False, zlib=False,
+                          method='douglas-peucker'):
+        """Exports the container and simplified versions of it to netCDF.
+
+        Each tolerance adds a simplified level of detail, written as a sibling
+        geometry container in the same file. Use the level or tolerance
+        arguments of read_netcdf to read a single level.
+
+        Args:
+            netcdf_path_or_object (str or netCDF4.Dataset): Target netCDF file
+                or object.  If the file exists, it is overwritten. Pass a
+                netCDF4.Dataset object to append to an existing file.
+            tolerances (array-like(float)): Simplification tolerance for each
+                level after the full detail level, in increasing order.
+            nc_names (cfgeom.convert.netcdf.nc_names.NcNames, optional): Object
+                specifying names for the full detail level. Simplified levels
+                prefix these names with lod1_, lod2_, and so on.
+            use_vlen (bool, optional): True if variable length (VLEN) arrays
+                from the netCDF enhanced model should be used for variables
+                such as node coordinate arrays, False otherwise.
+            zlib (bool, optional): True if variables should be compressed with
+                zlib, False otherwise. Ignored for VLEN variables.
+            method (str, optional): Simplification method, either
+                douglas-peucker or visvalingam.
 
         """
-        write_netcdf(self, netcdf_path_or_object, nc_names=nc_names,
-                     use_vlen=use_vlen)
+        write_netcdf_pyramid(self, netcdf_path_or_object, tolerances,
+                             nc_names=nc_names, use_vlen=use_vlen, zlib=zlib,
+                             method=method)
 
 
     def to_shapely(self, shapely_geom_type=None):
@@ -195,4 +810,6 @@ class GeometryContainer(object):
             list(shapely.geometry.BaseGeometry): List of shapely geometries.
 
         """
+        if self._ragged is not None:
+            return ragged_to_shapely(self._ragged, shapely_geom_type)
         return [to_shp(g, shapely_geom_type) for g in self.geoms]
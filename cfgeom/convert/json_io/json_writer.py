@@ -3,6 +3,11 @@
 import json
 
 
+_container_attrs = ('geom_type', '_has_hole', '_is_multipart', '_has_z',
+                    '_wkt_type')
+"""tuple: GeometryContainer attributes included in serializations."""
+
+
 def _dict_to_json(dict_obj):
     """Exports a Python dictionary to JSON.
 
@@ -101,8 +106,9 @@ def container_to_dict(container):
     container.has_z()
     container.wkt_type()
 
-    ret = container.__dict__.copy()
-    ret['geoms'] = [geom_to_dict(g) for g in ret['geoms']]
+    ret = dict((k, v) for k, v in container.__dict__.items()
+               if k in _container_attrs)
+    ret['geoms'] = [geom_to_dict(g) for g in container.geoms]
     return ret
 
     
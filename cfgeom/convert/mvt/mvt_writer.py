@@ -0,0 +1,567 @@
+"""Encodes geometry containers as Mapbox Vector Tiles (MVT).
+
+Tiles follow the Web Mercator tiling scheme, version 2 of the MVT
+specification, and are encoded as protocol buffers without a protobuf
+library. For each tile, candidate geometries are found with a grid index of
+bounding boxes, clipped in batch to the tile and a buffer around it,
+quantized to integer tile coordinates, and simplified. Geometry commands of
+all features in a tile are built and varint encoded at once over flat arrays.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ... clip import clip_by_box
+from ... ragged import RaggedArrays, _offsets, _range_index
+from ... simplify import simplify
+from ... spatial import GridIndex
+
+
+_earth_radius = 6378137.0
+"""float: Radius in meters of the Web Mercator sphere."""
+
+_origin = np.pi * _earth_radius
+"""float: Web Mercator coordinate of the east and north edges of the world."""
+
+_max_lat = 85.0511287798066
+"""float: Latitude of the north edge of the Web Mercator world."""
+
+_geom_types = {'point': 1, 'line': 2, 'polygon': 3}
+"""dict: MVT feature geometry type of each geometry type."""
+
+_move_to, _line_to, _close_path = 1, 2, 7
+"""int: MVT geometry command identifiers."""
+
+
+def _zigzag(vals):
+    """Maps signed integers to unsigned integers as protobuf sint types do.
+
+    Args:
+        vals (numpy.ndarray(int)): Signed integers.
+
+    Returns:
+        numpy.ndarray(uint64): Zigzag encoded values.
+
+    """
+    vals = np.asarray(vals, dtype=np.int64)
+    return ((vals << 1) ^ (vals >> 63)).astype(np.uint64)
+
+
+def _varints(vals):
+    """Encodes unsigned integers as protobuf base 128 varints.
+
+    Args:
+        vals (numpy.ndarray(int)): Non-negative integers.
+
+    Returns:
+        Tuple with the encoded bytes and the offset of each value within
+        them, one longer than the values.
+
+    """
+    vals = np.asarray(vals).astype(np.uint64)
+    nbytes = np.ones(len(vals), dtype=np.int_)
+    for k in range(1, 10):
+        nbytes += vals >= np.uint64(1) << np.uint64(7 * k)
+    offsets = _offsets(nbytes)
+    value = np.repeat(np.arange(len(vals)), nbytes)
+    position = np.arange(offsets[-1]) - offsets[value]
+    out = (vals[value] >> (np.uint64(7) * position.astype(np.uint64))) & \
+        np.uint64(0x7f)
+    # Every byte but the last of each value has its high bit set
+    more = np.ones(len(out), dtype=bool)
+    more[offsets[1:] - 1] = False
+    out[more] |= np.uint64(0x80)
+    return out.astype(np.uint8).tobytes(), offsets
+
+
+def _varint(val):
+    """Encodes one unsigned integer as a protobuf varint.
+
+    Args:
+        val (int): Non-negative integer.
+
+    Returns:
+        bytes: The encoded value.
+
+    """
+    out = bytearray()
+    while val > 0x7f:
+        out.append((val & 0x7f) | 0x80)
+        val >>= 7
+    out.append(val)
+    return bytes(out)
+
+
+def _key(field, wire_type):
+    """Encodes a protobuf field key.
+
+    Args:
+        field (int): Field number.
+        wire_type (int): Wire type, 0 for varints, 1 for 64-bit values, or 2
+            for length delimited values.
+
+    Returns:
+        bytes: The encoded key.
+
+    """
+    return _varint((field << 3) | wire_type)
+
+
+def _length_delimited(field, payload):
+    """Encodes a protobuf field holding bytes, a string, or a message.
+
+    Args:
+        field (int): Field number.
+        payload (bytes): Encoded value.
+
+    Returns:
+        bytes: The encoded field.
+
+    """
+    return _key(field, 2) + _varint(len(payload)) + payload
+
+
+def _encode_value(value):
+    """Encodes a feature attribute value as an MVT Value message.
+
+    Args:
+        value (str, bool, int, or float): The value.
+
+    Returns:
+        bytes: The encoded message.
+
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return _key(7, 0) + _varint(int(value))
+    if isinstance(value, (int, np.integer)):
+        if value < 0:
+            return _key(6, 0) + _varint(int(_zigzag([value])[0]))
+        return _key(5, 0) + _varint(int(value))
+    if isinstance(value, (float, np.floating)):
+        return _key(3, 1) + np.float64(value).astype('<f8').tobytes()
+    if isinstance(value, bytes):
+        value = value.decode('utf-8')
+    return _length_delimited(1, str(value).encode('utf-8'))
+
+
+def _is_missing(vals):
+    """Flags values that cannot be stored as attributes.
+
+    Args:
+        vals (numpy.ndarray): Attribute values, possibly masked.
+
+    Returns:
+        numpy.ndarray(bool): True for masked values and NaN.
+
+    """
+    missing = np.ma.getmaskarray(vals)
+    if vals.dtype.kind == 'f':
+        missing = missing | np.isnan(np.ma.getdata(vals))
+    return missing
+
+
+def lonlat_to_mercator(lon, lat):
+    """Projects longitude and latitude to Web Mercator coordinates.
+
+    Latitudes beyond the edges of the Web Mercator world are moved to the
+    nearest edge.
+
+    Args:
+        lon (array-like(float)): Longitude in degrees.
+        lat (array-like(float)): Latitude in degrees.
+
+    Returns:
+        Tuple of numpy.ndarray(float) with x and y coordinates in meters.
+
+    """
+    lon = np.asarray(lon, dtype=np.float64)
+    lat = np.clip(np.asarray(lat, dtype=np.float64), -_max_lat, _max_lat)
+    x = np.radians(lon) * _earth_radius
+    y = np.log(np.tan(np.pi / 4 + np.radians(lat) / 2)) * _earth_radius
+    return x, y
+
+
+def tile_bounds(z, x, y):
+    """Computes the Web Mercator bounds of a tile.
+
+    Args:
+        z (int): Zoom level.
+        x (int): Tile column, counted from the west.
+        y (int): Tile row, counted from the north.
+
+    Returns:
+        tuple(float): Minimum x, minimum y, maximum x, and maximum y of the
+        tile in meters.
+
+    """
+    size = 2 * _origin / 2 ** z
+    return (-_origin + x * size, _origin - (y + 1) * size,
+            -_origin + (x + 1) * size, _origin - y * size)
+
+
+class TileEncoder(object):
+    """Encodes the geometries of a container into vector tiles.
+
+    Attributes:
+        ragged (RaggedArrays): Geometries in Web Mercator coordinates.
+        index (spatial.GridIndex): Bounding boxes of the geometries.
+        data (dict): Attribute values of each geometry, keyed by name.
+        layer_name (str): Name of the tile layer holding the geometries.
+        extent (int): Count of integer tile coordinates along each side of a
+            tile.
+        buffer (int): Width in tile coordinates of the margin around each
+            tile within which geometries are kept.
+        tolerance (float): Simplification tolerance in tile coordinates.
+
+    """
+
+    def __init__(self, container, data=None, layer_name='geometries',
+                 extent=4096, buffer=64, tolerance=1.0, geographic=True):
+        """Inits TileEncoder with a container and its data variables.
+
+        Args:
+            container (GeometryContainer): The geometries.
+            data (dict, optional): Arrays of attribute values, keyed by
+                name, with one value per geometry. Masked and NaN values are
+                omitted from tiles.
+            layer_name (str, optional): Name of the tile layer.
+            extent (int, optional): Count of integer tile coordinates along
+                each side of a tile.
+            buffer (int, optional): Width in tile coordinates of the margin
+                around each tile within which geometries are kept.
+            tolerance (float, optional): Douglas-Peucker simplification
+                tolerance in tile coordinates. Use 0 to only remove repeated
+                nodes.
+            geographic (bool, optional): True if coordinates are longitude
+                and latitude in degrees, False if they are already Web
+                Mercator meters.
+
+        Raises:
+            ValueError: If a data array does not have one value per
+                geometry.
+
+        """
+        ragged = container.to_ragged()
+        if geographic:
+            x, y = lonlat_to_mercator(ragged.x, ragged.y)
+            ragged = RaggedArrays(ragged.geom_type, x, y, None,
+                                  ragged.node_count, ragged.part_node_count,
+                                  ragged.is_hole)
+        self.ragged = ragged
+        self.index = GridIndex(ragged.bounds())
+        self.data = {}
+        for name, vals in (data or {}).items():
+            vals = np.ma.asarray(vals)
+            if vals.shape != (len(ragged),):
+                m = 'Data variable {0} must have one value per geometry'
+                raise ValueError(m.format(name))
+            self.data[name] = vals
+        self.layer_name = layer_name
+        self.extent = int(extent)
+        self.buffer = int(buffer)
+        self.tolerance = tolerance
+
+
+    def tiles(self, z):
+        """Lists the tiles overlapping the bounding box of any geometry.
+
+        Args:
+            z (int): Zoom level.
+
+        Returns:
+            list(tuple(int)): Column and row of each tile, in row order.
+
+        """
+        n = 2 ** z
+        size = 2 * _origin / n
+        bounds = self.index.bounds
+        x0 = np.clip(np.floor((bounds[:, 0] + _origin) / size), 0, n - 1)
+        x1 = np.clip(np.floor((bounds[:, 2] + _origin) / size), 0, n - 1)
+        y0 = np.clip(np.floor((_origin - bounds[:, 3]) / size), 0, n - 1)
+        y1 = np.clip(np.floor((_origin - bounds[:, 1]) / size), 0, n - 1)
+        nx = (x1 - x0 + 1).astype(np.int64)
+        ny = (y1 - y0 + 1).astype(np.int64)
+        geom = np.repeat(np.arange(len(bounds)), nx * ny)
+        k = np.arange(len(geom)) - np.repeat(_offsets(nx * ny)[:-1], nx * ny)
+        tx = x0[geom].astype(np.int64) + k % nx[geom]
+        ty = y0[geom].astype(np.int64) + k // nx[geom]
+        keys = np.unique(ty * n + tx)
+        return [(int(key % n), int(key // n)) for key in keys]
+
+
+    def _tile_ragged(self, z, x, y):
+        """Clips, quantizes, and simplifies geometries for a tile.
+
+        Args:
+            z (int): Zoom level.
+            x (int): Tile column.
+            y (int): Tile row.
+
+        Returns:
+            Tuple with the geometries in integer tile coordinates, or None if
+            no geometry overlaps the tile, and the index of each.
+
+        """
+        xmin, ymin, xmax, ymax = tile_bounds(z, x, y)
+        scale = self.extent / (xmax - xmin)
+        margin = self.buffer / scale
+        box = (xmin - margin, ymin - margin, xmax + margin, ymax + margin)
+        _, candidates = self.index.query_boxes(box)
+        if not len(candidates):
+            return None, candidates
+        ragged, index = clip_by_box(self.ragged.take(candidates), *box,
+                                    return_index=True)
+        if not len(ragged):
+            return None, index
+        index = candidates[index]
+        # Tile coordinates run east and south from the north west corner
+        tx = np.rint((ragged.x - xmin) * scale)
+        ty = np.rint((ymax - ragged.y) * scale)
+        # Drop nodes repeating the node before them in the same part
+        keep = np.ones(len(tx), dtype=bool)
+        keep[1:] = (tx[1:] != tx[:-1]) | (ty[1:] != ty[:-1])
+        keep[ragged.part_offsets()[:-1]] = True
+        ragged = RaggedArrays(ragged.geom_type, tx, ty, None,
+                              ragged.node_count, ragged.part_node_count,
+                              ragged.is_hole).select_nodes(keep)
+        if self.tolerance > 0 and ragged.geom_type != 'point':
+            ragged = simplify(ragged, self.tolerance)
+        return ragged, index
+
+
+    def _geometry_commands(self, ragged):
+        """Builds the MVT geometry commands of every feature.
+
+        Line parts need two distinct nodes, and polygon rings three distinct
+        nodes enclosing some area. Polygon exteriors are wound clockwise and
+        holes anticlockwise in tile coordinates, and holes of dropped
+        exteriors are dropped.
+
+        Args:
+            ragged (RaggedArrays): Geometries in integer tile coordinates.
+
+        Returns:
+            Tuple with the encoded commands of all features, the byte offset
+            of each feature within them, one longer than the features, and
+            a flag for each feature that has commands.
+
+        """
+        geom_type = ragged.geom_type
+        x = ragged.x.astype(np.int64)
+        y = ragged.y.astype(np.int64)
+        if geom_type == 'point':
+            # All nodes of a geometry follow a single MoveTo command
+            counts = ragged.node_count
+            unit_geom = np.arange(len(ragged))
+            nodes = np.arange(len(x))
+        else:
+            counts = ragged.part_node_count.copy()
+            unit_geom = ragged.part_geom_index()
+            starts = ragged.part_offsets()[:-1]
+            if geom_type == 'polygon':
+                # Rings are closed with ClosePath rather than a closing node
+                counts -= ragged.is_closed()
+                keep = counts >= 3
+                nodes = _range_index(starts, counts)
+                ring = np.repeat(np.arange(len(counts)), counts)
+                following = np.arange(1, len(nodes) + 1)
+                ends = _offsets(counts)
+                following[ends[1:] - 1] = ends[:-1]
+                cross = (x[nodes] * y[nodes[following]] -
+                         x[nodes[following]] * y[nodes])
+                signed = np.bincount(ring, weights=cross,
+                                     minlength=len(counts))
+                keep &= signed != 0
+                exterior = np.cumsum(~ragged.is_hole) - 1
+                keep &= keep[np.flatnonzero(~ragged.is_hole)][exterior]
+                # Positive area in tile coordinates winds clockwise
+                reverse = (signed > 0) == ragged.is_hole
+            else:
+                keep = counts >= 2
+                reverse = np.zeros(len(counts), dtype=bool)
+            counts = counts[keep]
+            starts = starts[keep]
+            unit_geom = unit_geom[keep]
+            reverse = reverse[keep]
+            position = np.arange(counts.sum()) - np.repeat(
+                _offsets(counts)[:-1], counts)
+            position = np.where(np.repeat(reverse, counts),
+                                np.repeat(counts, counts) - 1 - position,
+                                position)
+            nodes = np.repeat(starts, counts) + position
+
+        # Coordinates are deltas from the previous node of the feature
+        px = x[nodes]
+        py = y[nodes]
+        node_geom = np.repeat(unit_geom, counts)
+        first = np.ones(len(nodes), dtype=bool)
+        first[1:] = node_geom[1:] != node_geom[:-1]
+        dx = px - np.where(first, 0, np.roll(px, 1))
+        dy = py - np.where(first, 0, np.roll(py, 1))
+
+        header = {'point': 1, 'line': 2, 'polygon': 3}[geom_type]
+        lengths = header + 2 * counts
+        unit_offsets = _offsets(lengths)
+        stream = np.zeros(unit_offsets[-1], dtype=np.uint64)
+        unit_start = unit_offsets[:-1]
+        j = np.arange(len(nodes)) - np.repeat(_offsets(counts)[:-1], counts)
+        pos = np.repeat(unit_start, counts) + 1 + 2 * j
+        if geom_type == 'point':
+            stream[unit_start] = _move_to | (counts << 3)
+        else:
+            stream[unit_start] = _move_to | (1 << 3)
+            stream[unit_start + 3] = _line_to | ((counts - 1) << 3)
+            pos += j >= 1
+        if geom_type == 'polygon':
+            stream[unit_offsets[1:] - 1] = _close_path | (1 << 3)
+        stream[pos] = _zigzag(dx)
+        stream[pos + 1] = _zigzag(dy)
+
+        encoded, byte_offsets = _varints(stream)
+        geom_units = np.bincount(unit_geom, minlength=len(ragged))
+        unit_bounds = _offsets(geom_units)
+        feature_offsets = byte_offsets[unit_offsets[unit_bounds]]
+        return encoded, feature_offsets, geom_units > 0
+
+
+    def encode(self, z, x, y):
+        """Encodes a tile.
+
+        Args:
+            z (int): Zoom level.
+            x (int): Tile column, counted from the west.
+            y (int): Tile row, counted from the north.
+
+        Returns:
+            bytes: The tile as an MVT protocol buffer, which is empty if no
+            geometry overlaps the tile.
+
+        """
+        ragged, index = self._tile_ragged(z, x, y)
+        if ragged is None:
+            return b''
+        encoded, offsets, has_commands = self._geometry_commands(ragged)
+        if not np.any(has_commands):
+            return b''
+
+        # Attribute values are shared by features through key and value tags
+        keys = list(self.data)
+        values = []
+        tags = np.zeros((len(index), 2 * len(keys)), dtype=np.int64)
+        tagged = np.zeros((len(index), 2 * len(keys)), dtype=bool)
+        for k, name in enumerate(keys):
+            vals = self.data[name][index]
+            present = ~_is_missing(vals)
+            unique, inverse = np.unique(np.ma.getdata(vals)[present],
+                                        return_inverse=True)
+            tags[:, 2 * k] = k
+            tags[present, 2 * k + 1] = len(values) + inverse
+            tagged[:, 2 * k:2 * k + 2] = present[:, None]
+            values.extend(_encode_value(v.item() if hasattr(v, 'item')
+                                        else v) for v in unique)
+        tag_bytes, tag_offsets = _varints(tags[tagged])
+        tag_bounds = _offsets(tagged.sum(axis=1))
+
+        feature_type = _key(3, 0) + _varint(_geom_types[ragged.geom_type])
+        features = []
+        for f in np.flatnonzero(has_commands):
+            geometry = encoded[offsets[f]:offsets[f + 1]]
+            message = _key(1, 0) + _varint(int(index[f]))
+            if tag_bounds[f + 1] > tag_bounds[f]:
+                message += _length_delimited(2, tag_bytes[
+                    tag_offsets[tag_bounds[f]]:tag_offsets[tag_bounds[f + 1]]])
+            message += feature_type + _length_delimited(4, geometry)
+            features.append(_length_delimited(2, message))
+
+        layer = (_key(15, 0) + _varint(2) +
+                 _length_delimited(1, self.layer_name.encode('utf-8')) +
+                 b''.join(features) +
+                 b''.join(_length_delimited(3, k.encode('utf-8'))
+                          for k in keys) +
+                 b''.join(_length_delimited(4, v) for v in values) +
+                 _key(5, 0) + _varint(self.extent))
+        return _length_delimited(3, layer)
+
+
+    def encode_zoom(self, z, max_workers=None, chunk_size=64):
+        """Encodes every tile of a zoom level holding geometries.
+
+        Tiles are encoded in a pool of processes, each receiving a copy of
+        the encoder once.
+
+        Args:
+            z (int): Zoom level.
+            max_workers (int, optional): Count of processes. Use 1 to encode
+                in the calling process. Defaults to the count of processors.
+            chunk_size (int, optional): Count of tiles sent to a process at
+                once.
+
+        Returns:
+            dict: Tile bytes keyed by tile column and row. Empty tiles are
+            omitted.
+
+        """
+        tiles = self.tiles(z)
+        chunks = [tiles[i:i + chunk_size]
+                  for i in range(0, len(tiles), chunk_size)]
+        if max_workers == 1:
+            results = [_encode_chunk(z, chunk, self) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers, initializer=_init_worker,
+                                     initargs=(self,)) as executor:
+                results = list(executor.map(_encode_chunk,
+                                            [z] * len(chunks), chunks))
+        return {tile: data for chunk, result in zip(chunks, results)
+                for tile, data in zip(chunk, result) if data}
+
+
+_worker_encoder = None
+"""TileEncoder: Encoder used by a pool process."""
+
+
+def _init_worker(encoder):
+    """Stores the encoder used by a pool process.
+
+    Args:
+        encoder (TileEncoder): The encoder.
+
+    """
+    global _worker_encoder
+    _worker_encoder = encoder
+
+
+def _encode_chunk(z, tiles, encoder=None):
+    """Encodes a list of tiles.
+
+    Args:
+        z (int): Zoom level.
+        tiles (list(tuple(int))): Column and row of each tile.
+        encoder (TileEncoder, optional): The encoder. Defaults to the encoder
+            of the pool process.
+
+    Returns:
+        list(bytes): Encoded tiles.
+
+    """
+    encoder = encoder or _worker_encoder
+    return [encoder.encode(z, x, y) for x, y in tiles]
+
+
+def container_to_mvt(container, z, x, y, data=None, **kwargs):
+    """Encodes the geometries of a container as a vector tile.
+
+    Args:
+        container (GeometryContainer): The geometries.
+        z (int): Zoom level.
+        x (int): Tile column, counted from the west.
+        y (int): Tile row, counted from the north.
+        data (dict, optional): Arrays of attribute values, keyed by name,
+            with one value per geometry.
+        **kwargs: Other options of TileEncoder.
+
+    Returns:
+        bytes: The tile as an MVT protocol buffer.
+
+    """
+    return TileEncoder(container, data, **kwargs).encode(z, x, y)
@@ -18,6 +18,28 @@ class Attrs(object):
     NODE_COUNT_LONG_NAME = 'count of coordinates in each instance geometry'
     PART_NODE_COUNT_LONG_NAME = 'count of nodes in each geometry part'
     RING_TYPE_LONG_NAME = 'type of each polygon geometry part'
+    COORD_ENCODING = 'coordinate_encoding'
+    COORD_QUANTUM = 'coordinate_quantum'
+    LOD_CONTAINERS = 'level_of_detail_containers'
+    LOD_LEVEL = 'level_of_detail'
+    LOD_TOLERANCE = 'simplification_tolerance'
+    ARC_NODE_COUNT = 'arc_node_count'
+    ARC_INDEX = 'arc_index'
+    PART_ARC_COUNT = 'part_arc_count'
+    ARC_NODE_COUNT_LONG_NAME = 'count of nodes in each shared arc'
+    ARC_INDEX_LONG_NAME = 'signed arc references of each geometry part'
+    PART_ARC_COUNT_LONG_NAME = 'count of arc references in each geometry part'
+    GEOMETRY_INDEX = 'geometry_index'
+    GEOMETRY_INDEX_LONG_NAME = 'index of the stored geometry of each instance'
+    GRID_SHAPE = 'grid_shape'
+    GEOMETRY = 'geometry'
+    CELL_METHODS = 'cell_methods'
+    WEIGHT_COUNT_LONG_NAME = 'count of overlapping grid cells for each geometry'
+    WEIGHT_CELL_LONG_NAME = 'flat index of each overlapping grid cell'
+    WEIGHT_AREA_LONG_NAME = 'area of overlap between geometry and grid cell'
+    NEIGHBOR_COUNT_LONG_NAME = 'count of neighbors of each geometry'
+    NEIGHBOR_INDEX_LONG_NAME = 'instance index of each neighbor'
+    NEIGHBOR_LENGTH_LONG_NAME = 'length of boundary shared with neighbor'
 
 
 class RingType(object):
@@ -25,3 +47,17 @@ class RingType(object):
 
     OUTER = 0
     INNER = 1
+
+
+class CoordEncoding(object):
+    """Indicates how node coordinate values are encoded within each part.
+
+    Encoded files are not readable by tools following the reference CF layout.
+    Delta encoding stores the difference between quantized integer values of
+    consecutive nodes. XOR encoding stores the exclusive or of the bits of
+    consecutive float values, which is lossless. In both cases, the first node
+    of each part is stored as is.
+    """
+
+    DELTA = 'delta'
+    XOR = 'xor'
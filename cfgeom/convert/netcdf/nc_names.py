@@ -9,8 +9,14 @@ class NcNames(object):
         self.node_vltype = 'node_VLType'
         self.part_node_vltype = 'part_node_VLType'
         self.instance_dim = 'instance'
+        self.geometry_dim = 'geometry'
         self.node_dim = 'node'
         self.part_dim = 'part'
+        self.arc_dim = 'arc'
+        self.arc_node_dim = 'arc_node'
+        self.arc_ref_dim = 'arc_reference'
+        self.weight_dim = 'weight'
+        self.neighbor_dim = 'neighbor'
         self.x_var = 'x'
         self.y_var = 'y'
         self.z_var = 'z'
@@ -18,6 +24,16 @@ class NcNames(object):
         self.node_count_var = 'node_count'
         self.part_node_count_var = 'part_node_count'
         self.ring_var = 'interior_ring'
+        self.arc_node_count_var = 'arc_node_count'
+        self.arc_index_var = 'arc_index'
+        self.part_arc_count_var = 'part_arc_count'
+        self.geometry_index_var = 'geometry_index'
+        self.weight_count_var = 'weight_count'
+        self.weight_cell_var = 'weight_cell'
+        self.weight_area_var = 'weight_area'
+        self.neighbor_count_var = 'neighbor_count'
+        self.neighbor_index_var = 'neighbor_index'
+        self.neighbor_length_var = 'neighbor_length'
         self.conventions = 'CF-1.8'
 
 
@@ -29,8 +45,14 @@ class NcNames(object):
                 variable name might be mydata_x.
 
         """
+        self.geometry_dim = prefix + self.geometry_dim
         self.node_dim = prefix + self.node_dim
         self.part_dim = prefix + self.part_dim
+        self.arc_dim = prefix + self.arc_dim
+        self.arc_node_dim = prefix + self.arc_node_dim
+        self.arc_ref_dim = prefix + self.arc_ref_dim
+        self.weight_dim = prefix + self.weight_dim
+        self.neighbor_dim = prefix + self.neighbor_dim
         self.x_var = prefix + self.x_var
         self.y_var = prefix + self.y_var
         self.z_var = prefix + self.z_var
@@ -38,3 +60,13 @@ class NcNames(object):
         self.node_count_var = prefix + self.node_count_var
         self.part_node_count_var = prefix + self.part_node_count_var
         self.ring_var = prefix + self.ring_var
+        self.arc_node_count_var = prefix + self.arc_node_count_var
+        self.arc_index_var = prefix + self.arc_index_var
+        self.part_arc_count_var = prefix + self.part_arc_count_var
+        self.geometry_index_var = prefix + self.geometry_index_var
+        self.weight_count_var = prefix + self.weight_count_var
+        self.weight_cell_var = prefix + self.weight_cell_var
+        self.weight_area_var = prefix + self.weight_area_var
+        self.neighbor_count_var = prefix + self.neighbor_count_var
+        self.neighbor_index_var = prefix + self.neighbor_index_var
+        self.neighbor_length_var = prefix + self.neighbor_length_var
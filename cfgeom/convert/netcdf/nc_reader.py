@@ -1,13 +1,18 @@
 """Handles reading netCDF data into geometry containers."""
 
-from netCDF4 import Dataset
+from netCDF4 import Dataset, VLType, chartostring
 import numpy as np
 
 from ... container import GeometryContainer
 from ... geometry import Geometry
 from ... part import Part
+from ... ragged import RaggedArrays, _offsets, _trim_z
+from ... topology import arc_node_index
+from .. shapely_io.shapely_writer import ragged_to_shapely
+from . nc_names import NcNames
 from . nc_constants import (
     Attrs,
+    CoordEncoding,
     RingType,
     )
 
@@ -40,28 +45,111 @@ def _find_geometry_container_variables(variables):
     return container_names
 
 
-def _get_coord_vals(nc_dataset, candidate_names, coord_type):
+def _segment_lengths(segment_counts, node_total):
+    """Finds the first node and node count of each encoded segment.
+
+    Args:
+        segment_counts (array-like(int) or None): Count of nodes in each
+            segment. If None, each node is its own segment.
+        node_total (int): Total count of nodes.
+
+    Returns:
+        Tuple of numpy.ndarray(int) with the index of the first node in each
+        segment and the count of nodes in each segment.
+
+    """
+    if segment_counts is None:
+        return np.arange(node_total), np.ones(node_total, dtype=np.int_)
+    segment_counts = np.asarray(segment_counts, dtype=np.int_)
+    return np.cumsum(segment_counts) - segment_counts, segment_counts
+
+
+def _decode_delta(vals, segment_counts, quantum):
+    """Decodes delta encoded coordinates with cumulative sums per segment.
+
+    Args:
+        vals (array-like(int)): Encoded coordinate values.
+        segment_counts (array-like(int) or None): Count of nodes in each part.
+        quantum (float): Quantum used when encoding.
+
+    Returns:
+        numpy.ndarray(float64): Decoded coordinate values.
+
+    """
+    vals = np.asarray(vals, dtype=np.int64)
+    starts, counts = _segment_lengths(segment_counts, len(vals))
+    totals = np.cumsum(vals)
+    # Subtract the running total preceding each segment to restart the sum
+    preceding = np.where(starts > 0, totals[starts - 1], np.int64(0))
+    decoded = totals - np.repeat(preceding, counts)
+    return decoded * np.float64(quantum)
+
+
+def _decode_xor(vals, segment_counts):
+    """Decodes XOR encoded coordinates with cumulative XOR per segment.
+
+    Args:
+        vals (array-like(uint64)): Encoded coordinate values.
+        segment_counts (array-like(int) or None): Count of nodes in each part.
+
+    Returns:
+        numpy.ndarray(float64): Decoded coordinate values.
+
+    """
+    vals = np.asarray(vals, dtype=np.uint64)
+    starts, counts = _segment_lengths(segment_counts, len(vals))
+    totals = np.bitwise_xor.accumulate(vals)
+    # XOR is its own inverse, so removing the running value preceding each
+    # segment restarts the accumulation
+    preceding = np.where(starts > 0, totals[starts - 1], np.uint64(0))
+    decoded = totals ^ np.repeat(preceding.astype(np.uint64), counts)
+    return decoded.view(np.float64)
+
+
+def _get_coord_vals(nc_dataset, candidate_names, coord_type,
+                    segment_counts=None, nodes=None):
     """Extracts coordinate values for the given coordinate type.
 
     Given a coordinate type and a list of candidate variable names, identify
-    the variable matching the coordinate type and extract its values.
+    the variable matching the coordinate type and extract its values. Encoded
+    coordinates are decoded.
 
     Args:
         nc_dataset (netCDF4.Dataset): The netCDF dataset.
         candidate_names (list(str)): Names of candidate variables, one of which
             should match the coordinate type.
         coord_type (str): The coordinate type, Valid values are X, Y, and Z.
+        segment_counts (array-like(int), optional): Count of nodes in each
+            geometry part, used to decode encoded coordinates. If None, each
+            node is treated as its own part.
+        nodes (slice, optional): Nodes to read, starting on the first node of
+            a part. Defaults to all nodes.
 
     Returns:
         array-like: Coordinate values.
 
+    Raises:
+        ValueError: If the coordinate encoding is not recognized.
+
     """
     coord_type = coord_type.upper()
     for name in candidate_names:
         var = nc_dataset.variables[name]
         role = getattr(var, Attrs.AXIS).upper()
         if role == coord_type:
-            return var[:]
+            if nodes is None:
+                nodes = slice(None)
+            if Attrs.COORD_ENCODING not in var.ncattrs():
+                return var[nodes]
+            encoding = getattr(var, Attrs.COORD_ENCODING)
+            vals = np.ma.getdata(var[nodes])
+            if encoding == CoordEncoding.DELTA:
+                quantum = getattr(var, Attrs.COORD_QUANTUM)
+                return _decode_delta(vals, segment_counts, quantum)
+            elif encoding == CoordEncoding.XOR:
+                return _decode_xor(vals, segment_counts)
+            raise ValueError('Unknown coordinate encoding: {0}'.format(
+                encoding))
     return None
 
 
@@ -107,7 +195,24 @@ def _is_vlen(geom_var, nc_dataset):
     """
     coord_var_name = getattr(geom_var, Attrs.NODE_COORDS).split(' ')[0]
     coord_var = nc_dataset.variables[coord_var_name]
-    return isinstance(coord_var[:][0], np.ndarray)
+    return isinstance(coord_var.datatype, VLType)
+
+
+def _get_geometry_index(geom_var, nc_dataset):
+    """Reads the stored geometry of each instance of a deduplicated container.
+
+    Args:
+        geom_var (Variable): The netCDF Variable object representing the
+            geometry container.
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+
+    Returns:
+        numpy.ndarray(int) or None: Index of the stored geometry of each
+        instance, or None if each instance stores its own geometry.
+
+    """
+    index = _get_geom_aux_variable(Attrs.GEOMETRY_INDEX, geom_var, nc_dataset)
+    return None if index is None else np.ma.getdata(index)
 
 
 def _geoms_from_cra(geom_type, x_vals, y_vals, z_vals, ring_types, node_counts,
@@ -223,13 +328,392 @@ def _geoms_from_vlen(geom_type, x_vals, y_vals, z_vals, ring_types,
     return GeometryContainer(geoms)
 
 
-def read_netcdf(path_or_object, container_name=None):
+def _select_level(nc_dataset, container_names, level, tolerance):
+    """Selects one level of detail from each geometry container pyramid.
+
+    A geometry container variable listing level of detail containers is the
+    base of a pyramid. Other geometry container variables not listed by a
+    pyramid base are treated as a pyramid with a single level.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        container_names (list(str)): Names of geometry container variables.
+        level (int or None): Level of detail to select, where 0 is full
+            detail.
+        tolerance (float or None): If level is None, the coarsest level whose
+            simplification tolerance does not exceed this value is selected.
+
+    Returns:
+        list(str): Names of the selected geometry container variables.
+
+    Raises:
+        ValueError: If the requested level is not found.
+
+    """
+    pyramids = []
+    members = set()
+    for name in container_names:
+        var = nc_dataset.variables[name]
+        if Attrs.LOD_CONTAINERS in var.ncattrs():
+            levels = getattr(var, Attrs.LOD_CONTAINERS).split(' ')
+            members.update(levels)
+            pyramids.append(levels)
+    for name in container_names:
+        if name not in members:
+            pyramids.append([name])
+
+    selected = []
+    for levels in pyramids:
+        candidates = {}
+        for name in levels:
+            var = nc_dataset.variables[name]
+            var_level = 0
+            var_tolerance = 0.0
+            if Attrs.LOD_LEVEL in var.ncattrs():
+                var_level = int(getattr(var, Attrs.LOD_LEVEL))
+                var_tolerance = float(getattr(var, Attrs.LOD_TOLERANCE))
+            candidates[var_level] = (name, var_tolerance)
+        if level is not None:
+            if level not in candidates:
+                m = 'Level {0} not found for {1}'.format(level, levels[0])
+                raise ValueError(m)
+            selected.append(candidates[level][0])
+        else:
+            eligible = [(t, n) for n, t in candidates.values()
+                        if t <= tolerance]
+            if eligible:
+                selected.append(max(eligible)[1])
+            else:
+                selected.append(candidates[min(candidates)][0])
+    return selected
+
+
+def _resolve_targets(nc_dataset, container_name, level, tolerance):
+    """Finds the names of the geometry container variables to read.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        container_name (str or list(str) or None): Name(s) of the geometry
+            container variables to read, or None to read all of them.
+        level (int or None): Level of detail to select, where 0 is full
+            detail.
+        tolerance (float or None): If level is None, the coarsest level whose
+            simplification tolerance does not exceed this value is selected.
+
+    Returns:
+        list(str): Names of the geometry container variables.
+
+    Raises:
+        ValueError: If no geometry container variable is found, or if the
+            requested level of detail was not found.
+
+    """
+    if container_name is None:
+        target = _find_geometry_container_variables(
+            nc_dataset.variables.values())
+        if len(target) == 0:
+            raise ValueError('No geometry container variable found')
+    else:
+        if isinstance(container_name, str):
+            target = [container_name]
+        else:
+            target = container_name
+    if level is not None or tolerance is not None:
+        target = _select_level(nc_dataset, target, level, tolerance)
+    return target
+
+
+def _read_geometry_arrays(nc_dataset, geom_var_name):
+    """Reads the raw arrays of a geometry container variable.
+
+    Encoded coordinates are decoded, and coordinates stored as shared arcs are
+    expanded to the nodes of each part.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        geom_var_name (str): Name of the geometry container variable.
+
+    Returns:
+        Tuple with the geometry type; the x, y, and z node coordinates, where
+        z is None if not present; the ring types, node counts, and part node
+        counts, each None if not present; and True if the arrays are variable
+        length arrays, holding one array per geometry.
+
+    """
+    ds = nc_dataset
+    geom_var = ds.variables[geom_var_name]
+    geom_type = getattr(geom_var, Attrs.GEOM_TYPE).lower()
+    coordinates = getattr(geom_var, Attrs.NODE_COORDS).split(' ')
+    ring_types = _get_geom_aux_variable(Attrs.RING_TYPE, geom_var, ds)
+    node_counts = _get_geom_aux_variable(Attrs.NODE_COUNT, geom_var, ds)
+    part_node_counts = _get_geom_aux_variable(Attrs.PART_NODE_COUNT, geom_var,
+                                              ds)
+    if geom_type == 'point':
+        segments = None
+    elif part_node_counts is not None:
+        segments = part_node_counts
+    else:
+        segments = node_counts
+    x = _get_coord_vals(ds, coordinates, Attrs.GEOM_X_NODE, segments)
+    y = _get_coord_vals(ds, coordinates, Attrs.GEOM_Y_NODE, segments)
+    z = _get_coord_vals(ds, coordinates, Attrs.GEOM_Z_NODE, segments)
+    if Attrs.ARC_INDEX in geom_var.ncattrs():
+        # Node coordinates hold arcs shared between parts
+        nodes = arc_node_index(
+            _get_geom_aux_variable(Attrs.ARC_NODE_COUNT, geom_var, ds),
+            _get_geom_aux_variable(Attrs.ARC_INDEX, geom_var, ds),
+            _get_geom_aux_variable(Attrs.PART_ARC_COUNT, geom_var, ds))
+        x = x[nodes]
+        y = y[nodes]
+        if z is not None:
+            z = z[nodes]
+    return (geom_type, x, y, z, ring_types, node_counts, part_node_counts,
+            _is_vlen(geom_var, ds))
+
+
+def _ragged_from_arrays(geom_type, x_vals, y_vals, z_vals, ring_types,
+                        node_counts, part_node_counts, is_vlen,
+                        coord_dtype=None):
+    """Builds contiguous ragged array buffers from raw netCDF arrays.
+
+    Variable length arrays are concatenated, so no Python object is created
+    per geometry part. Float32 coordinates stay float32 unless another type
+    is requested.
+
+    Args:
+        geom_type (str): Geometry type. Must be point, line, or polygon.
+        x_vals (array-like(float)): X node coordinate values.
+        y_vals (array-like(float)): Y node coordinate values.
+        z_vals (array-like(float) or None): Z node coordinate values.
+        ring_types (array-like(int) or None): Polygon ring types.
+        node_counts (array-like(int) or None): Node counts per geometry.
+        part_node_counts (array-like(int) or None): Node counts per geometry
+            part.
+        is_vlen (bool): True if the arrays are variable length arrays.
+        coord_dtype (numpy.dtype, optional): Coordinate data type of the
+            buffers, either float32 or float64.
+
+    Returns:
+        RaggedArrays: Buffers holding the geometry nodes.
+
+    """
+    if is_vlen:
+        node_counts = [len(vals) for vals in x_vals]
+        x_vals = np.concatenate(list(x_vals))
+        y_vals = np.concatenate(list(y_vals))
+        if z_vals is not None:
+            z_vals = np.concatenate(list(z_vals))
+        if part_node_counts is not None:
+            part_node_counts = np.concatenate(list(part_node_counts))
+        if ring_types is not None:
+            ring_types = np.concatenate(list(ring_types))
+    x = np.ma.getdata(x_vals)
+    y = np.ma.getdata(y_vals)
+    z = None
+    if z_vals is not None:
+        z_dtype = np.float32 if x.dtype == np.float32 else np.float64
+        z = np.ma.filled(np.ma.asarray(z_vals, dtype=z_dtype), np.nan)
+        z = _trim_z(z)
+    if node_counts is not None:
+        node_counts = np.ma.getdata(node_counts)
+    if part_node_counts is not None:
+        part_node_counts = np.ma.getdata(part_node_counts)
+    is_hole = None
+    if ring_types is not None:
+        is_hole = np.ma.getdata(ring_types) == RingType.INNER
+    ragged = RaggedArrays(geom_type, x, y, z, node_counts, part_node_counts,
+                          is_hole)
+    if coord_dtype is not None:
+        ragged = ragged.astype(coord_dtype)
+    return ragged
+
+
+_structure_attrs = [Attrs.NODE_COUNT, Attrs.PART_NODE_COUNT, Attrs.RING_TYPE,
+                    Attrs.ARC_NODE_COUNT, Attrs.ARC_INDEX,
+                    Attrs.PART_ARC_COUNT, Attrs.GEOMETRY_INDEX]
+"""list(str): Geometry container attributes naming structure variables."""
+
+
+def _structure_variables(nc_dataset, geom_var_name):
+    """Finds the variables describing the geometries of a container.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        geom_var_name (str): Name of the geometry container variable.
+
+    Returns:
+        dict: Names of the geometry container variable, node coordinate
+        variables, and count and ring variables, keyed by attribute name, with
+        node coordinates keyed by axis.
+
+    """
+    geom_var = nc_dataset.variables[geom_var_name]
+    names = {}
+    for attr in _structure_attrs:
+        if attr in geom_var.ncattrs() and getattr(geom_var, attr):
+            names[attr] = getattr(geom_var, attr)
+    for name in getattr(geom_var, Attrs.NODE_COORDS).split(' '):
+        axis = getattr(nc_dataset.variables[name], Attrs.AXIS).upper()
+        names[axis] = name
+    return names
+
+
+def _read_nc_names(nc_dataset, geom_var_name):
+    """Finds the names of dimensions and variables used by a container.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        geom_var_name (str): Name of the geometry container variable.
+
+    Returns:
+        nc_names.NcNames: Names used in the file, with defaults for names
+        that do not apply to the container.
+
+    """
+    variables = nc_dataset.variables
+    structure = _structure_variables(nc_dataset, geom_var_name)
+    nc_names = NcNames()
+    nc_names.container_var = geom_var_name
+    nc_names.x_var = structure[Attrs.GEOM_X_NODE]
+    nc_names.y_var = structure[Attrs.GEOM_Y_NODE]
+    nc_names.z_var = structure.get(Attrs.GEOM_Z_NODE, nc_names.z_var)
+    node_dim = variables[nc_names.x_var].dimensions[0]
+    if Attrs.NODE_COUNT in structure:
+        nc_names.node_count_var = structure[Attrs.NODE_COUNT]
+        nc_names.instance_dim = variables[
+            nc_names.node_count_var].dimensions[0]
+        if Attrs.ARC_INDEX in structure:
+            nc_names.arc_node_dim = node_dim
+        else:
+            nc_names.node_dim = node_dim
+    else:
+        nc_names.instance_dim = node_dim
+    attr_names = [(Attrs.PART_NODE_COUNT, 'part_node_count_var'),
+                  (Attrs.RING_TYPE, 'ring_var'),
+                  (Attrs.ARC_NODE_COUNT, 'arc_node_count_var'),
+                  (Attrs.ARC_INDEX, 'arc_index_var'),
+                  (Attrs.PART_ARC_COUNT, 'part_arc_count_var')]
+    for attr, name in attr_names:
+        if attr in structure:
+            setattr(nc_names, name, structure[attr])
+    for attr in [Attrs.PART_NODE_COUNT, Attrs.PART_ARC_COUNT]:
+        if attr in structure:
+            dim = variables[structure[attr]].dimensions[0]
+            if dim != nc_names.instance_dim:
+                nc_names.part_dim = dim
+    if Attrs.GEOMETRY_INDEX in structure:
+        # Counts run along the dimension of distinct geometries
+        nc_names.geometry_index_var = structure[Attrs.GEOMETRY_INDEX]
+        nc_names.geometry_dim = nc_names.instance_dim
+        nc_names.instance_dim = variables[
+            nc_names.geometry_index_var].dimensions[0]
+    return nc_names
+
+
+def _read_data(nc_dataset, geom_var_name, instance_dim, skip,
+               read_multidim=False):
+    """Reads the data variables of a geometry container.
+
+    Data variables are one-dimensional variables and character arrays along
+    the instance dimension, unless their geometry attribute names another
+    container. Character arrays are decoded to strings in one call per
+    variable. Other variables whose geometry attribute names the container,
+    such as time series, are only read if requested.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        geom_var_name (str): Name of the geometry container variable.
+        instance_dim (str): Name of the instance dimension.
+        skip (set(str)): Names of variables describing geometries.
+        read_multidim (bool, optional): True to also read the other variables
+            whose geometry attribute names the container.
+
+    Returns:
+        dict: Values of each data variable, keyed by variable name.
+
+    """
+    data = {}
+    for name, var in nc_dataset.variables.items():
+        if name in skip or not var.dimensions:
+            continue
+        is_column = var.dimensions[0] == instance_dim and (
+            var.ndim == 1 or (var.ndim == 2 and var.dtype == 'S1'))
+        if Attrs.GEOMETRY in var.ncattrs():
+            if getattr(var, Attrs.GEOMETRY) != geom_var_name:
+                continue
+            if not (is_column or read_multidim):
+                continue
+        elif not is_column:
+            continue
+        vals = var[:]
+        if vals.dtype.kind == 'S' and vals.ndim == var.ndim and var.ndim > 1:
+            # Characters were not converted to strings when read
+            vals = chartostring(np.ma.filled(vals, b''))
+        data[name] = vals
+    return data
+
+
+def _describe_containers(nc_dataset, target, read_data, read_multidim=False):
+    """Finds the names and data variables of geometry containers.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        target (list(str)): Names of the geometry container variables.
+        read_data (bool): True if data variables should be read.
+        read_multidim (bool, optional): True if multi-dimensional data
+            variables linked to a container should be read as well.
+
+    Returns:
+        dict: For each geometry container variable, a dictionary with the
+        NcNames used in the file and, if read_data is True, the data
+        variables.
+
+    """
+    skip = set()
+    for name in _find_geometry_container_variables(
+            nc_dataset.variables.values()):
+        skip.add(name)
+        skip.update(_structure_variables(nc_dataset, name).values())
+    described = {}
+    for geom_var_name in target:
+        nc_names = _read_nc_names(nc_dataset, geom_var_name)
+        described[geom_var_name] = {'nc_names': nc_names}
+        if read_data:
+            described[geom_var_name]['data'] = _read_data(
+                nc_dataset, geom_var_name, nc_names.instance_dim, skip,
+                read_multidim)
+    return described
+
+
+def read_netcdf(path_or_object, container_name=None, level=None,
+                tolerance=None, read_data=True, coord_dtype=None,
+                read_multidim=False):
     """Reads a netCDF file into geometry containers.
 
     Args:
         path_or_object (str or netCDF4.Dataset): Input netCDF file or object.
         container_name (str): Name of the geometry container variable to
             extract from the file.
+        level (int, optional): For files with levels of detail, the level to
+            read, where 0 is full detail. Only that level of each pyramid is
+            returned.
+        tolerance (float, optional): For files with levels of detail, read the
+            coarsest level whose simplification tolerance does not exceed this
+            value. Ignored if level is provided.
+        read_data (bool, optional): True to read the data variables of each
+            geometry container, i.e., one-dimensional variables and character
+            arrays along its instance dimension, unless their geometry
+            attribute names another container. Character arrays are decoded
+            to strings.
+        coord_dtype (numpy.dtype, optional): If provided, containers are
+            backed by contiguous ragged array buffers with coordinates of this
+            type, either float32 or float64, rather than by Geometry and Part
+            objects. Pass float32 to halve the memory used by coordinates.
+        read_multidim (bool, optional): True to also read, along with the
+            data variables, the multi-dimensional variables whose geometry
+            attribute names the container, such as time series. These can be
+            large, so by default they are left out; stream them in blocks
+            with iter_netcdf_chunks instead.
 
     Returns:
         Dictionary with one item for each geometry container found within the
@@ -238,16 +722,22 @@ def read_netcdf(path_or_object, container_name=None):
 
             {
                 'A_Geometry_Container_Variable_Name': {
-                    'container': GeometryContainer instance},
+                    'container': GeometryContainer instance,
+                    'nc_names': NcNames instance,
+                    'data': {'variable_name': numpy.ndarray}},
                 'Another_Geometry_Container_Variable_Name': {
-                    'container': GeometryContainer instance}
+                    'container': GeometryContainer instance,
+                    'nc_names': NcNames instance,
+                    'data': {'variable_name': numpy.ndarray}}
             }
 
+        The data item is omitted if read_data is False.
+
     Raises:
-        ValueError: If geometry container with the provided name was not found.
+        ValueError: If geometry container with the provided name was not
+            found, if the requested level of detail was not found, or if
+            coord_dtype is not float32 or float64.
 
-    Todo:
-        * Return NcNames in the dictionary for each container.
     """
     should_close = False
     if isinstance(path_or_object, Dataset):
@@ -257,40 +747,317 @@ def read_netcdf(path_or_object, container_name=None):
         should_close = True
 
     try:
-        pass
-        if container_name is None:
-            target = _find_geometry_container_variables(ds.variables.values())
-            if len(target) == 0:
-                raise ValueError('No geometry container variable found')
-        else:
-            if isinstance(container_name, str):
-                target = [container_name]
-            else:
-                target = container_name
-
-        containers = {}
+        target = _resolve_targets(ds, container_name, level, tolerance)
+        containers = _describe_containers(ds, target, read_data,
+                                          read_multidim)
         for geom_var_name in target:
-            geom_var = ds.variables[geom_var_name]
-            geom_type = getattr(geom_var, Attrs.GEOM_TYPE).lower()
-            coordinates = getattr(geom_var, Attrs.NODE_COORDS).split(' ')
-            x = _get_coord_vals(ds, coordinates, Attrs.GEOM_X_NODE)
-            y = _get_coord_vals(ds, coordinates, Attrs.GEOM_Y_NODE)
-            z = _get_coord_vals(ds, coordinates, Attrs.GEOM_Z_NODE)
-            ring_types = _get_geom_aux_variable(Attrs.RING_TYPE, geom_var, ds)
-            node_counts = _get_geom_aux_variable(Attrs.NODE_COUNT, geom_var, ds)
-            part_node_counts = _get_geom_aux_variable(Attrs.PART_NODE_COUNT, geom_var, ds)
-
-            if _is_vlen(geom_var, ds):
+            arrays = _read_geometry_arrays(ds, geom_var_name)
+            (geom_type, x, y, z, ring_types, node_counts, part_node_counts,
+             is_vlen) = arrays
+            index = _get_geometry_index(ds.variables[geom_var_name], ds)
+            if coord_dtype is not None:
+                ragged = _ragged_from_arrays(*arrays, coord_dtype=coord_dtype)
+                if index is not None:
+                    ragged = ragged.take(index)
+                containers[geom_var_name]['container'] = \
+                    GeometryContainer.from_ragged(ragged)
+                continue
+            if is_vlen:
                 is_multipoint = (geom_type == 'point')  # single point doesn't use vlen
                 container = _geoms_from_vlen(
                     geom_type, x, y, z, ring_types, part_node_counts, is_multipoint)
+            elif geom_type == 'point':
+                # Points stay in flat buffers until Geometry objects are used
+                container = GeometryContainer.from_ragged(
+                    _ragged_from_arrays(*arrays))
             else:
                 container = _geoms_from_cra(
                     geom_type, x, y, z, ring_types, node_counts, part_node_counts)
-            containers[geom_var_name] = {'container': container}
+            if index is not None:
+                # Instances share the Geometry objects of stored geometries
+                geoms = container.geoms
+                container = GeometryContainer([geoms[i] for i in index])
+            containers[geom_var_name]['container'] = container
         return containers
     finally:
         if should_close:
             ds.close()
 
 
+def read_netcdf_shapely(path_or_object, container_name=None, level=None,
+                        tolerance=None, shapely_geom_type=None,
+                        read_data=True, read_multidim=False):
+    """Reads a netCDF file directly into shapely geometries.
+
+    Raw coordinate and count arrays go straight to shapely constructors,
+    skipping the Geometry and Part objects built by read_netcdf. Use this when
+    only shapely geometries are needed.
+
+    Args:
+        path_or_object (str or netCDF4.Dataset): Input netCDF file or object.
+        container_name (str): Name of the geometry container variable to
+            extract from the file.
+        level (int, optional): For files with levels of detail, the level to
+            read, where 0 is full detail.
+        tolerance (float, optional): For files with levels of detail, read the
+            coarsest level whose simplification tolerance does not exceed this
+            value. Ignored if level is provided.
+        shapely_geom_type (str or shapely.geometry type, optional): The target
+            shapely geometry type. Use this to force a multipart shapely type
+            when geometries are single-part.
+        read_data (bool, optional): True to read the data variables of each
+            geometry container, as in read_netcdf.
+        read_multidim (bool, optional): True to also read multi-dimensional
+            variables linked to each geometry container, as in read_netcdf.
+
+    Returns:
+        Dictionary with one item for each geometry container found within the
+        file, or a single item if a container_name was provided. The dictionary
+        is keyed by geometry container variable and has this structure::
+
+            {
+                'A_Geometry_Container_Variable_Name': {
+                    'geometries': list of shapely geometries,
+                    'nc_names': NcNames instance,
+                    'data': {'variable_name': numpy.ndarray}},
+                'Another_Geometry_Container_Variable_Name': {
+                    'geometries': list of shapely geometries,
+                    'nc_names': NcNames instance,
+                    'data': {'variable_name': numpy.ndarray}}
+            }
+
+        The data item is omitted if read_data is False.
+
+    Raises:
+        ValueError: If geometry container with the provided name was not
+            found, or if the requested level of detail was not found.
+
+    """
+    should_close = False
+    if isinstance(path_or_object, Dataset):
+        ds = path_or_object
+    else:
+        ds = Dataset(path_or_object)
+        should_close = True
+
+    try:
+        target = _resolve_targets(ds, container_name, level, tolerance)
+        containers = _describe_containers(ds, target, read_data,
+                                          read_multidim)
+        for geom_var_name in target:
+            ragged = _ragged_from_arrays(
+                *_read_geometry_arrays(ds, geom_var_name))
+            geometries = ragged_to_shapely(ragged, shapely_geom_type)
+            index = _get_geometry_index(ds.variables[geom_var_name], ds)
+            if index is not None:
+                geometries = [geometries[i] for i in index]
+            containers[geom_var_name]['geometries'] = geometries
+        return containers
+    finally:
+        if should_close:
+            ds.close()
+
+
+_chunk_bytes = 2 ** 24
+"""int: Target size in bytes of blocks read from unchunked variables."""
+
+
+def _geometry_reader(nc_dataset, geom_var_name):
+    """Prepares to read contiguous ranges of geometries of a container.
+
+    Counts and ring types are read once. Coordinates are read for each range
+    when requested. Geometries stored as shared arcs or deduplicated are read
+    whole, then sliced in memory.
+
+    Args:
+        nc_dataset (netCDF4.Dataset): The netCDF dataset.
+        geom_var_name (str): Name of the geometry container variable.
+
+    Returns:
+        callable: Function taking the first and stop indices of a range of
+        geometries, and returning RaggedArrays holding those geometries.
+
+    """
+    ds = nc_dataset
+    geom_var = ds.variables[geom_var_name]
+    index = _get_geometry_index(geom_var, ds)
+    if index is not None:
+        ragged = _ragged_from_arrays(*_read_geometry_arrays(ds, geom_var_name))
+        return lambda start, stop: ragged.take(index[start:stop])
+    if Attrs.ARC_INDEX in geom_var.ncattrs():
+        ragged = _ragged_from_arrays(*_read_geometry_arrays(ds, geom_var_name))
+        return lambda start, stop: ragged.take(np.arange(start, stop))
+
+    geom_type = getattr(geom_var, Attrs.GEOM_TYPE).lower()
+    coordinates = getattr(geom_var, Attrs.NODE_COORDS).split(' ')
+    ring_types = _get_geom_aux_variable(Attrs.RING_TYPE, geom_var, ds)
+    node_counts = _get_geom_aux_variable(Attrs.NODE_COUNT, geom_var, ds)
+    part_node_counts = _get_geom_aux_variable(Attrs.PART_NODE_COUNT, geom_var,
+                                              ds)
+    is_vlen = _is_vlen(geom_var, ds)
+    if not is_vlen and node_counts is not None:
+        node_offsets = _offsets(np.ma.getdata(node_counts))
+        if part_node_counts is not None:
+            part_offsets = _offsets(np.ma.getdata(part_node_counts))
+        elif geom_type == 'point':
+            part_offsets = np.arange(node_offsets[-1] + 1)
+        else:
+            part_offsets = node_offsets
+
+    def read(start, stop):
+        geoms = slice(start, stop)
+        if is_vlen or node_counts is None:
+            # One array, or one node, per geometry
+            nodes = geoms
+            parts = geoms
+            counts = None
+            segments = None
+        else:
+            nodes = slice(node_offsets[start], node_offsets[stop])
+            parts = slice(np.searchsorted(part_offsets, nodes.start),
+                          np.searchsorted(part_offsets, nodes.stop))
+            counts = node_counts[geoms]
+            if geom_type == 'point':
+                segments = None
+            elif part_node_counts is not None:
+                segments = part_node_counts[parts]
+            else:
+                segments = counts
+        coords = [_get_coord_vals(ds, coordinates, axis, segments, nodes)
+                  for axis in [Attrs.GEOM_X_NODE, Attrs.GEOM_Y_NODE,
+                               Attrs.GEOM_Z_NODE]]
+        return _ragged_from_arrays(
+            geom_type, coords[0], coords[1], coords[2],
+            None if ring_types is None else ring_types[parts], counts,
+            None if part_node_counts is None else part_node_counts[parts],
+            is_vlen)
+    return read
+
+
+def _default_chunks(var, instance_axis):
+    """Chooses block sizes from the on-disk chunking of a variable.
+
+    Blocks match the chunks of chunked variables. For contiguous variables,
+    blocks span the fastest varying dimension, up to a fixed size in bytes.
+
+    Args:
+        var (netCDF4.Variable): Variable with two dimensions.
+        instance_axis (int): Position of the instance dimension.
+
+    Returns:
+        Tuple with the count of instances and the count of time steps in each
+        block.
+
+    """
+    chunking = var.chunking()
+    if chunking != 'contiguous':
+        return chunking[instance_axis], chunking[1 - instance_axis]
+    items = max(_chunk_bytes // var.dtype.itemsize, 1)
+    sizes = [0, 0]
+    sizes[1] = min(var.shape[1], items)
+    sizes[0] = max(items // max(sizes[1], 1), 1)
+    return sizes[instance_axis], sizes[1 - instance_axis]
+
+
+def iter_netcdf_chunks(path_or_object, var_name, container_name=None,
+                       instance_chunk=None, time_chunk=None):
+    """Iterates over blocks of a data variable with matching geometries.
+
+    The variable must have the instance dimension of a geometry container and
+    one other dimension, such as time. Each block holds a range of instances
+    and a range of time steps, so memory use depends on the block size rather
+    than the size of the variable. Blocks follow each other by time within a
+    range of instances, and geometries are read once per range of instances.
+
+    Args:
+        path_or_object (str or netCDF4.Dataset): Input netCDF file or object.
+        var_name (str): Name of the data variable.
+        container_name (str, optional): Name of the geometry container
+            variable. Defaults to the variable's geometry attribute, or to the
+            only geometry container in the file.
+        instance_chunk (int, optional): Count of instances in each block.
+            Defaults to the chunk size of the variable on disk.
+        time_chunk (int, optional): Count of time steps in each block.
+            Defaults to the chunk size of the variable on disk.
+
+    Yields:
+        Tuple with a GeometryContainer holding the geometries of the block;
+        slices of the instances and of the time steps in the block; and the
+        values of the block as an array of shape (instance, time).
+
+    Raises:
+        ValueError: If the geometry container cannot be determined, or if the
+            variable does not have the instance dimension and one other
+            dimension.
+
+    """
+    should_close = False
+    if isinstance(path_or_object, Dataset):
+        ds = path_or_object
+    else:
+        ds = Dataset(path_or_object)
+        should_close = True
+
+    try:
+        var = ds.variables[var_name]
+        if container_name is None:
+            if Attrs.GEOMETRY in var.ncattrs():
+                container_name = getattr(var, Attrs.GEOMETRY)
+            else:
+                names = _find_geometry_container_variables(
+                    ds.variables.values())
+                if len(names) != 1:
+                    raise ValueError('container_name is required unless the '
+                                     'file holds a single geometry container')
+                container_name = names[0]
+        instance_dim = _read_nc_names(ds, container_name).instance_dim
+        if var.ndim != 2 or instance_dim not in var.dimensions:
+            m = '{0} must have dimension {1} and one other dimension'
+            raise ValueError(m.format(var_name, instance_dim))
+        instance_axis = var.dimensions.index(instance_dim)
+        default_instances, default_times = _default_chunks(var, instance_axis)
+        instance_chunk = instance_chunk or default_instances
+        time_chunk = time_chunk or default_times
+        instance_count = var.shape[instance_axis]
+        time_count = var.shape[1 - instance_axis]
+        read_geoms = _geometry_reader(ds, container_name)
+
+        for start in range(0, instance_count, instance_chunk):
+            instances = slice(start, min(start + instance_chunk,
+                                         instance_count))
+            container = GeometryContainer.from_ragged(
+                read_geoms(instances.start, instances.stop))
+            for time_start in range(0, time_count, time_chunk):
+                times = slice(time_start, min(time_start + time_chunk,
+                                              time_count))
+                if instance_axis == 0:
+                    values = var[instances, times]
+                else:
+                    values = var[times, instances].T
+                yield container, instances, times, values
+    finally:
+        if should_close:
+            ds.close()
+
+
+def read_netcdf_bytes(buf, **kwargs):
+    """Reads an in-memory netCDF file into geometry containers.
+
+    The netCDF library reads straight from the buffer, without a temporary
+    file.
+
+    Args:
+        buf (bytes-like): Contents of a netCDF file, e.g., as returned by
+            GeometryContainer.to_netcdf_bytes or received in a request body.
+        **kwargs: Options passed to read_netcdf, e.g., container_name or
+            read_data.
+
+    Returns:
+        Dictionary of geometry containers, as in read_netcdf.
+
+    Raises:
+        ValueError: As in read_netcdf.
+
+    """
+    with Dataset('cfgeom_in_memory.nc', memory=buf) as ds:
+        return read_netcdf(ds, **kwargs)
@@ -0,0 +1,457 @@
+"""Handles updating geometries in existing netCDF files."""
+
+from netCDF4 import Dataset, VLType
+import numpy as np
+
+from ... container import GeometryContainer
+from ... ragged import RaggedArrays, _offsets, _range_index
+from . nc_constants import Attrs, CoordEncoding, RingType
+from . nc_reader import (
+    _decode_delta,
+    _find_geometry_container_variables,
+    _geometry_reader,
+    _structure_variables,
+    )
+from . nc_writer import _count_type, _encode_coords
+
+
+def _same_values(a, b):
+    """Compares coordinate values, treating NaN values as equal.
+
+    Args:
+        a (numpy.ndarray(float)): Coordinate values.
+        b (numpy.ndarray(float)): Coordinate values of the same length.
+
+    Returns:
+        numpy.ndarray(bool): True for each position with equal values.
+
+    """
+    return (a == b) | (np.isnan(a) & np.isnan(b))
+
+
+def _changed_geometries(old, new):
+    """Finds the geometries that differ between two sets of buffers.
+
+    Args:
+        old (RaggedArrays): Geometries as stored.
+        new (RaggedArrays): Geometries as updated, as many as stored.
+
+    Returns:
+        numpy.ndarray(int): Sorted indices of the geometries that differ in
+        their nodes, parts, or ring types.
+
+    """
+    same = ((old.node_count == new.node_count) &
+            (old.geom_part_count() == new.geom_part_count()))
+    index = np.flatnonzero(same)
+
+    counts = new.node_count[index]
+    old_nodes = _range_index(old.node_offsets()[index], counts)
+    new_nodes = _range_index(new.node_offsets()[index], counts)
+    equal = (_same_values(old.x[old_nodes], new.x[new_nodes]) &
+             _same_values(old.y[old_nodes], new.y[new_nodes]))
+    if old.z is not None or new.z is not None:
+        old_z = old.z if old.z is not None else np.full(len(old.x), np.nan)
+        new_z = new.z if new.z is not None else np.full(len(new.x), np.nan)
+        equal &= _same_values(old_z[old_nodes], new_z[new_nodes])
+    same[np.repeat(index, counts)[~equal]] = False
+
+    counts = new.geom_part_count()[index]
+    old_parts = _range_index(old.geom_part_offsets()[index], counts)
+    new_parts = _range_index(new.geom_part_offsets()[index], counts)
+    equal = ((old.part_node_count[old_parts] ==
+              new.part_node_count[new_parts]) &
+             (old.is_hole[old_parts] == new.is_hole[new_parts]))
+    same[np.repeat(index, counts)[~equal]] = False
+    return np.flatnonzero(~same)
+
+
+def _write_runs(var, positions, vals):
+    """Writes values at positions along the first dimension of a variable.
+
+    Consecutive positions are written with a single slice assignment.
+
+    Args:
+        var (netCDF4.Variable): Variable to write.
+        positions (numpy.ndarray(int)): Sorted positions to write.
+        vals (numpy.ndarray): Value for each position.
+
+    """
+    if not len(positions):
+        return
+    bounds = np.concatenate(
+        ([0], np.flatnonzero(np.diff(positions) != 1) + 1, [len(positions)]))
+    for first, stop in zip(bounds[:-1], bounds[1:]):
+        start = positions[first]
+        var[start:start + stop - first] = vals[first:stop]
+
+
+def _encode_var(var, vals, segment_counts):
+    """Encodes coordinate values as stored in a coordinate variable.
+
+    Args:
+        var (netCDF4.Variable): Coordinate variable.
+        vals (numpy.ndarray(float)): Coordinate values of all nodes.
+        segment_counts (array-like(int)): Count of nodes in each part.
+
+    Returns:
+        numpy.ndarray: Values to store in the variable.
+
+    """
+    encoding = getattr(var, Attrs.COORD_ENCODING, None)
+    quantum = getattr(var, Attrs.COORD_QUANTUM, None)
+    return _encode_coords(vals, segment_counts, encoding, quantum)[0]
+
+
+def _segment_counts(ragged):
+    """Returns the count of nodes in each part, as encoded in netCDF.
+
+    Args:
+        ragged (RaggedArrays): Geometry buffers.
+
+    Returns:
+        numpy.ndarray(int): Node count of each part, or ones for points,
+        whose nodes are encoded one by one.
+
+    """
+    if ragged.geom_type == 'point':
+        return np.ones(len(ragged.x), dtype=np.int_)
+    return ragged.part_node_count
+
+
+def _as_stored(ragged, coord_vars):
+    """Rounds coordinates to the values the coordinate variables would store.
+
+    Args:
+        ragged (RaggedArrays): Geometry buffers.
+        coord_vars (list(netCDF4.Variable)): X and y coordinate variables,
+            and the z coordinate variable if the file has one.
+
+    Returns:
+        RaggedArrays: Buffers whose coordinates are rounded to the quantum of
+        delta encoded variables and to float32 for float32 variables.
+
+    """
+    segments = _segment_counts(ragged)
+    coords = [ragged.x, ragged.y, ragged.z]
+    for axis, var in enumerate(coord_vars):
+        vals = coords[axis]
+        if vals is None:
+            continue
+        if getattr(var, Attrs.COORD_ENCODING, None) == CoordEncoding.DELTA:
+            coords[axis] = _decode_delta(_encode_var(var, vals, segments),
+                                         segments,
+                                         getattr(var, Attrs.COORD_QUANTUM))
+        elif var.dtype == np.float32:
+            coords[axis] = vals.astype(np.float32)
+    return RaggedArrays(ragged.geom_type, coords[0], coords[1], coords[2],
+                        *ragged._counts())
+
+
+def _check_dim(dataset, var, length):
+    """Checks that a dimension can take a new length.
+
+    Args:
+        dataset (netCDF4.Dataset): The netCDF file object.
+        var (netCDF4.Variable): Variable along the dimension.
+        length (int): New length of the dimension.
+
+    Raises:
+        ValueError: If the dimension would have to shrink, or to grow while
+            not unlimited.
+
+    """
+    dim = dataset.dimensions[var.dimensions[0]]
+    if length < len(dim) or (length > len(dim) and not dim.isunlimited()):
+        m = ('{0} dimension cannot change length from {1} to {2}. Write the '
+             'file with unlimited=True to let updates add nodes and parts, or '
+             'rewrite it with write_netcdf.').format(dim.name, len(dim),
+                                                      length)
+        raise ValueError(m)
+
+
+def _splice(old, new, old_counts, new_counts, replaced, new_index):
+    """Splices groups of new values into a run of stored values.
+
+    Args:
+        old (numpy.ndarray): Stored values of consecutive groups.
+        new (numpy.ndarray): Values of the replacing groups.
+        old_counts (numpy.ndarray(int)): Count of stored values per group.
+        new_counts (numpy.ndarray(int)): Count of values per replacing group.
+        replaced (numpy.ndarray(int)): Position of each replaced group among
+            the stored groups.
+        new_index (numpy.ndarray(int)): Position of each replacing group among
+            the new groups.
+
+    Returns:
+        numpy.ndarray: Values of all groups, with replaced groups taken from
+        the new values.
+
+    """
+    starts = _offsets(old_counts)[:-1]
+    counts = old_counts.copy()
+    starts[replaced] = len(old) + _offsets(new_counts)[new_index]
+    counts[replaced] = new_counts[new_index]
+    combined = np.concatenate((old, np.asarray(new).astype(old.dtype)))
+    return combined[_range_index(starts, counts)]
+
+
+def _update_vlen(coord_vars, part_var, ring_var, index, new, ring_type):
+    """Overwrites the variable length arrays of the changed geometries.
+
+    Args:
+        coord_vars (list(tuple)): Coordinate variable and new coordinates of
+            all nodes, for each axis.
+        part_var (netCDF4.Variable or None): Part node count variable.
+        ring_var (netCDF4.Variable or None): Ring type variable.
+        index (numpy.ndarray(int)): Index of each changed geometry.
+        new (RaggedArrays): The changed geometries.
+        ring_type (numpy.ndarray(int)): Ring type of each new part.
+
+    """
+    node_offsets = new.node_offsets()
+    part_offsets = new.geom_part_offsets()
+    for pos, geom_idx in enumerate(index):
+        nodes = slice(node_offsets[pos], node_offsets[pos + 1])
+        parts = slice(part_offsets[pos], part_offsets[pos + 1])
+        for var, vals in coord_vars:
+            var[geom_idx] = vals[nodes]
+        if part_var is not None:
+            part_var[geom_idx] = new.part_node_count[parts]
+        if ring_var is not None:
+            ring_var[geom_idx] = ring_type[parts]
+
+
+def _update_cra(dataset, coord_vars, node_count_var, part_var, ring_var,
+                index, new, ring_type, geom_type):
+    """Writes changed geometries into contiguous ragged arrays.
+
+    Geometries keeping their count of nodes and parts are overwritten in
+    place. From the first geometry changing its counts, the remaining nodes
+    and parts are spliced together and written once.
+
+    Args:
+        dataset (netCDF4.Dataset): The netCDF file object.
+        coord_vars (list(tuple)): Coordinate variable and new coordinates of
+            all nodes, for each axis.
+        node_count_var (netCDF4.Variable): Node count variable.
+        part_var (netCDF4.Variable or None): Part node count variable.
+        ring_var (netCDF4.Variable or None): Ring type variable.
+        index (numpy.ndarray(int)): Index of each changed geometry.
+        new (RaggedArrays): The changed geometries.
+        ring_type (numpy.ndarray(int)): Ring type of each new part.
+        geom_type (str): Geometry type of the container.
+
+    Raises:
+        ValueError: If the node or part dimension cannot take its new length.
+
+    """
+    node_count = np.ma.getdata(node_count_var[:])
+    node_offsets = _offsets(node_count)
+    same = node_count[index] == new.node_count
+    if geom_type == 'point':
+        part_count = None
+    else:
+        if part_var is None:
+            part_count = node_count
+        else:
+            part_count = np.ma.getdata(part_var[:])
+        geom_part_offsets = np.searchsorted(_offsets(part_count),
+                                            node_offsets)
+        same &= np.diff(geom_part_offsets)[index] == new.geom_part_count()
+        check = np.flatnonzero(same)
+        counts = new.geom_part_count()[check]
+        old_parts = _range_index(geom_part_offsets[index[check]], counts)
+        new_parts = _range_index(new.geom_part_offsets()[check], counts)
+        differ = part_count[old_parts] != new.part_node_count[new_parts]
+        same[np.repeat(check, counts)[differ]] = False
+    resized = np.flatnonzero(~same)
+    first = index[resized[0]] if len(resized) else len(node_count)
+    in_place = np.flatnonzero(index < first)
+    tail = np.flatnonzero(index >= first)
+
+    new_node_count = new.node_count
+    if len(tail):
+        node_start = node_offsets[first]
+        tail_node_count = node_count[first:].copy()
+        tail_node_count[index[tail] - first] = new_node_count[tail]
+        _check_dim(dataset, coord_vars[0][0],
+                   node_start + tail_node_count.sum())
+        if part_var is not None:
+            part_start = geom_part_offsets[first]
+            geom_parts = np.diff(geom_part_offsets)[first:].copy()
+            geom_parts[index[tail] - first] = new.geom_part_count()[tail]
+            _check_dim(dataset, part_var, part_start + geom_parts.sum())
+
+    # Geometries keeping their counts
+    nodes = _range_index(node_offsets[index[in_place]],
+                         new_node_count[in_place])
+    new_nodes = _range_index(new.node_offsets()[in_place],
+                             new_node_count[in_place])
+    for var, vals in coord_vars:
+        _write_runs(var, nodes, vals[new_nodes])
+    if ring_var is not None:
+        part_counts = new.geom_part_count()[in_place]
+        _write_runs(ring_var,
+                    _range_index(geom_part_offsets[index[in_place]],
+                                 part_counts),
+                    ring_type[_range_index(new.geom_part_offsets()[in_place],
+                                           part_counts)])
+    if not len(tail):
+        return
+
+    # Remaining geometries, from the first one changing its counts
+    replaced = index[tail] - first
+    for var, vals in coord_vars:
+        spliced = _splice(np.ma.getdata(var[node_start:]), vals,
+                          node_count[first:], new_node_count, replaced, tail)
+        var[node_start:node_start + len(spliced)] = spliced
+    _write_runs(node_count_var, index[tail], new_node_count[tail])
+    if part_var is not None:
+        geom_part_count = np.diff(geom_part_offsets)[first:]
+        spliced = _splice(part_count[part_start:], new.part_node_count,
+                          geom_part_count, new.geom_part_count(), replaced,
+                          tail)
+        part_var[part_start:part_start + len(spliced)] = spliced
+        if ring_var is not None:
+            spliced = _splice(np.ma.getdata(ring_var[part_start:]),
+                              ring_type, geom_part_count,
+                              new.geom_part_count(), replaced, tail)
+            ring_var[part_start:part_start + len(spliced)] = spliced
+
+
+def update_netcdf(path_or_object, changes, container_name=None):
+    """Writes changed geometries into an existing netCDF file.
+
+    Only the changed geometries are written. Where a changed geometry keeps
+    its count of nodes and parts, its nodes are overwritten in place. Once a
+    changed geometry has a different count, the nodes and parts following it
+    are rewritten, which requires the file to be written with unlimited=True
+    if the node or part dimension grows. Dimensions cannot shrink, so an
+    update removing nodes or parts in total is refused. Variable length
+    arrays are always overwritten per geometry. Encoded coordinates are
+    encoded as stored.
+
+    Args:
+        path_or_object (str or netCDF4.Dataset): NetCDF file to update, or a
+            netCDF4.Dataset object open for writing.
+        changes (GeometryContainer or dict): Either the full updated
+            container, which is compared with the file to find the changed
+            geometries, or the changed geometries keyed by instance index. An
+            iterable of (index, geometry) pairs is also accepted.
+        container_name (str, optional): Name of the geometry container
+            variable to update. Required if the file holds several.
+
+    Returns:
+        numpy.ndarray(int): Sorted instance indices of the updated geometries.
+
+    Raises:
+        ValueError: If the geometry container is not found or is ambiguous, if
+            the geometries are stored as shared arcs or deduplicated, if the
+            changes do not match the container in type or length, if an index
+            is out of range, if changed geometries have z values, more than
+            one part, or holes that the file has no variables for, if a
+            dimension cannot take its new length, or if new counts do not fit
+            the integer type of the count variables.
+
+    """
+    should_close = False
+    if isinstance(path_or_object, Dataset):
+        ds = path_or_object
+    else:
+        ds = Dataset(path_or_object, mode='a')
+        should_close = True
+
+    try:
+        if container_name is None:
+            names = _find_geometry_container_variables(ds.variables.values())
+            if len(names) != 1:
+                raise ValueError('Provide container_name to select one of {0} '
+                                 'geometry containers'.format(len(names)))
+            container_name = names[0]
+        geom_var = ds.variables[container_name]
+        if Attrs.ARC_INDEX in geom_var.ncattrs():
+            raise ValueError('Geometries stored as arcs cannot be updated')
+        if Attrs.GEOMETRY_INDEX in geom_var.ncattrs():
+            raise ValueError('Deduplicated geometries cannot be updated')
+        geom_type = getattr(geom_var, Attrs.GEOM_TYPE).lower()
+        structure = _structure_variables(ds, container_name)
+        variables = ds.variables
+        x_var = variables[structure[Attrs.GEOM_X_NODE]]
+        is_vlen = isinstance(x_var.datatype, VLType)
+        node_count_var = None
+        if Attrs.NODE_COUNT in structure:
+            node_count_var = variables[structure[Attrs.NODE_COUNT]]
+        count = len(x_var if node_count_var is None else node_count_var)
+        part_var = None
+        if Attrs.PART_NODE_COUNT in structure and geom_type != 'point':
+            part_var = variables[structure[Attrs.PART_NODE_COUNT]]
+        ring_var = None
+        if Attrs.RING_TYPE in structure:
+            ring_var = variables[structure[Attrs.RING_TYPE]]
+
+        if isinstance(changes, GeometryContainer):
+            if changes.geom_type != geom_type or len(changes) != count:
+                raise ValueError('The container must hold {0} {1} geometries '
+                                 'to update the file'.format(count, geom_type))
+            new = changes.to_ragged().copy()
+            if geom_type == 'polygon':
+                new.orient()
+            # Compare coordinates as stored, so rounding alone is no change
+            coord_vars = [variables[structure[attr]] for attr in
+                          (Attrs.GEOM_X_NODE, Attrs.GEOM_Y_NODE,
+                           Attrs.GEOM_Z_NODE) if attr in structure]
+            new = _as_stored(new, coord_vars)
+            index = _changed_geometries(
+                _geometry_reader(ds, container_name)(0, count), new)
+            new = new.take(index)
+        else:
+            changes = dict(changes)
+            index = np.array(sorted(changes), dtype=np.int_)
+            if len(index) and (index[0] < 0 or index[-1] >= count):
+                raise ValueError('Instance index out of range')
+            new = RaggedArrays.from_geoms(geom_type,
+                                          [changes[i] for i in index])
+            if geom_type == 'polygon':
+                new.orient()
+        if not len(index):
+            return index
+
+        if node_count_var is None and not is_vlen and \
+                np.any(new.node_count > 1):
+            raise ValueError('The file holds a single node per geometry')
+        if part_var is None and geom_type != 'point' and \
+                np.any(new.geom_part_count() > 1):
+            raise ValueError('The file holds a single part per geometry')
+        if ring_var is None and new.is_hole.any():
+            raise ValueError('The file holds no polygon holes')
+        for var, vals in [(node_count_var, new.node_count),
+                          (part_var, new.part_node_count)]:
+            if var is not None:
+                _count_type(vals, var.dtype)
+        coord_vars = [(x_var, new.x),
+                      (variables[structure[Attrs.GEOM_Y_NODE]], new.y)]
+        if Attrs.GEOM_Z_NODE in structure:
+            z = new.z if new.z is not None else np.full(len(new.x), np.nan)
+            coord_vars.append((variables[structure[Attrs.GEOM_Z_NODE]], z))
+        elif new.z is not None:
+            raise ValueError('The file holds no z coordinates')
+        ring_type = np.where(new.is_hole, RingType.INNER, RingType.OUTER)
+
+        if is_vlen:
+            _update_vlen(coord_vars, part_var, ring_var, index, new,
+                         ring_type)
+            return index
+        segments = _segment_counts(new)
+        coord_vars = [(var, _encode_var(var, vals, segments))
+                      for var, vals in coord_vars]
+        if node_count_var is None:
+            for var, vals in coord_vars:
+                _write_runs(var, index, vals)
+        else:
+            _update_cra(ds, coord_vars, node_count_var, part_var, ring_var,
+                        index, new, ring_type, geom_type)
+        return index
+    finally:
+        if should_close:
+            ds.close()
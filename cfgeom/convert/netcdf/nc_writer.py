@@ -1,20 +1,25 @@
 """Handles writing data to netCDF format."""
 
-from netCDF4 import Dataset
+import copy
+
+from netCDF4 import Dataset, default_fillvals
 import numpy as np
 
+from ... spatial import spatial_order
+from ... topology import Topology
 from . nc_names import NcNames
 from . nc_constants import (
     Attrs,
+    CoordEncoding,
     RingType,
     )
 
 
-def _to_cra_arrays(geom_container):
-    """Exports contiguous ragged arrays from a geometry container.
+def _to_cra_arrays(ragged):
+    """Exports contiguous ragged arrays from geometry buffers.
 
     Args:
-        geom_container (GeometryContainer): The geometry container.
+        ragged (RaggedArrays): Buffers of the geometry container.
 
     Returns:
         Tuple of one-dimensional arrays representing:
@@ -23,46 +28,26 @@ def _to_cra_arrays(geom_container):
             z coordinates
             node counts per geometry
             node counts per geometry part
-            ring type for each geometry part
+            ring type for each geometry part, or None without holes
 
     """
-    x = []
-    y = []
-    ring_type = []
-    node_count = []
-    part_node_count = []
-    has_z = geom_container.has_z()
-    z = [] if has_z else None
-
-    for geom in geom_container.geoms:
-        node_counter = 0
-        for part in geom.parts:
-            x.extend(part.x)
-            y.extend(part.y)
-            if has_z:
-                if not len(part.z):
-                    z.extend(len(part.x) * [None])
-                else:
-                    z.extend(part.z)
-            ring = RingType.INNER if part.is_hole else RingType.OUTER
-            ring_type.append(ring)
-            count_of_nodes_in_part = len(part.x)
-            part_node_count.append(count_of_nodes_in_part)
-            node_counter += count_of_nodes_in_part
-        node_count.append(node_counter)
-
-    x = np.array(x, dtype=np.float64)  # Converts None to nan
-    y = np.array(y, dtype=np.float64)
-    if has_z:
-        z = np.array(z, dtype=np.float64)
-    return (x, y, z, node_count, part_node_count, ring_type)
+    z = ragged.z if ragged.has_z() else None
+    ring_type = None
+    if ragged.has_hole():
+        ring_type = np.where(ragged.is_hole, RingType.INNER, RingType.OUTER)
+    return (ragged.x, ragged.y, z, ragged.node_count, ragged.part_node_count,
+            ring_type)
 
 
-def _to_vlen_arrays(geom_container):
+def _to_vlen_arrays(geom_container, coord_dtype=np.float64,
+                    count_dtype=np.int_):
     """Exports variable length arrays from a geometry container.
 
     Args:
         geom_container (GeometryContainer): The geometry container.
+        coord_dtype (numpy.dtype, optional): Data type of coordinates.
+        count_dtype (numpy.dtype, optional): Data type of part node counts
+            and ring types.
 
     Returns:
         Tuple of arrays representing:
@@ -109,16 +94,128 @@ def _to_vlen_arrays(geom_container):
             count_of_nodes_in_part = len(part.x)
             part_node_count_geom.append(count_of_nodes_in_part)
 
-        x[idx] = np.array(x_geom, dtype=np.float64)
-        y[idx] = np.array(y_geom, dtype=np.float64)
+        x[idx] = np.array(x_geom, dtype=coord_dtype)
+        y[idx] = np.array(y_geom, dtype=coord_dtype)
         if has_z:
-            z[idx] = np.array(z_geom, dtype=np.float64)
-        ring_type[idx] = np.array(ring_type_geom, dtype=np.int_)
-        part_node_count[idx] = np.array(part_node_count_geom, dtype=np.int_)
+            z[idx] = np.array(z_geom, dtype=coord_dtype)
+        ring_type[idx] = np.array(ring_type_geom, dtype=count_dtype)
+        part_node_count[idx] = np.array(part_node_count_geom,
+                                        dtype=count_dtype)
 
     return (x, y, z, part_node_count, ring_type)
 
 
+def _encode_delta(vals, part_node_count, quantum):
+    """Encodes coordinates as quantized differences between nodes in a part.
+
+    Args:
+        vals (array-like(float)): Coordinate values of all nodes.
+        part_node_count (array-like(int)): Count of nodes in each part.
+        quantum (float): Coordinates are rounded to a multiple of this value.
+
+    Returns:
+        numpy.ndarray(int64): Difference between each quantized node value and
+        the previous node value in the same part. The first node of each part
+        stores the quantized value itself.
+
+    Raises:
+        ValueError: If any value is NaN or infinite.
+
+    """
+    vals = np.asarray(vals, dtype=np.float64)
+    if not np.all(np.isfinite(vals)):
+        raise ValueError('Delta encoding requires finite coordinate values')
+    quantized = np.round(vals / quantum).astype(np.int64)
+    encoded = quantized.copy()
+    encoded[1:] -= quantized[:-1]
+    starts = np.cumsum(part_node_count) - part_node_count
+    encoded[starts] = quantized[starts]
+    return encoded
+
+
+def _encode_xor(vals, part_node_count):
+    """Encodes coordinates as the XOR of float bits between nodes in a part.
+
+    Args:
+        vals (array-like(float)): Coordinate values of all nodes.
+        part_node_count (array-like(int)): Count of nodes in each part.
+
+    Returns:
+        numpy.ndarray(uint64): Bits of each node value XOR the bits of the
+        previous node value in the same part. The first node of each part
+        stores its own bits.
+
+    """
+    bits = np.asarray(vals, dtype=np.float64).view(np.uint64)
+    encoded = bits.copy()
+    encoded[1:] ^= bits[:-1]
+    starts = np.cumsum(part_node_count) - part_node_count
+    encoded[starts] = bits[starts]
+    return encoded
+
+
+def _encode_coords(vals, part_node_count, coord_encoding, coord_quantum,
+                   coord_dtype=np.float64):
+    """Encodes coordinate values with the requested encoding.
+
+    Args:
+        vals (array-like(float)): Coordinate values of all nodes.
+        part_node_count (array-like(int)): Count of nodes in each part.
+        coord_encoding (str or None): Encoding name from
+            nc_constants.CoordEncoding, or None for no encoding.
+        coord_quantum (float or None): Quantum for delta encoding.
+        coord_dtype (numpy.dtype, optional): Data type of coordinates written
+            without encoding.
+
+    Returns:
+        Tuple of encoded values and the netCDF data type for them.
+
+    """
+    if coord_encoding == CoordEncoding.DELTA:
+        return _encode_delta(vals, part_node_count, coord_quantum), np.int64
+    elif coord_encoding == CoordEncoding.XOR:
+        return _encode_xor(vals, part_node_count), np.uint64
+    return np.asarray(vals, dtype=coord_dtype), coord_dtype
+
+
+def _count_type(vals, count_dtype):
+    """Returns the integer data type to write counts or indices with.
+
+    Args:
+        vals (array-like(int)): Values to write.
+        count_dtype (numpy.dtype or str or None): Integer data type, 'auto'
+            for the smallest signed integer type holding all values, or None
+            for the platform integer type.
+
+    Returns:
+        numpy.dtype: The data type.
+
+    Raises:
+        ValueError: If count_dtype is not an integer type, or cannot hold all
+            values.
+
+    """
+    if count_dtype is None:
+        return np.dtype(np.int_)
+    vals = np.asarray(vals, dtype=np.int_)
+    low = vals.min() if len(vals) else 0
+    high = vals.max() if len(vals) else 0
+    if isinstance(count_dtype, str) and count_dtype == 'auto':
+        for count_dtype in (np.int8, np.int16, np.int32):
+            info = np.iinfo(count_dtype)
+            if info.min <= low and high <= info.max:
+                return np.dtype(count_dtype)
+        return np.dtype(np.int64)
+    count_dtype = np.dtype(count_dtype)
+    if count_dtype.kind not in 'iu':
+        raise ValueError('Counts must be written as integers')
+    info = np.iinfo(count_dtype)
+    if low < info.min or high > info.max:
+        raise ValueError('Values range from {0} to {1}, which does not fit '
+                         'in {2}'.format(low, high, count_dtype))
+    return count_dtype
+
+
 def _make_vltype(dataset, base_type, type_name):
     """Creates a variable length data type in the netCDF file.
 
@@ -156,7 +253,7 @@ def _make_vltype(dataset, base_type, type_name):
     return vltype
 
 
-def _make_dim(dataset, name, length):
+def _make_dim(dataset, name, length, unlimited=False):
     """Creates a dimension in the netCDF file.
 
     Creates a dimension in the netCDF file. If a dimension of the same name
@@ -166,6 +263,8 @@ def _make_dim(dataset, name, length):
         dataset (netCDF4.Dataset): The netCDF file object.
         name (str): The name for the dimension.
         length (int): The length for the dimension.
+        unlimited (bool, optional): True if the dimension should be created
+            unlimited, so it grows as variables along it are written.
 
     Returns:
         Dimension: Dimension class instance describing the dimension.
@@ -176,7 +275,7 @@ def _make_dim(dataset, name, length):
 
     """
     if name not in dataset.dimensions:
-        dim = dataset.createDimension(name, length)
+        dim = dataset.createDimension(name, None if unlimited else length)
     else:
         dim = dataset.dimensions[name]
         if len(dim) != length:
@@ -187,7 +286,8 @@ def _make_dim(dataset, name, length):
     return dim
 
 
-def _make_var(dataset, name, dtype, dim_tuple=None):
+def _make_var(dataset, name, dtype, dim_tuple=None, zlib=False,
+              fill_value=None):
     """Creates a variable in the netCDF file.
 
     Args:
@@ -196,6 +296,9 @@ def _make_var(dataset, name, dtype, dim_tuple=None):
         dtype (numpy.dtype): The data type for the variable.
         dim_tuple (tuple(str), optional): Tuple of dimension names to use for
             the variable. Leave as None for scalar variables.
+        zlib (bool, optional): True if the variable should be compressed.
+        fill_value (optional): Value marking missing data, written as the
+            _FillValue attribute. Leave as None for the netCDF default.
 
     Returns:
         Variable: Variable class instance describing the new variable.
@@ -207,7 +310,8 @@ def _make_var(dataset, name, dtype, dim_tuple=None):
     if dim_tuple is None:
         dim_tuple = ()
     if name not in dataset.variables:
-        var = dataset.createVariable(name, dtype, dim_tuple)
+        var = dataset.createVariable(name, dtype, dim_tuple, zlib=zlib,
+                                     fill_value=fill_value)
     else:
         m = '{0} variable already exists in netCDF file'.format(name)
         raise ValueError(m)
@@ -239,7 +343,135 @@ def _set_attr(owner, name, value):
             raise ValueError(m)
 
 
-def write_netcdf(geom_container, path_or_object, nc_names=None, use_vlen=False):
+def _write_topology(dataset, v_container, nc_names, topology, zlib,
+                    count_dtype=None):
+    """Writes the arc counts and references of a topology.
+
+    Args:
+        dataset (netCDF4.Dataset): The netCDF file object.
+        v_container (Variable): The geometry container variable.
+        nc_names (nc_names.NcNames): Names to use in the netCDF file.
+        topology (topology.Topology): Topology holding the geometries.
+        zlib (bool): True if variables should be compressed.
+        count_dtype (numpy.dtype or str, optional): Integer data type of
+            counts and references, as in write_netcdf.
+
+    """
+    _make_dim(dataset, nc_names.arc_dim, len(topology.arc_node_count))
+    _make_dim(dataset, nc_names.arc_ref_dim, len(topology.arc_index))
+    _make_dim(dataset, nc_names.part_dim, len(topology.part_arc_count))
+    arc_vars = [
+        (nc_names.arc_node_count_var, nc_names.arc_dim, Attrs.ARC_NODE_COUNT,
+         Attrs.ARC_NODE_COUNT_LONG_NAME, topology.arc_node_count),
+        (nc_names.arc_index_var, nc_names.arc_ref_dim, Attrs.ARC_INDEX,
+         Attrs.ARC_INDEX_LONG_NAME, topology.arc_index),
+        (nc_names.part_arc_count_var, nc_names.part_dim, Attrs.PART_ARC_COUNT,
+         Attrs.PART_ARC_COUNT_LONG_NAME, topology.part_arc_count)]
+    for var_name, dim, attr, long_name, vals in arc_vars:
+        v_arc = _make_var(dataset, var_name, _count_type(vals, count_dtype),
+                          (dim,), zlib=zlib)
+        _set_attr(v_arc, Attrs.LONG_NAME, long_name)
+        v_arc[:] = vals
+        _set_attr(v_container, attr, var_name)
+
+
+def _data_columns(data):
+    """Returns the columns of a table of data variables.
+
+    Args:
+        data (dict or numpy.ndarray): Dictionary of arrays keyed by variable
+            name, or a structured array whose fields are the variables.
+
+    Returns:
+        list(tuple): Name and values of each column.
+
+    """
+    if isinstance(data, np.ndarray) and data.dtype.names:
+        return [(name, data[name]) for name in data.dtype.names]
+    return list(data.items())
+
+
+def _object_column(vals):
+    """Converts a column of Python objects to strings or numbers.
+
+    Args:
+        vals (numpy.ndarray(object)): Column values, of which any may be None.
+
+    Returns:
+        numpy.ndarray: If any value is a string, the values as strings, with
+        None values as empty strings. Otherwise, a masked array of the values
+        as numbers, masked where values are None.
+
+    """
+    missing = np.equal(vals, None)
+    present = vals[~missing]
+    numbers = np.array(present.tolist()) if len(present) else np.zeros(0)
+    if numbers.ndim != 1 or numbers.dtype.kind not in 'iuf':
+        return np.where(missing, '', vals).astype(str)
+    column = np.ma.masked_all(len(vals), dtype=numbers.dtype)
+    column[~missing] = numbers
+    return column
+
+
+def _write_data(dataset, nc_names, data, count, permutation, zlib):
+    """Writes data variables along the instance dimension.
+
+    Each variable is linked to the geometry container by its geometry
+    attribute. String columns are written as character arrays with a string
+    length dimension, converted for the whole column at once. Object columns
+    without strings, such as numbers with gaps, are written as numbers with
+    a fill value where values are None.
+
+    Args:
+        dataset (netCDF4.Dataset): The netCDF file object.
+        nc_names (nc_names.NcNames): Names to use in the netCDF file.
+        data (dict or numpy.ndarray): Dictionary of arrays keyed by variable
+            name, or a structured array, with one value per geometry.
+        count (int): Count of geometries.
+        permutation (numpy.ndarray(int) or None): Original index of each
+            geometry, if geometries were reordered.
+        zlib (bool): True if variables should be compressed.
+
+    Raises:
+        ValueError: If a column does not have one value per geometry.
+
+    """
+    for name, vals in _data_columns(data):
+        vals = np.asarray(vals)
+        if vals.ndim != 1 or len(vals) != count:
+            m = 'Data variable {0} must have one value per geometry'
+            raise ValueError(m.format(name))
+        if permutation is not None:
+            vals = vals[permutation]
+        if vals.dtype.kind == 'O':
+            vals = _object_column(vals)
+        if vals.dtype.kind in 'US':
+            if vals.dtype.kind == 'U':
+                vals = np.char.encode(vals, 'utf-8')
+            strlen = max(vals.dtype.itemsize, 1)
+            strlen_dim = '{0}_strlen'.format(name)
+            _make_dim(dataset, strlen_dim, strlen)
+            v_data = _make_var(dataset, name, 'S1',
+                               (nc_names.instance_dim, strlen_dim), zlib=zlib)
+            # View fixed width strings as characters without copying per item
+            chars = vals.astype('S{0}'.format(strlen)).view('S1')
+            v_data[:] = chars.reshape(len(vals), strlen)
+        else:
+            fill_value = None
+            if np.ma.isMaskedArray(vals):
+                fill_value = default_fillvals[vals.dtype.str[1:]]
+            v_data = _make_var(dataset, name, vals.dtype,
+                               (nc_names.instance_dim,), zlib=zlib,
+                               fill_value=fill_value)
+            v_data[:] = vals
+        _set_attr(v_data, Attrs.GEOMETRY, nc_names.container_var)
+
+
+def write_netcdf(geom_container, path_or_object, nc_names=None, use_vlen=False,
+                 zlib=False, coord_encoding=None, coord_quantum=None,
+                 sort_spatial=None, use_topology=False, data=None,
+                 unlimited=False, deduplicate=False, coord_dtype=None,
+                 count_dtype=None):
     """Exports a geometry container to a CF-compliant netCDF file.
 
     Args:
@@ -252,23 +484,135 @@ def write_netcdf(geom_container, path_or_object, nc_names=None, use_vlen=False):
         use_vlen (bool, optional): True if variable length (VLEN) arrays from
             the netCDF enhanced model should be used for variables such as node
             coordinate arrays, False otherwise.
+        zlib (bool, optional): True if variables should be compressed with
+            zlib, False otherwise. Ignored for VLEN variables.
+        coord_encoding (str, optional): Encoding applied to node coordinates
+            within each part, either 'delta' or 'xor' as in
+            nc_constants.CoordEncoding. Leave as None to write plain CF
+            coordinates. Encoded coordinates are marked by a
+            coordinate_encoding attribute and are not readable by tools that
+            expect the reference CF layout.
+        coord_quantum (float, optional): Required for delta encoding.
+            Coordinates are rounded to a multiple of this value before taking
+            differences between nodes.
+        sort_spatial (str, optional): If provided, geometries are written
+            in order along this space-filling curve, either hilbert or morton,
+            so spatially local reads touch contiguous chunks. The container
+            itself is not reordered.
+        use_topology (bool, optional): True if runs of nodes shared between
+            line or polygon parts should be stored once, as arcs. Node
+            coordinate variables then hold arc nodes along an arc node
+            dimension, and the geometry container names arc_node_count,
+            arc_index, and part_arc_count variables used to rebuild the parts.
+            Such files are not readable by tools that expect the reference CF
+            layout.
+        data (dict or numpy.ndarray, optional): Data variables to write along
+            the instance dimension, as a dictionary of arrays keyed by
+            variable name or as a structured array, with one value per
+            geometry. String columns are written as character arrays, and
+            object columns without strings as numbers, with None values
+            masked by a fill value. Each
+            variable is linked to the geometry container by its geometry
+            attribute, and is reordered along with the geometries if
+            sort_spatial is provided.
+        unlimited (bool, optional): True if the node and part dimensions
+            should be unlimited, so update_netcdf can later grow them when
+            updated geometries have more nodes or parts. Only one dimension
+            can be unlimited in netCDF classic formats.
+        deduplicate (bool, optional): True if identical geometries should be
+            stored once. Distinct geometries are then written along a
+            geometry dimension, and a geometry index variable along the
+            instance dimension gives the stored geometry of each instance.
+            Such files are not readable by tools that expect the reference CF
+            layout.
+        coord_dtype (numpy.dtype, optional): Data type of node coordinate
+            variables, either float32 or float64. Defaults to the type of the
+            container's coordinate buffers. Ignored with coord_encoding.
+        count_dtype (numpy.dtype or str, optional): Integer data type of
+            count, ring type, and index variables. Pass 'auto' to write each
+            variable with the smallest signed integer type that holds its
+            values, e.g., int8 part node counts for simple polygons. Defaults
+            to the platform integer type.
+
+    Returns:
+        numpy.ndarray(int) or None: If sort_spatial is provided, the
+        permutation applied to the geometries, i.e., the original index of
+        each geometry in its new position. Use it to reorder associated data
+        variables the same way.
+
+    Raises:
+        ValueError: If coord_encoding is not recognized, if delta encoding is
+            requested without a positive coord_quantum, or if encoding is
+            requested with VLEN arrays, or if topology is requested for points,
+            with VLEN arrays, or with coordinate encoding, or if a data
+            variable does not have one value per geometry, or if coord_dtype
+            is not float32 or float64, or if count_dtype is not an integer
+            type holding all counts.
 
     """
     if nc_names is None:
         nc_names = NcNames()
+    if coord_dtype is not None and np.dtype(coord_dtype) not in (np.float32,
+                                                                 np.float64):
+        raise ValueError('Coordinates must be written as float32 or float64')
+    if coord_encoding not in (None, CoordEncoding.DELTA, CoordEncoding.XOR):
+        raise ValueError('Unknown coordinate encoding: {0}'.format(
+            coord_encoding))
+    if coord_encoding is not None and use_vlen:
+        raise ValueError('Coordinate encoding is not supported for VLEN')
+    if coord_encoding == CoordEncoding.DELTA and not (coord_quantum and
+                                                      coord_quantum > 0):
+        raise ValueError('Delta encoding requires a positive coord_quantum')
+    if use_topology:
+        if geom_container.geom_type == 'point':
+            raise ValueError('Points cannot be stored as arcs')
+        if use_vlen or coord_encoding is not None:
+            raise ValueError('Arc topology is not supported with VLEN or '
+                             'coordinate encoding')
+    permutation = None
+    if sort_spatial is not None:
+        # Sort a copy, so the caller's container still lines up with its data
+        ragged = geom_container.to_ragged()
+        permutation = spatial_order(ragged, sort_spatial)
+        geom_container = geom_container.from_ragged(ragged.take(permutation))
     if geom_container.geom_type == 'polygon':
         geom_container.orient()  # Set anticlockwise vs clockwise node order
-
-    if use_vlen:
-        x, y, z, part_node_count, ring_type = _to_vlen_arrays(geom_container)
-    else:
-        x, y, z, node_count, part_node_count, ring_type = _to_cra_arrays(geom_container)
+    instance_count = len(geom_container)
+    geom_dim = nc_names.instance_dim
+    if deduplicate:
+        geom_container, geometry_index = geom_container.deduplicate()
+        geom_dim = nc_names.geometry_dim
 
     has_holes = geom_container.has_hole()
     geom_subtype = geom_container.wkt_type().lower()
     has_multinode_parts = (geom_subtype in ['multilinestring', 'multipolygon'] or
                            has_holes)
 
+    ragged = geom_container.to_ragged()
+    coord_dtype = np.dtype(ragged.x.dtype if coord_dtype is None
+                           else coord_dtype)
+    part_node_type = np.dtype(np.int_)
+    if has_multinode_parts:
+        part_node_type = _count_type(ragged.part_node_count, count_dtype)
+    if use_vlen:
+        x, y, z, part_node_count, ring_type = _to_vlen_arrays(
+            geom_container, coord_dtype, part_node_type)
+    else:
+        x, y, z, node_count, part_node_count, ring_type = _to_cra_arrays(ragged)
+        x, node_type = _encode_coords(
+            x, part_node_count, coord_encoding, coord_quantum, coord_dtype)
+        y, node_type = _encode_coords(
+            y, part_node_count, coord_encoding, coord_quantum, coord_dtype)
+        if z is not None:
+            z, node_type = _encode_coords(
+                z, part_node_count, coord_encoding, coord_quantum, coord_dtype)
+        if use_topology:
+            topology = Topology.from_ragged(ragged)
+            x = topology.arc_x.astype(coord_dtype)
+            y = topology.arc_y.astype(coord_dtype)
+            if z is not None:
+                z = topology.arc_z.astype(coord_dtype)
+
     should_close = False
     if isinstance(path_or_object, Dataset):
         ds = path_or_object
@@ -280,28 +624,33 @@ def write_netcdf(geom_container, path_or_object, nc_names=None, use_vlen=False):
         _set_attr(ds, Attrs.CONVENTIONS, nc_names.conventions)
 
         # Dimensions and Types
-        _make_dim(ds, nc_names.instance_dim, len(geom_container.geoms))
+        _make_dim(ds, nc_names.instance_dim, instance_count)
+        if deduplicate:
+            _make_dim(ds, geom_dim, len(geom_container))
 
         if use_vlen:
             if geom_subtype != 'point':
-                node_type = _make_vltype(ds, np.float64, nc_names.node_vltype)
+                node_type = _make_vltype(ds, coord_dtype, nc_names.node_vltype)
             else:
-                node_type = np.float64
+                node_type = coord_dtype
             if has_multinode_parts:
-                part_node_type = _make_vltype(ds, np.int_, nc_names.part_node_vltype)
-            node_dim = nc_names.instance_dim
-            part_node_count_dim = nc_names.instance_dim
+                part_node_type = _make_vltype(ds, part_node_type,
+                                              nc_names.part_node_vltype)
+            node_dim = geom_dim
+            part_node_count_dim = geom_dim
         else:
-            node_type = np.float64
-            part_node_type = np.int_
-            if geom_subtype != 'point':
-                node_dim = nc_names.node_dim
+            if use_topology:
+                node_dim = nc_names.arc_node_dim
                 _make_dim(ds, node_dim, len(x))
+            elif geom_subtype != 'point':
+                node_dim = nc_names.node_dim
+                _make_dim(ds, node_dim, len(x), unlimited=unlimited)
             else:
-                node_dim = nc_names.instance_dim
+                node_dim = geom_dim
             if has_multinode_parts:
                 part_node_count_dim = nc_names.part_dim
-                _make_dim(ds, part_node_count_dim, len(part_node_count))
+                _make_dim(ds, part_node_count_dim, len(part_node_count),
+                          unlimited=unlimited)
 
         # Variables
         v_container = _make_var(ds, nc_names.container_var, np.int_)
@@ -311,29 +660,34 @@ def write_netcdf(geom_container, path_or_object, nc_names=None, use_vlen=False):
             node_coords += ' ' + nc_names.z_var
         _set_attr(v_container, Attrs.NODE_COORDS, node_coords)
 
-        v_x = _make_var(ds, nc_names.x_var, node_type, (node_dim,))
-        _set_attr(v_x, Attrs.AXIS, Attrs.GEOM_X_NODE)
-        v_x[:] = x
-
-        v_y = _make_var(ds, nc_names.y_var, node_type, (node_dim,))
-        _set_attr(v_y, Attrs.AXIS, Attrs.GEOM_Y_NODE)
-        v_y[:] = y
-
+        compress = zlib and not use_vlen
+        coord_vars = [(nc_names.x_var, Attrs.GEOM_X_NODE, x),
+                      (nc_names.y_var, Attrs.GEOM_Y_NODE, y)]
         if z is not None:
-            v_z = _make_var(ds, nc_names.z_var, node_type, (node_dim,))
-            _set_attr(v_z, Attrs.AXIS, Attrs.GEOM_Z_NODE)
-            v_z[:] = z
+            coord_vars.append((nc_names.z_var, Attrs.GEOM_Z_NODE, z))
+        for var_name, axis, vals in coord_vars:
+            v_coord = _make_var(ds, var_name, node_type, (node_dim,),
+                                zlib=compress)
+            _set_attr(v_coord, Attrs.AXIS, axis)
+            if coord_encoding is not None:
+                _set_attr(v_coord, Attrs.COORD_ENCODING, coord_encoding)
+            if coord_encoding == CoordEncoding.DELTA:
+                _set_attr(v_coord, Attrs.COORD_QUANTUM, coord_quantum)
+            v_coord[:] = vals
 
         if (not use_vlen) and geom_subtype != 'point':
             v_node_count = _make_var(
-                ds, nc_names.node_count_var, np.int_, (nc_names.instance_dim,))
+                ds, nc_names.node_count_var,
+                _count_type(node_count, count_dtype), (geom_dim,),
+                zlib=compress)
             _set_attr(v_node_count, Attrs.LONG_NAME, Attrs.NODE_COUNT_LONG_NAME)
             v_node_count[:] = node_count
             _set_attr(v_container, Attrs.NODE_COUNT, nc_names.node_count_var)
 
         if has_multinode_parts:
             v_part_node_count = _make_var(
-                ds, nc_names.part_node_count_var, part_node_type, (part_node_count_dim,))
+                ds, nc_names.part_node_count_var, part_node_type,
+                (part_node_count_dim,), zlib=compress)
             _set_attr(v_part_node_count, Attrs.LONG_NAME,
                       Attrs.PART_NODE_COUNT_LONG_NAME)
             v_part_node_count[:] = part_node_count
@@ -341,12 +695,132 @@ def write_netcdf(geom_container, path_or_object, nc_names=None, use_vlen=False):
 
         if has_holes:
             v_ring_type = _make_var(
-                ds, nc_names.ring_var, part_node_type, (part_node_count_dim,))
+                ds, nc_names.ring_var, part_node_type, (part_node_count_dim,),
+                zlib=compress)
             _set_attr(v_ring_type, Attrs.LONG_NAME, Attrs.RING_TYPE_LONG_NAME)
             v_ring_type[:] = ring_type
             _set_attr(v_container, Attrs.RING_TYPE, nc_names.ring_var)
+
+        if use_topology:
+            _write_topology(ds, v_container, nc_names, topology, compress,
+                            count_dtype)
+
+        if deduplicate:
+            v_index = _make_var(ds, nc_names.geometry_index_var,
+                                _count_type(geometry_index, count_dtype),
+                                (nc_names.instance_dim,), zlib=compress)
+            _set_attr(v_index, Attrs.LONG_NAME,
+                      Attrs.GEOMETRY_INDEX_LONG_NAME)
+            v_index[:] = geometry_index
+            _set_attr(v_container, Attrs.GEOMETRY_INDEX,
+                      nc_names.geometry_index_var)
+
+        if data is not None:
+            _write_data(ds, nc_names, data, instance_count, permutation,
+                        compress)
     finally:
         if should_close:
             ds.close()
+    return permutation
+
 
+def write_netcdf_pyramid(geom_container, path_or_object, tolerances,
+                         nc_names=None, use_vlen=False, zlib=False,
+                         method='douglas-peucker'):
+    """Exports a geometry container with simplified levels of detail.
 
+    The full detail container is written as level 0 using nc_names. Each
+    tolerance adds a simplified level written as a sibling geometry container
+    sharing the instance dimension, with names prefixed by lod1_, lod2_, and so
+    on. Each level's geometry container variable records its level and
+    simplification tolerance, and the level 0 variable lists the geometry
+    container variables of all levels from finest to coarsest.
+
+    Args:
+        geom_container (GeometryContainer): Geometry container object.
+        path_or_object (str or netCDF4.Dataset): Target netCDF file
+            or object.  If the file exists, it is overwritten. Pass a
+            netCDF4.Dataset object to append to an existing file.
+        tolerances (array-like(float)): Simplification tolerance for each
+            level after level 0, in increasing order.
+        nc_names (nc_names.NcNames, optional): Object specifying names for
+            types, dimensions, and variables to use for level 0.
+        use_vlen (bool, optional): True if variable length (VLEN) arrays from
+            the netCDF enhanced model should be used for variables such as node
+            coordinate arrays, False otherwise.
+        zlib (bool, optional): True if variables should be compressed with
+            zlib, False otherwise. Ignored for VLEN variables.
+        method (str, optional): Simplification method, either douglas-peucker
+            or visvalingam.
+
+    Raises:
+        ValueError: If tolerances are not positive and increasing.
+
+    """
+    tolerances = list(tolerances)
+    if any(t <= 0 for t in tolerances) or tolerances != sorted(set(tolerances)):
+        raise ValueError('Tolerances must be positive and increasing')
+    if nc_names is None:
+        nc_names = NcNames()
+
+    should_close = False
+    if isinstance(path_or_object, Dataset):
+        ds = path_or_object
+    else:
+        ds = Dataset(path_or_object, mode='w')
+        should_close = True
+
+    try:
+        level_names = []
+        for level, tolerance in enumerate([0] + tolerances):
+            names = copy.copy(nc_names)
+            if level:
+                names.set_prefix('lod{0}_'.format(level))
+                level_container = geom_container.simplify(tolerance, method)
+            else:
+                level_container = geom_container
+            write_netcdf(level_container, ds, nc_names=names,
+                         use_vlen=use_vlen, zlib=zlib)
+            v_container = ds.variables[names.container_var]
+            _set_attr(v_container, Attrs.LOD_LEVEL, level)
+            _set_attr(v_container, Attrs.LOD_TOLERANCE, float(tolerance))
+            level_names.append(names.container_var)
+        _set_attr(ds.variables[nc_names.container_var], Attrs.LOD_CONTAINERS,
+                  ' '.join(level_names))
+    finally:
+        if should_close:
+            ds.close()
+
+
+_initial_memory = 2**16
+"""int: Initial size in bytes of in-memory netCDF files."""
+
+
+def write_netcdf_bytes(geom_container, file_format='NETCDF4', **kwargs):
+    """Exports a geometry container to an in-memory netCDF file.
+
+    The file is built in memory by the netCDF library and never touches the
+    filesystem.
+
+    Args:
+        geom_container (GeometryContainer): Geometry container object.
+        file_format (str, optional): NetCDF file format, e.g., NETCDF4 or
+            NETCDF3_64BIT_DATA. VLEN arrays require NETCDF4.
+        **kwargs: Options passed to write_netcdf, e.g., nc_names, zlib, or
+            data.
+
+    Returns:
+        memoryview: Contents of the netCDF file, without a copy of the
+        library's buffer. Pass it to read_netcdf_bytes, or write it to a file
+        or response body as is.
+
+    """
+    # The library grows the buffer as needed; the size is only a first guess
+    ds = Dataset('cfgeom_in_memory.nc', mode='w', format=file_format,
+                 memory=_initial_memory)
+    try:
+        write_netcdf(geom_container, ds, **kwargs)
+    except:
+        ds.close()
+        raise
+    return ds.close()
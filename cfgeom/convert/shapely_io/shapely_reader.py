@@ -1,11 +1,20 @@
 """Converts from shapely geometries to GeometryContainer objects."""
 
 import numpy as np
+from shapely.geometry import Point
 from shapely.geometry.base import BaseGeometry, BaseMultipartGeometry
 
+try:
+    from shapely import get_coordinates as _get_coordinates
+except ImportError:
+    # Shapely releases before 2.0 have no vectorized accessors
+    _get_coordinates = None
+
 from ... container import GeometryContainer
 from ... geometry import Geometry
 from ... part import Part
+from ... ragged import RaggedArrays, _trim_z
+from .. netcdf.nc_writer import write_netcdf
 
 
 _geom_map = {'Point': 'point',
@@ -137,3 +146,134 @@ def shapely_to_container(geoms):
 
     cf_geoms = [shapely_to_geom(g) for g in geoms]
     return GeometryContainer(cf_geoms)
+
+
+def _single_points_to_ragged(geoms):
+    """Converts shapely points to buffers holding one node per geometry.
+
+    With Shapely 2, coordinates are extracted in one vectorized call.
+
+    Args:
+        geoms (array-like(shapely.geometry.Point)): Shapely points.
+
+    Returns:
+        RaggedArrays: Buffers without count arrays, as for single points read
+        from netCDF.
+
+    Raises:
+        ValueError: If any point is empty.
+
+    """
+    if _get_coordinates is not None:
+        coords = _get_coordinates(np.asarray(geoms, dtype=object),
+                                  include_z=True)
+        if len(coords) != len(geoms):
+            raise ValueError('Empty Shapely geometries are not supported')
+    else:
+        try:
+            rows = [point.coords[0] for point in geoms]
+        except IndexError:
+            raise ValueError('Empty Shapely geometries are not supported')
+        coords = np.full((len(rows), 3), np.nan)
+        if any(len(row) > 2 for row in rows):
+            for idx, row in enumerate(rows):
+                coords[idx, :len(row)] = row
+        else:
+            coords[:, :2] = rows
+    return RaggedArrays('point', coords[:, 0], coords[:, 1],
+                        _trim_z(coords[:, 2].copy()))
+
+
+def shapely_to_ragged(geoms):
+    """Converts shapely geometries to contiguous ragged array buffers.
+
+    Coordinate arrays of every part are concatenated once, without creating
+    Geometry or Part objects or lists of coordinate values.
+
+    Args:
+        geoms (array-like(shapely.geometry.BaseGeometry)): Shapely geometry
+            object or objects, all of the same type, single or multipart.
+
+    Returns:
+        RaggedArrays: Buffers holding the geometry nodes.
+
+    Raises:
+        ValueError: If no geometries are provided, if geometries are empty, or
+            if geometries are of different or unsupported types.
+
+    """
+    if isinstance(geoms, BaseGeometry):
+        geoms = [geoms]
+    if not len(geoms):
+        raise ValueError('No Shapely geometries provided')
+    if all(type(shape) is Point for shape in geoms):
+        return _single_points_to_ragged(geoms)
+    geom_type = _geom_map.get(geoms[0].geom_type)
+    coords = []
+    part_has_z = []
+    is_hole = []
+    part_node_count = []
+    node_count = []
+    for shape in geoms:
+        if geom_type is None or _geom_map.get(shape.geom_type) != geom_type:
+            raise ValueError('Geometries must all be points, lines, or '
+                             'polygons of the same type')
+        parts = (shape.geoms if isinstance(shape, BaseMultipartGeometry)
+                 else [shape])
+        geom_node_count = 0
+        for part in parts:
+            if geom_type == 'polygon':
+                rings = [part.exterior] + list(part.interiors)
+            else:
+                rings = [part]
+            for ring_idx, ring in enumerate(rings):
+                ring_coords = np.asarray(ring.coords, dtype=np.float64)
+                if not len(ring_coords):
+                    raise ValueError('Empty Shapely geometries are not '
+                                     'supported')
+                coords.append(ring_coords)
+                part_has_z.append(ring_coords.shape[1] > 2)
+                is_hole.append(ring_idx > 0)
+                part_node_count.append(len(ring_coords))
+                geom_node_count += len(ring_coords)
+        if not geom_node_count:
+            raise ValueError('Empty Shapely geometries are not supported')
+        node_count.append(geom_node_count)
+
+    if any(part_has_z):
+        # Pad parts without z values with NaN, as in CF netCDF files
+        for idx in np.flatnonzero(~np.array(part_has_z)):
+            coords[idx] = np.column_stack(
+                (coords[idx], np.full(len(coords[idx]), np.nan)))
+    coords = np.concatenate(coords)
+    z = coords[:, 2] if coords.shape[1] > 2 else None
+    return RaggedArrays(geom_type, coords[:, 0], coords[:, 1], z, node_count,
+                        part_node_count, is_hole)
+
+
+def write_shapely_netcdf(geoms, path_or_object, **kwargs):
+    """Exports shapely geometries directly to a CF-compliant netCDF file.
+
+    Shapely coordinate arrays are flattened into contiguous ragged array
+    buffers, and polygon rings are oriented over the buffers in batch, so no
+    Geometry or Part objects are created on the way to the netCDF variables.
+
+    Args:
+        geoms (array-like(shapely.geometry.BaseGeometry)): Shapely geometry
+            object or objects, all of the same type, single or multipart.
+        path_or_object (str or netCDF4.Dataset): Target netCDF file
+            or object.  If the file exists, it is overwritten. Pass a
+            netCDF4.Dataset object to append to an existing file.
+        **kwargs: Options passed to nc_writer.write_netcdf, e.g., nc_names,
+            zlib, or coord_encoding.
+
+    Returns:
+        numpy.ndarray(int) or None: If sort_spatial is provided, the
+        permutation applied to the geometries, as in write_netcdf.
+
+    Raises:
+        ValueError: If geometries cannot be converted or written.
+
+    """
+    container = GeometryContainer.from_ragged(shapely_to_ragged(geoms))
+    return write_netcdf(container, path_or_object, **kwargs)
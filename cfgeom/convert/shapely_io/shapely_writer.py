@@ -1,5 +1,6 @@
 """Converts GeometryContainer objects to lists of shapely geometries."""
 
+import numpy as np
 from shapely.geometry import (
     Point,
     MultiPoint,
@@ -10,6 +11,12 @@ from shapely.geometry import (
 )
 from shapely.geometry.base import BaseGeometry
 
+try:
+    from shapely import points as _points
+except ImportError:
+    # Shapely releases before 2.0 have no vectorized constructors
+    _points = None
+
 
 _geom_map = {'Point': Point,
              'MultiPoint': MultiPoint,
@@ -130,3 +137,135 @@ def geom_to_shapely(geom, shapely_geom_type=None):
         ret = shapely_type(coords)
         
     return ret
+
+
+def _force_multi(geom_type, shapely_geom_type):
+    """Determines if a requested shapely type forces multipart geometries.
+
+    Args:
+        geom_type (str): Geometry type, either point, line, or polygon.
+        shapely_geom_type (str or shapely.geometry type or None): The target
+            shapely geometry type.
+
+    Returns:
+        bool: True if all geometries should be multipart.
+
+    Raises:
+        ValueError: If the provided shapely type is not compatible with the
+        geometry type.
+
+    """
+    if not shapely_geom_type:
+        return False
+    name = getattr(shapely_geom_type, '__name__', shapely_geom_type)
+    single = {'point': 'Point', 'line': 'LineString', 'polygon': 'Polygon'}
+    if name.replace('Multi', '') != single[geom_type]:
+        m = ('Target shapely type of {0} does not match input geometry '
+             'type of {1}'.format(name, geom_type))
+        raise ValueError(m)
+    return name.startswith('Multi')
+
+
+def _single_points(ragged):
+    """Creates shapely points from buffers holding one node per geometry.
+
+    With Shapely 2, all points are created in one vectorized call.
+
+    Args:
+        ragged (RaggedArrays): Buffers holding one node per geometry.
+
+    Returns:
+        list(shapely.geometry.Point): One point for each node.
+
+    """
+    coords = np.column_stack((ragged.x, ragged.y))
+    if ragged.z is None:
+        has_z = np.zeros(len(coords), dtype=bool)
+    else:
+        has_z = ~np.isnan(ragged.z)
+        coords_z = np.column_stack((ragged.x, ragged.y, ragged.z))
+    if _points is not None:
+        geoms = _points(coords)
+        if has_z.any():
+            geoms[has_z] = _points(coords_z[has_z])
+        return geoms.tolist()
+    if not has_z.any():
+        return [Point(xy) for xy in coords]
+    return [Point(xyz if node_has_z else xyz[:2])
+            for xyz, node_has_z in zip(coords_z, has_z.tolist())]
+
+
+def ragged_to_shapely(ragged, shapely_geom_type=None):
+    """Creates shapely geometries from contiguous ragged array buffers.
+
+    Shapely objects are built from slices of one coordinate array, without
+    creating Geometry or Part objects or lists of coordinate tuples.
+
+    Args:
+        ragged (RaggedArrays): Buffers holding the geometry nodes.
+        shapely_geom_type (str or shapely.geometry type, optional): The target
+            shapely geometry type. Use this to force a multipart shapely type
+            when geometries are single-part.
+
+    Returns:
+        list(shapely.geometry.BaseGeometry): One shapely geometry for each
+        geometry in the buffers.
+
+    Raises:
+        ValueError: If the provided shapely type is not compatible with the
+        geometry type.
+
+    """
+    force_multi = _force_multi(ragged.geom_type, shapely_geom_type)
+    if (ragged.geom_type == 'point' and not force_multi and
+            len(ragged) == len(ragged.x)):
+        return _single_points(ragged)
+    coords = np.column_stack((ragged.x, ragged.y))
+    if ragged.z is not None:
+        coords_z = np.column_stack((ragged.x, ragged.y, ragged.z))
+        part_has_z = ragged.part_has_z().tolist()
+    else:
+        part_has_z = [False] * len(ragged.part_node_count)
+    part_offsets = ragged.part_offsets().tolist()
+    geom_part_offsets = ragged.geom_part_offsets().tolist()
+
+    def part_coords(part_idx):
+        source = coords_z if part_has_z[part_idx] else coords
+        return source[part_offsets[part_idx]:part_offsets[part_idx + 1]]
+
+    geoms = []
+    if ragged.geom_type == 'polygon':
+        # Each exterior ring starts a polygon
+        is_hole = ragged.is_hole.tolist()
+        for geom_idx in range(len(ragged)):
+            polygons = []
+            for part_idx in range(geom_part_offsets[geom_idx],
+                                  geom_part_offsets[geom_idx + 1]):
+                if is_hole[part_idx] and polygons:
+                    polygons[-1][1].append(part_coords(part_idx))
+                else:
+                    polygons.append((part_coords(part_idx), []))
+            if len(polygons) > 1 or force_multi:
+                geoms.append(MultiPolygon(polygons))
+            else:
+                geoms.append(Polygon(*polygons[0]))
+    elif ragged.geom_type == 'line':
+        for geom_idx in range(len(ragged)):
+            start = geom_part_offsets[geom_idx]
+            end = geom_part_offsets[geom_idx + 1]
+            if end - start > 1 or force_multi:
+                geoms.append(MultiLineString(
+                    [part_coords(i) for i in range(start, end)]))
+            else:
+                geoms.append(LineString(part_coords(start)))
+    else:
+        # Each point part is a single node
+        for geom_idx in range(len(ragged)):
+            start = geom_part_offsets[geom_idx]
+            end = geom_part_offsets[geom_idx + 1]
+            if end - start > 1 or force_multi:
+                geoms.append(MultiPoint(
+                    [part_coords(i)[0] for i in range(start, end)]))
+            else:
+                geoms.append(Point(part_coords(start)[0]))
+    return geoms
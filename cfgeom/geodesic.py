@@ -0,0 +1,270 @@
+"""Measures geometries with longitude and latitude coordinates on the Earth.
+
+Coordinates are longitude and latitude in degrees. Lengths follow geodesics on
+the ellipsoid, computed with the inverse formula of Vincenty for all segments
+at once. Areas are computed on the sphere with the same surface area as the
+ellipsoid (the authalic sphere), after mapping latitudes to authalic
+latitudes, by summing the spherical excess of every ring edge at once. Ring
+edges therefore follow great circles of the authalic sphere, which differ
+from ellipsoidal geodesics by far less than typical digitizing error.
+
+Longitude differences are taken the short way around, so geometries may cross
+the antimeridian, but rings must not enclose a pole.
+"""
+
+import numpy as np
+
+
+_ellipsoids = {'WGS84': (6378137.0, 1 / 298.257223563),
+               'GRS80': (6378137.0, 1 / 298.257222101),
+               'sphere': (6371008.8, 0.0)}
+"""dict: Semi-major axis in meters and flattening of supported ellipsoids."""
+
+
+def _ellipsoid(ellipsoid):
+    """Looks up the axis and flattening of an ellipsoid.
+
+    Args:
+        ellipsoid (str or tuple(float)): Name of a supported ellipsoid, i.e.,
+            WGS84, GRS80, or sphere, or the semi-major axis in meters and the
+            flattening.
+
+    Returns:
+        Tuple with the semi-major axis and the flattening.
+
+    Raises:
+        ValueError: If the ellipsoid is not recognized.
+
+    """
+    if isinstance(ellipsoid, str):
+        if ellipsoid not in _ellipsoids:
+            raise ValueError('ellipsoid must be one of: {0}'.format(
+                ', '.join(_ellipsoids)))
+        return _ellipsoids[ellipsoid]
+    a, f = ellipsoid
+    if a <= 0 or not 0 <= f < 1:
+        raise ValueError('Ellipsoid axis must be positive and flattening '
+                         'between 0 and 1')
+    return float(a), float(f)
+
+
+def _wrap(delta):
+    """Wraps longitude differences in radians to the range -pi to pi.
+
+    Args:
+        delta (numpy.ndarray(float)): Longitude differences.
+
+    Returns:
+        numpy.ndarray(float): Equivalent differences, taken the short way.
+
+    """
+    return (delta + np.pi) % (2 * np.pi) - np.pi
+
+
+def _authalic(a, f):
+    """Returns the authalic radius and a function mapping latitudes.
+
+    Args:
+        a (float): Semi-major axis.
+        f (float): Flattening.
+
+    Returns:
+        Tuple with the radius of the sphere with the surface area of the
+        ellipsoid, and a function converting latitudes in radians to
+        authalic latitudes in radians.
+
+    """
+    if f == 0:
+        return a, lambda phi: phi
+    e2 = f * (2 - f)
+    e = np.sqrt(e2)
+
+    def q(sin_phi):
+        return (1 - e2) * (sin_phi / (1 - e2 * sin_phi ** 2) -
+                           np.log((1 - e * sin_phi) / (1 + e * sin_phi)) /
+                           (2 * e))
+    qp = q(1.0)
+    return (a * np.sqrt(qp / 2),
+            lambda phi: np.arcsin(np.clip(q(np.sin(phi)) / qp, -1, 1)))
+
+
+def _vincenty(lon1, lat1, lon2, lat2, a, f, max_iter=200):
+    """Computes geodesic distances with the inverse formula of Vincenty.
+
+    Near antipodal pairs for which the formula does not converge fall back to
+    the great circle distance on a sphere of the mean radius.
+
+    Args:
+        lon1, lat1 (numpy.ndarray(float)): Start of each segment, in radians.
+        lon2, lat2 (numpy.ndarray(float)): End of each segment, in radians.
+        a (float): Semi-major axis.
+        f (float): Flattening.
+        max_iter (int, optional): Maximum count of iterations.
+
+    Returns:
+        numpy.ndarray(float): Distance of each segment.
+
+    """
+    b = (1 - f) * a
+    big_l = _wrap(lon2 - lon1)
+    u1 = np.arctan((1 - f) * np.tan(lat1))
+    u2 = np.arctan((1 - f) * np.tan(lat2))
+    sin_u1, cos_u1 = np.sin(u1), np.cos(u1)
+    sin_u2, cos_u2 = np.sin(u2), np.cos(u2)
+
+    n = len(big_l)
+    sin_sigma = np.zeros(n)
+    cos_sigma = np.ones(n)
+    sigma = np.zeros(n)
+    cos2_alpha = np.ones(n)
+    cos_2sm = np.zeros(n)
+    # Iterate on the segments that have not converged, shrinking the working
+    # arrays as segments converge
+    i = np.arange(n)
+    lam = big_l
+    ell = big_l
+    cc = cos_u1 * cos_u2
+    ss = sin_u1 * sin_u2
+    cs = cos_u1 * sin_u2
+    sc = sin_u1 * cos_u2
+    with np.errstate(invalid='ignore', divide='ignore'):
+        for _ in range(max_iter):
+            if not len(i):
+                break
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            s_sigma = np.hypot(cos_u2[i] * sin_lam, cs - sc * cos_lam)
+            c_sigma = ss + cc * cos_lam
+            sig = np.arctan2(s_sigma, c_sigma)
+            sin_alpha = cc * sin_lam / s_sigma
+            sin_alpha[s_sigma == 0] = 0.0
+            c2_alpha = 1 - sin_alpha * sin_alpha
+            c_2sm = c_sigma - 2 * ss / c2_alpha
+            c_2sm[c2_alpha == 0] = 0.0
+            c = f / 16 * c2_alpha * (4 + f * (4 - 3 * c2_alpha))
+            new_lam = ell + (1 - c) * f * sin_alpha * (
+                sig + c * s_sigma * (c_2sm + c * c_sigma *
+                                     (-1 + 2 * c_2sm * c_2sm)))
+            sin_sigma[i], cos_sigma[i], sigma[i] = s_sigma, c_sigma, sig
+            cos2_alpha[i], cos_2sm[i] = c2_alpha, c_2sm
+            active = np.abs(new_lam - lam) > 1e-12
+            if not np.all(active):
+                i, lam, ell = i[active], new_lam[active], ell[active]
+                cc, ss, cs, sc = cc[active], ss[active], cs[active], \
+                    sc[active]
+            else:
+                lam = new_lam
+    active = np.zeros(n, dtype=bool)
+    active[i] = True
+
+    u_sq = cos2_alpha * (a ** 2 - b ** 2) / b ** 2
+    big_a = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq *
+                                               (320 - 175 * u_sq)))
+    big_b = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = big_b * sin_sigma * (
+        cos_2sm + big_b / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sm ** 2) -
+            big_b / 6 * cos_2sm * (-3 + 4 * sin_sigma ** 2) *
+            (-3 + 4 * cos_2sm ** 2)))
+    distance = b * big_a * (sigma - delta_sigma)
+    if np.any(active):
+        i = np.flatnonzero(active)
+        central = 2 * np.arcsin(np.sqrt(
+            np.sin((lat2[i] - lat1[i]) / 2) ** 2 + np.cos(lat1[i]) *
+            np.cos(lat2[i]) * np.sin(big_l[i] / 2) ** 2))
+        distance[i] = central * (2 * a + b) / 3
+    return distance
+
+
+def _segments(ragged):
+    """Finds the segments of every part.
+
+    Args:
+        ragged (RaggedArrays): Line or polygon geometries.
+
+    Returns:
+        Tuple of numpy.ndarray(int) with the start and end node of each
+        segment. Polygon rings include the segment from the last node back to
+        the first, which has no length if the ring is closed.
+
+    """
+    if ragged.geom_type == 'polygon':
+        return np.arange(len(ragged.x)), ragged.next_node_index()
+    last = np.zeros(len(ragged.x), dtype=bool)
+    last[ragged.part_offsets()[1:] - 1] = True
+    start = np.flatnonzero(~last)
+    return start, start + 1
+
+
+def geodesic_length(ragged, ellipsoid='WGS84'):
+    """Computes the geodesic length of every geometry.
+
+    Args:
+        ragged (RaggedArrays): Line or polygon geometries with longitude and
+            latitude coordinates in degrees.
+        ellipsoid (str or tuple(float), optional): Name of a supported
+            ellipsoid, i.e., WGS84, GRS80, or sphere, or the semi-major axis
+            in meters and the flattening.
+
+    Returns:
+        numpy.ndarray(float): Length of each line geometry, or perimeter of
+        each polygon geometry, in the units of the semi-major axis.
+
+    Raises:
+        ValueError: If geometry type is point, or if the ellipsoid is not
+            recognized.
+
+    """
+    if ragged.geom_type == 'point':
+        raise ValueError('Length requires line or polygon geometries')
+    a, f = _ellipsoid(ellipsoid)
+    start, end = _segments(ragged)
+    # Float32 coordinates would lose meters in the ellipsoid terms
+    lon = np.radians(ragged.x, dtype=np.float64)
+    lat = np.radians(ragged.y, dtype=np.float64)
+    lengths = _vincenty(lon[start], lat[start], lon[end], lat[end], a, f)
+    return np.bincount(ragged.node_geom_index()[start], weights=lengths,
+                       minlength=len(ragged))
+
+
+def geodesic_area(ragged, ellipsoid='WGS84'):
+    """Computes the area of every polygon geometry on the Earth.
+
+    Holes are subtracted from the area of their geometry, regardless of the
+    orientation of rings.
+
+    Args:
+        ragged (RaggedArrays): Polygon geometries with longitude and latitude
+            coordinates in degrees.
+        ellipsoid (str or tuple(float), optional): Name of a supported
+            ellipsoid, i.e., WGS84, GRS80, or sphere, or the semi-major axis
+            in meters and the flattening.
+
+    Returns:
+        numpy.ndarray(float): Area of each geometry, in the square units of
+        the semi-major axis.
+
+    Raises:
+        ValueError: If geometry type is not polygon, or if the ellipsoid is
+            not recognized.
+
+    """
+    if ragged.geom_type != 'polygon':
+        raise ValueError('Area requires polygon geometries')
+    a, f = _ellipsoid(ellipsoid)
+    radius, authalic = _authalic(a, f)
+    lam = np.radians(ragged.x, dtype=np.float64)
+    # tan(beta / 2) of each node's authalic latitude beta
+    t = np.tan(authalic(np.radians(ragged.y, dtype=np.float64)) / 2)
+    following = ragged.next_node_index()
+    # Spherical excess of the triangle formed by each edge and the pole
+    excess = 2 * np.arctan2(
+        np.tan(_wrap(lam[following] - lam) / 2) * (t + t[following]),
+        1 + t * t[following])
+    if not len(excess):
+        return np.zeros(len(ragged))
+    ring_excess = np.abs(np.add.reduceat(excess,
+                                         ragged.part_offsets()[:-1]))
+    ring_area = ring_excess * radius ** 2
+    ring_area[ragged.is_hole] *= -1
+    return np.bincount(ragged.part_geom_index(), weights=ring_area,
+                       minlength=len(ragged))
@@ -0,0 +1,231 @@
+"""Connects line geometries into a directed flow network.
+
+Each line geometry is a reach flowing from its first node to its last node,
+as flowlines are digitized in hydrography datasets. Reach end points are
+snapped by rounding their coordinates to a grid and grouping identical
+rounded coordinates by a hash of them, and a reach flows into every reach
+starting where it ends. Connections are held in compressed sparse row (CSR)
+form in both directions, so tracing visits each reach once, one breadth-first
+level at a time over flat arrays.
+"""
+
+import numpy as np
+
+from . ragged import _offsets, _range_index
+from . topology import _sort_rows
+
+
+def _csr(source, target, count):
+    """Builds compressed sparse row adjacency from edges.
+
+    Args:
+        source (numpy.ndarray(int)): Source of each edge.
+        target (numpy.ndarray(int)): Target of each edge.
+        count (int): Count of vertices.
+
+    Returns:
+        Tuple of numpy.ndarray(int) with the offsets of the targets of each
+        vertex, one longer than the vertices, and the targets, ordered by
+        source and then in input order.
+
+    """
+    order = np.argsort(source, kind='stable')
+    return _offsets(np.bincount(source, minlength=count)), target[order]
+
+
+class FlowNetwork(object):
+    """Contains the downstream and upstream connections between reaches.
+
+    Attributes:
+        down_indptr (numpy.ndarray(int)): Offsets of the downstream reaches
+            of each reach within down_indices, one longer than the reaches.
+        down_indices (numpy.ndarray(int)): Indices of downstream reaches.
+        up_indptr (numpy.ndarray(int)): Offsets of the upstream reaches of
+            each reach within up_indices, one longer than the reaches.
+        up_indices (numpy.ndarray(int)): Indices of upstream reaches.
+
+    """
+
+    def __init__(self, down_indptr, down_indices, up_indptr=None,
+                 up_indices=None):
+        """Inits FlowNetwork with downstream connections.
+
+        Args:
+            down_indptr (array-like(int)): Offsets of the downstream reaches
+                of each reach, one longer than the reaches.
+            down_indices (array-like(int)): Indices of downstream reaches.
+            up_indptr (array-like(int), optional): Offsets of the upstream
+                reaches of each reach. Computed if omitted.
+            up_indices (array-like(int), optional): Indices of upstream
+                reaches. Computed if omitted.
+
+        Raises:
+            ValueError: If offsets and indices are inconsistent.
+
+        """
+        self.down_indptr = np.asarray(down_indptr, dtype=np.int_)
+        self.down_indices = np.asarray(down_indices, dtype=np.int_)
+        if (self.down_indptr[0] != 0 or
+                self.down_indptr[-1] != len(self.down_indices)):
+            raise ValueError('Offsets must span the indices')
+        if up_indptr is None or up_indices is None:
+            source = np.repeat(np.arange(len(self)),
+                               np.diff(self.down_indptr))
+            up_indptr, up_indices = _csr(self.down_indices, source, len(self))
+        self.up_indptr = np.asarray(up_indptr, dtype=np.int_)
+        self.up_indices = np.asarray(up_indices, dtype=np.int_)
+
+
+    def __len__(self):
+        return len(self.down_indptr) - 1
+
+
+    @classmethod
+    def from_ragged(cls, ragged, tolerance=None):
+        """Builds a flow network from line geometries.
+
+        Args:
+            ragged (RaggedArrays): Line geometries, each flowing from its
+                first node to its last node.
+            tolerance (float, optional): Size of the grid end point
+                coordinates are rounded to before matching. Leave as None to
+                match identical coordinates only.
+
+        Returns:
+            FlowNetwork: Connections between the geometries.
+
+        Raises:
+            ValueError: If geometry type is not line, or if tolerance is not
+                positive.
+
+        """
+        if ragged.geom_type != 'line':
+            raise ValueError('Flow networks require line geometries')
+        if tolerance is not None and tolerance <= 0:
+            raise ValueError('tolerance must be positive')
+        offsets = ragged.node_offsets()
+        ends = np.concatenate((offsets[:-1], offsets[1:] - 1))
+        coords = np.column_stack((ragged.x[ends], ragged.y[ends]))
+        if tolerance is None:
+            # Adding zero turns negative zero into zero before comparing bits
+            keys = (coords.astype(np.float64) + 0.0).view(np.int64)
+        else:
+            keys = np.round(coords / tolerance).astype(np.int64)
+        if not len(keys):
+            return cls(np.zeros(1, dtype=np.int_), np.zeros(0, dtype=np.int_))
+        order, is_new = _sort_rows([keys[:, 0].copy(), keys[:, 1].copy()])
+        point = np.empty(len(keys), dtype=np.int_)
+        point[order] = np.cumsum(is_new) - 1
+        count = len(ragged)
+        start_point = point[:count]
+        end_point = point[count:]
+
+        # Reaches starting at each snapped point
+        starts_indptr, starting = _csr(start_point, np.arange(count),
+                                       point.max() + 1)
+        down_counts = np.diff(starts_indptr)[end_point]
+        targets = starting[_range_index(starts_indptr[end_point],
+                                        down_counts)]
+        sources = np.repeat(np.arange(count), down_counts)
+        keep = sources != targets
+        return cls(_offsets(np.bincount(sources[keep], minlength=count)),
+                   targets[keep])
+
+
+    def _trace(self, reaches, indptr, indices, include_self, max_steps):
+        """Visits reaches breadth first along one direction.
+
+        Args:
+            reaches (array-like(int)): Indices of reaches to start from.
+            indptr (numpy.ndarray(int)): Offsets of adjacent reaches.
+            indices (numpy.ndarray(int)): Indices of adjacent reaches.
+            include_self (bool): True to include the starting reaches.
+            max_steps (int or None): Maximum count of reaches to step
+                through, or None for no limit.
+
+        Returns:
+            numpy.ndarray(int): Indices of visited reaches, in the order they
+            were reached, each once.
+
+        """
+        frontier = np.unique(np.asarray(reaches, dtype=np.int_).ravel())
+        if len(frontier) and (frontier[0] < 0 or frontier[-1] >= len(self)):
+            raise ValueError('Reach index out of range')
+        visited = np.zeros(len(self), dtype=bool)
+        visited[frontier] = True
+        found = [frontier] if include_self else []
+        step = 0
+        while len(frontier) and (max_steps is None or step < max_steps):
+            starts = indptr[frontier]
+            adjacent = indices[_range_index(starts,
+                                            indptr[frontier + 1] - starts)]
+            adjacent = np.unique(adjacent[~visited[adjacent]])
+            visited[adjacent] = True
+            found.append(adjacent)
+            frontier = adjacent
+            step += 1
+        if not found:
+            return np.zeros(0, dtype=np.int_)
+        return np.concatenate(found)
+
+
+    def downstream(self, reaches, include_self=False, max_steps=None):
+        """Finds the reaches downstream of one or more reaches.
+
+        Args:
+            reaches (int or array-like(int)): Index of each starting reach.
+            include_self (bool, optional): True to include the starting
+                reaches in the result.
+            max_steps (int, optional): Maximum count of reaches to step
+                through. Defaults to no limit.
+
+        Returns:
+            numpy.ndarray(int): Indices of downstream reaches, nearest first.
+
+        Raises:
+            ValueError: If a reach index is out of range.
+
+        """
+        return self._trace(reaches, self.down_indptr, self.down_indices,
+                           include_self, max_steps)
+
+
+    def upstream(self, reaches, include_self=False, max_steps=None):
+        """Finds the reaches upstream of one or more reaches.
+
+        Args:
+            reaches (int or array-like(int)): Index of each starting reach.
+            include_self (bool, optional): True to include the starting
+                reaches in the result.
+            max_steps (int, optional): Maximum count of reaches to step
+                through. Defaults to no limit.
+
+        Returns:
+            numpy.ndarray(int): Indices of upstream reaches, nearest first.
+
+        Raises:
+            ValueError: If a reach index is out of range.
+
+        """
+        return self._trace(reaches, self.up_indptr, self.up_indices,
+                           include_self, max_steps)
+
+
+    def headwaters(self):
+        """Finds reaches without upstream reaches.
+
+        Returns:
+            numpy.ndarray(int): Indices of headwater reaches.
+
+        """
+        return np.flatnonzero(np.diff(self.up_indptr) == 0)
+
+
+    def outlets(self):
+        """Finds reaches without downstream reaches.
+
+        Returns:
+            numpy.ndarray(int): Indices of outlet reaches.
+
+        """
+        return np.flatnonzero(np.diff(self.down_indptr) == 0)
@@ -198,3 +198,5 @@ class Part(object):
         self.x = list(reversed(self.x))
         self.y = list(reversed(self.y))
         self.z = list(reversed(self.z))
+        if self._is_clockwise is not None:
+            self._is_clockwise = not self._is_clockwise
@@ -0,0 +1,858 @@
+"""Represents geometries as flat contiguous ragged array buffers.
+
+Contiguous ragged arrays (CRA) store the nodes of all geometries in flat
+coordinate arrays, with counts describing how nodes are grouped into parts and
+parts into geometries. This is the layout used by CF netCDF files, and it lets
+algorithms process every part of every geometry in one vectorized pass instead
+of looping over Part objects.
+"""
+
+import numpy as np
+
+from . geometry import Geometry
+from . part import Part
+
+
+def _range_index(starts, counts):
+    """Concatenates index ranges into a single index array.
+
+    Args:
+        starts (array-like(int)): First index of each range.
+        counts (array-like(int)): Count of indices in each range.
+
+    Returns:
+        numpy.ndarray(int): Indices of all ranges, e.g., starts of [5, 0] and
+        counts of [2, 3] yields [5, 6, 0, 1, 2].
+
+    """
+    starts = np.asarray(starts, dtype=np.int_)
+    counts = np.asarray(counts, dtype=np.int_)
+    total = counts.sum()
+    if not total:
+        return np.zeros(0, dtype=np.int_)
+    offsets = np.cumsum(counts) - counts
+    return np.arange(total) + np.repeat(starts - offsets, counts)
+
+
+def _trim_z(z):
+    """Returns z values, or None if there are no z values.
+
+    Args:
+        z (numpy.ndarray or None): Z coordinates, where NaN means no value.
+
+    Returns:
+        numpy.ndarray or None: The input, or None if all values are NaN.
+
+    """
+    if z is None or np.all(np.isnan(z)):
+        return None
+    return z
+
+
+def _offsets(counts):
+    """Returns offsets into a flat array given counts of items per group.
+
+    Args:
+        counts (array-like(int)): Count of items in each group.
+
+    Returns:
+        numpy.ndarray(int): Offsets, one longer than counts, where group i
+        spans offsets[i] to offsets[i + 1].
+
+    """
+    offsets = np.zeros(len(counts) + 1, dtype=np.int_)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def _as_coords(vals):
+    """Returns coordinate values as a float32 or float64 array.
+
+    Args:
+        vals (array-like(float)): Coordinate values.
+
+    Returns:
+        numpy.ndarray: The values, without a copy if already float32 or
+        float64, else converted to float64.
+
+    """
+    vals = np.asarray(vals)
+    if vals.dtype in (np.float32, np.float64):
+        return vals
+    return vals.astype(np.float64)
+
+
+def _affine(matrix, has_z):
+    """Builds a function applying an affine matrix to coordinates.
+
+    Args:
+        matrix (array-like(float)): Matrix of shape (2, 3) or (3, 3) for x
+            and y, or (3, 4) or (4, 4) for x, y, and z. A square matrix must
+            have a last row of zeros followed by a one.
+        has_z (bool): True if the function receives z coordinates.
+
+    Returns:
+        callable: Function taking x, y, and, if has_z, z arrays, and returning
+        a tuple of transformed arrays.
+
+    Raises:
+        ValueError: If the matrix shape is not supported, if the matrix is not
+            affine, or if the matrix transforms z and has_z is False.
+
+    """
+    matrix = np.asarray(matrix, dtype=np.float64)
+    if matrix.shape not in [(2, 3), (3, 3), (3, 4), (4, 4)]:
+        raise ValueError('Affine matrix must have shape (2, 3), (3, 3), '
+                         '(3, 4), or (4, 4)')
+    dims = matrix.shape[1] - 1
+    if matrix.shape[0] > dims:
+        expected = np.zeros(dims + 1)
+        expected[-1] = 1
+        if not np.array_equal(matrix[-1], expected):
+            raise ValueError('Matrix must be affine')
+    m = matrix[:dims]
+    if dims == 3 and not has_z:
+        raise ValueError('A three-dimensional matrix requires z values')
+
+    def apply(x, y, z=None):
+        coords = (x, y) if dims == 2 else (x, y, z)
+        result = []
+        for row in m:
+            value = np.full(len(x), row[-1])
+            # Skip zero terms so missing z values, stored as nan, do not
+            # leak into x and y
+            for coefficient, coord in zip(row, coords):
+                if coefficient != 0:
+                    value += coefficient * coord
+            result.append(value)
+        return result
+    return apply
+
+
+class RaggedArrays(object):
+    """Contains flat node and count buffers for a set of like geometries.
+
+    Attributes:
+        geom_type (str): Geometry type, either point, line, or polygon.
+        x (numpy.ndarray): X coordinates of all nodes, as float32 or float64.
+        y (numpy.ndarray): Y coordinates of all nodes, of the same type as x.
+        z (numpy.ndarray or None): Z coordinates of all nodes, or None if no
+            geometry has z values. Nodes without z values are NaN.
+        node_count (numpy.ndarray): Count of nodes in each geometry.
+        part_node_count (numpy.ndarray): Count of nodes in each geometry part.
+        is_hole (numpy.ndarray(bool)): True for each part that is a polygon
+            hole, False otherwise.
+
+    """
+
+    def __init__(self, geom_type, x, y, z=None, node_count=None,
+                 part_node_count=None, is_hole=None):
+        """Inits RaggedArrays with coordinates and counts.
+
+        Counts may be omitted as in CF netCDF files. If node_count is None,
+        each geometry has a single node. If part_node_count is None, each
+        multipoint node is its own part, and each line or polygon geometry has
+        a single part. If both are None, as for single points, count and
+        offset arrays are only built when first used, so the buffers hold
+        little more than the coordinate arrays.
+
+        Args:
+            geom_type (str): Geometry type, either point, line, or polygon.
+            x (array-like(float)): X coordinates of all nodes. Float32 and
+                float64 arrays are kept as is, other values are converted to
+                float64.
+            y (array-like(float)): Y coordinates of all nodes.
+            z (array-like(float), optional): Z coordinates of all nodes.
+            node_count (array-like(int), optional): Count of nodes in each
+                geometry.
+            part_node_count (array-like(int), optional): Count of nodes in
+                each geometry part.
+            is_hole (array-like(bool), optional): True for each part that is a
+                polygon hole. Defaults to False for all parts.
+
+        Raises:
+            ValueError: If geometry type is not point, line, or polygon; or if
+                array lengths are inconsistent, or if any count is not
+                positive, or if parts span more than one geometry.
+
+        """
+        geom_type = geom_type.lower()
+        if geom_type not in ['point', 'line', 'polygon']:
+            raise ValueError('geom_type must be point, line, or polygon')
+        x = _as_coords(x)
+        y = _as_coords(y)
+        if z is not None:
+            z = _as_coords(z)
+        if x.dtype != y.dtype or (z is not None and z.dtype != x.dtype):
+            x, y = x.astype(np.float64), y.astype(np.float64)
+            z = None if z is None else z.astype(np.float64)
+        if len(x) != len(y) or (z is not None and len(z) != len(x)):
+            raise ValueError('x, y, and z must contain the same number of items')
+        self.geom_type = geom_type
+        self.x = x
+        self.y = y
+        self.z = z
+        self._shares_coords = False
+        self._node_offsets = None
+        self._part_offsets = None
+        self._geom_part_offsets = None
+        self._single_node = node_count is None and part_node_count is None
+        if self._single_node:
+            # One node per geometry and part, so counts are trivially valid
+            self._node_count = None
+            self._part_node_count = None
+            self._is_hole = None
+            if is_hole is not None:
+                self.is_hole = is_hole
+                if len(self.is_hole) != len(x):
+                    raise ValueError('is_hole must contain one item per part')
+            return
+
+        if node_count is None:
+            node_count = np.ones(len(x), dtype=np.int_)
+        node_count = np.asarray(node_count, dtype=np.int_)
+        if part_node_count is None:
+            if geom_type == 'point':
+                part_node_count = np.ones(len(x), dtype=np.int_)
+            else:
+                part_node_count = node_count.copy()
+        part_node_count = np.asarray(part_node_count, dtype=np.int_)
+        if is_hole is None:
+            is_hole = np.zeros(len(part_node_count), dtype=bool)
+        is_hole = np.asarray(is_hole, dtype=bool)
+
+        if node_count.sum() != len(x) or part_node_count.sum() != len(x):
+            raise ValueError('Node counts must sum to the number of nodes')
+        if len(is_hole) != len(part_node_count):
+            raise ValueError('is_hole must contain one item per part')
+        if np.any(node_count < 1) or np.any(part_node_count < 1):
+            raise ValueError('Node counts must be positive')
+        self.node_count = node_count
+        self.part_node_count = part_node_count
+        self.is_hole = is_hole
+        part_offsets = self.part_offsets()
+        geom_part_offsets = self.geom_part_offsets()
+        if not np.array_equal(part_offsets[geom_part_offsets],
+                              self.node_offsets()):
+            raise ValueError('Geometry parts cannot span multiple geometries')
+
+
+    def __len__(self):
+        if self._single_node:
+            return len(self.x)
+        return len(self.node_count)
+
+
+    @property
+    def node_count(self):
+        """numpy.ndarray(int): Count of nodes in each geometry."""
+        if self._node_count is None:
+            self._node_count = np.ones(len(self.x), dtype=np.int_)
+        return self._node_count
+
+
+    @node_count.setter
+    def node_count(self, node_count):
+        self._node_count = np.asarray(node_count, dtype=np.int_)
+
+
+    @property
+    def part_node_count(self):
+        """numpy.ndarray(int): Count of nodes in each geometry part."""
+        if self._part_node_count is None:
+            self._part_node_count = np.ones(len(self.x), dtype=np.int_)
+        return self._part_node_count
+
+
+    @part_node_count.setter
+    def part_node_count(self, part_node_count):
+        self._part_node_count = np.asarray(part_node_count, dtype=np.int_)
+
+
+    @property
+    def is_hole(self):
+        """numpy.ndarray(bool): True for each part that is a polygon hole."""
+        if self._is_hole is None:
+            self._is_hole = np.zeros(len(self.part_node_count), dtype=bool)
+        return self._is_hole
+
+
+    @is_hole.setter
+    def is_hole(self, is_hole):
+        self._is_hole = np.asarray(is_hole, dtype=bool)
+
+
+    def _counts(self):
+        """Returns the count arrays to pass on to derived buffers.
+
+        Returns:
+            Tuple of node counts, part node counts, and hole flags, each None
+            if not built yet for single node buffers.
+
+        """
+        if self._single_node:
+            return None, None, self._is_hole
+        return self.node_count, self.part_node_count, self.is_hole
+
+
+    @classmethod
+    def from_geoms(cls, geom_type, geoms):
+        """Builds RaggedArrays from Geometry objects.
+
+        Args:
+            geom_type (str): Geometry type, either point, line, or polygon.
+            geoms (array-like(Geometry)): List of geometry objects.
+
+        Returns:
+            RaggedArrays: Buffers holding the nodes of all geometries.
+
+        """
+        x = []
+        y = []
+        z = []
+        has_z = False
+        node_count = []
+        part_node_count = []
+        is_hole = []
+        for geom in geoms:
+            node_counter = 0
+            for part in geom.parts:
+                count = len(part.x)
+                x.extend(part.x)
+                y.extend(part.y)
+                if len(part.z):
+                    has_z = True
+                    z.extend(part.z)
+                else:
+                    z.extend(count * [None])
+                is_hole.append(part.is_hole)
+                part_node_count.append(count)
+                node_counter += count
+            node_count.append(node_counter)
+        x = np.array(x, dtype=np.float64)
+        y = np.array(y, dtype=np.float64)
+        z = np.array(z, dtype=np.float64) if has_z else None  # None to nan
+        return cls(geom_type, x, y, z, node_count, part_node_count, is_hole)
+
+
+    def to_geoms(self):
+        """Builds Geometry objects from the buffers.
+
+        Returns:
+            list(Geometry): List of geometry objects.
+
+        """
+        part_offsets = self.part_offsets()
+        geom_part_offsets = self.geom_part_offsets()
+        x = self.x.tolist()
+        y = self.y.tolist()
+        if self.z is not None:
+            z = self.z.tolist()
+            part_has_z = self.part_has_z()
+        is_hole = self.is_hole.tolist()
+        geoms = []
+        for geom_idx in range(len(self)):
+            parts = []
+            for part_idx in range(geom_part_offsets[geom_idx],
+                                  geom_part_offsets[geom_idx + 1]):
+                start = part_offsets[part_idx]
+                end = part_offsets[part_idx + 1]
+                if self.z is not None and part_has_z[part_idx]:
+                    part_z = z[start:end]
+                else:
+                    part_z = None
+                parts.append(Part(x[start:end], y[start:end], part_z,
+                                  is_hole[part_idx]))
+            geoms.append(Geometry(self.geom_type, parts))
+        return geoms
+
+
+    def copy(self):
+        """Returns a copy of the buffers.
+
+        Returns:
+            RaggedArrays: Copy with its own coordinate and count arrays.
+
+        """
+        z = None if self.z is None else self.z.copy()
+        counts = [None if c is None else c.copy() for c in self._counts()]
+        return RaggedArrays(self.geom_type, self.x.copy(), self.y.copy(), z,
+                            *counts)
+
+
+    def equals(self, other):
+        """Determines if other buffers hold the same geometries.
+
+        Args:
+            other (RaggedArrays): Buffers to compare with.
+
+        Returns:
+            bool: True if both buffers hold the same geometry type, counts,
+            hole flags, and coordinates, False otherwise. Missing z values
+            compare equal to each other.
+
+        """
+        if (self.geom_type != other.geom_type or len(self) != len(other) or
+                len(self.x) != len(other.x)):
+            return False
+        if not (self._single_node and other._single_node):
+            if not (np.array_equal(self.node_count, other.node_count) and
+                    np.array_equal(self.part_node_count,
+                                   other.part_node_count)):
+                return False
+        z = self.z if self.has_z() else None
+        other_z = other.z if other.has_z() else None
+        if (z is None) != (other_z is None):
+            return False
+        return (np.array_equal(self.is_hole, other.is_hole) and
+                np.array_equal(self.x, other.x) and
+                np.array_equal(self.y, other.y) and
+                (z is None or np.array_equal(z, other_z, equal_nan=True)))
+
+
+    def _own_coords(self):
+        """Copies coordinate arrays shared with other buffers.
+
+        Called before coordinates are changed in place, so buffers holding
+        slices of the same arrays, such as clipping results, keep their
+        values.
+
+        """
+        if self._shares_coords:
+            self.x = self.x.copy()
+            self.y = self.y.copy()
+            self.z = None if self.z is None else self.z.copy()
+            self._shares_coords = False
+
+
+    def transform(self, func_or_matrix, inplace=False, chunk_size=None):
+        """Transforms the coordinates of all nodes.
+
+        Args:
+            func_or_matrix (callable or array-like(float)): Either a function
+                taking x and y arrays, plus a z array if the buffers have z
+                values, and returning transformed x and y arrays, plus an
+                optional z array; or an affine matrix. A matrix of shape
+                (2, 3) or (3, 3) transforms x and y, leaving z as is. A matrix
+                of shape (3, 4) or (4, 4) transforms x, y, and z.
+            inplace (bool, optional): True to overwrite the coordinate arrays,
+                False to write transformed coordinates to new arrays. Arrays
+                shared with other buffers are copied before being overwritten.
+            chunk_size (int, optional): Count of nodes transformed at once,
+                which bounds the memory used by temporary arrays. Defaults to
+                all nodes at once.
+
+        Returns:
+            RaggedArrays: These buffers if inplace is True. Otherwise, new
+            buffers sharing count arrays with these buffers.
+
+        Raises:
+            ValueError: If the matrix shape is not supported, if the matrix
+                is not affine, if a three-dimensional matrix is applied to
+                buffers without z values, or if chunk_size is not positive.
+
+        """
+        if callable(func_or_matrix):
+            func = func_or_matrix
+        else:
+            func = _affine(func_or_matrix, self.z is not None)
+        if chunk_size is None:
+            chunk_size = max(len(self.x), 1)
+        if chunk_size < 1:
+            raise ValueError('chunk_size must be positive')
+
+        if inplace:
+            self._own_coords()
+            x, y, z = self.x, self.y, self.z
+        else:
+            x = np.empty_like(self.x)
+            y = np.empty_like(self.y)
+            z = None if self.z is None else np.empty_like(self.z)
+        for start in range(0, len(self.x), chunk_size):
+            nodes = slice(start, start + chunk_size)
+            if self.z is None:
+                result = func(self.x[nodes], self.y[nodes])
+            else:
+                result = func(self.x[nodes], self.y[nodes], self.z[nodes])
+            x[nodes] = result[0]
+            y[nodes] = result[1]
+            if z is not None:
+                z[nodes] = result[2] if len(result) > 2 else self.z[nodes]
+        if inplace:
+            return self
+        ragged = RaggedArrays(self.geom_type, x, y, z, *self._counts())
+        ragged._node_offsets = self._node_offsets
+        ragged._part_offsets = self._part_offsets
+        ragged._geom_part_offsets = self._geom_part_offsets
+        return ragged
+
+
+    def astype(self, coord_dtype):
+        """Returns the buffers with coordinates of another data type.
+
+        Float32 coordinates halve the memory used by the coordinate arrays,
+        at the cost of about seven significant digits of precision. Counts
+        are not affected.
+
+        Args:
+            coord_dtype (numpy.dtype): Coordinate data type, either float32
+                or float64.
+
+        Returns:
+            RaggedArrays: These buffers if coordinates already have that type.
+            Otherwise, new buffers sharing count arrays with these buffers.
+
+        Raises:
+            ValueError: If coord_dtype is not float32 or float64.
+
+        """
+        coord_dtype = np.dtype(coord_dtype)
+        if coord_dtype not in (np.float32, np.float64):
+            raise ValueError('Coordinates must be float32 or float64')
+        if self.x.dtype == coord_dtype:
+            return self
+        z = None if self.z is None else self.z.astype(coord_dtype)
+        ragged = RaggedArrays(self.geom_type, self.x.astype(coord_dtype),
+                              self.y.astype(coord_dtype), z, *self._counts())
+        ragged._node_offsets = self._node_offsets
+        ragged._part_offsets = self._part_offsets
+        ragged._geom_part_offsets = self._geom_part_offsets
+        return ragged
+
+
+    def node_offsets(self):
+        """Returns offsets of the first node of each geometry.
+
+        Returns:
+            numpy.ndarray(int): Offsets, one longer than the geometry count,
+            where geometry i spans nodes offsets[i] to offsets[i + 1].
+
+        """
+        if self._node_offsets is None:
+            if self._single_node:
+                self._node_offsets = np.arange(len(self.x) + 1)
+            else:
+                self._node_offsets = _offsets(self.node_count)
+        return self._node_offsets
+
+
+    def part_offsets(self):
+        """Returns offsets of the first node of each part.
+
+        Returns:
+            numpy.ndarray(int): Offsets, one longer than the part count, where
+            part i spans nodes offsets[i] to offsets[i + 1].
+
+        """
+        if self._part_offsets is None:
+            if self._single_node:
+                self._part_offsets = self.node_offsets()
+            else:
+                self._part_offsets = _offsets(self.part_node_count)
+        return self._part_offsets
+
+
+    def geom_part_offsets(self):
+        """Returns offsets of the first part of each geometry.
+
+        Returns:
+            numpy.ndarray(int): Offsets, one longer than the geometry count,
+            where geometry i spans parts offsets[i] to offsets[i + 1].
+
+        """
+        if self._geom_part_offsets is None:
+            if self._single_node:
+                self._geom_part_offsets = self.node_offsets()
+            else:
+                self._geom_part_offsets = np.searchsorted(
+                    self.part_offsets(), self.node_offsets())
+        return self._geom_part_offsets
+
+
+    def geom_part_count(self):
+        """Returns the count of parts in each geometry.
+
+        Returns:
+            numpy.ndarray(int): Count of parts in each geometry.
+
+        """
+        return np.diff(self.geom_part_offsets())
+
+
+    def part_geom_index(self):
+        """Returns the index of the geometry owning each part.
+
+        Returns:
+            numpy.ndarray(int): Geometry index for each part.
+
+        """
+        return np.repeat(np.arange(len(self)), self.geom_part_count())
+
+
+    def node_part_index(self):
+        """Returns the index of the part owning each node.
+
+        Returns:
+            numpy.ndarray(int): Part index for each node.
+
+        """
+        return np.repeat(np.arange(len(self.part_node_count)),
+                         self.part_node_count)
+
+
+    def next_node_index(self):
+        """Returns the index of the node following each node in its part.
+
+        The last node of each part wraps around to the first node, as in a
+        ring.
+
+        Returns:
+            numpy.ndarray(int): Index of the following node.
+
+        """
+        part_offsets = self.part_offsets()
+        following = np.arange(1, len(self.x) + 1)
+        following[part_offsets[1:] - 1] = part_offsets[:-1]
+        return following
+
+
+    def node_geom_index(self):
+        """Returns the index of the geometry owning each node.
+
+        Returns:
+            numpy.ndarray(int): Geometry index for each node.
+
+        """
+        return np.repeat(np.arange(len(self)), self.node_count)
+
+
+    def part_has_z(self):
+        """Determines which parts have z values.
+
+        Returns:
+            numpy.ndarray(bool): True for each part with at least one non-NaN
+            z value, False otherwise.
+
+        """
+        if self.z is None:
+            return np.zeros(len(self.part_node_count), dtype=bool)
+        has_value = (~np.isnan(self.z)).astype(np.int_)
+        return np.add.reduceat(has_value, self.part_offsets()[:-1]) > 0
+
+
+    def has_hole(self):
+        """Determines if any geometries have polygon holes.
+
+        Returns:
+            bool: True if holes are found, False otherwise.
+
+        """
+        if self._single_node and self._is_hole is None:
+            return False
+        return bool(self.is_hole.any())
+
+
+    def is_multipart(self):
+        """Determines if any geometries have multiple parts.
+
+        Returns:
+            bool: True if multipart geometries were found, False otherwise.
+
+        """
+        if not len(self) or self._single_node:
+            return False
+        not_holes = (~self.is_hole).astype(np.int_)
+        counts = np.add.reduceat(not_holes, self.geom_part_offsets()[:-1])
+        return bool(np.any(counts > 1))
+
+
+    def has_z(self):
+        """Determines if any geometries have z values.
+
+        Returns:
+            bool: True if z values were found, False otherwise.
+
+        """
+        return self.z is not None and bool(np.any(~np.isnan(self.z)))
+
+
+    def centroids(self):
+        """Computes the mean node location of each geometry.
+
+        Returns:
+            Tuple of numpy.ndarray(float) with the mean x and mean y of the
+            nodes of each geometry.
+
+        """
+        if not len(self.x):
+            return np.zeros(0), np.zeros(0)
+        starts = self.node_offsets()[:-1]
+        mean_x = np.add.reduceat(self.x, starts) / self.node_count
+        mean_y = np.add.reduceat(self.y, starts) / self.node_count
+        return mean_x, mean_y
+
+
+    def bounds(self):
+        """Computes the bounding box of each geometry.
+
+        Returns:
+            numpy.ndarray(float): Array with one row per geometry and columns
+            for minimum x, minimum y, maximum x, and maximum y.
+
+        """
+        if not len(self.x):
+            return np.zeros((0, 4))
+        starts = self.node_offsets()[:-1]
+        return np.column_stack((np.minimum.reduceat(self.x, starts),
+                                np.minimum.reduceat(self.y, starts),
+                                np.maximum.reduceat(self.x, starts),
+                                np.maximum.reduceat(self.y, starts)))
+
+
+    def is_closed(self):
+        """Determines which parts end on the same node they start on.
+
+        Returns:
+            numpy.ndarray(bool): True for each part with more than one node
+            whose first and last nodes are identical, False otherwise.
+
+        """
+        first = self.part_offsets()[:-1]
+        last = self.part_offsets()[1:] - 1
+        closed = ((self.part_node_count > 1) &
+                  (self.x[first] == self.x[last]) &
+                  (self.y[first] == self.y[last]))
+        if self.z is not None:
+            z_first = self.z[first]
+            z_last = self.z[last]
+            closed &= ((z_first == z_last) |
+                       (np.isnan(z_first) & np.isnan(z_last)))
+        return closed
+
+
+    def part_areas(self, absolute=True):
+        """Computes the area of every part with the shoelace method.
+
+        If nodes are oriented in a clockwise fashion, the signed area is
+        positive; otherwise, the area is negative. Parts with less than three
+        nodes have an area of zero.
+
+        Args:
+            absolute (bool, optional): True if absolute values should be
+                returned; False if negative values are allowed.
+
+        Returns:
+            numpy.ndarray(float): Area of each part.
+
+        """
+        if not len(self.x):
+            return np.zeros(0)
+        starts = self.part_offsets()[:-1]
+        following = self.next_node_index()
+        cross = (self.x[following] * self.y - self.x * self.y[following])
+        areas = np.add.reduceat(cross, starts) / 2.0
+        areas[self.part_node_count < 3] = 0.0
+        return np.abs(areas) if absolute else areas
+
+
+    def is_clockwise(self):
+        """Determines which parts have nodes oriented clockwise.
+
+        Returns:
+            numpy.ndarray(bool): True for each part with nodes oriented
+            clockwise, False otherwise.
+
+        """
+        return self.part_areas(absolute=False) > 0
+
+
+    def orient(self, holes_clockwise=True):
+        """Orients polygon exterior and interior rings consistently, in-place.
+
+        Args:
+            holes_clockwise (bool, optional): True if nodes comprising holes
+                should be oriented clockwise while exterior rings are oriented
+                anticlockwise, False if holes should be oriented anticlockwise
+                while exterior rings are oriented clockwise.
+
+        Raises:
+            NotImplementedError: If geometry type is not polygon.
+
+        """
+        if self.geom_type != 'polygon':
+            raise NotImplementedError('Only polygons can be oriented')
+        should_be_clockwise = self.is_hole == holes_clockwise
+        flip = self.is_clockwise() != should_be_clockwise
+        if not flip.any():
+            return
+        starts = self.part_offsets()[:-1][flip]
+        counts = self.part_node_count[flip]
+        nodes = _range_index(starts, counts)
+        reversed_nodes = (np.repeat(2 * starts + counts - 1, counts) - nodes)
+        self._own_coords()
+        self.x[nodes] = self.x[reversed_nodes]
+        self.y[nodes] = self.y[reversed_nodes]
+        if self.z is not None:
+            self.z[nodes] = self.z[reversed_nodes]
+
+
+    def take(self, indices):
+        """Selects geometries by index.
+
+        Args:
+            indices (array-like(int)): Indices of geometries to select, in the
+                order they should appear in the result.
+
+        Returns:
+            RaggedArrays: New buffers holding copies of the selected
+            geometries.
+
+        """
+        indices = np.asarray(indices, dtype=np.int_)
+        if self._single_node:
+            z = None if self.z is None else _trim_z(self.z[indices])
+            is_hole = None if self._is_hole is None else \
+                self._is_hole[indices]
+            return RaggedArrays(self.geom_type, self.x[indices],
+                                self.y[indices], z, is_hole=is_hole)
+        node_offsets = self.node_offsets()
+        geom_part_offsets = self.geom_part_offsets()
+        nodes = _range_index(node_offsets[indices], self.node_count[indices])
+        parts = _range_index(geom_part_offsets[indices],
+                             np.diff(geom_part_offsets)[indices])
+        z = None if self.z is None else _trim_z(self.z[nodes])
+        return RaggedArrays(self.geom_type, self.x[nodes], self.y[nodes], z,
+                            self.node_count[indices],
+                            self.part_node_count[parts], self.is_hole[parts])
+
+
+    def select_nodes(self, mask):
+        """Selects nodes, recomputing counts for parts and geometries.
+
+        Parts left without nodes are dropped.
+
+        Args:
+            mask (array-like(bool)): True for each node to keep.
+
+        Returns:
+            RaggedArrays: New buffers holding the selected nodes.
+
+        Raises:
+            ValueError: If a geometry would be left without nodes.
+
+        """
+        mask = np.asarray(mask, dtype=bool)
+        as_int = mask.astype(np.int_)
+        if len(mask):
+            part_node_count = np.add.reduceat(as_int, self.part_offsets()[:-1])
+            node_count = np.add.reduceat(as_int, self.node_offsets()[:-1])
+        else:
+            part_node_count = self.part_node_count.copy()
+            node_count = self.node_count.copy()
+        if np.any(node_count == 0):
+            raise ValueError('Geometries must retain at least one node')
+        keep_part = part_node_count > 0
+        z = None if self.z is None else _trim_z(self.z[mask])
+        return RaggedArrays(self.geom_type, self.x[mask], self.y[mask], z,
+                            node_count, part_node_count[keep_part],
+                            self.is_hole[keep_part])
@@ -0,0 +1,267 @@
+"""Simplifies geometries held in contiguous ragged array buffers.
+
+Both algorithms process every part of every geometry in batch. Douglas-Peucker
+splits all open segments at once on each pass, so the number of passes grows
+with the depth of the recursion rather than with the number of parts.
+Visvalingam-Whyatt removes, on each pass, every node whose effective area is
+below the tolerance and smaller than that of its neighbors.
+"""
+
+import numpy as np
+
+from . ragged import _range_index
+
+
+_methods = ('douglas-peucker', 'visvalingam')
+"""tuple: Supported simplification methods."""
+
+
+def _group_argmax(vals, group_offsets):
+    """Finds the position of the largest value within each group.
+
+    Args:
+        vals (numpy.ndarray(float)): Values for all groups, concatenated.
+        group_offsets (numpy.ndarray(int)): Offsets of each group within vals,
+            one longer than the group count. Groups must not be empty.
+
+    Returns:
+        Tuple of numpy arrays with the largest value in each group and the
+        position of its first occurrence within vals.
+
+    """
+    counts = np.diff(group_offsets)
+    group_max = np.maximum.reduceat(vals, group_offsets[:-1])
+    group = np.repeat(np.arange(len(counts)), counts)
+    positions = np.flatnonzero(vals == group_max[group])
+    _, first = np.unique(group[positions], return_index=True)
+    return group_max, positions[first]
+
+
+def _segment_distance(px, py, ax, ay, bx, by):
+    """Computes distances from points to line segments.
+
+    Args:
+        px, py (numpy.ndarray(float)): Point coordinates.
+        ax, ay (numpy.ndarray(float)): Coordinates of segment start nodes.
+        bx, by (numpy.ndarray(float)): Coordinates of segment end nodes.
+
+    Returns:
+        numpy.ndarray(float): Distance from each point to its segment.
+
+    """
+    dx = bx - ax
+    dy = by - ay
+    length_sq = dx * dx + dy * dy
+    with np.errstate(invalid='ignore', divide='ignore'):
+        t = ((px - ax) * dx + (py - ay) * dy) / length_sq
+    t = np.where(length_sq > 0, np.clip(t, 0, 1), 0)
+    return np.hypot(px - (ax + t * dx), py - (ay + t * dy))
+
+
+def _min_nodes(ragged):
+    """Returns the minimum count of nodes each part must retain.
+
+    Args:
+        ragged (RaggedArrays): Geometry buffers.
+
+    Returns:
+        numpy.ndarray(int): Minimum node count for each part. Polygon rings
+        keep three distinct nodes, plus the closing node if the ring is closed.
+
+    """
+    if ragged.geom_type == 'polygon':
+        return 3 + ragged.is_closed().astype(np.int_)
+    return np.full(len(ragged.part_node_count), 2, dtype=np.int_)
+
+
+def _douglas_peucker(ragged, tolerance):
+    """Flags nodes retained by Douglas-Peucker simplification.
+
+    Args:
+        ragged (RaggedArrays): Line or polygon buffers.
+        tolerance (float): Maximum distance between a removed node and the
+            simplified part.
+
+    Returns:
+        numpy.ndarray(bool): True for each node to keep.
+
+    """
+    x = ragged.x
+    y = ragged.y
+    keep = np.zeros(len(x), dtype=bool)
+    starts = ragged.part_offsets()[:-1]
+    ends = ragged.part_offsets()[1:] - 1
+    keep[starts] = True
+    keep[ends] = True
+
+    seg_start = starts
+    seg_end = ends
+    is_ring = ragged.geom_type == 'polygon'
+    if is_ring:
+        # Split rings at the node farthest from the first node, so closed
+        # rings do not start with a degenerate segment
+        node_start = np.repeat(starts, ragged.part_node_count)
+        dist = np.hypot(x - x[node_start], y - y[node_start])
+        _, far = _group_argmax(dist, ragged.part_offsets())
+        keep[far] = True
+        seg_start = np.concatenate((starts, far))
+        seg_end = np.concatenate((far, ends))
+
+    while len(seg_start):
+        interior = seg_end - seg_start - 1
+        has_interior = interior > 0
+        seg_start = seg_start[has_interior]
+        seg_end = seg_end[has_interior]
+        interior = interior[has_interior]
+        if not len(seg_start):
+            break
+        nodes = _range_index(seg_start + 1, interior)
+        seg = np.repeat(np.arange(len(seg_start)), interior)
+        dist = _segment_distance(
+            x[nodes], y[nodes], x[seg_start][seg], y[seg_start][seg],
+            x[seg_end][seg], y[seg_end][seg])
+        dmax, pos = _group_argmax(dist, np.concatenate(([0],
+                                                        np.cumsum(interior))))
+        split = dmax > tolerance
+        split_node = nodes[pos[split]]
+        keep[split_node] = True
+        seg_start, seg_end = (
+            np.concatenate((seg_start[split], split_node)),
+            np.concatenate((split_node, seg_end[split])))
+
+    if is_ring:
+        keep = _restore_rings(ragged, keep, far)
+    return keep
+
+
+def _restore_rings(ragged, keep, far):
+    """Ensures simplified polygon rings keep at least three distinct nodes.
+
+    For each ring left with too few nodes, the node farthest from the line
+    through the first node and the node flagged in far is restored. Rings
+    which still have too few nodes are kept unsimplified.
+
+    Args:
+        ragged (RaggedArrays): Polygon buffers.
+        keep (numpy.ndarray(bool)): True for each node to keep.
+        far (numpy.ndarray(int)): Node index of a retained node in each ring,
+            other than its first and last nodes.
+
+    Returns:
+        numpy.ndarray(bool): Updated flags for nodes to keep.
+
+    """
+    part_offsets = ragged.part_offsets()
+    min_nodes = _min_nodes(ragged)
+    kept = np.add.reduceat(keep.astype(np.int_), part_offsets[:-1])
+    short = (kept < min_nodes) & (ragged.part_node_count >= min_nodes)
+    if not short.any():
+        return keep
+    starts = part_offsets[:-1][short]
+    counts = ragged.part_node_count[short]
+    nodes = _range_index(starts, counts)
+    first = np.repeat(starts, counts)
+    other = np.repeat(far[short], counts)
+    x = ragged.x
+    y = ragged.y
+    # Twice the triangle area is proportional to distance from the line
+    area = np.abs((x[other] - x[first]) * (y[nodes] - y[first]) -
+                  (x[nodes] - x[first]) * (y[other] - y[first]))
+    _, pos = _group_argmax(area, np.concatenate(([0], np.cumsum(counts))))
+    keep[nodes[pos]] = True
+
+    kept = np.add.reduceat(keep.astype(np.int_), part_offsets[:-1])
+    still_short = (kept < min_nodes) & short
+    if still_short.any():
+        keep[_range_index(part_offsets[:-1][still_short],
+                          ragged.part_node_count[still_short])] = True
+    return keep
+
+
+def _visvalingam(ragged, tolerance):
+    """Flags nodes retained by Visvalingam-Whyatt simplification.
+
+    Args:
+        ragged (RaggedArrays): Line or polygon buffers.
+        tolerance (float): Minimum effective area of a retained node.
+
+    Returns:
+        numpy.ndarray(bool): True for each node to keep.
+
+    """
+    x = ragged.x
+    y = ragged.y
+    keep = np.ones(len(x), dtype=bool)
+    node_part = ragged.node_part_index()
+    min_nodes = _min_nodes(ragged)
+    while True:
+        nodes = np.flatnonzero(keep)
+        part = node_part[nodes]
+        first = np.ones(len(nodes), dtype=bool)
+        first[1:] = part[1:] != part[:-1]
+        last = np.ones(len(nodes), dtype=bool)
+        last[:-1] = first[1:]
+        interior = ~first & ~last
+        prev = np.roll(nodes, 1)
+        following = np.roll(nodes, -1)
+        area = np.full(len(nodes), np.inf)
+        area[interior] = 0.5 * np.abs(
+            (x[prev] - x[nodes]) * (y[following] - y[nodes]) -
+            (x[following] - x[nodes]) * (y[prev] - y[nodes]))[interior]
+
+        # Only local minima are removed on a pass, so no two neighbors are
+        # removed together and each removal sees its final neighbors
+        candidate = area < tolerance
+        candidate[1:] &= area[1:] <= area[:-1]
+        candidate[:-1] &= area[:-1] < area[1:]
+        if not candidate.any():
+            break
+
+        # Remove the smallest areas first, up to the count each part can lose
+        remaining = np.bincount(part, minlength=len(min_nodes))
+        allowed = remaining - min_nodes
+        cand = np.flatnonzero(candidate)
+        order = np.lexsort((area[cand], part[cand]))
+        cand = cand[order]
+        cand_part = part[cand]
+        group_start = np.searchsorted(cand_part, cand_part)
+        rank = np.arange(len(cand)) - group_start
+        cand = cand[rank < allowed[cand_part]]
+        if not len(cand):
+            break
+        keep[nodes[cand]] = False
+    return keep
+
+
+def simplify(ragged, tolerance, method='douglas-peucker'):
+    """Simplifies all geometries held in contiguous ragged array buffers.
+
+    Args:
+        ragged (RaggedArrays): Geometry buffers.
+        tolerance (float): For the douglas-peucker method, the maximum distance
+            between a removed node and the simplified part. For the
+            visvalingam method, the minimum area of the triangle formed by a
+            retained node and its neighbors.
+        method (str, optional): Either douglas-peucker or visvalingam.
+
+    Returns:
+        RaggedArrays: New buffers with simplified geometries. Points are
+        returned unchanged.
+
+    Raises:
+        ValueError: If the method is not recognized or tolerance is negative.
+
+    """
+    method = method.lower()
+    if method not in _methods:
+        raise ValueError('method must be one of: {0}'.format(
+            ', '.join(_methods)))
+    if tolerance < 0:
+        raise ValueError('tolerance cannot be negative')
+    if ragged.geom_type == 'point':
+        return ragged.copy()
+    if method == 'douglas-peucker':
+        keep = _douglas_peucker(ragged, tolerance)
+    else:
+        keep = _visvalingam(ragged, tolerance)
+    return ragged.select_nodes(keep)
@@ -0,0 +1,511 @@
+"""Orders and indexes geometries by location.
+
+Space-filling curves map two-dimensional locations to one-dimensional keys so
+that sorting by key keeps nearby geometries near each other in the flat
+ragged arrays, and therefore in the chunks of a netCDF file.
+
+A grid index of bounding boxes narrows spatial queries to candidate
+geometries, which are then tested in batch over the flat ragged arrays.
+"""
+
+import numpy as np
+
+from . ragged import _offsets, _range_index
+
+
+_curves = ('hilbert', 'morton')
+"""tuple: Supported space-filling curves."""
+
+
+def _quantize(vals, vmin, vmax, order):
+    """Scales values onto an integer grid with 2**order cells per side.
+
+    Args:
+        vals (numpy.ndarray(float)): Values to scale.
+        vmin (float): Value mapped to the first cell.
+        vmax (float): Value mapped to the last cell.
+        order (int): Bits per dimension.
+
+    Returns:
+        numpy.ndarray(uint64): Cell index of each value.
+
+    """
+    cells = 2 ** order - 1
+    span = vmax - vmin
+    if span > 0:
+        scaled = (vals - vmin) / span * cells
+    else:
+        scaled = np.zeros(len(vals))
+    return np.clip(np.round(scaled), 0, cells).astype(np.uint64)
+
+
+def _quantize_xy(x, y, bounds, order):
+    """Scales locations onto an integer grid with 2**order cells per side.
+
+    Args:
+        x (array-like(float)): X coordinates.
+        y (array-like(float)): Y coordinates.
+        bounds (tuple(float) or None): Extent as (xmin, ymin, xmax, ymax).
+            Defaults to the extent of the coordinates.
+        order (int): Bits per dimension.
+
+    Returns:
+        Tuple of numpy.ndarray(uint64) with the cell column and row of each
+        location.
+
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if bounds is None:
+        if not len(x):
+            bounds = (0, 0, 0, 0)
+        else:
+            bounds = (np.nanmin(x), np.nanmin(y), np.nanmax(x), np.nanmax(y))
+    xmin, ymin, xmax, ymax = bounds
+    return (_quantize(x, xmin, xmax, order), _quantize(y, ymin, ymax, order))
+
+
+def _spread_bits(vals):
+    """Inserts a zero bit above each of the lower 32 bits of each value.
+
+    Args:
+        vals (numpy.ndarray(uint64)): Values of at most 32 bits.
+
+    Returns:
+        numpy.ndarray(uint64): Values with bits at even positions.
+
+    """
+    vals = vals & np.uint64(0x00000000FFFFFFFF)
+    for shift, mask in ((16, 0x0000FFFF0000FFFF), (8, 0x00FF00FF00FF00FF),
+                        (4, 0x0F0F0F0F0F0F0F0F), (2, 0x3333333333333333),
+                        (1, 0x5555555555555555)):
+        vals = (vals | (vals << np.uint64(shift))) & np.uint64(mask)
+    return vals
+
+
+def morton_keys(x, y, bounds=None, order=16):
+    """Computes Morton (Z-order) curve keys for locations.
+
+    Args:
+        x (array-like(float)): X coordinates.
+        y (array-like(float)): Y coordinates.
+        bounds (tuple(float), optional): Extent as (xmin, ymin, xmax, ymax).
+            Defaults to the extent of the coordinates.
+        order (int, optional): Bits per dimension, at most 32.
+
+    Returns:
+        numpy.ndarray(uint64): Key of each location.
+
+    """
+    qx, qy = _quantize_xy(x, y, bounds, order)
+    return _spread_bits(qx) | (_spread_bits(qy) << np.uint64(1))
+
+
+def hilbert_keys(x, y, bounds=None, order=16):
+    """Computes Hilbert curve keys for locations.
+
+    Args:
+        x (array-like(float)): X coordinates.
+        y (array-like(float)): Y coordinates.
+        bounds (tuple(float), optional): Extent as (xmin, ymin, xmax, ymax).
+            Defaults to the extent of the coordinates.
+        order (int, optional): Bits per dimension, at most 31.
+
+    Returns:
+        numpy.ndarray(uint64): Key of each location.
+
+    """
+    qx, qy = _quantize_xy(x, y, bounds, order)
+    n = np.uint64(2 ** order)
+    keys = np.zeros(len(qx), dtype=np.uint64)
+    s = 2 ** (order - 1)
+    while s > 0:
+        s64 = np.uint64(s)
+        rx = (qx & s64) > 0
+        ry = (qy & s64) > 0
+        quadrant = (3 * rx.astype(np.uint64)) ^ ry.astype(np.uint64)
+        keys += s64 * s64 * quadrant
+        # Rotate the quadrant so the curve stays continuous
+        flip = rx & ~ry
+        qx = np.where(flip, n - np.uint64(1) - qx, qx)
+        qy = np.where(flip, n - np.uint64(1) - qy, qy)
+        swap = ~ry
+        qx, qy = np.where(swap, qy, qx), np.where(swap, qx, qy)
+        s //= 2
+    return keys
+
+
+def spatial_order(ragged, curve='hilbert'):
+    """Finds the order of geometries along a space-filling curve.
+
+    Geometries are located by the mean of their nodes.
+
+    Args:
+        ragged (RaggedArrays): Geometry buffers.
+        curve (str, optional): Space-filling curve, either hilbert or morton.
+
+    Returns:
+        numpy.ndarray(int): Indices that sort the geometries along the curve.
+
+    Raises:
+        ValueError: If the curve is not recognized.
+
+    """
+    curve = curve.lower()
+    if curve not in _curves:
+        raise ValueError('curve must be one of: {0}'.format(
+            ', '.join(_curves)))
+    x, y = ragged.centroids()
+    if curve == 'hilbert':
+        keys = hilbert_keys(x, y)
+    else:
+        keys = morton_keys(x, y)
+    return np.argsort(keys, kind='stable')
+
+
+class GridIndex(object):
+    """Indexes bounding boxes by the cells of a regular grid they overlap.
+
+    Attributes:
+        bounds (numpy.ndarray(float)): Bounding box of each item, with columns
+            for minimum x, minimum y, maximum x, and maximum y.
+        extent (tuple(float)): Minimum x, minimum y, maximum x, and maximum y
+            of all items.
+        shape (tuple(int)): Count of grid cells along x and along y.
+
+    """
+
+    def __init__(self, bounds, shape=None):
+        """Inits GridIndex with item bounding boxes.
+
+        Args:
+            bounds (array-like(float)): Bounding box of each item, with columns
+                for minimum x, minimum y, maximum x, and maximum y.
+            shape (tuple(int), optional): Count of grid cells along x and
+                along y. By default, the grid has about one cell per item.
+
+        Raises:
+            ValueError: If no bounding boxes are provided.
+
+        """
+        self.bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        if not len(self.bounds):
+            raise ValueError('At least one bounding box must be provided')
+        self.extent = (self.bounds[:, 0].min(), self.bounds[:, 1].min(),
+                       self.bounds[:, 2].max(), self.bounds[:, 3].max())
+        if shape is None:
+            side = max(1, int(np.ceil(np.sqrt(len(self.bounds)))))
+            shape = (side, side)
+        self.shape = tuple(int(n) for n in shape)
+
+        item, cells = self._covered_cells(self.bounds)
+        order = np.argsort(cells, kind='stable')
+        self._items = item[order]
+        self._cell_offsets = _offsets(
+            np.bincount(cells, minlength=self.shape[0] * self.shape[1]))
+
+
+    def _cell_xy(self, x, y):
+        """Finds the grid column and row containing each location.
+
+        Locations outside the extent are clipped to the nearest cell.
+
+        Args:
+            x (numpy.ndarray(float)): X coordinates.
+            y (numpy.ndarray(float)): Y coordinates.
+
+        Returns:
+            Tuple of numpy.ndarray(int) with the column and row of each
+            location.
+
+        """
+        xmin, ymin, xmax, ymax = self.extent
+        nx, ny = self.shape
+        # Degenerate extents collapse to a single row or column
+        dx = (xmax - xmin) / nx or 1.0
+        dy = (ymax - ymin) / ny or 1.0
+        ix = np.clip(np.floor((x - xmin) / dx), 0, nx - 1).astype(np.int_)
+        iy = np.clip(np.floor((y - ymin) / dy), 0, ny - 1).astype(np.int_)
+        return ix, iy
+
+
+    def _covered_cells(self, bounds):
+        """Lists the grid cells overlapped by each box.
+
+        Args:
+            bounds (numpy.ndarray(float)): Boxes, with columns for minimum x,
+                minimum y, maximum x, and maximum y.
+
+        Returns:
+            Tuple of numpy.ndarray(int) with the box index and cell index of
+            each overlap, ordered by box.
+
+        """
+        ix0, iy0 = self._cell_xy(bounds[:, 0], bounds[:, 1])
+        ix1, iy1 = self._cell_xy(bounds[:, 2], bounds[:, 3])
+        width = ix1 - ix0 + 1
+        counts = width * (iy1 - iy0 + 1)
+        box = np.repeat(np.arange(len(bounds)), counts)
+        step = np.arange(counts.sum()) - np.repeat(_offsets(counts)[:-1],
+                                                   counts)
+        cells = ((iy0[box] + step // width[box]) * self.shape[0] +
+                 ix0[box] + step % width[box])
+        return box, cells
+
+
+    def query_points(self, x, y):
+        """Finds the items whose bounding box contains each point.
+
+        Args:
+            x (array-like(float)): X coordinates of the points.
+            y (array-like(float)): Y coordinates of the points.
+
+        Returns:
+            Tuple of numpy.ndarray(int) with the point index and item index of
+            each match, ordered by point and then by item.
+
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        xmin, ymin, xmax, ymax = self.extent
+        within = np.flatnonzero((x >= xmin) & (x <= xmax) &
+                                (y >= ymin) & (y <= ymax))
+        ix, iy = self._cell_xy(x[within], y[within])
+        cells = iy * self.shape[0] + ix
+        starts = self._cell_offsets[cells]
+        counts = self._cell_offsets[cells + 1] - starts
+        point = np.repeat(within, counts)
+        item = self._items[_range_index(starts, counts)]
+        box = self.bounds[item]
+        hit = ((x[point] >= box[:, 0]) & (x[point] <= box[:, 2]) &
+               (y[point] >= box[:, 1]) & (y[point] <= box[:, 3]))
+        return point[hit], item[hit]
+
+
+    def query_boxes(self, bounds):
+        """Finds the items whose bounding box intersects each query box.
+
+        Args:
+            bounds (array-like(float)): Query boxes, with columns for minimum
+                x, minimum y, maximum x, and maximum y.
+
+        Returns:
+            Tuple of numpy.ndarray(int) with the query box index and item
+            index of each match, ordered by query box and then by item.
+
+        """
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        xmin, ymin, xmax, ymax = self.extent
+        within = np.flatnonzero((bounds[:, 2] >= xmin) &
+                                (bounds[:, 0] <= xmax) &
+                                (bounds[:, 3] >= ymin) &
+                                (bounds[:, 1] <= ymax))
+        local, cells = self._covered_cells(bounds[within])
+        box = within[local]
+        starts = self._cell_offsets[cells]
+        item_counts = self._cell_offsets[cells + 1] - starts
+        box = np.repeat(box, item_counts)
+        item = self._items[_range_index(starts, item_counts)]
+        # Items spanning several cells are found once per cell
+        key = np.unique(box * len(self.bounds) + item)
+        box = key // len(self.bounds)
+        item = key % len(self.bounds)
+        a = bounds[box]
+        b = self.bounds[item]
+        hit = ((a[:, 2] >= b[:, 0]) & (a[:, 0] <= b[:, 2]) &
+               (a[:, 3] >= b[:, 1]) & (a[:, 1] <= b[:, 3]))
+        return box[hit], item[hit]
+
+
+class PolygonIndex(object):
+    """Indexes polygon geometries for point in polygon tests.
+
+    Bounding boxes of the geometries are held in a GridIndex. The ring edges
+    of each geometry are also sorted into horizontal bands, so a point is only
+    tested against the edges spanning its y coordinate.
+
+    Attributes:
+        ragged (RaggedArrays): Polygon buffers.
+        grid (GridIndex): Index of geometry bounding boxes.
+
+    """
+
+    def __init__(self, ragged):
+        """Inits PolygonIndex with polygon buffers.
+
+        Args:
+            ragged (RaggedArrays): Polygon buffers.
+
+        Raises:
+            ValueError: If the buffers do not hold polygons.
+
+        """
+        if ragged.geom_type != 'polygon':
+            raise ValueError('Points can only be located within polygons')
+        self.ragged = ragged
+        bounds = ragged.bounds()
+        self.grid = GridIndex(bounds)
+
+        # About the square root of the node count of each geometry in bands
+        self._band_count = np.ceil(np.sqrt(ragged.node_count)).astype(np.int_)
+        self._band_offsets = _offsets(self._band_count)
+        self._band_base = bounds[:, 1]
+        self._band_height = ((bounds[:, 3] - bounds[:, 1]) /
+                             self._band_count)
+        self._band_height[self._band_height == 0] = 1.0
+
+        y = ragged.y
+        following = ragged.next_node_index()
+        geom = ragged.node_geom_index()
+        low = self._band(np.minimum(y, y[following]), geom)
+        high = self._band(np.maximum(y, y[following]), geom)
+        counts = high - low + 1
+        edge = np.repeat(np.arange(len(y)), counts)
+        step = np.arange(counts.sum()) - np.repeat(_offsets(counts)[:-1],
+                                                   counts)
+        keys = self._band_offsets[geom[edge]] + low[edge] + step
+        order = np.argsort(keys, kind='stable')
+        self._edges = edge[order]
+        self._key_offsets = _offsets(
+            np.bincount(keys, minlength=self._band_offsets[-1]))
+
+
+    def _band(self, y, geom):
+        """Finds the band of each y coordinate within a geometry.
+
+        Args:
+            y (numpy.ndarray(float)): Y coordinates.
+            geom (numpy.ndarray(int)): Geometry index of each coordinate.
+
+        Returns:
+            numpy.ndarray(int): Band index within the geometry, clipped to the
+            bands of the geometry.
+
+        """
+        band = np.floor((y - self._band_base[geom]) / self._band_height[geom])
+        return np.clip(band, 0, self._band_count[geom] - 1).astype(np.int_)
+
+
+    def _crossings(self, px, py, geom):
+        """Tests points against the rings of candidate polygons.
+
+        Args:
+            px (numpy.ndarray(float)): X coordinate of each candidate pair.
+            py (numpy.ndarray(float)): Y coordinate of each candidate pair.
+            geom (numpy.ndarray(int)): Geometry index of each candidate pair.
+
+        Returns:
+            numpy.ndarray(bool): True for each pair whose point is inside the
+            geometry, i.e., inside more outer rings than holes.
+
+        """
+        ragged = self.ragged
+        keys = self._band_offsets[geom] + self._band(py, geom)
+        starts = self._key_offsets[keys]
+        counts = self._key_offsets[keys + 1] - starts
+        nodes = self._edges[_range_index(starts, counts)]
+        pair = np.repeat(np.arange(len(geom)), counts)
+        following = ragged.next_node_index()[nodes]
+
+        x0 = ragged.x[nodes]
+        y0 = ragged.y[nodes]
+        x1 = ragged.x[following]
+        y1 = ragged.y[following]
+        x = px[pair]
+        y = py[pair]
+        straddles = (y0 > y) != (y1 > y)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+        crossing = straddles & (x < x_cross)
+
+        # Count crossings for each ring of each pair. Edges of a band are in
+        # node order, so the edges of each ring are together.
+        node_part = ragged.node_part_index()[nodes]
+        ring_start = np.ones(len(nodes), dtype=bool)
+        ring_start[1:] = ((node_part[1:] != node_part[:-1]) |
+                          (pair[1:] != pair[:-1]))
+        ring_start = np.flatnonzero(ring_start)
+        depth = np.zeros(len(geom), dtype=np.int_)
+        if len(ring_start):
+            inside_ring = np.add.reduceat(crossing.astype(np.int_),
+                                          ring_start) % 2
+            sign = np.where(ragged.is_hole[node_part[ring_start]], -1, 1)
+            np.add.at(depth, pair[ring_start], inside_ring * sign)
+        return depth > 0
+
+
+    def contains(self, x, y, geom, chunk_size=2**22):
+        """Tests whether points are inside the given geometries.
+
+        Each point is tested with the crossing number method over the edges
+        of its geometry that span its y coordinate. A point is inside a
+        geometry if it is inside more of its outer rings than its holes.
+        Points on a boundary may be found inside or outside.
+
+        Args:
+            x (array-like(float)): X coordinate of each point.
+            y (array-like(float)): Y coordinate of each point.
+            geom (array-like(int)): Index of the geometry to test each point
+                against.
+            chunk_size (int, optional): Approximate count of edges tested at
+                once, which bounds memory use.
+
+        Returns:
+            numpy.ndarray(bool): True for each point inside its geometry.
+
+        """
+        x = np.asarray(x, dtype=np.float64).ravel()
+        y = np.asarray(y, dtype=np.float64).ravel()
+        geom = np.asarray(geom, dtype=np.int_).ravel()
+        keys = self._band_offsets[geom] + self._band(y, geom)
+        edges = np.cumsum(self._key_offsets[keys + 1] -
+                          self._key_offsets[keys])
+        bounds = np.searchsorted(edges, np.arange(chunk_size, edges[-1] if
+                                                  len(edges) else 0,
+                                                  chunk_size))
+        inside = np.zeros(len(geom), dtype=bool)
+        for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(geom)]):
+            if stop > start:
+                inside[start:stop] = self._crossings(
+                    x[start:stop], y[start:stop], geom[start:stop])
+        return inside
+
+
+def locate_points(ragged, x, y, index=None, chunk_size=2**22):
+    """Finds the polygon geometry containing each point.
+
+    Candidate geometries are found with a grid index of bounding boxes, then
+    tested with PolygonIndex.contains. Holes are honored. Points on a boundary
+    may be assigned to either neighbor.
+
+    Args:
+        ragged (RaggedArrays): Polygon buffers.
+        x (array-like(float)): X coordinates of the points.
+        y (array-like(float)): Y coordinates of the points.
+        index (PolygonIndex, optional): Index of the geometries. Pass an index
+            to reuse it across queries on the same buffers.
+        chunk_size (int, optional): Approximate count of ring edges tested at
+            once, which bounds memory use.
+
+    Returns:
+        numpy.ndarray(int): Index of the first geometry containing each point,
+        or -1 for points outside all geometries.
+
+    Raises:
+        ValueError: If the buffers do not hold polygons, or if x and y differ
+            in length.
+
+    """
+    x = np.asarray(x, dtype=np.float64).ravel()
+    y = np.asarray(y, dtype=np.float64).ravel()
+    if len(x) != len(y):
+        raise ValueError('x and y must have the same length')
+    if index is None:
+        index = PolygonIndex(ragged)
+    point, geom = index.grid.query_points(x, y)
+    inside = index.contains(x[point], y[point], geom, chunk_size)
+
+    located = np.full(len(x), -1, dtype=np.int_)
+    first_point, first = np.unique(point[inside], return_index=True)
+    located[first_point] = geom[inside][first]
+    return located
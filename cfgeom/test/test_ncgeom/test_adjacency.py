@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from shapely.geometry import box, Polygon
+
+from ... import Adjacency, GeometryContainer, Geometry, Part
+from ... convert.shapely_io.shapely_reader import shapely_to_container
+from ... topology import _sort_rows
+from .. base import AbstractNcgeomTest
+
+
+class TestAdjacency(AbstractNcgeomTest):
+    def setUp(self):
+        # A 2 x 2 grid of squares, a square sharing half an edge with the
+        # grid through an extra node, and a square touching at a corner
+        super(TestAdjacency, self).setUp()
+        polygons = [box(0, 0, 1, 1), box(1, 0, 2, 1), box(0, 1, 1, 2),
+                    box(1, 1, 2, 2),
+                    Polygon([(2, 0), (3, 0), (3, 0.5), (2, 0.5)]),
+                    box(-1, -1, 0, 0)]
+        # Give the grid square the extra node on its edge
+        polygons[1] = Polygon([(1, 0), (2, 0), (2, 0.5), (2, 1), (1, 1)])
+        self.container = shapely_to_container(polygons)
+
+
+    def test_neighbors(self):
+        adjacency = self.container.adjacency()
+        self.assertEqual(len(adjacency), 6)
+        self.assertEqual(list(adjacency.neighbors(0)), [1, 2])
+        self.assertEqual(list(adjacency.neighbors(1)), [0, 3, 4])
+        self.assertEqual(list(adjacency.neighbors(5)), [])
+        self.assertEqual(list(adjacency.counts()), [2, 3, 2, 2, 1, 0])
+        lengths = dict(zip(adjacency.neighbors(1),
+                           adjacency.lengths[adjacency.indptr[1]:
+                                             adjacency.indptr[2]]))
+        self.assertEqual(lengths, {0: 1.0, 3: 1.0, 4: 0.5})
+
+
+    def test_shared_by_more_than_two(self):
+        square = box(0, 0, 1, 1)
+        container = shapely_to_container([square, square, square])
+        adjacency = container.adjacency()
+        self.assertEqual(list(adjacency.neighbors(1)), [0, 2])
+        self.assertTrue(np.allclose(adjacency.lengths, 4))
+
+
+    def test_float32(self):
+        expected = self.container.adjacency()
+        adjacency = self.container.astype(np.float32).adjacency()
+        self.assertTrue(np.array_equal(adjacency.indptr, expected.indptr))
+        self.assertTrue(np.array_equal(adjacency.indices, expected.indices))
+        self.assertTrue(np.array_equal(adjacency.lengths, expected.lengths))
+
+
+    def test_to_scipy(self):
+        pytest.importorskip('scipy')
+        adjacency = self.container.adjacency()
+        matrix = adjacency.to_scipy().toarray()
+        self.assertEqual(matrix.shape, (6, 6))
+        self.assertTrue(np.array_equal(matrix, matrix.T))
+        self.assertEqual(list(matrix[1]), [1, 0, 0, 1, 0.5, 0])
+
+
+    def test_netcdf(self):
+        adjacency = self.container.adjacency()
+        path = self.get_temporary_file_path('adjacency.nc')
+        adjacency.to_netcdf(path)
+        loaded = Adjacency.from_netcdf(path)
+        self.assertTrue(np.array_equal(loaded.indptr, adjacency.indptr))
+        self.assertTrue(np.array_equal(loaded.indices, adjacency.indices))
+        self.assertTrue(np.array_equal(loaded.lengths, adjacency.lengths))
+
+
+    def test_sort_rows(self):
+        columns = [np.array([1, 3, 1, 1], dtype=np.int64),
+                   np.array([2, 4, 2, 5], dtype=np.int64)]
+        order, is_new = _sort_rows(columns)
+        groups = np.cumsum(is_new)[np.argsort(order)]
+        self.assertEqual(groups[0], groups[2])
+        self.assertEqual(len(set(groups)), 3)
+
+
+    def test_errors(self):
+        container = GeometryContainer(Geometry('line', Part([0, 1], [0, 1])))
+        with pytest.raises(ValueError):
+            container.adjacency()
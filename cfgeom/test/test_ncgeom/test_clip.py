@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+from shapely.geometry import box, LineString, Polygon
+
+from ... import GeometryContainer, Geometry, Part
+from ... clip import clip_by_box
+from ... ragged import RaggedArrays
+from ... convert.shapely_io.shapely_reader import shapely_to_container
+from .. base import AbstractNcgeomTest
+
+
+class TestClipLines(AbstractNcgeomTest):
+    def test_split_where_line_leaves_box(self):
+        line = LineString([(-1, 1), (1, 1), (1, 3), (2, 3), (2, 1), (3, 1)])
+        container = shapely_to_container([line])
+        result = container.clip_by_box(0, 0, 2.5, 2)
+        expected = line.intersection(box(0, 0, 2.5, 2))
+        actual = result.to_shapely()[0]
+        self.assertEqual(len(result.geoms[0].parts), 2)
+        self.assertAlmostEqual(actual.length, expected.length)
+        self.assertAlmostEqual(actual.hausdorff_distance(expected), 0)
+
+
+    def test_interpolates_z(self):
+        part = Part([-2, 2], [0, 0], [0, 4])
+        container = GeometryContainer(Geometry('line', part))
+        result = container.clip_by_box(-1, -1, 1, 1)
+        self.assertEqual(result.geoms[0].parts[0].x, [-1, 1])
+        self.assertEqual(result.geoms[0].parts[0].z, [1, 3])
+
+
+    def test_drops_lines_touching_box(self):
+        ragged = RaggedArrays('line', [0, 1, 5, 6], [0, 1, 5, 6],
+                              node_count=[2, 2])
+        result, index = clip_by_box(ragged, 1, 1, 4, 4, return_index=True)
+        self.assertEqual(len(result), 0)
+        self.assertEqual(len(index), 0)
+
+
+class TestClipPolygons(AbstractNcgeomTest):
+    def test_matches_shapely(self):
+        shell = [(0, 0), (4, 0), (4, 4), (2, 1), (0, 4), (0, 0)]
+        hole = [(1, 0.5), (1.5, 0.5), (1.5, 1), (1, 0.5)]
+        polygons = [Polygon(shell, [hole]), box(10, 10, 11, 11),
+                    box(0.5, 0.5, 0.6, 0.6)]
+        container = shapely_to_container(polygons)
+        clip_box = box(0.25, 0.25, 3, 2)
+        result, index = container.clip_by_box(*clip_box.bounds,
+                                               return_index=True)
+        self.assertEqual(list(index), [0, 2])
+        for actual, i in zip(result.to_shapely(), index):
+            expected = polygons[i].intersection(clip_box)
+            self.assertAlmostEqual(actual.area, expected.area)
+            self.assertAlmostEqual(
+                actual.symmetric_difference(expected).area, 0)
+        # Clipped rings stay closed
+        self.assertTrue(np.all(result.to_ragged().is_closed()))
+
+
+    def test_inside_box_shares_buffers(self):
+        container = shapely_to_container([box(0, 0, 1, 1), box(2, 2, 3, 3)])
+        ragged = container.to_ragged()
+        result = clip_by_box(ragged, -1, -1, 4, 4)
+        self.assertTrue(np.shares_memory(result.x, ragged.x))
+        self.assertTrue(np.array_equal(result.x, ragged.x))
+        self.assertIsNone(container.clip_by_box(5, 5, 6, 6))
+
+
+    def test_inside_box_source_unchanged(self):
+        # Clockwise boxes, so writing netCDF reverses their rings
+        boxes = [box(0, 0, 1, 1, ccw=False), box(2, 2, 3, 3, ccw=False)]
+        container = GeometryContainer.from_ragged(
+            shapely_to_container(boxes).to_ragged())
+        x = container.to_ragged().x.copy()
+        clipped = container.clip_by_box(-1, -1, 4, 4)
+        clipped.transform([[1, 0, 100], [0, 1, 0]])
+        self.assertTrue(np.array_equal(container.to_ragged().x, x))
+        clipped = container.clip_by_box(-1, -1, 4, 4)
+        clipped.to_netcdf(self.get_temporary_file_path('clipped.nc'))
+        self.assertTrue(np.array_equal(container.to_ragged().x, x))
+        # Nor does changing the source change the clipped geometries
+        clipped = container.clip_by_box(-1, -1, 4, 4)
+        clipped_x = clipped.to_ragged().x.copy()
+        container.transform([[1, 0, 100], [0, 1, 0]])
+        self.assertTrue(np.array_equal(clipped.to_ragged().x, clipped_x))
+
+
+class TestClipPoints(AbstractNcgeomTest):
+    def test_multipoint(self):
+        geom = Geometry('point', [Part(0, 0), Part(5, 5), Part(1, 1)])
+        container = GeometryContainer(geom)
+        result = container.clip_by_box(0, 0, 2, 2)
+        self.assertEqual([p.x for p in result.geoms[0].parts], [[0], [1]])
+
+
+    def test_errors(self):
+        ragged = RaggedArrays('point', [0], [0])
+        with pytest.raises(ValueError):
+            clip_by_box(ragged, 1, 0, 0, 1)
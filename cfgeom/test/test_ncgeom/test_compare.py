@@ -0,0 +1,85 @@
+from unittest import mock
+
+import numpy as np
+
+from ... import GeometryContainer, Geometry, Part
+from ... import compare
+from ... compare import geometry_hashes
+from ... ragged import RaggedArrays
+from .. base import AbstractNcgeomTest
+
+
+class TestCompare(AbstractNcgeomTest):
+    def setUp(self):
+        super(TestCompare, self).setUp()
+        self.lines = [Geometry('line', Part([0, 1, 2], [0, 1, 0])),
+                      Geometry('line', [Part([5, 6], [5, 5]),
+                                        Part([7, 8], [5, 5])]),
+                      Geometry('line', Part([1, 2], [1, 1], [3, 3]))]
+
+
+    def test_geometry_hashes(self):
+        hashes = GeometryContainer(self.lines).geometry_hashes()
+        self.assertEqual(hashes.dtype, np.uint64)
+        self.assertEqual(len(set(hashes.tolist())), 3)
+        # Same content in another container and position
+        other = GeometryContainer([self.lines[2], self.lines[0]])
+        self.assertEqual(list(other.geometry_hashes()),
+                         [hashes[2], hashes[0]])
+        # Node order, part boundaries, z values and geometry type count
+        variants = [Geometry('line', Part([2, 1, 0], [0, 1, 0])),
+                    Geometry('line', Part([5, 6, 7, 8], [5, 5, 5, 5])),
+                    Geometry('line', Part([1, 2], [1, 1]))]
+        variant_hashes = GeometryContainer(variants).geometry_hashes()
+        self.assertFalse(np.any(variant_hashes == hashes))
+        points = RaggedArrays('point', [0, 1, 2], [0, 1, 0],
+                              node_count=[3])
+        lines = RaggedArrays('line', [0, 1, 2], [0, 1, 0])
+        self.assertNotEqual(geometry_hashes(points)[0],
+                            geometry_hashes(lines)[0])
+        # Signed zeros and NaN values are canonical, missing z is NaN z
+        a = RaggedArrays('line', [0.0, np.nan], [1, 1])
+        b = RaggedArrays('line', [-0.0, np.float64('-nan')], [1, 1],
+                         [np.nan, np.nan])
+        self.assertEqual(geometry_hashes(a)[0], geometry_hashes(b)[0])
+
+
+    def test_fingerprint_and_diff(self):
+        container = GeometryContainer(self.lines)
+        same = GeometryContainer.from_ragged(container.to_ragged().copy())
+        self.assertEqual(container.fingerprint(), same.fingerprint())
+        reordered = GeometryContainer(self.lines[::-1])
+        self.assertNotEqual(container.fingerprint(), reordered.fingerprint())
+
+        changed = GeometryContainer(
+            [self.lines[0], Geometry('line', Part([5, 6], [5, 5])),
+             self.lines[2], self.lines[0], self.lines[1]])
+        added, removed, modified = container.diff(changed)
+        self.assertEqual(list(added), [3, 4])
+        self.assertEqual(list(removed), [])
+        self.assertEqual(list(modified), [1])
+        added, removed, modified = changed.diff(container)
+        self.assertEqual(list(added), [])
+        self.assertEqual(list(removed), [3, 4])
+        self.assertEqual(list(modified), [1])
+
+
+    def test_deduplicate(self):
+        geoms = [self.lines[1], self.lines[0], self.lines[1], self.lines[2],
+                 Geometry('line', Part([0, 1, 2], [0, 1, 0])),
+                 self.lines[2]]
+        unique, index = GeometryContainer(geoms).deduplicate()
+        self.assertEqual(unique, GeometryContainer(self.lines[1::-1] +
+                                                   self.lines[2:]))
+        self.assertEqual(list(index), [0, 1, 0, 2, 1, 2])
+
+
+    def test_hash_collision(self):
+        # Distinct geometries sharing a hash are kept apart, each stored once
+        # more rather than merged
+        ragged = RaggedArrays('point', [0, 1, 0, 1], [0, 0, 0, 0])
+        with mock.patch.object(compare, 'geometry_hashes',
+                               lambda r: np.zeros(len(r), np.uint64)):
+            first, index = compare.unique_geometries(ragged)
+        self.assertEqual(list(first), [0, 1, 3])
+        self.assertEqual(list(index), [0, 1, 0, 2])
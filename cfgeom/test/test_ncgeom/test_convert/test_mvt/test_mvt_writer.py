@@ -0,0 +1,162 @@
+import struct
+
+import numpy as np
+from shapely.geometry import box, LineString
+
+from ..... import GeometryContainer, Geometry, Part
+from .... base import AbstractNcgeomTest
+from ..... convert.mvt.mvt_writer import (TileEncoder, _varints,
+                                          lonlat_to_mercator, tile_bounds)
+from ..... convert.shapely_io.shapely_reader import shapely_to_container
+
+
+def _read_varint(data, pos):
+    result = shift = 0
+    while True:
+        byte = data[pos]
+        result |= (byte & 0x7f) << shift
+        pos += 1
+        shift += 7
+        if byte < 0x80:
+            return result, pos
+
+
+def _read_message(data):
+    """Reads protobuf fields into a dictionary of lists keyed by field."""
+    fields = {}
+    pos = 0
+    while pos < len(data):
+        key, pos = _read_varint(data, pos)
+        field, wire_type = key >> 3, key & 7
+        if wire_type == 0:
+            value, pos = _read_varint(data, pos)
+        elif wire_type == 1:
+            value = struct.unpack('<d', data[pos:pos + 8])[0]
+            pos += 8
+        else:
+            length, pos = _read_varint(data, pos)
+            value = data[pos:pos + length]
+            pos += length
+        fields.setdefault(field, []).append(value)
+    return fields
+
+
+def _read_packed(data):
+    values = []
+    pos = 0
+    while pos < len(data):
+        value, pos = _read_varint(data, pos)
+        values.append(value)
+    return values
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def _read_layer(tile):
+    layer = _read_message(_read_message(tile)[3][0])
+    features = [_read_message(f) for f in layer[2]]
+    return layer, features
+
+
+def _decode_geometry(commands):
+    """Decodes geometry commands into lists of tile coordinate rings."""
+    parts = []
+    x = y = 0
+    pos = 0
+    while pos < len(commands):
+        command, count = commands[pos] & 7, commands[pos] >> 3
+        pos += 1
+        if command == 7:
+            parts[-1].append(parts[-1][0])
+            continue
+        if command == 1:
+            parts.append([])
+        for _ in range(count):
+            x += _unzigzag(commands[pos])
+            y += _unzigzag(commands[pos + 1])
+            pos += 2
+            parts[-1].append((x, y))
+    return parts
+
+
+class TestVarints(AbstractNcgeomTest):
+    def test_varints(self):
+        vals = [0, 1, 127, 128, 300, 2**35]
+        encoded, offsets = _varints(vals)
+        self.assertEqual(_read_packed(encoded), vals)
+        self.assertEqual(list(np.diff(offsets)), [1, 1, 1, 2, 2, 6])
+
+
+class TestTileEncoder(AbstractNcgeomTest):
+    def test_polygon_tile(self):
+        # Mercator meters make tile coordinates easy to check at zoom 0
+        half = tile_bounds(0, 0, 0)[2]
+        square = box(-half / 2, -half / 2, half / 2, half / 2)
+        hole = box(-half / 8, -half / 8, half / 8, half / 8)
+        polygon = square.difference(hole)
+        container = shapely_to_container([polygon])
+        tile = container.to_mvt(0, 0, 0, data={'name': ['a']},
+                                geographic=False, extent=256)
+        layer, features = _read_layer(tile)
+        self.assertEqual(layer[1][0], b'geometries')
+        self.assertEqual(layer[5][0], 256)
+        self.assertEqual(layer[3], [b'name'])
+        self.assertEqual(_read_message(layer[4][0])[1], [b'a'])
+        self.assertEqual(features[0][3], [3])
+        rings = _decode_geometry(_read_packed(features[0][4][0]))
+        self.assertEqual(len(rings), 2)
+        self.assertEqual(set(rings[0]), {(64, 64), (192, 64), (192, 192),
+                                         (64, 192)})
+        # Exteriors wind clockwise in tile coordinates, holes anticlockwise
+        areas = [sum(x0 * y1 - x1 * y0
+                     for (x0, y0), (x1, y1) in zip(ring[:-1], ring[1:]))
+                 for ring in rings]
+        self.assertTrue(areas[0] > 0)
+        self.assertTrue(areas[1] < 0)
+
+
+    def test_clip_and_attributes(self):
+        lines = [LineString([(-170, 10), (170, 10)]),
+                 LineString([(-100, -50), (-90, -40)])]
+        container = shapely_to_container(lines)
+        data = {'id': np.array([-3, 7]),
+                'flow': np.ma.masked_array([1.5, 2.5], mask=[False, True])}
+        encoder = TileEncoder(container, data=data, buffer=0, tolerance=0)
+        tile = encoder.encode(1, 1, 0)
+        layer, features = _read_layer(tile)
+        self.assertEqual(len(features), 1)
+        self.assertEqual(features[0][1], [0])
+        parts = _decode_geometry(_read_packed(features[0][4][0]))
+        self.assertEqual([x for x, _ in parts[0]],
+                         [0, round(170 / 180 * 4096)])
+        tags = _read_packed(features[0][2][0])
+        values = [_read_message(v) for v in layer[4]]
+        self.assertEqual(_unzigzag(values[tags[1]][6][0]), -3)
+        self.assertEqual(values[tags[3]][3][0], 1.5)
+
+        # The masked value of the second line is omitted
+        tile = encoder.encode(1, 0, 1)
+        _, features = _read_layer(tile)
+        self.assertEqual(features[0][1], [1])
+        self.assertEqual(len(_read_packed(features[0][2][0])), 2)
+        self.assertEqual(encoder.encode(3, 7, 7), b'')
+
+
+    def test_points_and_zoom(self):
+        geoms = [Geometry('point', Part(-100, 40)),
+                 Geometry('point', [Part(10, 10), Part(12, -10)])]
+        container = GeometryContainer(geoms)
+        encoder = TileEncoder(container, buffer=0)
+        self.assertEqual(encoder.tiles(1), [(0, 0), (1, 0), (1, 1)])
+        tiles = encoder.encode_zoom(1, max_workers=2, chunk_size=1)
+        self.assertEqual(tiles, encoder.encode_zoom(1, max_workers=1))
+        self.assertEqual(set(tiles), {(0, 0), (1, 0), (1, 1)})
+        _, features = _read_layer(tiles[(0, 0)])
+        points = _decode_geometry(_read_packed(features[0][4][0]))
+        x, y = lonlat_to_mercator(-100, 40)
+        xmin, _, xmax, ymax = tile_bounds(1, 0, 0)
+        scale = 4096 / (xmax - xmin)
+        self.assertEqual(points, [[(round((x - xmin) * scale),
+                                    round((ymax - y) * scale))]])
@@ -2,10 +2,16 @@ import json
 import os
 from os.path import join
 
+from netCDF4 import Dataset
+import numpy as np
 import pytest
 
+from ..... import GeometryContainer, Geometry, Part
 from .... base import AbstractNcgeomTest
-from ..... convert.netcdf.nc_reader import read_netcdf
+from ..... convert.json_io.json_reader import json_to_container
+from ..... convert.netcdf.nc_names import NcNames
+from ..... convert.netcdf.nc_reader import (
+    iter_netcdf_chunks, read_netcdf, read_netcdf_bytes, read_netcdf_shapely)
 
 
 class TestReadNetcdf(AbstractNcgeomTest):
@@ -23,3 +29,253 @@ class TestReadNetcdf(AbstractNcgeomTest):
                 container = containers['geometry_container']['container']
                 self.assertEqual(json.loads(container.to_json()), data)
 
+
+    def test_read_encoded_netcdf(self):
+        root = join(self.path_data, 'simplified_examples')
+        files = [join(root, f) for f in os.listdir(root)
+                 if f.endswith('.json')]
+        for json_file in files:
+            with open(json_file) as f:
+                data = json.load(f)
+            container = json_to_container(json.dumps(data))
+            path = self.get_temporary_file_path('foo.nc')
+            container.to_netcdf(path, coord_encoding='xor')
+            loaded = read_netcdf(path)['geometry_container']['container']
+            self.assertEqual(json.loads(loaded.to_json()), data)
+            if not container.has_z():
+                container.to_netcdf(path, coord_encoding='delta',
+                                    coord_quantum=0.25)
+                loaded = read_netcdf(path)['geometry_container']['container']
+                self.assertEqual(json.loads(loaded.to_json()), data)
+
+
+    def test_read_topology_netcdf(self):
+        root = join(self.path_data, 'simplified_examples')
+        files = [join(root, f) for f in os.listdir(root)
+                 if f.endswith('.json')]
+        for json_file in files:
+            with open(json_file) as f:
+                data = json.load(f)
+            container = json_to_container(json.dumps(data))
+            if container.geom_type == 'point':
+                continue
+            path = self.get_temporary_file_path('foo.nc')
+            container.to_netcdf(path, use_topology=True)
+            loaded = read_netcdf(path)['geometry_container']['container']
+            self.assertEqual(json.loads(loaded.to_json()), data)
+
+
+    def test_read_level_of_detail(self):
+        x = [0, 1, 2, 3, 4, 5]
+        y = [0, 0.1, -0.1, 5, 6, 7]
+        container = GeometryContainer(Geometry('line', Part(x, y)))
+        path = self.get_temporary_file_path('foo.nc')
+        container.to_netcdf_pyramid(path, [0.5, 100])
+        self.assertEqual(len(read_netcdf(path)), 3)
+
+        def read_x(**kwargs):
+            containers = read_netcdf(path, **kwargs)
+            self.assertEqual(len(containers), 1)
+            name, item = list(containers.items())[0]
+            return name, item['container'].geoms[0].parts[0].x
+
+        self.assertEqual(read_x(level=0), ('geometry_container', x))
+        self.assertEqual(read_x(level=1),
+                         ('lod1_geometry_container', [0, 2, 3, 5]))
+        self.assertEqual(read_x(level=2)[1], [0, 5])
+        self.assertEqual(read_x(tolerance=1)[0], 'lod1_geometry_container')
+        self.assertEqual(read_x(tolerance=0.1)[0], 'geometry_container')
+        self.assertEqual(read_x(tolerance=1000)[0], 'lod2_geometry_container')
+        self.assertEqual(
+            read_x(container_name='geometry_container', level=2)[1], [0, 5])
+        with pytest.raises(ValueError):
+            read_netcdf(path, level=3)
+
+
+    def test_read_netcdf_shapely(self):
+        root = join(self.path_data, 'simplified_examples')
+        nc_files = [join(root, f) for f in os.listdir(root)
+                    if f.endswith('.nc')]
+        for nc_file in nc_files:
+            container = read_netcdf(nc_file)['geometry_container']['container']
+            geoms = read_netcdf_shapely(nc_file)['geometry_container'][
+                'geometries']
+            expected = container.to_shapely()
+            self.assertEqual([g.wkt for g in geoms],
+                             [g.wkt for g in expected])
+            multi_type = 'Multi' + expected[0].geom_type.replace('Multi', '')
+            multi = read_netcdf_shapely(nc_file, shapely_geom_type=multi_type)
+            multi = multi['geometry_container']['geometries']
+            self.assertTrue(all(g.geom_type.startswith('Multi')
+                                for g in multi))
+
+
+class TestReadData(AbstractNcgeomTest):
+    def setUp(self):
+        super(TestReadData, self).setUp()
+        self.lines = GeometryContainer([
+            Geometry('line', Part([0, 1], [0, 0])),
+            Geometry('line', Part([5, 6], [5, 5])),
+            Geometry('line', Part([1, 2], [1, 1]))])
+        self.data = {'flow': np.array([1.5, 2.5, 3.5]),
+                     'name': np.array(['a', 'bb', 'Ünser'])}
+
+
+    def test_round_trip(self):
+        path = self.get_temporary_file_path('data.nc')
+        permutation = self.lines.to_netcdf(path, data=self.data,
+                                           sort_spatial='hilbert')
+        read = read_netcdf(path)['geometry_container']
+        self.assertEqual(sorted(read['data']), ['flow', 'name'])
+        self.assertEqual(list(read['data']['flow']),
+                         list(self.data['flow'][permutation]))
+        self.assertEqual(list(read['data']['name']),
+                         list(self.data['name'][permutation]))
+        self.assertEqual(read['nc_names'].instance_dim, 'instance')
+        self.assertEqual(read['nc_names'].node_count_var, 'node_count')
+        self.assertNotIn('data', read_netcdf(path, read_data=False)[
+            'geometry_container'])
+
+
+    def test_bytes_round_trip(self):
+        cwd = os.getcwd()
+        before = set(os.listdir(cwd))
+        for file_format in ('NETCDF4', 'NETCDF3_64BIT_DATA'):
+            buf = self.lines.to_netcdf_bytes(file_format=file_format,
+                                             data=self.data)
+            self.assertTrue(bytes(buf[:4]).startswith((b'CDF', b'\x89HDF')))
+            read = read_netcdf_bytes(buf)['geometry_container']
+            self.assertEqual(read['container'].geoms[1].parts[0].x, [5, 6])
+            self.assertEqual(list(read['data']['name']),
+                             list(self.data['name']))
+            self.assertEqual(
+                len(read_netcdf_bytes(bytes(buf), read_data=False)), 1)
+        self.assertEqual(set(os.listdir(cwd)), before)
+
+    def test_deduplicated(self):
+        path = self.get_temporary_file_path('dedup.nc')
+        geoms = self.lines.geoms
+        lines = GeometryContainer([geoms[0], geoms[1], geoms[0], geoms[0]])
+        data = {'flow': np.arange(4.)}
+        with Dataset(path, 'w') as ds:
+            lines.to_netcdf(ds, data=data, deduplicate=True)
+            ds.createDimension('time', 2)
+            v = ds.createVariable('series', np.float64, ('instance', 'time'))
+            v[:] = np.arange(8).reshape(4, 2)
+            v.geometry = 'geometry_container'
+        with Dataset(path) as ds:
+            self.assertEqual(len(ds.dimensions['instance']), 4)
+            self.assertEqual(len(ds.dimensions['geometry']), 2)
+            self.assertEqual(list(ds.variables['geometry_index'][:]),
+                             [0, 1, 0, 0])
+        read = read_netcdf(path)['geometry_container']
+        self.assertEqual(read['container'], lines)
+        self.assertIs(read['container'].geoms[0],
+                      read['container'].geoms[3])
+        self.assertEqual(sorted(read['data']), ['flow'])
+        self.assertEqual(read['nc_names'].instance_dim, 'instance')
+        self.assertEqual(read['nc_names'].geometry_dim, 'geometry')
+        shapes = read_netcdf_shapely(path)['geometry_container']['geometries']
+        self.assertEqual(len(shapes), 4)
+        self.assertIs(shapes[0], shapes[2])
+        chunks = list(iter_netcdf_chunks(path, 'series', instance_chunk=3))
+        self.assertEqual(chunks[1][0], GeometryContainer([geoms[0]]))
+
+    def test_coord_dtype(self):
+        path = self.get_temporary_file_path('float32.nc')
+        lines = GeometryContainer([Geometry('line', Part([0.1, 1], [0, 0],
+                                                         [2, 2]))] * 3)
+        lines.to_netcdf(path, coord_dtype=np.float32, count_dtype='auto',
+                        deduplicate=True)
+        read = read_netcdf(path)['geometry_container']['container']
+        self.assertEqual(len(read), 3)
+        self.assertAlmostEqual(read.geoms[2].parts[0].x[0], 0.1, places=6)
+        for coord_dtype in [np.float32, np.float64]:
+            read = read_netcdf(path, coord_dtype=coord_dtype)
+            ragged = read['geometry_container']['container'].to_ragged()
+            self.assertEqual(len(ragged), 3)
+            self.assertEqual(ragged.x.dtype, coord_dtype)
+            self.assertEqual(ragged.z.dtype, coord_dtype)
+            self.assertEqual(ragged.node_count.dtype, np.int_)
+        self.assertEqual(ragged.x[0], np.float32(0.1))
+        with pytest.raises(ValueError):
+            read_netcdf(path, coord_dtype=np.int16)
+
+    def test_geometry_link(self):
+        # Two containers share the instance dimension. A time series is
+        # linked to one of them through its geometry attribute.
+        path = self.get_temporary_file_path('data.nc')
+        with Dataset(path, 'w') as ds:
+            self.lines.to_netcdf(ds, data=self.data)
+            names = NcNames()
+            names.set_prefix('other_')
+            self.lines.to_netcdf(ds, nc_names=names)
+            ds.createDimension('time', 2)
+            v = ds.createVariable('series', np.float64, ('instance', 'time'))
+            v[:] = np.arange(6).reshape(3, 2)
+            v.geometry = names.container_var
+        read = read_netcdf(path)
+        self.assertEqual(sorted(read['geometry_container']['data']),
+                         ['flow', 'name'])
+        # Time series are only read on request
+        self.assertEqual(read['other_geometry_container']['data'], {})
+        read = read_netcdf(path, read_multidim=True)
+        self.assertEqual(sorted(read['geometry_container']['data']),
+                         ['flow', 'name'])
+        other = read['other_geometry_container']
+        self.assertEqual(sorted(other['data']), ['series'])
+        self.assertEqual(other['data']['series'].shape, (3, 2))
+        self.assertEqual(other['nc_names'].x_var, 'other_x')
+        shapely_read = read_netcdf_shapely(path, 'other_geometry_container',
+                                           read_multidim=True)
+        self.assertEqual(sorted(shapely_read['other_geometry_container'][
+            'data']), ['series'])
+
+
+class TestIterChunks(AbstractNcgeomTest):
+    def _write(self, path, container, time_first=False, **kwargs):
+        values = np.arange(len(container) * 5, dtype=np.float64).reshape(
+            len(container), 5)
+        with Dataset(path, 'w') as ds:
+            container.to_netcdf(ds, **kwargs)
+            ds.createDimension('time', 5)
+            dims = ('time', 'instance') if time_first else ('instance', 'time')
+            v = ds.createVariable('flow', np.float64, dims,
+                                  chunksizes=(2, 3) if time_first else None)
+            v[:] = values.T if time_first else values
+            v.geometry = 'geometry_container'
+        return values
+
+
+    def test_blocks(self):
+        root = join(self.path_data, 'simplified_examples')
+        for name in ['multipolygon', 'multipoint', 'line_z', 'point_z',
+                     'polygon_hole']:
+            with open(join(root, name + '.json')) as f:
+                container = json_to_container(f.read())
+            geoms = container.to_shapely()
+            for kwargs in [{}, {'use_vlen': True},
+                           {'coord_encoding': 'xor'}]:
+                path = self.get_temporary_file_path('chunks.nc')
+                values = self._write(path, container, **kwargs)
+                seen = np.zeros_like(values)
+                for block, instances, times, vals in iter_netcdf_chunks(
+                        path, 'flow', instance_chunk=1, time_chunk=2):
+                    self.assertEqual(block.to_shapely(), geoms[instances])
+                    seen[instances, times] = vals
+                self.assertTrue(np.array_equal(seen, values))
+
+
+    def test_disk_chunking(self):
+        container = GeometryContainer([
+            Geometry('line', Part([i, i + 1], [0, 1])) for i in range(7)])
+        path = self.get_temporary_file_path('chunks.nc')
+        values = self._write(path, container, time_first=True)
+        blocks = list(iter_netcdf_chunks(path, 'flow'))
+        self.assertEqual([(b[1].start, b[1].stop) for b in blocks[:3]],
+                         [(0, 3), (0, 3), (0, 3)])
+        self.assertEqual([b[3].shape for b in blocks[:3]],
+                         [(3, 2), (3, 2), (3, 1)])
+        self.assertTrue(np.array_equal(blocks[-1][3], values[6:, 4:]))
+        with pytest.raises(ValueError):
+            list(iter_netcdf_chunks(path, 'x'))
@@ -0,0 +1,145 @@
+from netCDF4 import Dataset
+import numpy as np
+import pytest
+
+from ..... import GeometryContainer, Geometry, Part
+from .... base import AbstractNcgeomTest
+from ..... convert.netcdf.nc_reader import read_netcdf
+from ..... convert.netcdf.nc_updater import update_netcdf
+
+
+def _square(x0, size=1, hole=False):
+    x = [x0, x0, x0 + size, x0 + size, x0]
+    y = [0, size, size, 0, 0]
+    parts = [Part(x, y)]
+    if hole:
+        parts.append(Part([x0 + 0.2, x0 + 0.4, x0 + 0.4, x0 + 0.2],
+                          [0.2, 0.2, 0.4, 0.2], is_hole=True))
+    return Geometry('polygon', parts)
+
+
+def _triangle(x0):
+    return Geometry('polygon', Part([x0, x0 + 1, x0, x0], [0, 0, 1, 0]))
+
+
+class TestUpdateNetcdf(AbstractNcgeomTest):
+    def setUp(self):
+        super(TestUpdateNetcdf, self).setUp()
+        self.geoms = [_square(0, hole=True), _square(2), _square(4),
+                      _square(6)]
+
+
+    def _write(self, geoms, **kwargs):
+        path = self.get_temporary_file_path('update.nc')
+        GeometryContainer(geoms).to_netcdf(path, **kwargs)
+        return path
+
+
+    def _check(self, path, expected):
+        read = read_netcdf(path)['geometry_container']['container']
+        ragged = GeometryContainer(expected).to_ragged().copy()
+        if ragged.geom_type == 'polygon':
+            ragged.orient()
+        self.assertEqual(read, GeometryContainer.from_ragged(ragged))
+
+
+    def test_in_place(self):
+        path = self._write(self.geoms)
+        with Dataset(path) as ds:
+            node_dim = len(ds.dimensions['node'])
+        changed = update_netcdf(path, {3: _square(10), 1: _square(12)})
+        self.assertEqual(list(changed), [1, 3])
+        self.geoms[1] = _square(12)
+        self.geoms[3] = _square(10)
+        self._check(path, self.geoms)
+        with Dataset(path) as ds:
+            self.assertEqual(len(ds.dimensions['node']), node_dim)
+
+
+    def test_tail_rewrite(self):
+        path = self._write(self.geoms, unlimited=True)
+        changes = [(1, _square(8, hole=True)), (3, _square(9, hole=True)),
+                   (0, _square(1))]
+        update_netcdf(path, changes)
+        self.geoms[0] = _square(1)
+        self.geoms[1] = _square(8, hole=True)
+        self.geoms[3] = _square(9, hole=True)
+        self._check(path, self.geoms)
+
+
+    def test_resize_errors(self):
+        path = self._write(self.geoms)
+        with pytest.raises(ValueError):
+            update_netcdf(path, {2: _square(2, hole=True)})
+        # Write new geometries, as writing orients them in place
+        self.geoms = [_square(0, hole=True), _square(2), _square(4),
+                      _square(6)]
+        path = self._write(self.geoms, unlimited=True)
+        with pytest.raises(ValueError):
+            update_netcdf(path, {2: _triangle(2)})
+        with pytest.raises(ValueError):
+            update_netcdf(path, {4: _square(2)})
+        self._check(path, self.geoms)
+
+
+    def test_compare_container(self):
+        path = self._write(self.geoms, coord_encoding='xor', unlimited=True)
+        geoms = list(self.geoms)
+        geoms[2] = _square(4, size=2)
+        geoms[3] = _square(5, hole=True)
+        changed = update_netcdf(path, GeometryContainer(geoms))
+        self.assertEqual(list(changed), [2, 3])
+        self._check(path, geoms)
+        self.assertEqual(len(update_netcdf(path, GeometryContainer(geoms))),
+                         0)
+
+
+    def test_delta_quantum(self):
+        # Coordinates off the quantum still match their stored values
+        geoms = [_square(x + 0.123) for x in range(0, 10, 2)]
+        path = self._write(geoms, coord_encoding='delta', coord_quantum=0.25)
+        changed = list(geoms)
+        changed[1] = _square(20.123)
+        changed[3] = _square(30.123)
+        index = update_netcdf(path, GeometryContainer(changed))
+        self.assertEqual(list(index), [1, 3])
+        self.assertEqual(
+            len(update_netcdf(path, GeometryContainer(changed))), 0)
+
+        points = [Geometry('point', Part([i + 0.5], [i])) for i in range(4)]
+        path = self._write(points, coord_encoding='delta', coord_quantum=0.25)
+        update_netcdf(path, {1: Geometry('point', Part([7.25], [8]))})
+        points[1] = Geometry('point', Part([7.25], [8]))
+        self._check(path, points)
+
+
+    def test_vlen_and_points(self):
+        path = self._write(self.geoms, use_vlen=True)
+        update_netcdf(path, {2: _square(3, hole=True)})
+        self.geoms[2] = _square(3, hole=True)
+        self._check(path, self.geoms)
+
+        points = [Geometry('point', Part([i], [i])) for i in range(5)]
+        path = self._write(points)
+        update_netcdf(path, {1: Geometry('point', Part([7], [8]))})
+        points[1] = Geometry('point', Part([7], [8]))
+        self._check(path, points)
+        with pytest.raises(ValueError):
+            update_netcdf(path, {1: Geometry('point', Part([7], [8], [1]))})
+
+
+    def test_narrow_types(self):
+        path = self._write(self.geoms, coord_dtype=np.float32,
+                           count_dtype='auto', unlimited=True)
+        self.assertEqual(len(update_netcdf(path, GeometryContainer(
+            self.geoms).astype(np.float32))), 0)
+        big = Geometry('polygon', Part([0] * 199 + [1], [0] * 198 + [1, 0]))
+        with pytest.raises(ValueError):
+            update_netcdf(path, {3: big})
+        update_netcdf(path, {3: _square(6, hole=True)})
+        self.geoms[3] = _square(6, hole=True)
+        read = read_netcdf(path, coord_dtype=np.float64)
+        expected = GeometryContainer(self.geoms).astype(np.float32)
+        expected.orient()
+        self.assertEqual(read['geometry_container']['container'].fingerprint(),
+                         expected.fingerprint())
@@ -274,3 +274,158 @@ class TestNcWriter(AbstractNcgeomTest):
             with Dataset(path) as nc:
                 x = nc.variables['x']
                 self.assertEqual(list(x), [10, 5, 0, 1, 5, 9])
+
+
+    def test_coord_encoding(self):
+        root = join(self.path_data, 'simplified_examples')
+        with open(join(root, 'multipolygon.json')) as f:
+            container = json_to_container(f.read())
+        path = self.get_temporary_file_path('foo.nc')
+        container.to_netcdf(path, coord_encoding='xor', zlib=True)
+        with Dataset(path) as nc:
+            var = nc.variables['x']
+            assert _has_attr(var, 'coordinate_encoding', 'xor')
+            assert var.dtype == np.uint64
+            assert var.filters()['zlib']
+            assert not _has_attr(var, 'coordinate_quantum')
+
+        path = self.get_temporary_file_path('bar.nc')
+        container.to_netcdf(path, coord_encoding='delta', coord_quantum=0.5)
+        with Dataset(path) as nc:
+            assert _has_attr(nc.variables['y'], 'coordinate_encoding', 'delta')
+            assert _has_attr(nc.variables['y'], 'coordinate_quantum', 0.5)
+            # Parts start at nodes 0, 3, 6, and 9
+            assert _has_var(nc, 'x', np.int64,
+                            [200, -50, -50, 20, -10, -10, 2, 8, 8, 40, -10, -8, 8])
+
+
+    def test_coord_encoding_errors(self):
+        path = self.get_temporary_file_path('foo.nc')
+        container = GeometryContainer(poly)
+        with pytest.raises(ValueError):
+            container.to_netcdf(path, coord_encoding='bogus')
+        with pytest.raises(ValueError):
+            container.to_netcdf(path, coord_encoding='delta')
+        with pytest.raises(ValueError):
+            container.to_netcdf(path, coord_encoding='xor', use_vlen=True)
+        container = GeometryContainer([poly, poly2])
+        with pytest.raises(ValueError):
+            # Missing z values are NaN, which cannot be quantized
+            container.to_netcdf(path, coord_encoding='delta', coord_quantum=1)
+
+
+    def test_write_pyramid(self):
+        path = self.get_temporary_file_path('foo.nc')
+        container = GeometryContainer([poly, poly_hole])
+        container.to_netcdf_pyramid(path, [0.5, 2])
+        with Dataset(path) as nc:
+            assert _has_dim(nc, 'instance', 2)
+            var = nc.variables['geometry_container']
+            assert _has_attr(var, 'level_of_detail_containers',
+                             'geometry_container lod1_geometry_container '
+                             'lod2_geometry_container')
+            assert _has_attr(var, 'level_of_detail', 0)
+            var = nc.variables['lod2_geometry_container']
+            assert _has_attr(var, 'level_of_detail', 2)
+            assert _has_attr(var, 'simplification_tolerance', 2.0)
+            assert _has_attr(var, 'node_coordinates', 'lod2_x lod2_y lod2_z')
+            assert _has_dim(nc, 'lod2_node')
+        with pytest.raises(ValueError):
+            container.to_netcdf_pyramid(path, [2, 1])
+
+
+class TestWriteData(AbstractNcgeomTest):
+    def test_write_data(self):
+        container = GeometryContainer([line, line, line])
+        path = self.get_temporary_file_path('data.nc')
+        data = {'flow': np.array([1.5, 2.5, 3.5]),
+                'name': np.array(['a', None, 'Ünser'], dtype=object),
+                'code': ['x', 'yy', 'zzz']}
+        container.to_netcdf(path, data=data)
+        with Dataset(path) as ds:
+            self.assertEqual(ds.variables['flow'].geometry,
+                             'geometry_container')
+            self.assertEqual(ds.variables['code'].dimensions,
+                             ('instance', 'code_strlen'))
+            self.assertEqual(len(ds.dimensions['code_strlen']), 3)
+        structured = np.array([(1, b'a'), (2, b'b'), (3, b'c')],
+                              dtype=[('id', np.int64), ('tag', 'S1')])
+        container.to_netcdf(path, data=structured)
+        with Dataset(path) as ds:
+            self.assertEqual(list(ds.variables['id'][:]), [1, 2, 3])
+        with pytest.raises(ValueError):
+            container.to_netcdf(path, data={'flow': [1, 2]})
+
+
+    def test_missing_values(self):
+        container = GeometryContainer([line] * 4)
+        path = self.get_temporary_file_path('missing.nc')
+        data = {'area': [1, None, 3, 4],
+                'depth': np.array([None, 0.5, None, 2], dtype=object),
+                'tag': [1, 'a', None, 2]}
+        container.to_netcdf(path, data=data)
+        with Dataset(path) as ds:
+            area = ds.variables['area']
+            self.assertEqual(area.dtype, np.int64)
+            self.assertIn('_FillValue', area.ncattrs())
+            self.assertEqual(area[:].tolist(), [1, None, 3, 4])
+            self.assertEqual(ds.variables['depth'][:].tolist(),
+                             [None, 0.5, None, 2])
+            self.assertEqual(ds.variables['tag'].dimensions,
+                             ('instance', 'tag_strlen'))
+
+
+class TestWriteDtypes(AbstractNcgeomTest):
+    def test_dtypes(self):
+        geoms = [poly_hole] + [poly] * 200
+        container = GeometryContainer(geoms).astype(np.float32)
+        self.assertEqual(container.to_ragged().x.dtype, np.float32)
+        path = self.get_temporary_file_path('dtypes.nc')
+        container.to_netcdf(path, count_dtype='auto', deduplicate=True)
+        with Dataset(path) as ds:
+            self.assertEqual(ds.variables['x'].dtype, np.float32)
+            self.assertEqual(ds.variables['z'].dtype, np.float32)
+            self.assertEqual(ds.variables['node_count'].dtype, np.int8)
+            self.assertEqual(ds.variables['part_node_count'].dtype, np.int8)
+            self.assertEqual(ds.variables['interior_ring'].dtype, np.int8)
+            self.assertEqual(ds.variables['geometry_index'].dtype, np.int8)
+        GeometryContainer([poly_hole] * 200).to_netcdf(
+            path, coord_dtype=np.float32, count_dtype=np.int16,
+            use_vlen=True)
+        with Dataset(path) as ds:
+            self.assertEqual(ds.vltypes['node_VLType'].dtype, np.float32)
+            self.assertEqual(ds.vltypes['part_node_VLType'].dtype, np.int16)
+        GeometryContainer([line] * 200).to_netcdf(path, count_dtype='auto',
+                                                  use_topology=True)
+        with Dataset(path) as ds:
+            self.assertEqual(ds.variables['x'].dtype, np.float64)
+            self.assertEqual(ds.variables['arc_index'].dtype, np.int8)
+
+        big = GeometryContainer([Geometry('line', Part(range(200),
+                                                       range(200)))])
+        big.to_netcdf(path, count_dtype='auto')
+        with Dataset(path) as ds:
+            self.assertEqual(ds.variables['node_count'].dtype, np.int16)
+        with pytest.raises(ValueError):
+            big.to_netcdf(path, count_dtype=np.int8)
+        with pytest.raises(ValueError):
+            big.to_netcdf(path, count_dtype=np.float32)
+        with pytest.raises(ValueError):
+            big.to_netcdf(path, coord_dtype=np.int32)
+
+
+class TestWriteEdited(AbstractNcgeomTest):
+    def test_write_after_edit(self):
+        geoms = [Geometry('line', Part([0, 1], [0, 0])),
+                 Geometry('line', Part([5, 6], [5, 5]))]
+        container = GeometryContainer(geoms)
+        path = self.get_temporary_file_path('edit.nc')
+        container.to_netcdf(path)
+        geoms[0].parts[0].x = [0, 1, 2]
+        geoms[0].parts[0].y = [0, 0, 0]
+        geoms[1].parts[0].x[0] = 4
+        container.geoms = geoms
+        container.to_netcdf(path)
+        with Dataset(path) as ds:
+            self.assertEqual(list(ds.variables['node_count'][:]), [3, 2])
+            self.assertEqual(list(ds.variables['x'][:]), [0, 1, 2, 4, 6])
@@ -1,10 +1,11 @@
 import pytest
 from shapely import wkt
-from shapely.geometry import Point, LineString
+from shapely.geometry import Point, LineString, MultiPolygon, Polygon
 from shapely.geometry.polygon import orient
 
-from ..... import GeometryContainer
-from ..... convert.shapely_io.shapely_reader import shapely_to_container
+from ..... import GeometryContainer, read_netcdf
+from ..... convert.shapely_io.shapely_reader import (
+    shapely_to_container, shapely_to_ragged, write_shapely_netcdf)
 from .... base import AbstractNcgeomTest
 
 
@@ -25,6 +26,20 @@ class TestPoint(AbstractNcgeomTest):
         self.assertIsNotNone(coll.geoms[0].parts[0].z)
 
 
+    def test_points_to_ragged(self):
+        geoms = [Point(1, 2), Point(3, 4, 11), Point(5, 6)]
+        ragged = shapely_to_ragged(geoms)
+        self.assertEqual(list(ragged.x), [1, 3, 5])
+        self.assertEqual(list(ragged.z[1:2]), [11])
+        self.assertEqual(GeometryContainer.from_ragged(ragged),
+                         shapely_to_container(geoms))
+        self.assertEqual(GeometryContainer.from_ragged(ragged).to_shapely(),
+                         geoms)
+        self.assertIsNone(shapely_to_ragged(geoms[::2]).z)
+        with pytest.raises(ValueError):
+            shapely_to_ragged([Point(1, 2), Point()])
+
+
 class TestLineString(AbstractNcgeomTest):
     def test_from_shapely_linestring_2d_multipart(self):
         geom = wkt.loads(self.fixture_wkt['2d']['multilinestring'])
@@ -47,3 +62,40 @@ class TestPolygon(AbstractNcgeomTest):
             for ctr, geom in enumerate(res.geoms):
                 loaded = geom.to_shapely()
                 self.assertTrue(loaded.almost_equals(geoms[ctr]))
+
+
+class TestShapelyToNetcdf(AbstractNcgeomTest):
+    def test_shapely_to_ragged(self):
+        geoms = [MultiPolygon([Polygon([(0, 0), (4, 0), (4, 4)],
+                                       [[(1, 0.5), (3, 0.5), (3, 2)]]),
+                               Polygon([(9, 9), (9, 10), (10, 9)])]),
+                 Polygon([(0, 0, 1), (1, 0, 2), (1, 1, 3)])]
+        ragged = shapely_to_ragged(geoms)
+        self.assertEqual(list(ragged.node_count), [12, 4])
+        self.assertEqual(list(ragged.part_node_count), [4, 4, 4, 4])
+        self.assertEqual(list(ragged.is_hole), [False, True, False, False])
+        self.assertEqual(list(ragged.part_has_z()),
+                         [False, False, False, True])
+        self.assertEqual(GeometryContainer.from_ragged(ragged),
+                         shapely_to_container(geoms))
+        with pytest.raises(ValueError):
+            shapely_to_ragged([Point(0, 0), LineString([(0, 0), (1, 1)])])
+        with pytest.raises(ValueError):
+            shapely_to_ragged([])
+
+
+    def test_write_shapely_netcdf(self):
+        for d in ['2d', '3d']:
+            geoms = [wkt.loads(self.fixture_wkt[d][key])
+                     for key in ['polygon', 'polygon_hole']]
+            geoms[0] = orient(geoms[0], sign=-1.0)
+            path = self.get_temporary_file_path('shapely.nc')
+            write_shapely_netcdf(geoms, path)
+            expected_path = self.get_temporary_file_path('container.nc')
+            shapely_to_container(geoms).to_netcdf(expected_path)
+            loaded = read_netcdf(path)['geometry_container']['container']
+            expected = read_netcdf(expected_path)['geometry_container'][
+                'container']
+            self.assertEqual(loaded, expected)
+            self.assertEqual(list(loaded.to_ragged().is_clockwise()),
+                             [False, False, True])
@@ -3,7 +3,9 @@ from shapely import wkt
 from shapely.geometry import Point, MultiPoint, LineString
 
 from ..... import GeometryContainer, Geometry, Part
-from ..... convert.shapely_io.shapely_writer import geom_to_shapely
+from ..... convert.shapely_io.shapely_writer import (
+    geom_to_shapely, ragged_to_shapely)
+from ..... ragged import RaggedArrays
 from .... base import AbstractNcgeomTest
 
 
@@ -17,6 +19,25 @@ class TestShapelyWriter(AbstractNcgeomTest):
         self.assertEqual(shp.geom_type, 'LineString')
 
 
+    def test_ragged_to_shapely(self):
+        geoms = [
+            Geometry('polygon', [Part([0, 4, 4], [0, 0, 4]),
+                                 Part([1, 3, 3], [0.5, 0.5, 2], is_hole=True),
+                                 Part([10, 11, 11], [0, 0, 1], [1, 2, 3])]),
+            Geometry('polygon', Part([0, 1, 1], [0, 0, 1]))]
+        ragged = RaggedArrays.from_geoms('polygon', geoms)
+        shps = ragged_to_shapely(ragged)
+        self.assertEqual(shps, [geom_to_shapely(g) for g in geoms])
+        self.assertEqual(len(shps[0].geoms[0].interiors), 1)
+        self.assertTrue(shps[0].geoms[1].has_z)
+        multi = ragged_to_shapely(ragged, 'MultiPolygon')
+        self.assertEqual(multi[1].geom_type, 'MultiPolygon')
+        container = GeometryContainer.from_ragged(ragged)
+        self.assertEqual(container.to_shapely(), shps)
+        with pytest.raises(ValueError):
+            ragged_to_shapely(ragged, 'LineString')
+
+
 class TestPoint(AbstractNcgeomTest):
     def test_to_shapely_point_2d(self):
         geom = Geometry('point', Part([30], [10]))
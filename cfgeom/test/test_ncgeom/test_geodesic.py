@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, Part
+from ... geodesic import geodesic_area, geodesic_length
+from ... ragged import RaggedArrays
+from .. base import AbstractNcgeomTest
+
+
+def _dms(degrees, minutes, seconds):
+    return degrees + minutes / 60.0 + seconds / 3600.0
+
+
+class TestGeodesicLength(AbstractNcgeomTest):
+    def test_vincenty_example(self):
+        # Flinders Peak to Buninyong, from Vincenty (1975)
+        lon = [_dms(144, 25, 29.52440), _dms(143, 55, 35.38390)]
+        lat = [-_dms(37, 57, 3.72030), -_dms(37, 39, 10.15610)]
+        container = GeometryContainer(Geometry('line', Part(lon, lat)))
+        self.assertAlmostEqual(container.geodesic_length()[0], 54972.271, 3)
+
+
+    def test_parts_and_rings(self):
+        geom = Geometry('line', [Part([0, 45], [0, 0]),
+                                 Part([45, 90], [0, 0])])
+        ring = Geometry('polygon', Part([0, 1, 1, 0, 0], [0, 0, 1, 1, 0]))
+        lines = GeometryContainer(geom)
+        self.assertAlmostEqual(lines.geodesic_length()[0], 10018754.171, 3)
+        perimeter = GeometryContainer(ring).geodesic_length('sphere')[0]
+        expected = 6371008.8 * np.radians(1) * (3 + np.cos(np.radians(1)))
+        self.assertAlmostEqual(perimeter / expected, 1, 4)
+
+
+    def test_float32(self):
+        ragged = RaggedArrays('line', np.float32([0, 1.1]),
+                              np.float32([0, 0.3]), node_count=[2])
+        self.assertEqual(geodesic_length(ragged)[0],
+                         geodesic_length(ragged.astype(np.float64))[0])
+
+
+    def test_antipodal(self):
+        ragged = RaggedArrays('line', [0, 179.9], [0, 0.1], node_count=[2])
+        length = geodesic_length(ragged)[0]
+        self.assertTrue(19990000 < length < 20010000)
+
+
+class TestGeodesicArea(AbstractNcgeomTest):
+    def test_octant(self):
+        ragged = RaggedArrays('polygon', [0, 90, 0], [0, 0, 90],
+                              node_count=[3])
+        area = geodesic_area(ragged, 'sphere')[0]
+        self.assertAlmostEqual(area / (4 * np.pi * 6371008.8 ** 2), 0.125)
+
+
+    def test_hole_and_antimeridian(self):
+        shell = Part([179, -179, -179, 179, 179], [0, 0, 2, 2, 0])
+        hole = Part([179.5, 179.5, -179.5, -179.5, 179.5],
+                    [0.5, 1.5, 1.5, 0.5, 0.5], is_hole=True)
+        cell = Part([0, 1, 1, 0, 0], [0, 0, 1, 1, 0])
+        container = GeometryContainer([Geometry('polygon', [shell, hole]),
+                                       Geometry('polygon', cell)])
+        areas = container.geodesic_area()
+        # Area of a one degree cell at the equator, from GeographicLib
+        self.assertAlmostEqual(areas[1] / 12308778361.469, 1, 6)
+        self.assertAlmostEqual(areas[0] / (areas[1] * 3), 1, 3)
+
+
+    def test_errors(self):
+        lines = RaggedArrays('line', [0, 1], [0, 1], node_count=[2])
+        with pytest.raises(ValueError):
+            geodesic_area(lines)
+        with pytest.raises(ValueError):
+            geodesic_length(RaggedArrays('point', [0], [0]))
+        with pytest.raises(ValueError):
+            geodesic_length(lines, 'bogus')
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, Part, FlowNetwork
+from ... ragged import RaggedArrays
+from .. base import AbstractNcgeomTest
+
+
+def _reach(x, y):
+    return Geometry('line', Part(x, y))
+
+
+class TestFlowNetwork(AbstractNcgeomTest):
+    def setUp(self):
+        # Two tributaries join, then flow through two reaches to an outlet.
+        # The last tributary ends just off the junction.
+        super(TestFlowNetwork, self).setUp()
+        self.container = GeometryContainer([
+            _reach([0, 1], [2, 1]),
+            _reach([2, 1], [2, 1]),
+            _reach([1, 1, 1], [1, 0.5, 0]),
+            _reach([1, 1], [0, -1]),
+            _reach([3, 1.001], [0, -0.001])])
+
+
+    def test_exact(self):
+        network = self.container.flow_network()
+        self.assertEqual(list(network.downstream(0)), [2, 3])
+        self.assertEqual(list(network.upstream(3)), [2, 0, 1])
+        self.assertEqual(list(network.upstream([2, 3], include_self=True)),
+                         [2, 3, 0, 1])
+        self.assertEqual(list(network.upstream(3, max_steps=1)), [2])
+        self.assertEqual(list(network.headwaters()), [0, 1, 4])
+        self.assertEqual(list(network.outlets()), [3, 4])
+
+
+    def test_tolerance(self):
+        network = self.container.flow_network(tolerance=0.01)
+        self.assertEqual(list(network.downstream(4)), [3])
+        self.assertEqual(list(network.upstream(3)), [2, 4, 0, 1])
+        self.assertEqual(len(network.down_indices), 4)
+
+
+    def test_float32(self):
+        container = self.container.astype(np.float32)
+        network = container.flow_network()
+        self.assertEqual(list(network.upstream(3)), [2, 0, 1])
+        self.assertEqual(list(network.outlets()), [3, 4])
+        network = container.flow_network(tolerance=0.01)
+        self.assertEqual(list(network.upstream(3)), [2, 4, 0, 1])
+
+
+    def test_cycle(self):
+        ragged = RaggedArrays('line', [0, 1, 1, 0], [0, 0, 0, 0],
+                              node_count=[2, 2])
+        network = FlowNetwork.from_ragged(ragged)
+        self.assertEqual(list(network.downstream(0)), [1])
+        self.assertEqual(list(network.downstream(0, include_self=True)),
+                         [0, 1])
+
+
+    def test_errors(self):
+        container = GeometryContainer(Geometry('point', Part(0, 0)))
+        with pytest.raises(ValueError):
+            container.flow_network()
+        network = self.container.flow_network()
+        with pytest.raises(ValueError):
+            network.downstream(5)
+        with pytest.raises(ValueError):
+            self.container.flow_network(tolerance=0)
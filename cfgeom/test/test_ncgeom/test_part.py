@@ -1,6 +1,7 @@
 import numpy as np
 import pytest
 
+from ... geometry import Geometry
 from ... part import Part, _compute_area, _is_clockwise
 from .. base import AbstractNcgeomTest
 
@@ -157,3 +158,16 @@ class TestReverse(AbstractNcgeomTest):
         part = Part(x, y)
         part.reverse()
         self.assertEqual(part.x, list(reversed(x)))
+
+
+    def test_reverse_orientation(self):
+        part = Part([0, 5, 10], [0, 5, 0])
+        self.assertEqual(part.is_clockwise(), True)
+        part.reverse()
+        self.assertEqual(part.is_clockwise(), False)
+        # Orienting twice leaves the nodes as oriented the first time
+        geom = Geometry('polygon', Part([0, 5, 10], [0, 5, 0]))
+        geom.orient()
+        x = list(geom.parts[0].x)
+        geom.orient()
+        self.assertEqual(geom.parts[0].x, x)
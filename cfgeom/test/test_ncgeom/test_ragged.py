@@ -0,0 +1,210 @@
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, Part
+from ... ragged import RaggedArrays
+from .. base import AbstractNcgeomTest
+
+
+x = [10, 5, 0]
+y = [0, 5, 0]
+x1 = [9, 5, 1]
+y1 = [1, 4, 1]
+z1 = [1, 1, 1]
+poly = Geometry('polygon', Part(x, y))
+poly_hole = Geometry('polygon', [Part(x, y), Part(x1, y1, z1, is_hole=True)])
+multi = Geometry('polygon', [Part(x, y), Part(x1, y1)])
+
+
+class TestInit(AbstractNcgeomTest):
+    def test_init_errors(self):
+        with pytest.raises(ValueError):
+            RaggedArrays('not a geom type', [1], [1])
+        with pytest.raises(ValueError):
+            RaggedArrays('point', [1, 2], [1])
+        with pytest.raises(ValueError):
+            RaggedArrays('line', [1, 2, 3], [1, 2, 3], node_count=[2])
+        with pytest.raises(ValueError):
+            # Second part spans both geometries
+            RaggedArrays('line', [1, 2, 3, 4], [1, 2, 3, 4],
+                         node_count=[3, 1], part_node_count=[2, 2])
+
+
+    def test_init_default_counts(self):
+        ragged = RaggedArrays('point', [1, 2], [3, 4])
+        self.assertEqual(list(ragged.node_count), [1, 1])
+        ragged = RaggedArrays('point', [1, 2, 3], [3, 4, 5], node_count=[1, 2])
+        self.assertEqual(list(ragged.part_node_count), [1, 1, 1])
+        ragged = RaggedArrays('line', [1, 2, 3], [3, 4, 5], node_count=[3])
+        self.assertEqual(list(ragged.part_node_count), [3])
+
+
+    def test_single_node(self):
+        # Counts of single points are only built when used
+        ragged = RaggedArrays('point', [1, 2, 3], [3, 4, 5],
+                              [np.nan, 1, np.nan])
+        self.assertEqual(len(ragged), 3)
+        self.assertFalse(ragged.has_hole() or ragged.is_multipart())
+        taken = ragged.take([2, 0])
+        self.assertEqual(list(taken.x), [3, 1])
+        self.assertIsNone(taken.z)
+        self.assertIsNone(ragged.copy()._counts()[0])
+        self.assertEqual(list(ragged.geom_part_offsets()), [0, 1, 2, 3])
+        self.assertIsNone(ragged._counts()[0])
+        self.assertEqual(list(ragged.node_count), [1, 1, 1])
+        self.assertEqual(list(ragged.is_hole), [False, False, False])
+        self.assertEqual(ragged.to_geoms()[1],
+                         Geometry('point', Part([2], [4], [1])))
+        with pytest.raises(ValueError):
+            RaggedArrays('point', [1, 2], [3, 4], is_hole=[False])
+
+
+class TestGeoms(AbstractNcgeomTest):
+    def test_round_trip(self):
+        geoms = [poly, poly_hole, multi]
+        ragged = RaggedArrays.from_geoms('polygon', geoms)
+        self.assertEqual(list(ragged.node_count), [3, 6, 6])
+        self.assertEqual(list(ragged.part_node_count), [3, 3, 3, 3, 3])
+        self.assertEqual(list(ragged.is_hole),
+                         [False, False, True, False, False])
+        self.assertEqual(list(ragged.geom_part_count()), [1, 2, 2])
+        self.assertEqual(ragged.to_geoms(), geoms)
+
+
+    def test_take(self):
+        ragged = RaggedArrays.from_geoms('polygon', [poly, poly_hole, multi])
+        taken = ragged.take([2, 0])
+        self.assertEqual(taken.to_geoms(), [multi, poly])
+        self.assertIsNone(ragged.take([0]).z)
+
+
+    def test_select_nodes(self):
+        ragged = RaggedArrays.from_geoms('line', [Geometry('line', Part(x, y))])
+        selected = ragged.select_nodes([True, False, True])
+        self.assertEqual(list(selected.x), [10, 0])
+        self.assertEqual(list(selected.node_count), [2])
+        with pytest.raises(ValueError):
+            ragged.select_nodes([False, False, False])
+
+
+    def test_bounds(self):
+        ragged = RaggedArrays.from_geoms('polygon', [poly, poly_hole])
+        self.assertEqual(ragged.bounds().tolist(),
+                         [[0, 0, 10, 5], [0, 0, 10, 5]])
+
+
+class TestOrient(AbstractNcgeomTest):
+    def test_orient(self):
+        geoms = [Geometry('polygon', [Part(x, y), Part(x1, y1, is_hole=True)])]
+        ragged = RaggedArrays.from_geoms('polygon', geoms)
+        self.assertEqual(list(ragged.is_clockwise()), [False, False])
+        ragged.orient(holes_clockwise=False)
+        container = GeometryContainer(geoms)
+        container.orient(holes_clockwise=False)
+        self.assertEqual(ragged.to_geoms(), container.geoms)
+        self.assertEqual(list(ragged.is_clockwise()), [True, False])
+
+
+class TestContainer(AbstractNcgeomTest):
+    def test_from_ragged(self):
+        ragged = RaggedArrays.from_geoms('polygon', [poly, poly_hole, multi])
+        container = GeometryContainer.from_ragged(ragged)
+        self.assertEqual(len(container), 3)
+        self.assertTrue(container.has_hole())
+        self.assertTrue(container.is_multipart())
+        self.assertTrue(container.has_z())
+        self.assertEqual(container.wkt_type(), 'MultiPolygon')
+        self.assertIs(container.to_ragged(), ragged)
+        self.assertEqual(container, GeometryContainer([poly, poly_hole, multi]))
+
+
+    def test_cached_buffers(self):
+        ragged = RaggedArrays.from_geoms('polygon', [poly, poly_hole])
+        container = GeometryContainer.from_ragged(ragged)
+        # Equal buffers are compared without building Geometry objects
+        other = GeometryContainer.from_ragged(ragged.copy())
+        self.assertEqual(container, other)
+        self.assertIsNone(container._geoms)
+        other.to_ragged().x[0] = 11
+        self.assertNotEqual(container, other)
+        # Reading geometries keeps the buffers
+        self.assertEqual(len(container.geoms), 2)
+        self.assertIs(container.to_ragged(), ragged)
+        container = GeometryContainer([poly, poly_hole])
+        self.assertIs(container.to_ragged(), container.to_ragged())
+        container.to_ragged().orient(holes_clockwise=False)
+        self.assertEqual(list(container.to_ragged().is_clockwise()),
+                         [True, True, False])
+
+
+    def test_edit_geometries(self):
+        # Buffers are rebuilt once edited geometries are reassigned
+        container = GeometryContainer.from_ragged(
+            RaggedArrays.from_geoms('polygon', [poly, poly_hole]))
+        geoms = container.geoms
+        part = Part([0, 1, 1], [0, 0, 1])
+        geoms[0] = Geometry('polygon', part)
+        geoms[1].parts.pop()
+        container.geoms = geoms
+        self.assertEqual(list(container.to_ragged().x[:3]), [0, 1, 1])
+        self.assertEqual(len(container.to_ragged().x), 6)
+
+
+class TestTransform(AbstractNcgeomTest):
+    def test_matrix(self):
+        ragged = RaggedArrays.from_geoms('polygon', [poly, poly_hole])
+        moved = ragged.transform([[1, 0, 2], [0, 1, -1]])
+        self.assertEqual(list(moved.x[:3]), [12, 7, 2])
+        self.assertEqual(list(moved.y[:3]), [-1, 4, -1])
+        self.assertIs(moved.node_count, ragged.node_count)
+        self.assertEqual(list(ragged.x[:3]), [10, 5, 0])
+        scaled = ragged.transform(np.diag([1, 1, 2, 1]))
+        self.assertEqual(list(scaled.z[-3:]), [2, 2, 2])
+        self.assertEqual(list(scaled.x), list(ragged.x))
+
+
+    def test_function_chunks(self):
+        ragged = RaggedArrays.from_geoms('polygon', [poly, multi])
+        whole = ragged.transform(lambda x, y: (x * 2, y + x))
+        ragged.transform(lambda x, y: (x * 2, y + x), inplace=True,
+                         chunk_size=4)
+        self.assertEqual(list(ragged.x), list(whole.x))
+        self.assertEqual(list(ragged.y), list(whole.y))
+
+
+    def test_shared_coords(self):
+        # Buffers over slices of the same arrays are changed independently
+        ragged = RaggedArrays('polygon', [0, 1, 0, 5, 5, 6], [0, 0, 1, 0, 1, 0],
+                              node_count=[3, 3])
+        head = RaggedArrays('polygon', ragged.x[:3], ragged.y[:3],
+                            node_count=[3])
+        ragged._shares_coords = head._shares_coords = True
+        head.transform([[1, 0, 2], [0, 1, 0]], inplace=True)
+        self.assertEqual(list(ragged.x), [0, 1, 0, 5, 5, 6])
+        self.assertEqual(list(head.x), [2, 3, 2])
+        ragged.orient()
+        self.assertEqual(list(ragged.x), [0, 1, 0, 6, 5, 5])
+        self.assertEqual(list(head.x), [2, 3, 2])
+
+
+    def test_errors(self):
+        ragged = RaggedArrays.from_geoms('polygon', [poly])
+        with pytest.raises(ValueError):
+            ragged.transform(np.eye(4))
+        with pytest.raises(ValueError):
+            ragged.transform([[1, 0, 0], [0, 1, 0], [1, 0, 1]])
+        with pytest.raises(ValueError):
+            ragged.transform(np.eye(2))
+        with pytest.raises(ValueError):
+            ragged.transform(np.eye(3), chunk_size=0)
+
+
+    def test_container(self):
+        container = GeometryContainer([poly, multi])
+        self.assertEqual(container.geoms[0].parts[0].is_clockwise(), False)
+        moved = container.transform([[-1, 0, 0], [0, 1, 0]], inplace=False)
+        self.assertEqual(list(container.geoms[0].parts[0].x), x)
+        self.assertEqual(list(moved.geoms[0].parts[0].x), [-10, -5, 0])
+        container.transform([[-1, 0, 0], [0, 1, 0]])
+        self.assertEqual(container, moved)
+        self.assertEqual(container.geoms[0].parts[0].is_clockwise(), True)
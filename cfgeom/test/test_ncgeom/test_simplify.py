@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, Part
+from ... ragged import RaggedArrays
+from ... simplify import simplify
+from .. base import AbstractNcgeomTest
+
+
+line_x = [0, 1, 2, 3, 4, 5]
+line_y = [0, 0.1, -0.1, 5, 6, 7]
+square_x = [0, 1, 2, 2, 2, 1, 0, 0, 0]
+square_y = [0, 0.01, 0, 1, 2, 2, 2, 1, 0]
+
+
+class TestDouglasPeucker(AbstractNcgeomTest):
+    def test_line(self):
+        container = GeometryContainer(Geometry('line', Part(line_x, line_y)))
+        result = container.simplify(0.5)
+        self.assertEqual(result.geoms[0].parts[0].x, [0, 2, 3, 5])
+        # Only the collinear node is removed
+        result = container.simplify(0)
+        self.assertEqual(result.geoms[0].parts[0].x, [0, 1, 2, 3, 5])
+
+
+    def test_ring_keeps_three_distinct_nodes(self):
+        geom = Geometry('polygon', Part(square_x, square_y))
+        container = GeometryContainer(geom)
+        result = container.simplify(0.5)
+        self.assertEqual(result.geoms[0].parts[0].x, [0, 2, 2, 0, 0])
+        result = container.simplify(100)
+        part = result.geoms[0].parts[0]
+        self.assertEqual(len(part.x), 4)
+        self.assertEqual(len(set(zip(part.x, part.y))), 3)
+
+
+    def test_points_unchanged(self):
+        container = GeometryContainer(Geometry('point', Part(1, 2)))
+        self.assertEqual(container.simplify(10), container)
+
+
+class TestVisvalingam(AbstractNcgeomTest):
+    def test_line(self):
+        container = GeometryContainer(Geometry('line', Part(line_x, line_y)))
+        result = container.simplify(0.5, method='visvalingam')
+        self.assertEqual(result.geoms[0].parts[0].x, [0, 2, 3, 5])
+
+
+    def test_ring_keeps_three_distinct_nodes(self):
+        geom = Geometry('polygon', Part(square_x, square_y))
+        container = GeometryContainer(geom)
+        result = container.simplify(100, method='visvalingam')
+        self.assertEqual(len(result.geoms[0].parts[0].x), 4)
+
+
+class TestErrors(AbstractNcgeomTest):
+    def test_errors(self):
+        ragged = RaggedArrays('line', [0, 1], [0, 1], node_count=[2])
+        with pytest.raises(ValueError):
+            simplify(ragged, 1, method='bogus')
+        with pytest.raises(ValueError):
+            simplify(ragged, -1)
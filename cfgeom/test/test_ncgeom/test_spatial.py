@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, Part
+from ... convert.netcdf.nc_reader import read_netcdf
+from ... spatial import GridIndex, hilbert_keys, morton_keys
+from .. base import AbstractNcgeomTest
+
+
+class TestKeys(AbstractNcgeomTest):
+    def test_hilbert_keys(self):
+        x = [0, 0, 1, 1]
+        y = [0, 1, 1, 0]
+        self.assertEqual(list(hilbert_keys(x, y, order=1)), [0, 1, 2, 3])
+        # Consecutive keys on a finer grid are always neighboring cells
+        gx, gy = np.meshgrid(np.arange(8), np.arange(8))
+        keys = hilbert_keys(gx.ravel(), gy.ravel(), order=3)
+        order = np.argsort(keys)
+        steps = (np.abs(np.diff(gx.ravel()[order])) +
+                 np.abs(np.diff(gy.ravel()[order])))
+        self.assertTrue(np.all(steps == 1))
+
+
+    def test_morton_keys(self):
+        x = [0, 1, 0, 1, 3]
+        y = [0, 0, 1, 1, 3]
+        self.assertEqual(list(morton_keys(x, y, order=2)), [0, 1, 2, 3, 15])
+
+
+class TestSortSpatial(AbstractNcgeomTest):
+    def test_sort_spatial(self):
+        locations = [(0, 0), (10, 10), (1, 1), (10, 0), (0, 10)]
+        geoms = [Geometry('point', Part(x, y)) for x, y in locations]
+        data = np.arange(len(geoms))
+        for curve in ['hilbert', 'morton']:
+            container = GeometryContainer(list(geoms))
+            permutation = container.sort_spatial(curve)
+            self.assertEqual(container.geoms, [geoms[i] for i in permutation])
+            self.assertEqual(list(container.to_ragged().x),
+                             [locations[i][0] for i in permutation])
+            self.assertEqual(list(data[permutation][:2]), [0, 2])
+        with pytest.raises(ValueError):
+            container.sort_spatial('bogus')
+
+
+    def test_write_sorted(self):
+        geoms = [Geometry('line', Part([x, x + 1], [0, 1])) for x in [5, 0, 9]]
+        container = GeometryContainer(geoms)
+        path = self.get_temporary_file_path('foo.nc')
+        self.assertIsNone(container.to_netcdf(path))
+        permutation = container.to_netcdf(path, sort_spatial='hilbert')
+        self.assertEqual(list(permutation), [1, 0, 2])
+        # The container keeps its order; the file holds the sorted one
+        self.assertEqual(container.geoms, geoms)
+        loaded = read_netcdf(path)['geometry_container']['container']
+        self.assertEqual(loaded.geoms, [geoms[i] for i in permutation])
+
+
+class TestLocatePoints(AbstractNcgeomTest):
+    def test_grid_index(self):
+        index = GridIndex([[0, 0, 1, 1], [0.5, 0.5, 3, 3], [5, 5, 5, 5]])
+        point, item = index.query_points([0.75, 2, 5, 9, np.nan],
+                                         [0.75, 2, 5, 9, 0])
+        self.assertEqual(list(point), [0, 0, 1, 2])
+        self.assertEqual(list(item), [0, 1, 1, 2])
+
+
+    def test_locate_points(self):
+        square = Part([0, 0, 4, 4, 0], [0, 4, 4, 0, 0])
+        hole = Part([1, 3, 3, 1, 1], [1, 1, 3, 3, 1], is_hole=True)
+        island = Part([1.5, 1.5, 2.5, 2.5, 1.5], [1.5, 2.5, 2.5, 1.5, 1.5])
+        far = Part([10, 10, 11, 11], [10, 11, 11, 10])
+        container = GeometryContainer([
+            Geometry('polygon', [square, hole, island]),
+            Geometry('polygon', far),
+            Geometry('polygon', square)])
+        x = [0.5, 1.25, 2, 10.5, 5, -1]
+        y = [0.5, 1.25, 2, 10.5, 5, 2]
+        # Points in the hole fall in the last polygon, which has no hole
+        self.assertEqual(list(container.locate_points(x, y)),
+                         [0, 2, 0, 1, -1, -1])
+        with pytest.raises(ValueError):
+            GeometryContainer(Geometry('line', Part([0, 1], [0, 1]))
+                              ).locate_points([0], [0])
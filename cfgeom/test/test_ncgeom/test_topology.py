@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, Part, Topology
+from ... convert.netcdf.nc_reader import read_netcdf
+from .. base import AbstractNcgeomTest
+
+
+def _square(x, y, step=0.25):
+    edge = np.arange(0, 1 + step, step)[:-1]
+    xs = np.concatenate((x + edge, np.full(len(edge), x + 1),
+                         x + 1 - edge, np.full(len(edge), x)))
+    ys = np.concatenate((np.full(len(edge), y), y + edge,
+                         np.full(len(edge), y + 1), y + 1 - edge))
+    # Close the ring
+    return Geometry('polygon', Part(list(xs) + [x], list(ys) + [y]))
+
+
+class TestTopology(AbstractNcgeomTest):
+    def test_shared_edge(self):
+        container = GeometryContainer([_square(0, 0), _square(1, 0)])
+        topology = container.to_topology()
+        # The shared edge has 5 nodes and is stored once, but the first ring is
+        # also cut where it starts, repeating 3 nodes at the ends of its arcs
+        self.assertEqual(len(container.to_ragged().x), 34)
+        self.assertEqual(len(topology.arc_x), 32)
+        self.assertEqual(list(topology.part_arc_count), [3, 2])
+        self.assertEqual(list(topology.arc_node_count), [5, 5, 9, 13])
+        # Neighbors traverse the shared arc in opposite directions
+        shared = set(topology.arc_index[:3]) & set(~topology.arc_index[3:])
+        self.assertEqual(len(shared), 1)
+        self.assertEqual(GeometryContainer.from_topology(topology), container)
+
+
+    def test_round_trip(self):
+        geoms = [_square(x, y) for x in range(3) for y in range(3)]
+        geoms.append(Geometry('polygon', [
+            Part([10, 20, 20, 10], [10, 10, 20, 20]),
+            Part([12, 14, 14], [12, 12, 14], is_hole=True)]))
+        container = GeometryContainer(geoms)
+        ragged = container.to_ragged()
+        topology = Topology.from_ragged(ragged)
+        self.assertLess(len(topology.arc_x), len(ragged.x))
+        rebuilt = topology.to_ragged()
+        for name in ['x', 'y', 'node_count', 'part_node_count', 'is_hole']:
+            self.assertTrue(np.array_equal(getattr(rebuilt, name),
+                                           getattr(ragged, name)))
+
+
+    def test_lines(self):
+        geoms = [Geometry('line', Part([0, 1, 2], [0, 1, 2])),
+                 Geometry('line', Part([2, 1, 0], [2, 1, 0])),
+                 Geometry('line', [Part([5, 6], [5, 6]), Part([7, 8], [7, 8])]),
+                 Geometry('line', Part([0, 1, 3], [0, 1, 0]))]
+        container = GeometryContainer(geoms)
+        topology = container.to_topology()
+        # The first two lines are cut where the last line leaves them
+        self.assertEqual(list(topology.part_arc_count), [2, 2, 1, 1, 2])
+        self.assertEqual(list(topology.arc_index[:4]), [0, 1, ~1, ~0])
+        self.assertEqual(list(topology.arc_index[6:]), [0, 4])
+        self.assertEqual(GeometryContainer.from_topology(topology), container)
+
+
+    def test_float32(self):
+        geoms = [_square(0, 0), _square(1, 0)]
+        for geom, z in zip(geoms, [1.5, 2.5]):
+            geom.parts[0].z = [z] * len(geom.parts[0].x)
+        container = GeometryContainer(geoms)
+        single = container.astype(np.float32)
+        topology = single.to_topology()
+        expected = container.to_topology()
+        self.assertEqual(topology.arc_x.dtype, np.float32)
+        self.assertEqual(list(topology.arc_index), list(expected.arc_index))
+        self.assertTrue(np.array_equal(topology.arc_z, expected.arc_z))
+        self.assertEqual(GeometryContainer.from_topology(topology), container)
+        path = self.get_temporary_file_path('foo.nc')
+        single.to_netcdf(path, use_topology=True)
+        loaded = read_netcdf(path)['geometry_container']['container']
+        self.assertEqual(loaded, container)
+
+
+    def test_points(self):
+        container = GeometryContainer(Geometry('point', Part([0], [0])))
+        with pytest.raises(ValueError):
+            container.to_topology()
+        path = self.get_temporary_file_path('foo.nc')
+        with pytest.raises(ValueError):
+            container.to_netcdf(path, use_topology=True)
@@ -0,0 +1,85 @@
+import numpy as np
+
+from ... import GeometryContainer, Geometry, Part
+from ... ragged import RaggedArrays
+from ... validate import Errors, repair, validate
+from .. base import AbstractNcgeomTest
+
+
+class TestValidate(AbstractNcgeomTest):
+    def setUp(self):
+        # Valid closed square, unclosed square with a repeated node, ring
+        # with a NaN node, hole before its exterior, degenerate ring
+        super(TestValidate, self).setUp()
+        nan = np.nan
+        x = [0, 1, 1, 0, 0,
+             0, 1, 1, 1, 0,
+             0, nan, 1, 0,
+             0.2, 0.8, 0.5, 0, 1, 1, 0,
+             5, 6, 5]
+        y = [0, 0, 1, 1, 0,
+             0, 0, 0, 1, 1,
+             0, 0, 1, 0,
+             0.2, 0.2, 0.8, 0, 0, 1, 0,
+             5, 5, 5]
+        self.ragged = RaggedArrays(
+            'polygon', x, y, node_count=[5, 5, 4, 7, 3],
+            part_node_count=[5, 5, 4, 3, 4, 3],
+            is_hole=[False, False, False, True, False, False])
+
+
+    def test_validate(self):
+        errors = validate(self.ragged)
+        self.assertEqual(errors[0], 0)
+        self.assertEqual(errors[1],
+                         Errors.DUPLICATE_NODE | Errors.UNCLOSED_RING)
+        self.assertEqual(errors[2],
+                         Errors.NAN_COORDINATE | Errors.TOO_FEW_NODES)
+        self.assertEqual(errors[3], Errors.HOLE_FIRST | Errors.UNCLOSED_RING)
+        self.assertEqual(errors[4], Errors.TOO_FEW_NODES)
+        container = GeometryContainer.from_ragged(self.ragged)
+        self.assertEqual(list(container.validate()), list(errors))
+
+
+    def test_repair(self):
+        repaired, index = repair(self.ragged, return_index=True)
+        self.assertEqual(list(index), [0, 1, 3])
+        self.assertTrue(np.all(validate(repaired) == 0))
+        self.assertEqual(list(repaired.node_count), [5, 5, 8])
+        self.assertEqual(list(repaired.x[5:10]), [0, 1, 1, 0, 0])
+        self.assertEqual(list(repaired.is_hole), [False, False, False, True])
+        self.assertEqual(list(repaired.x[10:14]), [0, 1, 1, 0])
+        self.assertEqual(list(repaired.x[14:]), [0.2, 0.8, 0.5, 0.2])
+
+
+    def test_only_holes(self):
+        ragged = RaggedArrays('polygon', [0, 1, 1], [0, 0, 1],
+                              node_count=[3], is_hole=[True])
+        repaired = repair(ragged)
+        self.assertEqual(list(repaired.is_hole), [False])
+        self.assertEqual(list(repaired.node_count), [4])
+
+
+    def test_lines_and_points(self):
+        ragged = RaggedArrays('line', [0, 0, 1, 2, 2], [0, 0, 0, 0, 0],
+                              node_count=[2, 3])
+        self.assertEqual(list(validate(ragged)),
+                         [Errors.DUPLICATE_NODE | Errors.TOO_FEW_NODES,
+                          Errors.DUPLICATE_NODE])
+        repaired, index = repair(ragged, return_index=True)
+        self.assertEqual(list(index), [1])
+        self.assertEqual(list(repaired.x), [1, 2])
+        ragged = RaggedArrays('point', [0, np.nan], [0, 1])
+        self.assertEqual(list(validate(ragged)), [0, Errors.NAN_COORDINATE |
+                                                Errors.TOO_FEW_NODES])
+
+
+    def test_container(self):
+        container = GeometryContainer([
+            Geometry('line', Part([0, 1], [0, 1], [1, 1])),
+            Geometry('line', Part([0, 0], [0, 0]))])
+        repaired, index = container.repair(return_index=True)
+        self.assertEqual(list(index), [0])
+        self.assertEqual(repaired.geoms, container.geoms[:1])
+        self.assertIsNone(GeometryContainer.from_ragged(
+            RaggedArrays('point', [np.nan], [0])).repair())
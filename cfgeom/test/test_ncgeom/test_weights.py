@@ -0,0 +1,119 @@
+from unittest import mock
+
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, OverlapWeights, Part
+from ... import weights as weights_module
+from ... weights import grid_cells
+from .. base import AbstractNcgeomTest
+
+
+def _container():
+    # A 2 x 2 square with a 1 x 1 hole, and a triangle
+    outer = Part([0.5, 2.5, 2.5, 0.5], [0.5, 0.5, 2.5, 2.5])
+    hole = Part([1, 1, 2, 2], [1, 2, 2, 1], is_hole=True)
+    triangle = Part([0, 1, 0], [0, 0, 1])
+    return GeometryContainer([Geometry('polygon', [outer, hole]),
+                              Geometry('polygon', triangle)])
+
+
+def _dense(weights):
+    dense = np.zeros(weights.shape)
+    rows = np.repeat(np.arange(weights.shape[0]), weights.counts())
+    dense[rows, weights.cells] = weights.areas
+    return dense
+
+
+class TestGridCells(AbstractNcgeomTest):
+    def test_grid_cells(self):
+        cell_x, cell_y, grid_shape = grid_cells([0, 1, 2], [[5, 4]])
+        self.assertEqual(grid_shape, (1, 2))
+        self.assertEqual(cell_x.tolist(), [[0, 1, 1, 0], [1, 2, 2, 1]])
+        # Clockwise cells are reversed
+        self.assertEqual(cell_y.tolist(), [[4, 4, 5, 5], [4, 4, 5, 5]])
+        with pytest.raises(ValueError):
+            grid_cells([0], [0, 1])
+
+
+class TestOverlapWeights(AbstractNcgeomTest):
+    def test_regular_grid(self):
+        weights = _container().overlap_weights([0, 1, 2, 3], [0, 1, 2, 3])
+        self.assertEqual(weights.shape, (2, 9))
+        expected = np.zeros((2, 9))
+        expected[0] = [0.25, 0.5, 0.25, 0.5, 0, 0.5, 0.25, 0.5, 0.25]
+        expected[1, 0] = 0.5
+        self.assertTrue(np.allclose(_dense(weights), expected))
+        # The cell within the hole is not stored
+        self.assertEqual(list(weights.counts()), [8, 1])
+
+        # Descending bounds reverse the rows
+        weights = _container().overlap_weights([0, 1, 2, 3], [3, 2, 1, 0])
+        flipped = expected.reshape(2, 3, 3)[:, ::-1].reshape(2, 9)
+        self.assertTrue(np.allclose(_dense(weights), flipped))
+
+
+    def test_regular_bounds(self):
+        # Bounds of shape (n, 2) match edges, without building cell corners
+        expected = _dense(_container().overlap_weights([0, 1, 2, 3],
+                                                       [0, 1, 2, 3]))
+        bounds = [[0, 1], [1, 2], [2, 3]]
+        with mock.patch.object(weights_module, 'grid_cells',
+                               side_effect=AssertionError):
+            weights = _container().overlap_weights(bounds, bounds)
+        self.assertEqual(weights.shape, (2, 9))
+        self.assertTrue(np.allclose(_dense(weights), expected))
+        self.assertEqual(list(weights.counts()), [8, 1])
+
+
+    def test_curvilinear_grid(self):
+        # Rotate a fine grid; total overlap is the polygon area
+        gx, gy = np.meshgrid(np.linspace(-2, 4, 13), np.linspace(-2, 4, 13))
+        angle = 0.3
+        x = gx * np.cos(angle) - gy * np.sin(angle)
+        y = gx * np.sin(angle) + gy * np.cos(angle)
+        corners = [(slice(None, -1), slice(None, -1)),
+                   (slice(None, -1), slice(1, None)),
+                   (slice(1, None), slice(1, None)),
+                   (slice(1, None), slice(None, -1))]
+        x_bounds = np.stack([x[c] for c in corners], axis=-1)
+        y_bounds = np.stack([y[c] for c in corners], axis=-1)
+        weights = _container().overlap_weights(x_bounds, y_bounds)
+        self.assertEqual(weights.grid_shape, (12, 12))
+        self.assertTrue(np.allclose(_dense(weights).sum(axis=1), [3, 0.5]))
+
+
+    def test_aggregate(self):
+        weights = _container().overlap_weights([0, 1, 2, 3], [0, 1, 2, 3])
+        values = np.arange(9, dtype=float).reshape(3, 3)
+        means = weights.aggregate(np.stack((values, values * 2)))
+        self.assertTrue(np.allclose(means, [[4, 0], [8, 0]]))
+        values[0, 0] = np.nan
+        self.assertTrue(np.isnan(weights.aggregate(values)[1]))
+        with pytest.raises(ValueError):
+            weights.aggregate(np.zeros((2, 2)))
+
+
+    def test_to_scipy(self):
+        pytest.importorskip('scipy')
+        weights = _container().overlap_weights([0, 1, 2, 3], [0, 1, 2, 3])
+        matrix = weights.to_scipy()
+        self.assertEqual(matrix.shape, (2, 9))
+        self.assertTrue(np.allclose(matrix.toarray(), _dense(weights)))
+
+
+    def test_netcdf(self):
+        weights = _container().overlap_weights([0, 1, 2, 3], [0, 1, 2, 3])
+        path = self.get_temporary_file_path('foo.nc')
+        weights.to_netcdf(path)
+        loaded = OverlapWeights.from_netcdf(path)
+        self.assertEqual(loaded.grid_shape, (3, 3))
+        self.assertEqual(list(loaded.indptr), list(weights.indptr))
+        self.assertEqual(list(loaded.cells), list(weights.cells))
+        self.assertTrue(np.allclose(loaded.areas, weights.areas))
+
+
+    def test_errors(self):
+        container = GeometryContainer(Geometry('line', Part([0, 1], [0, 1])))
+        with pytest.raises(ValueError):
+            container.overlap_weights([0, 1], [0, 1])
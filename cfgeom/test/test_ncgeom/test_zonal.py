@@ -0,0 +1,96 @@
+from unittest import mock
+
+from netCDF4 import Dataset
+import numpy as np
+import pytest
+
+from ... import GeometryContainer, Geometry, Part
+from ... import zonal
+from ... zonal import zonal_stats
+from .. base import AbstractNcgeomTest
+
+
+def _write_grid(path, values):
+    with Dataset(path, 'w') as ds:
+        ds.createDimension('time', values.shape[0])
+        ds.createDimension('y', values.shape[1])
+        ds.createDimension('x', values.shape[2])
+        v_time = ds.createVariable('time', np.float64, ('time',))
+        v_time.units = 'days since 2000-01-01'
+        v_time[:] = np.arange(values.shape[0])
+        v_precip = ds.createVariable('precip', np.float64,
+                                     ('time', 'y', 'x'))
+        v_precip.units = 'mm'
+        v_precip[:] = values
+
+
+class TestZonalStats(AbstractNcgeomTest):
+    def setUp(self):
+        super(TestZonalStats, self).setUp()
+        # Covers all of cell 0 and half of cell 1 of a 2 x 2 grid
+        self.container = GeometryContainer([
+            Geometry('polygon', Part([0, 1.5, 1.5, 0], [0, 0, 1, 1])),
+            Geometry('polygon', Part([5, 6, 6], [5, 5, 6]))])
+        self.weights = self.container.overlap_weights([0, 1, 2], [0, 1, 2])
+        self.values = np.arange(5 * 4, dtype=float).reshape(5, 2, 2)
+        self.grid_path = self.get_temporary_file_path('grid.nc')
+        _write_grid(self.grid_path, self.values)
+
+
+    def test_zonal_stats(self):
+        result = zonal_stats(self.weights, self.grid_path, 'precip',
+                             stats=['mean', 'sum', 'min', 'max'],
+                             chunk_size=2)
+        first = self.values[:, 0, 0]
+        second = self.values[:, 0, 1]
+        self.assertEqual(result['mean'].shape, (2, 5))
+        self.assertTrue(np.allclose(result['mean'][0],
+                                    (first + 0.5 * second) / 1.5))
+        self.assertTrue(np.allclose(result['sum'][0], first + 0.5 * second))
+        self.assertTrue(np.allclose(result['min'][0], first))
+        self.assertTrue(np.allclose(result['max'][0], second))
+        # The second polygon is outside the grid
+        self.assertTrue(np.all(np.isnan(result['mean'][1])))
+
+
+    def test_default_blocks(self):
+        # Blocks hold as many time steps as fit in the byte budget, here 2
+        expected = zonal_stats(self.weights, self.grid_path, 'precip',
+                               chunk_size=5)['mean']
+        reads = []
+        aggregate = self.weights.aggregate
+
+        def record(block, stat):
+            reads.append(len(block))
+            return aggregate(block, stat)
+
+        with mock.patch.object(zonal, '_chunk_bytes', 2 * 4 * 8 + 1), \
+                mock.patch.object(self.weights, 'aggregate', record):
+            result = zonal_stats(self.weights, self.grid_path, 'precip')
+        self.assertEqual(reads, [2, 2, 1])
+        self.assertTrue(np.array_equal(result['mean'], expected,
+                                       equal_nan=True))
+
+
+    def test_write_zonal_stats(self):
+        path = self.get_temporary_file_path('geoms.nc')
+        self.container.to_netcdf(path)
+        zonal_stats(self.weights, self.grid_path, 'precip', target=path,
+                    stats=['mean', 'max'], chunk_size=3)
+        with Dataset(path) as ds:
+            v_mean = ds.variables['precip_mean']
+            self.assertEqual(v_mean.dimensions, ('instance', 'time'))
+            self.assertEqual(v_mean.geometry, 'geometry_container')
+            self.assertEqual(v_mean.cell_methods, 'area: mean')
+            self.assertEqual(v_mean.units, 'mm')
+            self.assertEqual(list(ds.variables['time'][:]), list(range(5)))
+            self.assertTrue(np.allclose(ds.variables['precip_max'][0],
+                                        self.values[:, 0, 1]))
+
+
+    def test_errors(self):
+        with pytest.raises(ValueError):
+            zonal_stats(self.weights, self.grid_path, 'precip',
+                        stats=['median'])
+        with pytest.raises(ValueError):
+            zonal_stats(self.weights, self.grid_path, 'time')
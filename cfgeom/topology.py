@@ -0,0 +1,355 @@
+"""Stores line and polygon parts as shared arcs.
+
+Neighboring polygons usually repeat the nodes of the boundary they share, once
+for each polygon. A topology stores each shared run of nodes once, as an arc,
+and describes each part as a sequence of references to arcs. References are
+signed in the manner of TopoJSON: arc i is referenced as i when traversed in
+stored order and as ~i (i.e., -i - 1) when traversed in reverse. Consecutive
+arcs of a part share their end nodes.
+
+Shared runs are found by hashing the segments between consecutive nodes.
+Nodes are identified by exact coordinate equality.
+"""
+
+import numpy as np
+
+from . ragged import RaggedArrays, _as_coords, _offsets, _range_index
+
+
+_hash_base = np.uint64(0x9E3779B97F4A7C15)
+"""numpy.uint64: Multiplier used to hash sequences of node ids."""
+
+
+def _group_rows(keys):
+    """Groups identical rows of an integer array.
+
+    Args:
+        keys (numpy.ndarray(int)): Two-dimensional array of keys.
+
+    Returns:
+        Tuple of numpy.ndarray(int) with the group of each row, numbered in
+        sorted order of the keys, and the index of the first row in each group.
+
+    """
+    order = np.lexsort(keys.T[::-1])
+    ordered = keys[order]
+    is_new = np.ones(len(keys), dtype=bool)
+    is_new[1:] = np.any(ordered[1:] != ordered[:-1], axis=1)
+    group = np.empty(len(keys), dtype=np.int_)
+    group[order] = np.cumsum(is_new) - 1
+    return group, order[is_new]
+
+
+def _sort_rows(columns):
+    """Sorts rows of integer columns so identical rows are adjacent.
+
+    Rows are hashed into single integers, which sort much faster than rows.
+    Rows are sorted by value instead if two differing rows share a hash.
+
+    Args:
+        columns (list(numpy.ndarray(int64))): Columns of keys, each with one
+            item per row.
+
+    Returns:
+        Tuple of numpy.ndarray with the order of the rows, and a flag for each
+        position in that order that is True if the row there differs from the
+        row before it.
+
+    """
+    hashed = np.zeros(len(columns[0]), dtype=np.uint64)
+    with np.errstate(over='ignore'):
+        for k, column in enumerate(columns):
+            hashed = (hashed << np.uint64(23) | hashed >> np.uint64(41)) ^ \
+                np.asarray(column, dtype=np.int64).view(np.uint64)
+            hashed *= _hash_base + np.uint64(2 * k)
+    order = np.argsort(hashed)
+    sorted_hash = hashed[order]
+    is_new = np.ones(len(hashed), dtype=bool)
+    is_new[1:] = sorted_hash[1:] != sorted_hash[:-1]
+    repeat = np.flatnonzero(~is_new[1:])
+    first = order[repeat]
+    second = order[repeat + 1]
+    if any(np.any(c[first] != c[second]) for c in columns):
+        order = np.lexsort(columns[::-1])
+        is_new[1:] = False
+        for column in columns:
+            ordered = column[order]
+            is_new[1:] |= ordered[1:] != ordered[:-1]
+    return order, is_new
+
+
+def _node_ids(ragged):
+    """Assigns the same id to nodes with identical coordinates.
+
+    Args:
+        ragged (RaggedArrays): Geometry buffers.
+
+    Returns:
+        numpy.ndarray(int): Id of each node.
+
+    """
+    columns = [ragged.x, ragged.y]
+    if ragged.z is not None:
+        columns.append(ragged.z)
+    # Compare bits, treating -0.0 as 0.0 and all NaN values as equal
+    keys = np.column_stack([np.where(c == 0, 0.0, c).astype(np.float64)
+                            for c in columns])
+    keys[np.isnan(keys)] = np.nan
+    ids, _ = _group_rows(keys.view(np.int64))
+    return ids
+
+
+def _segment_signatures(ids, node_part, segment_start):
+    """Identifies the parts sharing each segment.
+
+    Args:
+        ids (numpy.ndarray(int)): Id of each node.
+        node_part (numpy.ndarray(int)): Part index of each node.
+        segment_start (numpy.ndarray(int)): Index of the first node of each
+            segment. Segments run to the following node.
+
+    Returns:
+        numpy.ndarray(int): Array with one row per segment and three columns
+        summarizing the parts sharing the segment: count of occurrences, and
+        smallest and largest part index.
+
+    """
+    a = ids[segment_start]
+    b = ids[segment_start + 1]
+    pairs = np.column_stack((np.minimum(a, b), np.maximum(a, b)))
+    group, _ = _group_rows(pairs)
+    part = node_part[segment_start]
+    order = np.argsort(group, kind='stable')
+    starts = np.flatnonzero(np.r_[True, np.diff(group[order]) != 0])
+    size = np.diff(np.r_[starts, len(order)])
+    low = np.minimum.reduceat(part[order], starts)
+    high = np.maximum.reduceat(part[order], starts)
+    return np.column_stack((size, low, high))[group]
+
+
+def _hash_sequences(ids, counts):
+    """Hashes sequences of node ids.
+
+    Args:
+        ids (numpy.ndarray(int)): Node ids of all sequences, concatenated.
+        counts (numpy.ndarray(int)): Length of each sequence.
+
+    Returns:
+        numpy.ndarray(uint64): Hash of each sequence.
+
+    """
+    position = np.arange(len(ids)) - np.repeat(np.cumsum(counts) - counts,
+                                               counts)
+    powers = np.full(max(counts.max(), 1), _hash_base, dtype=np.uint64)
+    powers = np.multiply.accumulate(powers)
+    terms = (ids.astype(np.uint64) + np.uint64(1)) * powers[position]
+    return np.add.reduceat(terms, np.cumsum(counts) - counts)
+
+
+def arc_node_index(arc_node_count, arc_index, part_arc_count):
+    """Finds the arc nodes making up each part.
+
+    Args:
+        arc_node_count (array-like(int)): Count of nodes in each arc.
+        arc_index (array-like(int)): Signed arc references of all parts,
+            concatenated.
+        part_arc_count (array-like(int)): Count of arc references in each part.
+
+    Returns:
+        numpy.ndarray(int): Index into the arc node arrays for each node of
+        each part, in order.
+
+    """
+    arc_node_count = np.asarray(arc_node_count, dtype=np.int_)
+    arc_index = np.asarray(arc_index, dtype=np.int_)
+    part_arc_count = np.asarray(part_arc_count, dtype=np.int_)
+    arc_offsets = _offsets(arc_node_count)
+    is_reversed = arc_index < 0
+    arc = np.where(is_reversed, ~arc_index, arc_index)
+    counts = arc_node_count[arc]
+    # Every arc after the first in a part skips the node it shares with the
+    # preceding arc
+    first_in_part = np.zeros(len(arc_index), dtype=bool)
+    first_in_part[(np.cumsum(part_arc_count) - part_arc_count)[
+        part_arc_count > 0]] = True
+    skip = (~first_in_part).astype(np.int_)
+    used = counts - skip
+    step = _range_index(skip, used)
+    ref = np.repeat(np.arange(len(arc_index)), used)
+    return np.where(is_reversed[ref],
+                    arc_offsets[arc[ref] + 1] - 1 - step,
+                    arc_offsets[arc[ref]] + step)
+
+
+class Topology(object):
+    """Contains line or polygon geometries stored as shared arcs.
+
+    Attributes:
+        geom_type (str): Geometry type, either line or polygon.
+        arc_x (numpy.ndarray): X coordinates of all arc nodes.
+        arc_y (numpy.ndarray): Y coordinates of all arc nodes.
+        arc_z (numpy.ndarray or None): Z coordinates of all arc nodes, if any.
+        arc_node_count (numpy.ndarray): Count of nodes in each arc.
+        arc_index (numpy.ndarray): Signed arc references of all parts,
+            concatenated. Arc i traversed in reverse is referenced as ~i.
+        part_arc_count (numpy.ndarray): Count of arc references in each part.
+        node_count (numpy.ndarray): Count of nodes in each geometry.
+        part_node_count (numpy.ndarray): Count of nodes in each geometry part.
+        is_hole (numpy.ndarray(bool)): True for each part that is a polygon
+            hole, False otherwise.
+
+    """
+
+    def __init__(self, geom_type, arc_x, arc_y, arc_z, arc_node_count,
+                 arc_index, part_arc_count, node_count, part_node_count,
+                 is_hole):
+        """Inits Topology with arcs and counts.
+
+        Args:
+            geom_type (str): Geometry type, either line or polygon.
+            arc_x (array-like(float)): X coordinates of all arc nodes, kept
+                as is if float32 or float64.
+            arc_y (array-like(float)): Y coordinates of all arc nodes.
+            arc_z (array-like(float) or None): Z coordinates of all arc nodes.
+            arc_node_count (array-like(int)): Count of nodes in each arc.
+            arc_index (array-like(int)): Signed arc references of all parts.
+            part_arc_count (array-like(int)): Count of arc references in each
+                part.
+            node_count (array-like(int)): Count of nodes in each geometry.
+            part_node_count (array-like(int)): Count of nodes in each part.
+            is_hole (array-like(bool)): True for each part that is a hole.
+
+        Raises:
+            ValueError: If geometry type is not line or polygon.
+
+        """
+        if geom_type not in ['line', 'polygon']:
+            raise ValueError('Only lines and polygons can be stored as arcs')
+        self.geom_type = geom_type
+        self.arc_x = _as_coords(arc_x)
+        self.arc_y = _as_coords(arc_y)
+        self.arc_z = None if arc_z is None else _as_coords(arc_z)
+        self.arc_node_count = np.asarray(arc_node_count, dtype=np.int_)
+        self.arc_index = np.asarray(arc_index, dtype=np.int_)
+        self.part_arc_count = np.asarray(part_arc_count, dtype=np.int_)
+        self.node_count = np.asarray(node_count, dtype=np.int_)
+        self.part_node_count = np.asarray(part_node_count, dtype=np.int_)
+        self.is_hole = np.asarray(is_hole, dtype=bool)
+
+
+    @classmethod
+    def from_ragged(cls, ragged):
+        """Builds a topology by finding runs of nodes shared between parts.
+
+        Each part is cut at junctions, i.e., nodes where the set of parts
+        sharing the adjacent segments changes, and at the nodes where any part
+        starts or ends. Runs between cuts with the same nodes, in either
+        direction, are stored once as an arc.
+
+        Args:
+            ragged (RaggedArrays): Line or polygon buffers.
+
+        Returns:
+            Topology: Topology holding the geometries as arcs.
+
+        Raises:
+            ValueError: If geometry type is not line or polygon.
+
+        """
+        if ragged.geom_type not in ['line', 'polygon']:
+            raise ValueError('Only lines and polygons can be stored as arcs')
+        n = len(ragged.x)
+        ids = _node_ids(ragged)
+        node_part = ragged.node_part_index()
+        part_offsets = ragged.part_offsets()
+        first = part_offsets[:-1]
+        last = part_offsets[1:] - 1
+
+        # Cut where the parts sharing consecutive segments differ
+        is_first = np.zeros(n, dtype=bool)
+        is_first[first] = True
+        is_last = np.zeros(n, dtype=bool)
+        is_last[last] = True
+        segment_start = np.flatnonzero(~is_last)
+        cut = is_first | is_last
+        if len(segment_start):
+            signature = _segment_signatures(ids, node_part, segment_start)
+            changed = np.any(signature[1:] != signature[:-1], axis=1)
+            following = segment_start[1:]
+            # Only compare segments within the same part
+            inner = changed & (following == segment_start[:-1] + 1)
+            cut[following[inner]] = True
+        # A junction in one part is a junction wherever its node appears
+        junction = np.zeros(ids.max() + 1 if n else 0, dtype=bool)
+        junction[ids[cut]] = True
+        cut |= junction[ids]
+
+        # Runs span consecutive cuts within a part, sharing their end nodes
+        cut_nodes = np.flatnonzero(cut)
+        pos = np.flatnonzero(~is_last[cut_nodes])
+        run_start = cut_nodes[pos]
+        run_end = cut_nodes[pos + 1]
+        # Parts with one node have a run with one node
+        single = first[ragged.part_node_count == 1]
+        if len(single):
+            run_start = np.concatenate((run_start, single))
+            run_end = np.concatenate((run_end, single))
+            order = np.argsort(run_start)
+            run_start = run_start[order]
+            run_end = run_end[order]
+        run_count = run_end - run_start + 1
+        run_offsets = _offsets(run_count)[:-1]
+        part_arc_count = np.bincount(node_part[run_start],
+                                     minlength=len(first))
+
+        # Put each run in a canonical direction so reversed runs match
+        inner_start = np.minimum(run_start + 1, run_end)
+        inner_end = np.maximum(run_end - 1, run_start)
+        forward = ((ids[run_start] < ids[run_end]) |
+                   ((ids[run_start] == ids[run_end]) &
+                    (ids[inner_start] <= ids[inner_end])))
+        step = np.arange(run_count.sum()) - np.repeat(run_offsets, run_count)
+        canonical = np.where(np.repeat(forward, run_count),
+                             np.repeat(run_start, run_count) + step,
+                             np.repeat(run_end, run_count) - step)
+        canonical_ids = ids[canonical]
+        hashes = _hash_sequences(canonical_ids, run_count)
+
+        # Group runs with the same hash, length, and end nodes, then confirm
+        # every run matches the first run in its group exactly
+        ends = np.sort(np.column_stack((ids[run_start], ids[run_end])),
+                       axis=1)
+        keys = np.column_stack((hashes.view(np.int64), run_count, ends))
+        group, first_run = _group_rows(keys)
+        rep = first_run[group]
+        rep_nodes = np.repeat(run_offsets[rep], run_count) + step
+        same = canonical_ids == canonical_ids[rep_nodes]
+        run_same = np.logical_and.reduceat(same, run_offsets)
+        rep = np.where(run_same, rep, np.arange(len(rep)))
+
+        # Arcs are the distinct representatives, in order of first use
+        is_rep = rep == np.arange(len(rep))
+        arc_of_rep = np.cumsum(is_rep) - 1
+        arc = arc_of_rep[rep]
+        arc_index = np.where(forward, arc, ~arc)
+        arc_nodes = canonical[np.repeat(is_rep, run_count)]
+        arc_z = None if ragged.z is None else ragged.z[arc_nodes]
+        return cls(ragged.geom_type, ragged.x[arc_nodes], ragged.y[arc_nodes],
+                   arc_z, run_count[is_rep], arc_index, part_arc_count,
+                   ragged.node_count.copy(), ragged.part_node_count.copy(),
+                   ragged.is_hole.copy())
+
+
+    def to_ragged(self):
+        """Rebuilds the parts from their arcs.
+
+        Returns:
+            RaggedArrays: Buffers holding the geometry nodes.
+
+        """
+        nodes = arc_node_index(self.arc_node_count, self.arc_index,
+                               self.part_arc_count)
+        z = None if self.arc_z is None else self.arc_z[nodes]
+        return RaggedArrays(self.geom_type, self.arc_x[nodes],
+                            self.arc_y[nodes], z, self.node_count,
+                            self.part_node_count, self.is_hole)
@@ -0,0 +1,217 @@
+"""Validates and repairs geometries held in contiguous ragged array buffers.
+
+Every check runs over the flat node and part arrays at once, so validating a
+container costs a few passes over its buffers rather than a loop over Part
+objects. Errors are reported per geometry as bit flags, combined with bitwise
+or, so a geometry with several problems reports all of them.
+
+Only structural problems are detected. Self-intersecting rings, overlapping
+parts, and holes outside their exterior ring are not.
+"""
+
+import numpy as np
+
+from . ragged import RaggedArrays, _offsets, _range_index, _trim_z
+
+
+class Errors(object):
+    """Bit flags of the errors found by validate."""
+
+    NAN_COORDINATE = 1
+    """int: A node has a NaN x or y coordinate."""
+
+    DUPLICATE_NODE = 2
+    """int: A node repeats the node before it in its part."""
+
+    TOO_FEW_NODES = 4
+    """int: A part has fewer distinct nodes than its geometry type needs,
+    i.e., two for lines and three for polygons, not counting the closing
+    node of a ring."""
+
+    UNCLOSED_RING = 8
+    """int: A polygon ring does not end on the node it starts on."""
+
+    HOLE_FIRST = 16
+    """int: The first part of a polygon geometry is a hole."""
+
+
+_min_nodes = {'point': 1, 'line': 2, 'polygon': 3}
+"""dict: Count of distinct nodes each part needs, by geometry type."""
+
+
+def _keep_nodes(ragged):
+    """Finds nodes with coordinates that differ from the previous node.
+
+    Args:
+        ragged (RaggedArrays): Geometries to check.
+
+    Returns:
+        Tuple of numpy.ndarray(bool) with True for each node with x and y
+        coordinates, and True for each such node that does not repeat the
+        previous such node of its part.
+
+    """
+    valid = ~(np.isnan(ragged.x) | np.isnan(ragged.y))
+    index = np.flatnonzero(valid)
+    previous = index[:-1]
+    current = index[1:]
+    node_part = ragged.node_part_index()
+    repeat = ((node_part[current] == node_part[previous]) &
+              (ragged.x[current] == ragged.x[previous]) &
+              (ragged.y[current] == ragged.y[previous]))
+    if ragged.z is not None:
+        z_current = ragged.z[current]
+        z_previous = ragged.z[previous]
+        repeat &= ((z_current == z_previous) |
+                   (np.isnan(z_current) & np.isnan(z_previous)))
+    keep = valid.copy()
+    keep[current[repeat]] = False
+    return valid, keep
+
+
+def _summarize_parts(ragged, keep):
+    """Counts the nodes kept in each part and checks ring closure.
+
+    Args:
+        ragged (RaggedArrays): Geometries to check.
+        keep (numpy.ndarray(bool)): True for each node kept.
+
+    Returns:
+        Tuple with the index of each kept node, the count of nodes kept in
+        each part, and True for each part whose first and last kept nodes are
+        identical.
+
+    """
+    kept = np.flatnonzero(keep)
+    count = np.bincount(ragged.node_part_index()[kept],
+                        minlength=len(ragged.part_node_count))
+    offsets = _offsets(count)
+    closed = np.zeros(len(count), dtype=bool)
+    multiple = np.flatnonzero(count > 1)
+    first = kept[offsets[multiple]]
+    last = kept[offsets[multiple + 1] - 1]
+    same = (ragged.x[first] == ragged.x[last]) & \
+        (ragged.y[first] == ragged.y[last])
+    if ragged.z is not None:
+        same &= ((ragged.z[first] == ragged.z[last]) |
+                 (np.isnan(ragged.z[first]) & np.isnan(ragged.z[last])))
+    closed[multiple] = same
+    return kept, count, closed
+
+
+def _any_by_geom(ragged, part_flag):
+    """Determines which geometries have a flagged part.
+
+    Args:
+        ragged (RaggedArrays): Geometries owning the parts.
+        part_flag (numpy.ndarray(bool)): True for each flagged part.
+
+    Returns:
+        numpy.ndarray(bool): True for each geometry with a flagged part.
+
+    """
+    return np.bincount(ragged.part_geom_index()[part_flag],
+                       minlength=len(ragged)) > 0
+
+
+def validate(ragged):
+    """Checks every geometry for structural errors.
+
+    Args:
+        ragged (RaggedArrays): Geometries to check.
+
+    Returns:
+        numpy.ndarray(int): Error flags of each geometry, combined from
+        Errors values, or zero if the geometry is valid.
+
+    """
+    valid, keep = _keep_nodes(ragged)
+    node_part = ragged.node_part_index()
+    part_count = len(ragged.part_node_count)
+    errors = np.zeros(len(ragged), dtype=np.int_)
+
+    nan_part = np.bincount(node_part[~valid], minlength=part_count) > 0
+    errors[_any_by_geom(ragged, nan_part)] |= Errors.NAN_COORDINATE
+    repeat_part = np.bincount(node_part[valid & ~keep],
+                              minlength=part_count) > 0
+    errors[_any_by_geom(ragged, repeat_part)] |= Errors.DUPLICATE_NODE
+
+    _, count, closed = _summarize_parts(ragged, keep)
+    if ragged.geom_type == 'polygon':
+        distinct = count - closed
+    else:
+        distinct = count
+    few_part = distinct < _min_nodes[ragged.geom_type]
+    errors[_any_by_geom(ragged, few_part)] |= Errors.TOO_FEW_NODES
+
+    if ragged.geom_type == 'polygon':
+        errors[_any_by_geom(ragged, ~ragged.is_closed())] |= \
+            Errors.UNCLOSED_RING
+        first_part = ragged.geom_part_offsets()[:-1]
+        errors[ragged.is_hole[first_part]] |= Errors.HOLE_FIRST
+    return errors
+
+
+def repair(ragged, return_index=False):
+    """Repairs structural errors of every geometry.
+
+    Nodes with a NaN x or y coordinate are dropped, as are nodes repeating
+    the node before them. Polygon rings are closed. Parts left with too few
+    distinct nodes are dropped, and geometries left without parts are
+    dropped. Holes before the first exterior ring of a polygon geometry are
+    moved after it, and holes of a geometry without any exterior ring become
+    exterior rings.
+
+    Args:
+        ragged (RaggedArrays): Geometries to repair.
+        return_index (bool, optional): True to also return the index of the
+            original geometry of each repaired geometry.
+
+    Returns:
+        RaggedArrays: Repaired geometries, in their original order, which may
+        hold no geometries. If return_index is True, a tuple with the
+        repaired geometries and the index of each in the original buffers.
+
+    """
+    _, keep = _keep_nodes(ragged)
+    kept, count, closed = _summarize_parts(ragged, keep)
+    is_polygon = ragged.geom_type == 'polygon'
+    distinct = count - closed if is_polygon else count
+    part_ok = distinct >= _min_nodes[ragged.geom_type]
+    append = part_ok & ~closed if is_polygon else np.zeros_like(part_ok)
+
+    # Source node of every output node, grouped by part: the kept nodes,
+    # then the first node of each ring that needs closing
+    part_index = np.flatnonzero(part_ok)
+    kept_offsets = _offsets(count)
+    sources = np.concatenate((
+        kept[_range_index(kept_offsets[part_index], count[part_index])],
+        kept[kept_offsets[:-1][append]]))
+    source_part = np.concatenate((np.repeat(part_index, count[part_index]),
+                                  np.flatnonzero(append)))
+
+    # Order the parts of each geometry so its first exterior ring leads
+    part_geom = ragged.part_geom_index()[part_index]
+    is_hole = ragged.is_hole[part_index].copy()
+    position = np.arange(len(part_index), dtype=np.float64)
+    if is_polygon and len(part_index):
+        exterior = np.flatnonzero(~is_hole)
+        _, first = np.unique(part_geom[exterior], return_index=True)
+        position[exterior[first]] = -1
+        no_exterior = np.ones(len(ragged), dtype=bool)
+        no_exterior[part_geom[exterior]] = False
+        is_hole[no_exterior[part_geom]] = False
+    part_order = np.lexsort((position, part_geom))
+    rank = np.empty(len(ragged.part_node_count), dtype=np.int_)
+    rank[part_index[part_order]] = np.arange(len(part_index))
+    nodes = sources[np.argsort(rank[source_part], kind='stable')]
+
+    part_node_count = (count + append)[part_index[part_order]]
+    node_count = np.bincount(part_geom, weights=count[part_index] +
+                             append[part_index], minlength=len(ragged))
+    index = np.flatnonzero(node_count)
+    z = None if ragged.z is None else _trim_z(ragged.z[nodes])
+    result = RaggedArrays(ragged.geom_type, ragged.x[nodes], ragged.y[nodes],
+                          z, node_count[index].astype(np.int_),
+                          part_node_count, is_hole[part_order])
+    return (result, index) if return_index else result
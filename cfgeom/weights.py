@@ -0,0 +1,655 @@
+"""Computes area overlap weights between polygons and grid cells.
+
+Polygon rings are clipped against the grid cells touched by the bounding box
+of any ring edge. Clipping follows Sutherland-Hodgman, one cell edge at a
+time, for all ring and cell pairs at once over flat arrays. Cells must be
+convex, which holds for regular grids and for the quadrilateral cells of
+typical curvilinear grids. Other cells within the bounding box of a geometry
+are entirely inside or entirely outside it, which a point in polygon test of
+the cell center settles.
+
+Weights are stored in compressed sparse row (CSR) form with one row per
+geometry and one column per grid cell.
+"""
+
+from netCDF4 import Dataset
+import numpy as np
+
+from . clip import _clip_half_plane, _half_plane, _ring_areas
+from . ragged import _offsets, _range_index
+from . spatial import GridIndex, PolygonIndex
+from . convert.netcdf.nc_constants import Attrs
+from . convert.netcdf.nc_names import NcNames
+from . convert.netcdf.nc_writer import _make_dim, _make_var, _set_attr
+
+
+_stats = ('mean', 'sum', 'min', 'max')
+"""tuple: Statistics supported when aggregating gridded values."""
+
+
+_min_fraction = 1e-9
+"""float: Overlaps smaller than this fraction of the cell area are dropped."""
+
+
+def _axis_bounds(bounds):
+    """Converts regular grid edges to bounds for each row or column.
+
+    Args:
+        bounds (numpy.ndarray(float)): Either the cell edges along an axis, or
+            an array of shape (n, 2) with the bounds of each row or column.
+
+    Returns:
+        numpy.ndarray(float): Array of shape (n, 2) with the bounds of each row
+        or column.
+
+    Raises:
+        ValueError: If the bounds are not in a recognized form.
+
+    """
+    if bounds.ndim == 1 and len(bounds) > 1:
+        return np.column_stack((bounds[:-1], bounds[1:]))
+    elif bounds.ndim == 2 and bounds.shape[1] == 2:
+        return bounds
+    raise ValueError('Grid bounds must be edges, bounds of shape (n, 2), or '
+                     'corners of shape (ny, nx, 4)')
+
+
+def grid_cells(x_bounds, y_bounds):
+    """Finds the corners of each cell of a regular or curvilinear grid.
+
+    Args:
+        x_bounds (array-like(float)): For a regular grid, either the cell
+            edges along x, or an array of shape (nx, 2) with the bounds of each
+            column as in the CF bounds convention. For a curvilinear grid, an
+            array of shape (ny, nx, 4) with the x coordinate of the corners of
+            each cell.
+        y_bounds (array-like(float)): Cell edges or bounds along y, in the
+            same form as x_bounds.
+
+    Returns:
+        Tuple with arrays of x and y cell corners, each of shape (ncell, 4) in
+        anticlockwise order, and the shape of the grid as (ny, nx). Cells are
+        ordered with x varying fastest.
+
+    Raises:
+        ValueError: If the bounds are not in a recognized form.
+
+    """
+    x_bounds = np.asarray(x_bounds, dtype=np.float64)
+    y_bounds = np.asarray(y_bounds, dtype=np.float64)
+    if x_bounds.ndim == 3 and x_bounds.shape[-1] == 4:
+        if x_bounds.shape != y_bounds.shape:
+            raise ValueError('x_bounds and y_bounds must have the same shape')
+        grid_shape = x_bounds.shape[:2]
+        cell_x = x_bounds.reshape(-1, 4)
+        cell_y = y_bounds.reshape(-1, 4)
+    else:
+        edges = [_axis_bounds(x_bounds), _axis_bounds(y_bounds)]
+        x_edges, y_edges = edges
+        grid_shape = (len(y_edges), len(x_edges))
+        x0 = np.tile(x_edges[:, 0], len(y_edges))
+        x1 = np.tile(x_edges[:, 1], len(y_edges))
+        y0 = np.repeat(y_edges[:, 0], len(x_edges))
+        y1 = np.repeat(y_edges[:, 1], len(x_edges))
+        cell_x = np.column_stack((x0, x1, x1, x0))
+        cell_y = np.column_stack((y0, y0, y1, y1))
+
+    # Reverse clockwise cells so the inside of each edge is on its left
+    clockwise = _cell_areas(cell_x, cell_y) < 0
+    cell_x = np.where(clockwise[:, None], cell_x[:, ::-1], cell_x)
+    cell_y = np.where(clockwise[:, None], cell_y[:, ::-1], cell_y)
+    return cell_x, cell_y, tuple(grid_shape)
+
+
+def _clip_areas(ragged, cell_x, cell_y, geom, cell):
+    """Computes the area of overlap of geometry and cell pairs.
+
+    Args:
+        ragged (RaggedArrays): Polygon buffers.
+        cell_x (numpy.ndarray(float)): X coordinates of cell corners.
+        cell_y (numpy.ndarray(float)): Y coordinates of cell corners.
+        geom (numpy.ndarray(int)): Geometry index of each pair.
+        cell (numpy.ndarray(int)): Cell index of each pair.
+
+    Returns:
+        numpy.ndarray(float): Area of overlap of each pair. Hole areas are
+        subtracted.
+
+    """
+    # Expand pairs to one entry per ring of the geometry
+    part_offsets = ragged.geom_part_offsets()
+    part_counts = ragged.geom_part_count()[geom]
+    part = _range_index(part_offsets[geom], part_counts)
+    ring_pair = np.repeat(np.arange(len(geom)), part_counts)
+    ring_cell = cell[ring_pair]
+    counts = ragged.part_node_count[part]
+    nodes = _range_index(ragged.part_offsets()[part], counts)
+    x = ragged.x[nodes]
+    y = ragged.y[nodes]
+
+    rings = np.arange(len(part))
+    for k in range(4):
+        following = (k + 1) % 4
+        x, y, _, counts = _clip_half_plane(
+            x, y, counts,
+            cell_x[ring_cell[rings], k], cell_y[ring_cell[rings], k],
+            cell_x[ring_cell[rings], following],
+            cell_y[ring_cell[rings], following])
+        nonempty = counts > 0
+        rings = rings[nonempty]
+        counts = counts[nonempty]
+        if not len(rings):
+            return np.zeros(len(geom))
+
+    area = _ring_areas(x, y, counts)
+    sign = np.where(ragged.is_hole[part[rings]], -1.0, 1.0)
+    return np.bincount(ring_pair[rings], weights=area * sign,
+                       minlength=len(geom))
+
+
+class OverlapWeights(object):
+    """Contains areas of overlap between geometries and grid cells.
+
+    Attributes:
+        indptr (numpy.ndarray(int)): Offsets of each geometry's entries, one
+            longer than the count of geometries.
+        cells (numpy.ndarray(int)): Flat index of the grid cell of each entry.
+        areas (numpy.ndarray(float)): Area of overlap of each entry.
+        grid_shape (tuple(int)): Shape of the grid.
+
+    """
+
+    def __init__(self, indptr, cells, areas, grid_shape):
+        """Inits OverlapWeights with CSR arrays.
+
+        Args:
+            indptr (array-like(int)): Offsets of each geometry's entries.
+            cells (array-like(int)): Flat grid cell index of each entry.
+            areas (array-like(float)): Area of overlap of each entry.
+            grid_shape (tuple(int)): Shape of the grid.
+
+        Raises:
+            ValueError: If the arrays are inconsistent.
+
+        """
+        self.indptr = np.asarray(indptr, dtype=np.int_)
+        self.cells = np.asarray(cells, dtype=np.int_)
+        self.areas = np.asarray(areas, dtype=np.float64)
+        self.grid_shape = tuple(int(n) for n in grid_shape)
+        if (len(self.cells) != len(self.areas) or
+                self.indptr[-1] != len(self.cells)):
+            raise ValueError('CSR arrays are inconsistent')
+
+
+    @property
+    def shape(self):
+        """tuple(int): Count of geometries and count of grid cells."""
+        return (len(self.indptr) - 1, int(np.prod(self.grid_shape)))
+
+
+    def counts(self):
+        """Returns the count of overlapping grid cells for each geometry.
+
+        Returns:
+            numpy.ndarray(int): Count of entries in each row.
+
+        """
+        return np.diff(self.indptr)
+
+
+    def _reduce_rows(self, vals, ufunc, empty):
+        """Reduces entry values along the last axis within each row.
+
+        Args:
+            vals (numpy.ndarray): Values with one entry per weight along the
+                last axis.
+            ufunc (numpy.ufunc): Reduction, such as numpy.add.
+            empty (float): Result for rows without entries.
+
+        Returns:
+            numpy.ndarray: Reduced values with one entry per geometry along
+            the last axis.
+
+        """
+        counts = self.counts()
+        result = np.full(vals.shape[:-1] + (len(counts),), empty,
+                         dtype=np.float64)
+        filled = counts > 0
+        if filled.any():
+            result[..., filled] = ufunc.reduceat(
+                vals, self.indptr[:-1][filled], axis=-1)
+        return result
+
+
+    def aggregate(self, values, stat='mean'):
+        """Summarizes gridded values for each geometry.
+
+        Cells with missing values, i.e., NaN or masked, are ignored.
+
+        Args:
+            values (array-like(float)): Gridded values whose trailing
+                dimensions match the grid shape. Leading dimensions, such as
+                time, are preserved.
+            stat (str, optional): One of mean, sum, min, or max. The mean is
+                weighted by overlap area. The sum adds each value times its
+                overlap area, i.e., integrates a density over the geometry.
+                The min and max are taken over all overlapping cells.
+
+        Returns:
+            numpy.ndarray(float): Statistic for each geometry along the last
+            axis, or NaN where no overlapping cell has a value.
+
+        Raises:
+            ValueError: If the statistic is not recognized or if the trailing
+                dimensions do not match the grid.
+
+        """
+        if stat not in _stats:
+            raise ValueError('stat must be one of: {0}'.format(
+                ', '.join(_stats)))
+        vals = self._gather(values)
+        valid = ~np.isnan(vals)
+        if stat in ('min', 'max'):
+            ufunc, fill = ((np.minimum, np.inf) if stat == 'min'
+                           else (np.maximum, -np.inf))
+            result = self._reduce_rows(np.where(valid, vals, fill), ufunc,
+                                       fill)
+            result[result == fill] = np.nan
+            return result
+        weights = np.where(valid, self.areas, 0.0)
+        total = self._reduce_rows(np.where(valid, vals, 0.0) * weights,
+                                  np.add, 0.0)
+        area = self._reduce_rows(weights, np.add, 0.0)
+        if stat == 'sum':
+            return np.where(area > 0, total, np.nan)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return np.where(area > 0, total / area, np.nan)
+
+
+    def _gather(self, values):
+        """Collects the gridded value of each entry.
+
+        Args:
+            values (array-like(float)): Gridded values whose trailing
+                dimensions match the grid shape.
+
+        Returns:
+            numpy.ndarray(float): Values with one entry per weight along the
+            last axis, with NaN for missing values.
+
+        Raises:
+            ValueError: If the trailing dimensions do not match the grid.
+
+        """
+        values = np.ma.filled(np.ma.asarray(values, dtype=np.float64), np.nan)
+        ndim = len(self.grid_shape)
+        if values.shape[values.ndim - ndim:] != self.grid_shape:
+            m = 'Values must end with the grid shape {0}'.format(
+                self.grid_shape)
+            raise ValueError(m)
+        flat = values.reshape(values.shape[:values.ndim - ndim] +
+                              (self.shape[1],))
+        return flat[..., self.cells]
+
+
+    def to_scipy(self):
+        """Converts the weights to a scipy sparse matrix.
+
+        Requires scipy, installed with the scipy extra, e.g.,
+        pip install cfgeom[scipy].
+
+        Returns:
+            scipy.sparse.csr_matrix: Matrix of overlap areas.
+
+        """
+        from scipy.sparse import csr_matrix
+        return csr_matrix((self.areas, self.cells, self.indptr),
+                          shape=self.shape)
+
+
+    def to_netcdf(self, path_or_object, nc_names=None):
+        """Writes the weights to a netCDF file.
+
+        Entries are stored as a contiguous ragged array along the instance
+        dimension, so weights can sit next to the geometry container they were
+        computed from.
+
+        Args:
+            path_or_object (str or netCDF4.Dataset): Target netCDF file
+                or object.  If the file exists, it is overwritten. Pass a
+                netCDF4.Dataset object to append to an existing file.
+            nc_names (nc_names.NcNames, optional): Object specifying names for
+                dimensions and variables to use in the netCDF file.
+
+        """
+        if nc_names is None:
+            nc_names = NcNames()
+        should_close = False
+        if isinstance(path_or_object, Dataset):
+            ds = path_or_object
+        else:
+            ds = Dataset(path_or_object, mode='w')
+            should_close = True
+
+        try:
+            _make_dim(ds, nc_names.instance_dim, self.shape[0])
+            _make_dim(ds, nc_names.weight_dim, len(self.cells))
+            v_count = _make_var(ds, nc_names.weight_count_var, np.int_,
+                                (nc_names.instance_dim,))
+            _set_attr(v_count, Attrs.LONG_NAME, Attrs.WEIGHT_COUNT_LONG_NAME)
+            v_count[:] = self.counts()
+            v_cell = _make_var(ds, nc_names.weight_cell_var, np.int_,
+                               (nc_names.weight_dim,))
+            _set_attr(v_cell, Attrs.LONG_NAME, Attrs.WEIGHT_CELL_LONG_NAME)
+            _set_attr(v_cell, Attrs.GRID_SHAPE, np.array(self.grid_shape))
+            v_cell[:] = self.cells
+            v_area = _make_var(ds, nc_names.weight_area_var, np.float64,
+                               (nc_names.weight_dim,))
+            _set_attr(v_area, Attrs.LONG_NAME, Attrs.WEIGHT_AREA_LONG_NAME)
+            v_area[:] = self.areas
+        finally:
+            if should_close:
+                ds.close()
+
+
+    @classmethod
+    def from_netcdf(cls, path_or_object, nc_names=None):
+        """Reads weights written by to_netcdf.
+
+        Args:
+            path_or_object (str or netCDF4.Dataset): Input netCDF file or
+                object.
+            nc_names (nc_names.NcNames, optional): Object specifying names for
+                dimensions and variables used in the netCDF file.
+
+        Returns:
+            OverlapWeights: The weights.
+
+        """
+        if nc_names is None:
+            nc_names = NcNames()
+        should_close = False
+        if isinstance(path_or_object, Dataset):
+            ds = path_or_object
+        else:
+            ds = Dataset(path_or_object)
+            should_close = True
+
+        try:
+            counts = ds.variables[nc_names.weight_count_var][:]
+            v_cell = ds.variables[nc_names.weight_cell_var]
+            grid_shape = np.atleast_1d(getattr(v_cell, Attrs.GRID_SHAPE))
+            return cls(_offsets(counts), v_cell[:],
+                       ds.variables[nc_names.weight_area_var][:], grid_shape)
+        finally:
+            if should_close:
+                ds.close()
+
+
+def _axis_range(lo, hi, vmin, vmax):
+    """Finds the rows or columns of a regular grid spanned by intervals.
+
+    Args:
+        lo (numpy.ndarray(float)): Lower bound of each row or column. Bounds
+            must be monotonic.
+        hi (numpy.ndarray(float)): Upper bound of each row or column.
+        vmin (numpy.ndarray(float)): Lower end of each interval.
+        vmax (numpy.ndarray(float)): Upper end of each interval.
+
+    Returns:
+        Tuple of numpy.ndarray(int) with the first row or column spanned by
+        each interval and the one after the last.
+
+    """
+    if lo[-1] >= lo[0]:
+        return (np.searchsorted(hi, vmin, side='left'),
+                np.searchsorted(lo, vmax, side='right'))
+    n = len(lo)
+    return (n - np.searchsorted(lo[::-1], vmax, side='right'),
+            n - np.searchsorted(hi[::-1], vmin, side='left'))
+
+
+def _regular_areas(ragged, x_bounds, y_bounds):
+    """Computes overlap areas with the cells of a regular grid by bisection.
+
+    All rings are clipped to the grid extent. The block of cells spanned by
+    each ring piece is then split in two along its longer side, and the piece
+    is clipped against the split line for each half, until every block is a
+    single cell. Each level clips every node about once, so the work grows
+    with the node count times the logarithm of the cell count rather than with
+    their product.
+
+    Args:
+        ragged (RaggedArrays): Polygon buffers.
+        x_bounds (numpy.ndarray(float)): Monotonic bounds of each column, of
+            shape (nx, 2).
+        y_bounds (numpy.ndarray(float)): Monotonic bounds of each row, of
+            shape (ny, 2).
+
+    Returns:
+        Tuple of numpy arrays with the geometry index, cell index, and
+        overlap area of each ring piece. Hole areas are negative.
+
+    """
+    x_lo = x_bounds.min(axis=1)
+    x_hi = x_bounds.max(axis=1)
+    y_lo = y_bounds.min(axis=1)
+    y_hi = y_bounds.max(axis=1)
+    nx = len(x_bounds)
+    ny = len(y_bounds)
+    part = np.arange(len(ragged.part_node_count))
+    counts = ragged.part_node_count
+    x = ragged.x
+    y = ragged.y
+    for value, is_x, keep_greater in [(x_lo.min(), True, True),
+                                      (x_hi.max(), True, False),
+                                      (y_lo.min(), False, True),
+                                      (y_hi.max(), False, False)]:
+        line = _half_plane(np.full(len(part), value), is_x, keep_greater)
+        x, y, _, counts = _clip_half_plane(x, y, counts, *line)
+        part = part[counts > 0]
+        counts = counts[counts > 0]
+    # Start each ring with the block of cells its bounding box spans
+    offsets = _offsets(counts)[:-1]
+    i0, i1 = _axis_range(x_lo, x_hi, np.minimum.reduceat(x, offsets),
+                         np.maximum.reduceat(x, offsets))
+    j0, j1 = _axis_range(y_lo, y_hi, np.minimum.reduceat(y, offsets),
+                         np.maximum.reduceat(y, offsets))
+    spanned = (i1 > i0) & (j1 > j0)
+    nodes = _range_index(offsets[spanned], counts[spanned])
+    x = x[nodes]
+    y = y[nodes]
+    part, counts, i0, i1, j0, j1 = [
+        a[spanned] for a in (part, counts, i0, i1, j0, j1)]
+
+    done_part = []
+    done_cell = []
+    done_area = []
+    while len(part):
+        # Pieces within a single cell are finished
+        offsets = _offsets(counts)
+        single = (i1 - i0) * (j1 - j0) == 1
+        if single.any():
+            nodes = _range_index(offsets[:-1][single], counts[single])
+            done_part.append(part[single])
+            done_cell.append(j0[single] * nx + i0[single])
+            done_area.append(_ring_areas(x[nodes], y[nodes], counts[single]))
+        split = ~single
+        nodes = _range_index(offsets[:-1][split], counts[split])
+        part = part[split]
+        counts = counts[split]
+        i0, i1, j0, j1 = i0[split], i1[split], j0[split], j1[split]
+        x = x[nodes]
+        y = y[nodes]
+
+        # Split each block along its longer side
+        along_x = (i1 - i0) >= (j1 - j0)
+        mid = np.where(along_x, (i0 + i1) // 2, (j0 + j1) // 2)
+        # The first half holds lower coordinates if bounds increase along
+        # the axis, and higher coordinates otherwise
+        first_edge = np.empty(len(mid))
+        second_edge = np.empty(len(mid))
+        first_greater = np.empty(len(mid), dtype=bool)
+        for along, lo, hi in [(along_x, x_lo, x_hi), (~along_x, y_lo, y_hi)]:
+            m = mid[along]
+            ascending = lo[-1] >= lo[0]
+            first_edge[along] = hi[m - 1] if ascending else lo[m - 1]
+            second_edge[along] = lo[m] if ascending else hi[m]
+            first_greater[along] = not ascending
+
+        halves = [
+            (first_greater, first_edge, i0, np.where(along_x, mid, i1),
+             j0, np.where(along_x, j1, mid)),
+            (~first_greater, second_edge, np.where(along_x, mid, i0), i1,
+             np.where(along_x, j0, mid), j1)]
+        results = []
+        for keep_greater, edge, ci0, ci1, cj0, cj1 in halves:
+            line = _half_plane(edge, along_x, keep_greater)
+            clipped_x, clipped_y, _, clipped_counts = _clip_half_plane(
+                x, y, counts, *line)
+            results.append((clipped_x, clipped_y, clipped_counts, ci0, ci1,
+                            cj0, cj1))
+        x, y, counts, i0, i1, j0, j1 = [np.concatenate(r)
+                                        for r in zip(*results)]
+        kept = counts > 0
+        part, counts, i0, i1, j0, j1 = [
+            a[kept] for a in (np.concatenate((part, part)), counts, i0, i1,
+                              j0, j1)]
+
+    if not done_part:
+        return np.zeros(0, dtype=np.int_), np.zeros(0, dtype=np.int_), \
+            np.zeros(0)
+    part = np.concatenate(done_part)
+    sign = np.where(ragged.is_hole[part], -1.0, 1.0)
+    return (ragged.part_geom_index()[part], np.concatenate(done_cell),
+            np.concatenate(done_area) * sign)
+
+
+def _curvilinear_areas(ragged, cell_x, cell_y, chunk_size):
+    """Computes overlap areas with the cells of any grid of convex cells.
+
+    Only cells touched by the bounding box of a ring edge are clipped. Other
+    cells within the bounding box of a geometry are entirely inside or
+    outside it, so their centers are tested instead.
+
+    Args:
+        ragged (RaggedArrays): Polygon buffers.
+        cell_x (numpy.ndarray(float)): X coordinates of cell corners.
+        cell_y (numpy.ndarray(float)): Y coordinates of cell corners.
+        chunk_size (int): Approximate count of nodes processed at once.
+
+    Returns:
+        Tuple of numpy arrays with the geometry index, cell index, and
+        overlap area of each geometry and cell pair.
+
+    """
+    index = GridIndex(np.column_stack((cell_x.min(axis=1), cell_y.min(axis=1),
+                                       cell_x.max(axis=1), cell_y.max(axis=1))))
+    ncell = len(cell_x)
+    geom, cell = index.query_boxes(ragged.bounds())
+
+    # Cells touched by a ring edge need clipping
+    following = ragged.next_node_index()
+    x0 = ragged.x
+    y0 = ragged.y
+    x1 = ragged.x[following]
+    y1 = ragged.y[following]
+    edge, edge_cell = index.query_boxes(np.column_stack((
+        np.minimum(x0, x1), np.minimum(y0, y1),
+        np.maximum(x0, x1), np.maximum(y0, y1))))
+    edge_geom = ragged.node_geom_index()[edge]
+    boundary = np.unique(edge_geom * ncell + edge_cell)
+    is_boundary = np.isin(geom * ncell + cell, boundary)
+
+    areas = np.zeros(len(geom))
+    interior = np.flatnonzero(~is_boundary)
+    if len(interior):
+        cx = cell_x[cell[interior]]
+        cy = cell_y[cell[interior]]
+        inside = PolygonIndex(ragged).contains(
+            cx.mean(axis=1), cy.mean(axis=1), geom[interior], chunk_size)
+        areas[interior] = np.where(inside, _cell_areas(cx, cy), 0.0)
+
+    # Clip in chunks of roughly equal node counts
+    clip = np.flatnonzero(is_boundary)
+    nodes = np.cumsum(ragged.node_count[geom[clip]])
+    bounds = np.searchsorted(nodes, np.arange(chunk_size, nodes[-1] if
+                                              len(nodes) else 0, chunk_size))
+    for start, stop in zip(np.r_[0, bounds], np.r_[bounds, len(clip)]):
+        if stop > start:
+            pairs = clip[start:stop]
+            areas[pairs] = _clip_areas(ragged, cell_x, cell_y, geom[pairs],
+                                       cell[pairs])
+    return geom, cell, areas
+
+
+def _cell_areas(cell_x, cell_y):
+    """Computes the area of anticlockwise cells.
+
+    Args:
+        cell_x (numpy.ndarray(float)): X coordinates of cell corners.
+        cell_y (numpy.ndarray(float)): Y coordinates of cell corners.
+
+    Returns:
+        numpy.ndarray(float): Area of each cell.
+
+    """
+    return np.sum(cell_x * np.roll(cell_y, -1, axis=1) -
+                  np.roll(cell_x, -1, axis=1) * cell_y, axis=1) / 2.0
+
+
+def overlap_weights(ragged, x_bounds, y_bounds, chunk_size=2**22):
+    """Computes areas of overlap between polygons and grid cells.
+
+    Regular grids, given by bounds along each axis, are processed by
+    recursive bisection. Curvilinear grids, given by cell corners, clip each
+    geometry against the cells crossed by its edges.
+
+    Args:
+        ragged (RaggedArrays): Polygon buffers.
+        x_bounds (array-like(float)): Grid bounds along x, as in grid_cells.
+            Bounds of regular grids must be monotonic.
+        y_bounds (array-like(float)): Grid bounds along y, as in grid_cells.
+        chunk_size (int, optional): Approximate count of ring nodes clipped
+            at once for curvilinear grids, which bounds memory use.
+
+    Returns:
+        OverlapWeights: Areas of overlap, with one row per geometry.
+
+    Raises:
+        ValueError: If the buffers do not hold polygons, or if the grid bounds
+            are not in a recognized form.
+
+    """
+    if ragged.geom_type != 'polygon':
+        raise ValueError('Overlap weights require polygons')
+    x_bounds = np.asarray(x_bounds, dtype=np.float64)
+    y_bounds = np.asarray(y_bounds, dtype=np.float64)
+    if x_bounds.ndim == 3:
+        cell_x, cell_y, grid_shape = grid_cells(x_bounds, y_bounds)
+        geom, cell, areas = _curvilinear_areas(ragged, cell_x, cell_y,
+                                               chunk_size)
+        cell_areas = np.abs(_cell_areas(cell_x[cell], cell_y[cell]))
+    else:
+        # Rectilinear cells are products of row and column bounds, so the
+        # corners of each cell are never built
+        x_bounds = _axis_bounds(x_bounds)
+        y_bounds = _axis_bounds(y_bounds)
+        nx = len(x_bounds)
+        ncell = len(y_bounds) * nx
+        grid_shape = (len(y_bounds), nx)
+        geom, cell, areas = _regular_areas(ragged, x_bounds, y_bounds)
+        # Sum the pieces of each geometry and cell pair
+        keys, inverse = np.unique(geom * ncell + cell, return_inverse=True)
+        geom = keys // ncell
+        cell = keys % ncell
+        areas = np.bincount(inverse.ravel(), weights=areas,
+                            minlength=len(keys))
+        cell_areas = (np.abs(np.diff(x_bounds, axis=1))[cell % nx, 0] *
+                      np.abs(np.diff(y_bounds, axis=1))[cell // nx, 0])
+
+    # Drop cells in holes, whose area cancels to round-off
+    overlaps = areas > _min_fraction * cell_areas
+    counts = np.bincount(geom[overlaps], minlength=len(ragged))
+    return OverlapWeights(_offsets(counts), cell[overlaps], areas[overlaps],
+                          grid_shape)
@@ -0,0 +1,140 @@
+"""Computes zonal statistics of gridded netCDF variables over geometries.
+
+The gridded variable is read a block of time steps at a time, so memory use
+depends on the block size rather than on the length of the time series. By
+default, blocks hold as many time steps as fit in a fixed number of bytes,
+whatever the grid size.
+"""
+
+from netCDF4 import Dataset
+import numpy as np
+
+from . weights import _stats
+from . convert.netcdf.nc_constants import Attrs
+from . convert.netcdf.nc_names import NcNames
+from . convert.netcdf.nc_reader import _chunk_bytes
+from . convert.netcdf.nc_writer import _make_dim, _make_var, _set_attr
+
+
+_cell_methods = {'mean': 'area: mean', 'sum': 'area: sum',
+                 'min': 'area: minimum', 'max': 'area: maximum'}
+"""dict: CF cell methods describing each statistic."""
+
+
+def _copy_time(source, target, time_dim):
+    """Copies the time dimension and coordinate variable to another file.
+
+    Args:
+        source (netCDF4.Dataset): The gridded netCDF file.
+        target (netCDF4.Dataset): The netCDF file receiving statistics.
+        time_dim (str): Name of the time dimension.
+
+    """
+    _make_dim(target, time_dim, len(source.dimensions[time_dim]))
+    if time_dim in source.variables and time_dim not in target.variables:
+        v_source = source.variables[time_dim]
+        v_time = _make_var(target, time_dim, v_source.dtype, (time_dim,))
+        v_time.setncatts({a: v_source.getncattr(a)
+                          for a in v_source.ncattrs()
+                          if a != '_FillValue'})
+        v_time[:] = v_source[:]
+
+
+def zonal_stats(weights, source, var_name, target=None, stats=('mean',),
+                chunk_size=None, nc_names=None):
+    """Computes statistics of a gridded variable for each geometry.
+
+    The variable must have one leading dimension, typically time, followed by
+    dimensions matching the grid of the weights.
+
+    Args:
+        weights (OverlapWeights): Areas of overlap between the geometries and
+            the grid, as from GeometryContainer.overlap_weights.
+        source (str or netCDF4.Dataset): NetCDF file or object holding the
+            gridded variable.
+        var_name (str): Name of the gridded variable.
+        target (str or netCDF4.Dataset, optional): NetCDF file or object to
+            write statistics to, typically the file holding the geometry
+            container. A path is opened in append mode. Each statistic is
+            written as a variable named after the gridded variable and the
+            statistic, e.g., precip_mean, with the instance and time
+            dimensions. Leave as None to return the statistics instead.
+        stats (list(str), optional): Statistics to compute, from mean, sum,
+            min, and max, as in OverlapWeights.aggregate.
+        chunk_size (int, optional): Count of time steps read at once. Each
+            time step holds the whole grid, so the block takes chunk_size
+            times the grid size times the item size in bytes. Defaults to as
+            many time steps as fit in 16 MiB, and at least one.
+        nc_names (nc_names.NcNames, optional): Names of the instance dimension
+            and geometry container variable in the target file.
+
+    Returns:
+        dict or None: If target is None, a dictionary keyed by statistic with
+        arrays of shape (instance, time). Otherwise, None.
+
+    Raises:
+        ValueError: If a statistic is not recognized, or if the variable does
+            not match the grid.
+
+    """
+    if nc_names is None:
+        nc_names = NcNames()
+    for stat in stats:
+        if stat not in _stats:
+            raise ValueError('stat must be one of: {0}'.format(
+                ', '.join(_stats)))
+
+    to_close = []
+    try:
+        if isinstance(source, Dataset):
+            src = source
+        else:
+            src = Dataset(source)
+            to_close.append(src)
+        var = src.variables[var_name]
+        if (var.ndim != len(weights.grid_shape) + 1 or
+                var.shape[1:] != weights.grid_shape):
+            m = ('{0} must have one leading dimension followed by the grid '
+                 'shape {1}').format(var_name, weights.grid_shape)
+            raise ValueError(m)
+        time_dim = var.dimensions[0]
+        time_count = var.shape[0]
+        if chunk_size is None:
+            step_bytes = int(np.prod(weights.grid_shape)) * var.dtype.itemsize
+            chunk_size = max(_chunk_bytes // max(step_bytes, 1), 1)
+
+        if target is None:
+            outputs = {stat: np.empty((weights.shape[0], time_count))
+                       for stat in stats}
+        else:
+            if isinstance(target, Dataset):
+                tgt = target
+            else:
+                tgt = Dataset(target, mode='a')
+                to_close.append(tgt)
+            _make_dim(tgt, nc_names.instance_dim, weights.shape[0])
+            _copy_time(src, tgt, time_dim)
+            outputs = {}
+            for stat in stats:
+                v_stat = _make_var(tgt, '{0}_{1}'.format(var_name, stat),
+                                   np.float64,
+                                   (nc_names.instance_dim, time_dim))
+                for attr in ['units', Attrs.LONG_NAME, Attrs.STANDARD_NAME]:
+                    if attr in var.ncattrs() and stat != 'sum':
+                        _set_attr(v_stat, attr, var.getncattr(attr))
+                _set_attr(v_stat, Attrs.CELL_METHODS, _cell_methods[stat])
+                if nc_names.container_var in tgt.variables:
+                    _set_attr(v_stat, Attrs.GEOMETRY, nc_names.container_var)
+                outputs[stat] = v_stat
+
+        for start in range(0, time_count, chunk_size):
+            stop = min(start + chunk_size, time_count)
+            block = var[start:stop]
+            for stat in stats:
+                outputs[stat][:, start:stop] = weights.aggregate(
+                    block, stat).T
+    finally:
+        for ds in to_close:
+            ds.close()
+    if target is None:
+        return outputs
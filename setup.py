@@ -36,6 +36,9 @@ setuptools.setup(
         'numpy >= 1.9.3',
         'netcdf4 >= 1.0.8',
     ],
+    extras_require={
+        'scipy': ['scipy'],
+    },
     classifiers=[
         'Programming Language :: Python',
         'License :: OSI Approved :: MIT License',